@@ -1,11 +1,15 @@
 # admin.py
+import os
+
 from django.contrib import admin
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.html import format_html
 
 from .models import (
-    People, Project, RequirementDraft, Requirement, SimilarProject,
+    People, Project, RequirementDraft, DraftFeature, Requirement, SimilarProject,
     TeamMember, TaskAssignment, ProjectTimeline, OutputDocument,
-    GanttChart, GanttTask,
+    GanttChart, GanttTask, Artifact, LLMCall,
 )
 
 # ───────────────────────── Project ─────────────────────────
@@ -19,6 +23,15 @@ class ProjectAdmin(admin.ModelAdmin):
 
 
 # ─────────────────────── RequirementDraft ───────────────────────
+class DraftFeatureInline(admin.TabularInline):
+    model = DraftFeature
+    fields = ("position", "feature_code", "feature_name", "priority", "summary")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = False
+
+
 @admin.register(RequirementDraft)
 class RequirementDraftAdmin(admin.ModelAdmin):
     list_display = ("draft_id", "project_id_col", "project_title", "creator",
@@ -32,6 +45,7 @@ class RequirementDraftAdmin(admin.ModelAdmin):
     list_filter = ("source", "created_at")
     ordering = ("-RequirementDraft_id",)
     list_select_related = ("project", "project__user")
+    inlines = [DraftFeatureInline]
 
     def draft_id(self, obj):
         return obj.RequirementDraft_id
@@ -64,6 +78,7 @@ class RequirementAdmin(admin.ModelAdmin):
     list_filter = ("source", "confirmed_by_user", "created_at")
     ordering = ("-Requirement",)
     list_select_related = ("project", "selected_from_draft")
+    raw_id_fields = ("selected_from_draft", "source_feature")
 
     def project_id_col(self, obj):
         return getattr(obj.project, "project_id", None)
@@ -88,7 +103,6 @@ class SimilarProjectAdmin(admin.ModelAdmin):
     ordering = ("-SimilarProject",)
     list_select_related = ("project",)
     list_per_page = 50
-    actions = ["dedupe_by_url"]
 
     def project_id_col(self, obj):
         return getattr(obj.project, "project_id", None)
@@ -121,19 +135,6 @@ class SimilarProjectAdmin(admin.ModelAdmin):
         )
     score_bar.short_description = "SIMILARITY (of 5)"
 
-    @admin.action(description="중복 URL 정리(같은 프로젝트의 동일 URL은 최고 점수만 남김)")
-    def dedupe_by_url(self, request, queryset):
-        seen = {}
-        deleted = 0
-        for sp in queryset.order_by("-similarity_score", "-stars", "-SimilarProject"):
-            key = (sp.project_id, sp.repo_url)
-            if key in seen:
-                sp.delete()
-                deleted += 1
-            else:
-                seen[key] = True
-        self.message_user(request, f"{deleted}개 중복 항목 정리됨.")
-
 
 # ───────────────────── TeamMember / TaskAssignment (커스텀) ─────────────────────
 @admin.register(TeamMember)
@@ -216,6 +217,64 @@ class TaskAssignmentAdmin(admin.ModelAdmin):
     member_name.short_description = "ASSIGNED TO"
 
 
+# ────────────────────────── Artifact ──────────────────────────
+@admin.register(Artifact)
+class ArtifactAdmin(admin.ModelAdmin):
+    list_display = ("Artifact", "project_id_col", "kind", "ts", "rel_path", "size", "created_at")
+    list_display_links = ("Artifact", "rel_path")
+    search_fields = ("rel_path", "sha256", "project__project_id", "project__title")
+    list_filter = ("kind", "created_at")
+    ordering = ("-Artifact",)
+    list_select_related = ("project",)
+
+    def project_id_col(self, obj):
+        return getattr(obj.project, "project_id", None)
+    project_id_col.short_description = "PROJECT ID"
+
+
+# ────────────────────────── LLMCall ──────────────────────────
+@admin.register(LLMCall)
+class LLMCallAdmin(admin.ModelAdmin):
+    list_display = ("LLMCall", "created_at", "provider", "stage", "call_site", "project_id", "model",
+                    "key_alias", "prompt_tokens", "output_tokens", "latency_ms", "retries", "cache_hit", "outcome")
+    list_display_links = ("LLMCall", "created_at")
+    search_fields = ("stage", "call_site", "model", "key_alias", "error", "project__project_id")
+    list_filter = ("provider", "outcome", "cache_hit", "stage", "created_at")
+    ordering = ("-created_at", "-LLMCall")
+    date_hierarchy = "created_at"
+    show_full_result_count = False  # 텔레메트리 테이블은 커서 COUNT(*)가 비쌈
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        custom = [
+            path("dashboard/", self.admin_site.admin_view(self.dashboard_view), name="auto_app_llmcall_dashboard"),
+        ]
+        return custom + super().get_urls()
+
+    def dashboard_view(self, request):
+        from .llm_telemetry import dashboard_stats, stats
+
+        try:
+            days = min(90, max(1, int(request.GET.get("days", 7))))
+        except ValueError:
+            days = 7
+        max_rows = int(os.getenv("LLM_DASHBOARD_MAX_ROWS", "200000"))
+        context = dict(
+            self.admin_site.each_context(request),
+            title="LLM 호출 비용/지연 대시보드",
+            opts=self.model._meta,
+            data=dashboard_stats(days=days, max_rows=max_rows),
+            writer=stats(),
+            day_choices=(1, 7, 30, 90),
+        )
+        return TemplateResponse(request, "admin/auto_app/llmcall/dashboard.html", context)
+
+
 # ────────────────────── Other simple tables ─────────────────────
 admin.site.register(People)
 admin.site.register(ProjectTimeline)
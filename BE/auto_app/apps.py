@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auto_app'
+
+    def ready(self):
+        # LLM_TRANSPORT_MODE=record|replay 이면 외부 HTTP 호출을 카세트 계층으로 연결
+        from . import llm_transport
+        if llm_transport.mode() != "live":
+            llm_transport.install()
+
+        # JWT 사용자 스냅샷 캐시: People 저장/삭제 시 캐시 무효화
+        from . import auth_cache
+        auth_cache.connect_signals()
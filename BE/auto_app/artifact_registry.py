@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+artifact_registry.py
+- media/ 하위에 생성되는 산출물 파일을 Artifact 테이블에 등록/조회
+- 목록·최신 파일 조회를 디렉터리 glob/listdir 대신 인덱스 쿼리로 처리
+- 파일명 규칙 파싱(parse_media_path)은 백필 커맨드(backfill_artifacts)와 공유
+- ARTIFACT_CAS=1(기본)이면 등록 시 blob_store로 흡수(동일 내용 중복 제거, 로컬 저장소일 때만)
+- 원격 저장소(ARTIFACT_STORAGE=s3)면 등록 시 업로드(publish)하고 URL은 presigned로 발급
+"""
+
+import hashlib
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Artifact
+from .blob_store import cas_enabled, detach_for_write, ingest_file
+from .storage_backend import get_storage, media_rel
+
+__all__ = [
+    "media_root",
+    "media_url",
+    "rel_media_path",
+    "register_artifact",
+    "detach_for_write",
+    "latest_artifact",
+    "find_artifact",
+    "list_artifacts",
+    "artifact_abspath",
+    "artifact_url",
+    "ts_to_iso",
+    "next_idea_seq",
+    "parse_media_path",
+    "file_url",
+    "stored_exists",
+    "read_stored_bytes",
+]
+
+_CHUNK = 64 * 1024
+
+
+def media_root() -> str:
+    return str(getattr(settings, "MEDIA_ROOT",
+                       os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media")))
+
+
+def media_url() -> str:
+    return getattr(settings, "MEDIA_URL", "/media/")
+
+
+def rel_media_path(abspath: str) -> str:
+    """MEDIA_ROOT 기준 상대경로(슬래시 구분)."""
+    return media_rel(os.path.abspath(abspath))
+
+
+def file_url(path: str, filename: Optional[str] = None) -> str:
+    """MEDIA 하위 파일의 다운로드 URL(로컬: MEDIA_URL, S3: presigned)."""
+    return get_storage().url(media_rel(path), filename=filename)
+
+
+def stored_exists(path: str) -> bool:
+    """로컬 스테이징 또는 원격 저장소에 파일이 있는지."""
+    if os.path.isfile(os.path.join(media_root(), *media_rel(path).split("/"))):
+        return True
+    storage = get_storage()
+    return (not storage.is_local) and storage.exists(media_rel(path))
+
+
+def read_stored_bytes(path: str) -> bytes:
+    local = os.path.join(media_root(), *media_rel(path).split("/"))
+    if os.path.isfile(local):
+        with open(local, "rb") as f:
+            return f.read()
+    return get_storage().read_bytes(media_rel(path))
+
+
+def _sha256(abspath: str) -> str:
+    h = hashlib.sha256()
+    with open(abspath, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 등록
+# ──────────────────────────────────────────────────────────────────────────────
+def register_artifact(
+    abspath: str,
+    kind: str,
+    project=None,
+    user=None,
+    source_draft=None,
+    ts: str = "",
+    seq: Optional[int] = None,
+    created_at=None,
+    compute_hash: bool = True,
+) -> Optional[Artifact]:
+    """
+    파일 생성 직후 호출. 같은 rel_path가 있으면 갱신(덮어쓰기 파일: 보고서 등).
+    등록 실패는 산출물 생성 자체를 막지 않도록 경고만 출력하고 None 반환.
+    """
+    try:
+        if not os.path.isfile(abspath):
+            return None
+        rel = rel_media_path(abspath)
+        storage = get_storage()
+        blob = None
+        if cas_enabled() and compute_hash and storage.is_local:
+            blob = ingest_file(abspath)
+            sha = blob.sha256
+        else:
+            sha = _sha256(abspath) if compute_hash else ""
+        obj, _ = Artifact.objects.update_or_create(
+            rel_path=rel,
+            defaults={
+                "project": project,
+                "user": user,
+                "kind": kind,
+                "ts": ts or "",
+                "seq": seq,
+                "size": os.path.getsize(abspath),
+                "sha256": sha,
+                "blob": blob,
+                "source_draft": source_draft,
+                "created_at": created_at or timezone.now(),
+            },
+        )
+        if not storage.is_local:
+            storage.publish(abspath, rel)  # 멀티파트 스트리밍 업로드(+ 로컬 스테이징 정리)
+        return obj
+    except Exception as e:
+        print(f"⚠️ Artifact 등록 실패({kind}): {abspath} → {e}")
+        return None
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 조회
+# ──────────────────────────────────────────────────────────────────────────────
+def list_artifacts(project, kind: str):
+    return Artifact.objects.filter(project=project, kind=kind).order_by("-created_at", "-Artifact")
+
+
+def latest_artifact(project, kind: str) -> Optional[Artifact]:
+    return list_artifacts(project, kind).first()
+
+
+def find_artifact(project, kind: str, ts: str) -> Optional[Artifact]:
+    return list_artifacts(project, kind).filter(ts=ts).first()
+
+
+def artifact_abspath(artifact: Artifact) -> str:
+    return os.path.join(media_root(), *artifact.rel_path.split("/"))
+
+
+def artifact_url(artifact: Optional[Artifact]) -> Optional[str]:
+    if not artifact:
+        return None
+    return get_storage().url(artifact.rel_path, filename=os.path.basename(artifact.rel_path))
+
+
+def ts_to_iso(ts: str) -> Optional[str]:
+    try:
+        return datetime.strptime(ts, "%Y%m%d_%H%M%S").isoformat()
+    except Exception:
+        return None
+
+
+def next_idea_seq(prefix: str) -> int:
+    """ideas/{prefix}_{n}.* 의 다음 번호. 미등록 파일과의 충돌은 호출 측에서 존재 확인."""
+    cur = (
+        Artifact.objects
+        .filter(kind__in=("idea_md", "idea_docx"), rel_path__startswith=f"ideas/{prefix}_")
+        .aggregate(m=Max("seq"))["m"]
+    )
+    return (cur or 0) + 1
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 파일명 규칙 파싱 (백필용)
+# ──────────────────────────────────────────────────────────────────────────────
+_TS = r"(\d{8}_\d{6})"
+_PATTERNS = [
+    (re.compile(rf"^drafts/project(\d+)_{_TS}_g1\.json$"), "g1_json"),
+    (re.compile(rf"^drafts/project(\d+)_{_TS}_g1\.xlsx$"), "g1_xlsx"),
+    (re.compile(rf"^refine/project(\d+)_{_TS}_g2_fix\.json$"), "g2_json"),
+    (re.compile(rf"^refine/project(\d+)_{_TS}_g2_fix\.xlsx$"), "g2_xlsx"),
+    (re.compile(rf"^final/project(\d+)_{_TS}_final\.docx$"), "final_docx"),
+    (re.compile(rf"^final/_main/project(\d+)_{_TS}_main\.docx$"), "main_docx"),
+    (re.compile(r"^reports/project(\d+)_analysis_report\.md$"), "report_md"),
+    (re.compile(r"^gantt/project(\d+)_.+\.xlsx$"), "gantt_xlsx"),
+    (re.compile(rf"^artifacts/project(\d+)/tools_recommendation_{_TS}\.json$"), "tools_json"),
+    (re.compile(rf"^artifacts/project(\d+)/tools_summary_{_TS}\.md$"), "tools_md"),
+    (re.compile(rf"^artifacts/project(\d+)/project\d+_(?:sql|backend|frontend)_{_TS}\.zip$"), "code_zip"),
+]
+_IDEA_RE = re.compile(r"^ideas/.+_(\d+)\.(md|docx)$")
+
+
+def parse_media_path(rel_path: str) -> Optional[dict]:
+    """
+    media 상대경로 → {"kind", "project_id", "ts", "seq"} (규칙 밖 파일은 None)
+    """
+    for rx, kind in _PATTERNS:
+        m = rx.match(rel_path)
+        if m:
+            groups = m.groups()
+            return {
+                "kind": kind,
+                "project_id": int(groups[0]),
+                "ts": groups[1] if len(groups) > 1 else "",
+                "seq": None,
+            }
+    m = _IDEA_RE.match(rel_path)
+    if m:
+        return {
+            "kind": "idea_md" if m.group(2) == "md" else "idea_docx",
+            "project_id": None,
+            "ts": "",
+            "seq": int(m.group(1)),
+        }
+    return None
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+artifact_serving.py
+- 생성 산출물(xlsx/md/docx 등) 다운로드·미리보기 공용 응답 계층
+- 강한 ETag(내용 sha256) + If-None-Match → 304
+- Range: bytes=… 단일 구간 → 206 / 불가 구간 → 416
+- 선택: 리버스 프록시로 전송 위임(X-Accel-Redirect / X-Sendfile)
+- 원격 저장소(ARTIFACT_STORAGE=s3)면 presigned URL로 302
+
+설정(settings 또는 .env):
+  ARTIFACT_OFFLOAD        = "" | "nginx" | "apache"
+  ARTIFACT_ACCEL_PREFIX   = "/protected-media/"   # nginx internal location (MEDIA_ROOT 매핑)
+  ARTIFACT_CACHE_CONTROL  = "private, no-cache"   # 매번 재검증(304) 허용, 공유 캐시 금지
+
+nginx 예시:
+  location /protected-media/ { internal; alias /srv/autoplan/BE/media/; }
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.http import http_date
+
+from .storage_backend import get_storage, media_rel
+
+__all__ = [
+    "serve_artifact",
+    "file_etag",
+    "etag_matches",
+    "content_disposition",
+    "media_root",
+]
+
+_CHUNK = 64 * 1024
+
+
+def _setting(name: str, default: str) -> str:
+    val = getattr(settings, name, None)
+    if val is None:
+        val = os.getenv(name, default)
+    return str(val or "")
+
+
+def media_root() -> str:
+    return str(getattr(
+        settings,
+        "MEDIA_ROOT",
+        os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media"),
+    ))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# ETag: (경로, 크기, mtime_ns) 단위로 해시를 메모리에 캐시 → 재요청 시 파일을 다시 읽지 않음
+# ──────────────────────────────────────────────────────────────────────────────
+_ETAG_CACHE_MAX = 2048
+_etag_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_etag_lock = threading.Lock()
+
+
+def file_etag(abspath: str, st: Optional[os.stat_result] = None) -> str:
+    """파일 내용 sha256 기반 강한 ETag(따옴표 포함)."""
+    st = st or os.stat(abspath)
+    key = (abspath, st.st_size, st.st_mtime_ns)
+    with _etag_lock:
+        tag = _etag_cache.get(key)
+        if tag:
+            _etag_cache.move_to_end(key)
+            return tag
+
+    h = hashlib.sha256()
+    with open(abspath, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    tag = f'"{h.hexdigest()[:32]}"'
+
+    with _etag_lock:
+        _etag_cache[key] = tag
+        while len(_etag_cache) > _ETAG_CACHE_MAX:
+            _etag_cache.popitem(last=False)
+    return tag
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match는 약한 비교: W/ 접두어 무시
+    tags = [t.strip() for t in header.split(",")]
+    return any(t[2:] == etag if t.startswith("W/") else t == etag for t in tags)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Range 파싱 (단일 구간만 206, 다중 구간은 전체 200으로 응답 - RFC 9110 허용)
+# ──────────────────────────────────────────────────────────────────────────────
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header: str, size: int):
+    """
+    반환: None(Range 무시 → 전체), (start, end) 포함 구간, 또는 "unsatisfiable"
+    """
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip().replace(" ", ""))
+    if not m:
+        return None  # 다중 구간/형식 오류 → 전체 응답
+    first, last = m.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        n = int(last)
+        if n == 0:
+            return "unsatisfiable"
+        return (max(0, size - n), size - 1)
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return "unsatisfiable"
+    return (start, min(end, size - 1))
+
+
+def _iter_range(abspath: str, start: int, length: int):
+    with open(abspath, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 응답 헤더
+# ──────────────────────────────────────────────────────────────────────────────
+def content_disposition(filename: str, as_attachment: bool = True) -> str:
+    """한글 파일명 호환(RFC 5987) + ASCII 대체 파일명."""
+    kind = "attachment" if as_attachment else "inline"
+    ascii_name = filename.encode("ascii", "ignore").decode() or "download"
+    ascii_name = ascii_name.replace('"', "").replace("\\", "")
+    return f"{kind}; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def _common_headers(resp, etag: str, st: os.stat_result, filename: str,
+                    content_type: str, as_attachment: Optional[bool]):
+    resp["ETag"] = etag
+    resp["Last-Modified"] = http_date(st.st_mtime)
+    resp["Cache-Control"] = _setting("ARTIFACT_CACHE_CONTROL", "private, no-cache")
+    resp["Accept-Ranges"] = "bytes"
+    resp["X-Content-Type-Options"] = "nosniff"
+    if content_type:
+        resp["Content-Type"] = content_type
+    if as_attachment is not None:
+        resp["Content-Disposition"] = content_disposition(filename, as_attachment)
+    return resp
+
+
+def _offload(resp, abspath: str) -> bool:
+    """프록시 전송 위임 헤더 설정. 위임했으면 True."""
+    mode = _setting("ARTIFACT_OFFLOAD", "").strip().lower()
+    if mode == "apache":
+        resp["X-Sendfile"] = abspath
+        return True
+    if mode == "nginx":
+        root = os.path.abspath(media_root())
+        if os.path.commonpath([root, abspath]) != root:
+            return False  # MEDIA_ROOT 밖 파일은 내부 location 매핑이 없으므로 직접 전송
+        rel = os.path.relpath(abspath, root).replace(os.sep, "/")
+        prefix = _setting("ARTIFACT_ACCEL_PREFIX", "/protected-media/")
+        resp["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(rel)
+        return True
+    return False
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 진입점
+# ──────────────────────────────────────────────────────────────────────────────
+def serve_artifact(
+    request,
+    abspath: str,
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+    as_attachment: Optional[bool] = True,
+    not_found: str = "파일이 존재하지 않습니다.",
+):
+    """
+    파일 응답 공용 함수.
+    - as_attachment=True: 다운로드 / False: inline / None: Content-Disposition 생략(RAW 미리보기)
+    - If-None-Match 일치 → 304 (본문 없음)
+    - Range 단일 구간 → 206, If-Range 불일치면 전체 200
+    - ARTIFACT_OFFLOAD 설정 시 본문은 프록시가 전송(X-Accel-Redirect/X-Sendfile)
+    """
+    abspath = os.path.abspath(abspath)
+
+    # 원격 저장소(S3/MinIO): 앱 서버를 거치지 않고 presigned URL로 리다이렉트
+    storage = get_storage()
+    if not storage.is_local and not os.path.isfile(abspath):
+        rel = media_rel(abspath)
+        if not storage.exists(rel):
+            raise Http404(not_found)
+        name = (filename or os.path.basename(abspath)) if as_attachment else None
+        return HttpResponseRedirect(storage.url(rel, filename=name))
+
+    try:
+        st = os.stat(abspath)
+    except OSError:
+        raise Http404(not_found)
+    if not os.path.isfile(abspath):
+        raise Http404(not_found)
+
+    filename = filename or os.path.basename(abspath)
+    if content_type is None:
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    etag = file_etag(abspath, st)
+    meta = request.META
+
+    # 1) 조건부 요청 → 304
+    if etag_matches(meta.get("HTTP_IF_NONE_MATCH", ""), etag):
+        resp = HttpResponse(status=304)
+        resp["ETag"] = etag
+        resp["Cache-Control"] = _setting("ARTIFACT_CACHE_CONTROL", "private, no-cache")
+        return resp
+
+    # 2) 프록시 위임: Range/전송은 프록시가 처리
+    resp = HttpResponse(content_type=content_type)
+    if _offload(resp, abspath):
+        return _common_headers(resp, etag, st, filename, content_type, as_attachment)
+
+    # 3) Range
+    size = st.st_size
+    rng = _parse_range(meta.get("HTTP_RANGE", ""), size)
+    if_range = meta.get("HTTP_IF_RANGE", "").strip()
+    if rng is not None and if_range and if_range != etag:
+        rng = None  # 파일이 바뀌었으면 전체 재전송
+
+    if rng == "unsatisfiable":
+        resp = HttpResponse(status=416)
+        resp["Content-Range"] = f"bytes */{size}"
+        resp["ETag"] = etag
+        resp["Accept-Ranges"] = "bytes"
+        return resp
+
+    if rng:
+        start, end = rng
+        length = end - start + 1
+        resp = StreamingHttpResponse(_iter_range(abspath, start, length), status=206,
+                                     content_type=content_type)
+        resp["Content-Range"] = f"bytes {start}-{end}/{size}"
+        resp["Content-Length"] = str(length)
+        return _common_headers(resp, etag, st, filename, content_type, as_attachment)
+
+    # 4) 전체: FileResponse → wsgi.file_wrapper(sendfile) 사용 가능
+    resp = FileResponse(open(abspath, "rb"), content_type=content_type)
+    resp["Content-Length"] = str(size)
+    return _common_headers(resp, etag, st, filename, content_type, as_attachment)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+auth_cache.py
+- JWTAuthentication의 요청당 People 조회(SELECT 1회)를 없애는 인증 클래스
+- 토큰의 user_id 클레임 + 짧은 TTL 캐시의 사용자 스냅샷으로 가벼운 People 인스턴스를 만듦
+  (Model.from_db 사용 → FK 대입/pk 비교는 그대로 동작, password 등 스냅샷에 없는 필드는 접근 시 지연 로드)
+- People 저장/삭제(비밀번호 변경·비활성화 포함) 시 post_save/post_delete 시그널로 캐시 항목 삭제
+  QuerySet.update()처럼 시그널이 안 나가는 경로는 invalidate_user(user_id)를 직접 호출
+
+환경변수:
+  JWT_USER_CACHE_TTL = 스냅샷 캐시 만료(초, 기본 60). 0이면 캐시 끔(매 요청 DB 조회)
+
+주의: CACHES["default"]가 기본 LocMemCache면 무효화는 해당 워커 프로세스에만 적용되고,
+      다른 워커는 TTL이 지나야 반영됨 → 여러 워커/서버에서는 Redis 등 공유 캐시 권장.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+__all__ = [
+    "CachedJWTAuthentication",
+    "invalidate_user",
+    "connect_signals",
+]
+
+# 스냅샷에 담는 필드(비밀번호 해시는 캐시에 넣지 않음)
+_SNAPSHOT_FIELDS = (
+    "user_id", "email", "username", "first_name", "last_name",
+    "is_active", "is_staff", "is_superuser", "date_joined", "created_at",
+)
+_REVOKE_KEY = "_pwd_md5"
+
+
+def _ttl() -> int:
+    try:
+        return int(os.getenv("JWT_USER_CACHE_TTL", "60"))
+    except ValueError:
+        return 60
+
+
+def _cache_key(user_id: Any) -> str:
+    return f"jwt_user:{user_id}"
+
+
+def invalidate_user(user_id: Any) -> None:
+    """캐시된 사용자 스냅샷 삭제(다음 요청에서 DB 재조회)."""
+    cache.delete(_cache_key(user_id))
+
+
+def _snapshot(user) -> Dict[str, Any]:
+    data = {name: getattr(user, name) for name in _SNAPSHOT_FIELDS}
+    if api_settings.CHECK_REVOKE_TOKEN:
+        from rest_framework_simplejwt.utils import get_md5_hash_password
+        data[_REVOKE_KEY] = get_md5_hash_password(user.password)
+    return data
+
+
+def _hydrate(model, data: Dict[str, Any]):
+    # from_db는 values를 concrete_fields 순서로 받음
+    names = [f.attname for f in model._meta.concrete_fields if f.attname in data]
+    db = router.db_for_read(model)
+    return model.from_db(db, names, [data[n] for n in names])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication과 같은 검증(토큰/활성 사용자/비밀번호 변경 토큰 폐기) + 사용자 스냅샷 캐시.
+    settings.REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"]에 등록해서 사용.
+    """
+
+    def get_user(self, validated_token):
+        ttl = _ttl()
+        if ttl <= 0:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        key = _cache_key(user_id)
+        data: Optional[Dict[str, Any]] = cache.get(key)
+        if data is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            data = _snapshot(user)
+            cache.set(key, data, ttl)
+        else:
+            user = _hydrate(self.user_model, data)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not data["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != data.get(_REVOKE_KEY):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 무효화 시그널 (비밀번호 변경 / 비활성화 / 프로필 수정 / 삭제)
+# ──────────────────────────────────────────────────────────────────────────────
+def _on_user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+def connect_signals() -> None:
+    """AppConfig.ready()에서 1회 호출."""
+    model = get_user_model()
+    post_save.connect(_on_user_changed, sender=model, dispatch_uid="auth_cache_user_saved")
+    post_delete.connect(_on_user_changed, sender=model, dispatch_uid="auth_cache_user_deleted")
@@ -20,7 +20,6 @@ Auto Document Writer — Interactive + Batch (Gemini 2.5-Flash)
   GEMINI_API_KEY_3=YOUR_KEY
 """
 
-import os
 import re
 import sys
 import json
@@ -29,30 +28,44 @@ from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
 from dotenv import load_dotenv
-import google.generativeai as genai
 
-# ---- Optional imports ----
 try:
-    import fitz  # PyMuPDF for PDF
-except Exception:
-    fitz = None
+    from .gemini_pool import get_pool, gemini_model
+except ImportError:  # 단독 스크립트 실행
+    from gemini_pool import get_pool, gemini_model
+
+# ---- Optional imports (첫 사용 때 로드: 서버 기동 시 PyMuPDF/python-docx import 비용 제거) ----
+fitz = None
+DocxDocument = None
+RGBColor = None
+_OPTIONAL_LOADED = False
 
-try:
-    from docx import Document as DocxDocument
-    from docx.shared import RGBColor
-except Exception:
-    DocxDocument = None
+
+def _load_optional():
+    global fitz, DocxDocument, RGBColor, _OPTIONAL_LOADED
+    if _OPTIONAL_LOADED:
+        return
+    try:
+        import fitz as _fitz  # PyMuPDF for PDF
+        fitz = _fitz
+    except Exception:
+        fitz = None
+    try:
+        from docx import Document as _DocxDocument
+        from docx.shared import RGBColor as _RGBColor
+        DocxDocument, RGBColor = _DocxDocument, _RGBColor
+    except Exception:
+        DocxDocument = None
+    _OPTIONAL_LOADED = True
 
 # --------------------------
 # Gemini 초기화
 # --------------------------
 def init_gemini(model_name: str):
     load_dotenv()
-    api_key = os.getenv("GEMINI_API_KEY_3")
-    if not api_key:
-        raise RuntimeError("GEMINI_API_KEY_3 가 .env 에 없습니다.")
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel(model_name)
+    if not len(get_pool()):
+        raise RuntimeError("Gemini 키 풀이 비어 있습니다. .env에 GEMINI_API_KEY_1~4 / GOOGLE_API_KEY / GEMINI_API_KEY 중 하나 이상을 설정하세요.")
+    return gemini_model(model_name, prefer="GEMINI_API_KEY_3")
 
 # --------------------------
 # 유틸: 파일/문서 도우미
@@ -71,6 +84,7 @@ def detect_placeholders_in_text(text: str) -> List[str]:
     return sorted(set(m.group(1).strip() for m in PLACEHOLDER_PATTERN.finditer(text)))
 
 def extract_text_from_pdf(p: Path, max_bytes: int = 50000) -> str:
+    _load_optional()
     if fitz is None:
         return "(PyMuPDF 미설치) PDF 텍스트 추출 불가"
     doc = fitz.open(p.as_posix())
@@ -90,6 +104,7 @@ def extract_text_from_pdf(p: Path, max_bytes: int = 50000) -> str:
     return "\n\n".join(pages)
 
 def load_docx_and_plaintext(p: Path) -> Tuple[Optional[object], str]:
+    _load_optional()
     if DocxDocument is None:
         return None, ""
     doc = DocxDocument(p.as_posix())
@@ -132,6 +147,8 @@ def hwpx_replace_and_write(src: Path, dst: Path, mapping: Dict[str, str], unsure
                 zout.writestr(item, data)
 
 def docx_replace_placeholders(doc, mapping: Dict[str, str], unsure_to_red=True):
+    _load_optional()
+
     def replace_run_text(run, key, value):
         if f"{{{{{key}}}}}" in run.text:
             run.text = run.text.replace(f"{{{{{key}}}}}", value)
@@ -240,8 +257,10 @@ def build_prompt(plan_text: str,
 # 프롬프트 & LLM 호출(안전)
 # --------------------------
 def llm_generate(model, prompt: str, instruction: str) -> str:
+    from google.generativeai.types import GenerationConfig
+
     full = prompt + "\n\n[작성 요청]\n" + instruction
-    gen_cfg = genai.types.GenerationConfig(
+    gen_cfg = GenerationConfig(
         temperature=0.3, top_p=0.9, max_output_tokens=1536
     )
 
@@ -551,6 +570,7 @@ def process_structure_mimic_mode(model,
     print(f"✅ 합본 저장: {outp}")
 
     # (선택) DOCX 변환 안내
+    _load_optional()
     if DocxDocument:
         try:
             d2 = DocxDocument()
@@ -625,6 +645,7 @@ def main():
     # 4) 분기 처리
     ext = tpl_path.suffix.lower()
 
+    _load_optional()
     if ext == ".docx":
         if DocxDocument is None:
             print("python-docx 미설치로 .docx 처리가 불가합니다.", file=sys.stderr); sys.exit(1)
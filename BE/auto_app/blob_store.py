@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+blob_store.py
+- media 산출물을 SHA-256 기준 blob(media/blobs/ab/<sha256>)으로 저장하고
+  기존 경로(drafts/…, refine/… 등)는 blob에 대한 하드링크로 유지 → 동일 내용은 디스크 1벌
+- 보존 정책: (프로젝트, 종류)별 최근 N개만 유지(ARTIFACT_KEEP_LAST, 종류별 ARTIFACT_KEEP_LAST_<KIND>)
+  단, GanttChart/OutputDocument.file_path가 가리키는 파일은 다운로드 링크가 살아 있으므로 남김
+- GC: 참조 없는 blob / 오래된 중간 파일(final/_tmp, final/_main/proj*_plan.json) 삭제 + 회수 바이트 집계
+
+하드링크가 불가능한 파일시스템이면 복사로 대체(중복 제거 없이 참조 집계만 유지)
+
+주의: 하드링크는 inode를 공유하므로 media 경로를 제자리에서 다시 쓰면(open "w", doc.save 등)
+blob과 같은 내용의 다른 산출물까지 바뀐다. 기존 경로를 덮어쓸 수 있는 writer는 쓰기 전에
+detach_for_write(path)로 링크를 끊거나, 임시 파일에 쓴 뒤 os.replace로 교체해야 한다.
+"""
+
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from datetime import timedelta
+from typing import Dict, Optional, Set
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Artifact, Blob, GanttChart, OutputDocument
+from .storage_backend import get_storage, media_rel
+
+__all__ = [
+    "cas_enabled",
+    "keep_last_for",
+    "ingest_file",
+    "detach_for_write",
+    "apply_retention",
+    "collect_garbage",
+    "human_bytes",
+]
+
+BLOB_DIR = "blobs"
+_CHUNK = 64 * 1024
+
+
+def _media_root() -> str:
+    from .artifact_registry import media_root
+    return media_root()
+
+
+def cas_enabled() -> bool:
+    return os.getenv("ARTIFACT_CAS", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def keep_last_for(kind: str) -> int:
+    """종류별 보존 개수(0 이하 = 무제한)."""
+    raw = os.getenv(f"ARTIFACT_KEEP_LAST_{kind.upper()}") or os.getenv("ARTIFACT_KEEP_LAST", "10")
+    try:
+        return int(raw)
+    except ValueError:
+        return 10
+
+
+def human_bytes(n: int) -> str:
+    size = float(n)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f}{unit}" if unit != "B" else f"{int(size)}B"
+        size /= 1024
+    return f"{n}B"
+
+
+def _sha256(abspath: str) -> str:
+    h = hashlib.sha256()
+    with open(abspath, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _blob_rel(sha: str) -> str:
+    return f"{BLOB_DIR}/{sha[:2]}/{sha}"
+
+
+def _abs(rel: str) -> str:
+    return os.path.join(_media_root(), *rel.split("/"))
+
+
+def _link_or_copy(src: str, dst: str) -> bool:
+    """dst를 src의 하드링크로 원자적 교체. 링크 불가면 복사. 링크 성공 여부 반환."""
+    tmp = f"{dst}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        os.link(src, tmp)
+        linked = True
+    except OSError:
+        shutil.copy2(src, tmp)
+        linked = False
+    os.replace(tmp, dst)
+    return linked
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 저장(ingest)
+# ──────────────────────────────────────────────────────────────────────────────
+def ingest_file(abspath: str) -> Blob:
+    """
+    방금 생성된 파일을 blob 저장소로 흡수한다.
+    - 같은 sha256 blob이 있으면: 새 파일을 기존 blob 하드링크로 교체(중복 바이트 해제)
+    - 없으면: 파일 내용을 blob 경로에 하드링크로 등록
+    """
+    sha = _sha256(abspath)
+    size = os.path.getsize(abspath)
+    rel = _blob_rel(sha)
+    blob_abs = _abs(rel)
+
+    blob = Blob.objects.filter(sha256=sha).first()
+    if blob and os.path.isfile(blob_abs):
+        if not os.path.samefile(blob_abs, abspath):
+            _link_or_copy(blob_abs, abspath)
+        Blob.objects.filter(pk=blob.pk).update(last_ref_at=timezone.now())
+        return blob
+
+    os.makedirs(os.path.dirname(blob_abs), exist_ok=True)
+    if not os.path.isfile(blob_abs):
+        _link_or_copy(abspath, blob_abs)
+    try:
+        with transaction.atomic():
+            blob, _ = Blob.objects.update_or_create(
+                sha256=sha,
+                defaults={"size": size, "path": rel, "last_ref_at": timezone.now()},
+            )
+    except IntegrityError:
+        # 동시 ingest로 다른 워커가 먼저 만든 경우
+        blob = Blob.objects.get(sha256=sha)
+    return blob
+
+
+def detach_for_write(abspath: str) -> None:
+    """abspath가 다른 경로(blob)와 inode를 공유하면 이 경로만 지운다 → 이후 쓰기는 새 inode로 감."""
+    try:
+        if os.stat(abspath).st_nlink > 1:
+            os.remove(abspath)
+    except OSError:
+        pass
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 보존 정책
+# ──────────────────────────────────────────────────────────────────────────────
+def _remove_file(abspath: str) -> int:
+    """파일 삭제. 실제로 해제된 바이트(마지막 링크였을 때만) 반환."""
+    try:
+        st = os.stat(abspath)
+    except OSError:
+        return 0
+    freed = st.st_size if st.st_nlink <= 1 else 0
+    try:
+        os.remove(abspath)
+    except OSError:
+        return 0
+    return freed
+
+
+def _referenced_paths(project=None) -> Set[str]:
+    """다른 테이블이 file_path로 직접 가리키는 media 상대경로(간트 엑셀 다운로드 등)."""
+    paths: Set[str] = set()
+    for model in (GanttChart, OutputDocument):
+        qs = model.objects.exclude(file_path__isnull=True).exclude(file_path="")
+        if project is not None:
+            qs = qs.filter(project=project)
+        paths.update(media_rel(p) for p in qs.values_list("file_path", flat=True))
+    return paths
+
+
+def apply_retention(keep_last: Optional[int] = None, project=None, dry_run: bool = False) -> Dict[str, int]:
+    """
+    (프로젝트, 사용자, 종류)별 최신 N개를 남기고 나머지 Artifact 행과 해당 경로 파일을 삭제.
+    프로젝트 없는 산출물(아이디어)은 사실상 (사용자, 종류) 단위. 개수를 센 키 그대로 삭제 대상을 고른다.
+    GanttChart/OutputDocument.file_path가 가리키는 파일은 N개를 넘어도 남긴다(referenced로 집계).
+    blob 자체는 GC 단계에서 참조 0일 때 삭제된다.
+    """
+    from .artifact_registry import artifact_abspath
+
+    qs = Artifact.objects.all()
+    if project is not None:
+        qs = qs.filter(project=project)
+
+    groups = (
+        qs.values("project_id", "user_id", "kind")
+        .annotate(n=Count("Artifact"))
+        .order_by()
+    )
+    stats = {"artifacts": 0, "bytes": 0, "referenced": 0}
+    referenced = _referenced_paths(project)
+    for g in groups:
+        keep = keep_last if keep_last is not None else keep_last_for(g["kind"])
+        if keep <= 0 or g["n"] <= keep:
+            continue
+        stale = list(
+            qs.filter(project_id=g["project_id"], user_id=g["user_id"], kind=g["kind"]).order_by("-created_at", "-Artifact")[keep:]
+        )
+        storage = get_storage()
+        for a in stale:
+            if a.rel_path in referenced:
+                stats["referenced"] += 1
+                continue
+            stats["artifacts"] += 1
+            if dry_run:
+                continue
+            stats["bytes"] += _remove_file(artifact_abspath(a))
+            if not storage.is_local:
+                storage.delete(a.rel_path)
+                stats["bytes"] += a.size
+            a.delete()
+    return stats
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# GC
+# ──────────────────────────────────────────────────────────────────────────────
+def collect_garbage(
+    dry_run: bool = False,
+    grace_minutes: int = 10,
+    tmp_max_age_hours: float = 24,
+) -> Dict[str, int]:
+    """
+    - 참조 0인 blob(행 + 파일) 삭제 (grace_minutes 이내 사용된 blob은 보류: 동시 ingest 보호)
+    - DB에 없는 blob 파일(중단된 ingest 잔여물) 삭제
+    - final/_tmp/*, final/_main/proj*_plan.json 중 tmp_max_age_hours 지난 중간 파일 삭제
+    """
+    root = _media_root()
+    cutoff = timezone.now() - timedelta(minutes=grace_minutes)
+    stats = {"blobs": 0, "orphan_files": 0, "tmp_files": 0, "bytes": 0}
+
+    # 1) 참조 없는 blob
+    unref = (
+        Blob.objects.annotate(refs=Count("artifacts"))
+        .filter(refs=0, last_ref_at__lt=cutoff)
+    )
+    for b in unref:
+        stats["blobs"] += 1
+        if dry_run:
+            stats["bytes"] += b.size
+            continue
+        stats["bytes"] += _remove_file(_abs(b.path))
+        b.delete()
+        try:
+            os.rmdir(os.path.dirname(_abs(b.path)))  # 비었으면 blobs/ab/ 정리
+        except OSError:
+            pass
+
+    # 2) DB에 없는 blob 파일
+    blob_root = os.path.join(root, BLOB_DIR)
+    known = set(Blob.objects.values_list("path", flat=True))
+    old_ts = time.time() - grace_minutes * 60
+    if os.path.isdir(blob_root):
+        for dirpath, _dirs, files in os.walk(blob_root):
+            for name in files:
+                fp = os.path.join(dirpath, name)
+                rel = os.path.relpath(fp, root).replace(os.sep, "/")
+                if rel in known or os.path.getmtime(fp) > old_ts:
+                    continue
+                stats["orphan_files"] += 1
+                stats["bytes"] += os.path.getsize(fp) if dry_run else _remove_file(fp)
+
+    # 3) final 중간 파일
+    tmp_cut = time.time() - tmp_max_age_hours * 3600
+    final_dir = os.path.join(root, "final")
+    cands = []
+    tmp_dir = os.path.join(final_dir, "_tmp")
+    if os.path.isdir(tmp_dir):
+        cands += [os.path.join(tmp_dir, n) for n in os.listdir(tmp_dir)]
+    main_dir = os.path.join(final_dir, "_main")
+    if os.path.isdir(main_dir):
+        cands += [os.path.join(main_dir, n) for n in os.listdir(main_dir)
+                  if n.startswith("proj") and n.endswith("_plan.json")]
+    for fp in cands:
+        if not os.path.isfile(fp) or os.path.getmtime(fp) > tmp_cut:
+            continue
+        stats["tmp_files"] += 1
+        stats["bytes"] += os.path.getsize(fp) if dry_run else _remove_file(fp)
+
+    return stats
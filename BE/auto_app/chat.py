@@ -6,12 +6,12 @@ try:
 except Exception:
     load_dotenv = None  # optional
 
+# google-generativeai는 gemini_pool이 첫 호출 때 import (여기서 미리 import하지 않음)
+
 try:
-    import google.generativeai as genai  # type: ignore
-except Exception as exc:
-    print("google-generativeai 패키지가 설치되어 있지 않습니다.\n"
-          "설치: pip install -r requirements.txt", file=sys.stderr)
-    raise
+    from .gemini_pool import get_pool
+except ImportError:  # 단독 스크립트 실행
+    from gemini_pool import get_pool
 
 
 SYSTEM_INSTRUCTION_KO = (
@@ -32,17 +32,20 @@ def configure_api_key() -> str:
         load_dotenv()
     api_key = os.environ.get("GEMINI_API_KEY_4", "").strip()
     if not api_key:
-        print("환경변수 GEMINI_API_KEY가 설정되어 있지 않습니다.")
-        print("PowerShell 예시:  $env:GEMINI_API_KEY=\"YOUR_KEY\"")
-        print("또는 .env 파일에 GEMINI_API_KEY=... 를 설정하세요.")
+        print("환경변수 GEMINI_API_KEY_4가 설정되어 있지 않습니다. (챗봇은 이 키를 풀에 등록해 우선 사용)")
+        print("PowerShell 예시:  $env:GEMINI_API_KEY_4=\"YOUR_KEY\"")
+        print("또는 .env 파일에 GEMINI_API_KEY_4=... 를 설정하세요.")
         sys.exit(1)
     return api_key
 
 
 def build_model(api_key: str):
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(
-        model_name="gemini-1.5-flash",
+    # 전역 genai.configure 대신 키 풀에 등록 후 해당 키 우선 사용
+    pool = get_pool()
+    alias = pool.ensure_key(api_key, alias="GEMINI_API_KEY_4")
+    model = pool.model(
+        "gemini-1.5-flash",
+        prefer=alias,
         system_instruction=SYSTEM_INSTRUCTION_KO,
     )
     chat = model.start_chat(history=[])
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+compressed_text.py
+- 큰 TEXT 컬럼(기획서 원문, LLM JSON 등)을 압축해 BLOB으로 저장하는 모델 필드 + 코덱
+  CompressedTextField: 저장 시 압축, 조회 시(from_db_value) 자동 해제 → 코드에서는 그대로 str
+- 코덱: zlib(표준 라이브러리, 기본) / zstd(zstandard 설치 시). 둘 다 사전(dictionary) 사용
+  우리 데이터는 같은 한국어 JSON 키("기능명", "기능설명", "사용자시나리오" …)가 반복되므로
+  사전이 있으면 짧은 값도 잘 줄어듦
+- 저장 형식: 1바이트 코덱 + (압축이면) 4바이트 사전 ID + 본문
+    0x00 = 무압축 UTF-8 / 0x01 = raw deflate / 0x02 = zstd
+  헤더가 없는 값(압축 전 TEXT 데이터)은 UTF-8 원문으로 읽음
+- 사전: 내장 사전(_BUILTIN_DICT) + auto_app/text_dicts/*.dict(train_dictionary로 생성)
+  한 번이라도 데이터를 쓴 사전은 지우거나 바꾸면 안 됨(ID = 사전 내용 crc32)
+
+설정(.env):
+  TEXT_COMPRESSION          = "zlib"(기본) | "zstd" | "none"
+  TEXT_COMPRESSION_DICT     = 쓰기에 사용할 사전 파일 경로(없으면 내장 사전)
+  TEXT_COMPRESSION_LEVEL    = 압축 레벨(기본 zlib 6 / zstd 9)
+  TEXT_COMPRESSION_MIN_BYTES = 이보다 짧으면 무압축(기본 128)
+"""
+
+import json
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import models
+
+__all__ = [
+    "CompressedTextField",
+    "compress_text",
+    "decompress_text",
+    "train_dictionary",
+    "builtin_dictionary",
+    "DICT_DIR",
+]
+
+RAW, DEFLATE, ZSTD = 0x00, 0x01, 0x02
+DICT_DIR = Path(__file__).resolve().parent / "text_dicts"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 내장 사전 (⚠️ 내용 변경 금지 — 바꾸려면 text_dicts/에 새 사전 추가)
+# ──────────────────────────────────────────────────────────────────────────────
+def _builtin_dict_bytes() -> bytes:
+    feature = {
+        "기능ID": "F-001",
+        "기능명": "",
+        "기능설명": {"목적": "", "핵심역할": ""},
+        "사용자시나리오": {"상황": "", "행동": ""},
+        "입력값": {"필수": [], "선택": [], "형식": ""},
+        "출력값": {"요약정보": "", "상세정보": ""},
+        "처리방식": {"단계": [], "사용모델": ""},
+        "예외조건및처리": {"입력누락": "", "오류": ""},
+        "의존성또는연동항목": [],
+        "기능우선순위": "높음",
+        "UI요소": [],
+        "테스트케이스예시": [],
+    }
+    gantt = {"기획서요약": "", "기능ID": "", "기능명": "", "파트": ["백엔드", "프론트엔드"],
+             "기간": 1, "시작주차": 1, "선행작업": None}
+    words = (
+        "사용자가 기능을 통해 데이터를 입력하면 시스템은 결과를 저장하고 화면에 표시한다. "
+        "백엔드 프론트엔드 AI 디자인 데이터베이스 서버 API 로그인 회원가입 인증 권한 관리자 "
+        "조회 등록 수정 삭제 검색 알림 업로드 다운로드 결제 대시보드 통계 보고서 프로젝트 "
+        "요구사항 기획서 개발 일정 테스트 예외 처리 오류 메시지 입력 출력 필수 선택 형식 "
+        "높음 중간 낮음 주차 기간 담당 파트 "
+    )
+    parts = [
+        words,
+        json.dumps(gantt, ensure_ascii=False),
+        json.dumps(feature, ensure_ascii=False, indent=2),
+        json.dumps([feature], ensure_ascii=False),  # 가장 흔한 형태(압축 JSON 배열)는 끝 쪽에
+    ]
+    return "\n".join(parts).encode("utf-8")
+
+
+_BUILTIN_DICT = _builtin_dict_bytes()
+
+
+def _dict_id(data: bytes) -> int:
+    return zlib.crc32(data) & 0xFFFFFFFF
+
+
+def builtin_dictionary() -> bytes:
+    return _BUILTIN_DICT
+
+
+_dicts_lock = threading.Lock()
+_dicts: Optional[Dict[int, bytes]] = None
+_active: Optional[Tuple[int, bytes]] = None
+
+
+def _dictionaries() -> Dict[int, bytes]:
+    """사전 ID → 사전 바이트 (내장 + text_dicts/*.dict + TEXT_COMPRESSION_DICT). 프로세스당 1회 로드."""
+    global _dicts, _active
+    if _dicts is None:
+        with _dicts_lock:
+            if _dicts is None:
+                active = (_dict_id(_BUILTIN_DICT), _BUILTIN_DICT)
+                found = {active[0]: _BUILTIN_DICT}
+                paths = sorted(DICT_DIR.glob("*.dict")) if DICT_DIR.is_dir() else []
+                extra = os.getenv("TEXT_COMPRESSION_DICT", "").strip()
+                if extra:
+                    paths.append(Path(extra))
+                for p in paths:
+                    try:
+                        data = p.read_bytes()
+                    except OSError as e:
+                        print(f"⚠️ 압축 사전 로드 실패: {p} ({e})")
+                        continue
+                    found[_dict_id(data)] = data
+                    if extra and p == Path(extra):
+                        active = (_dict_id(data), data)
+                _active = active
+                _dicts = found
+    return _dicts
+
+
+def _active_dict() -> Tuple[int, bytes]:
+    _dictionaries()
+    return _active
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 코덱
+# ──────────────────────────────────────────────────────────────────────────────
+_warned_zstd = False
+_local = threading.local()
+
+
+def _codec() -> str:
+    global _warned_zstd
+    name = os.getenv("TEXT_COMPRESSION", "zlib").strip().lower() or "zlib"
+    if name == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            if not _warned_zstd:
+                print("⚠️ TEXT_COMPRESSION=zstd 이지만 zstandard 미설치 → zlib 사용 (pip install zstandard)")
+                _warned_zstd = True
+            return "zlib"
+    return name
+
+
+def _level(default: int) -> int:
+    try:
+        return int(os.getenv("TEXT_COMPRESSION_LEVEL", str(default)))
+    except ValueError:
+        return default
+
+
+def _min_bytes() -> int:
+    try:
+        return int(os.getenv("TEXT_COMPRESSION_MIN_BYTES", "128"))
+    except ValueError:
+        return 128
+
+
+def _zstd_dict(did: int, data: bytes):
+    import zstandard
+    cache = getattr(_local, "zdicts", None)
+    if cache is None:
+        cache = _local.zdicts = {}
+    if did not in cache:
+        cache[did] = zstandard.ZstdCompressionDict(data)
+    return cache[did]
+
+
+def compress_text(text: str, codec: Optional[str] = None, dictionary: Optional[bytes] = None) -> bytes:
+    """
+    str → 저장용 bytes(헤더 포함).
+    codec/dictionary를 주면 설정 대신 사용(벤치마크용). dictionary=b""는 사전 없이 압축.
+    """
+    raw = text.encode("utf-8")
+    codec = codec or _codec()
+    if codec == "none" or len(raw) < _min_bytes():
+        return bytes([RAW]) + raw
+
+    if dictionary is None:
+        did, zdict = _active_dict()
+    else:
+        did, zdict = (_dict_id(dictionary), dictionary) if dictionary else (0, None)
+        if did:
+            _dictionaries().setdefault(did, dictionary)  # 임시 사전도 같은 프로세스에서 해제 가능하게
+
+    if codec == "zstd":
+        import zstandard
+        params = {"level": _level(9)}
+        if zdict:
+            params["dict_data"] = _zstd_dict(did, zdict)
+        body = zstandard.ZstdCompressor(**params).compress(raw)
+        out = bytes([ZSTD]) + did.to_bytes(4, "big") + body
+    else:
+        co = zlib.compressobj(_level(6), zlib.DEFLATED, -15, 9, zdict=zdict) if zdict \
+            else zlib.compressobj(_level(6), zlib.DEFLATED, -15, 9)
+        body = co.compress(raw) + co.flush()
+        out = bytes([DEFLATE]) + did.to_bytes(4, "big") + body
+
+    # 압축 이득이 없으면 원문 저장
+    return out if len(out) < len(raw) + 1 else bytes([RAW]) + raw
+
+
+def decompress_text(value) -> str:
+    """저장 bytes(헤더 포함 또는 압축 전 원문) → str."""
+    if isinstance(value, str):
+        return value  # SQLite 등에서 압축 전 TEXT 값이 그대로 올라온 경우
+    data = bytes(value)
+    if not data:
+        return ""
+    head = data[0]
+    if head == RAW:
+        return data[1:].decode("utf-8")
+    if head not in (DEFLATE, ZSTD) or len(data) < 5:
+        return data.decode("utf-8")  # 헤더 없는 원문(마이그레이션 전 데이터)
+
+    did = int.from_bytes(data[1:5], "big")
+    zdict = _dictionaries().get(did) if did else None
+    if did and zdict is None:
+        raise ValueError(f"압축 사전을 찾을 수 없습니다(id={did:08x}). auto_app/text_dicts/를 확인하세요.")
+    body = data[5:]
+    if head == ZSTD:
+        import zstandard
+        params = {"dict_data": _zstd_dict(did, zdict)} if zdict else {}
+        return zstandard.ZstdDecompressor(**params).decompress(body).decode("utf-8")
+    do = zlib.decompressobj(-15, zdict=zdict) if zdict else zlib.decompressobj(-15)
+    return (do.decompress(body) + do.flush()).decode("utf-8")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 사전 학습
+# ──────────────────────────────────────────────────────────────────────────────
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.){1,80}"\s*:?\s*|[\[\]{},]\s*')
+
+
+def train_dictionary(samples: Iterable[str], size: int = 16 * 1024) -> bytes:
+    """
+    실제 데이터 샘플로 사전 생성.
+    - zstandard가 있으면 zstd 학습 사전(ZDICT)
+    - 없으면 빈도×길이 상위 JSON 토큰(키/값/구분자)을 이어 붙인 raw 사전(zlib zdict·zstd 모두 사용 가능)
+    """
+    texts = [s for s in samples if s]
+    if not texts:
+        return _BUILTIN_DICT
+    try:
+        import zstandard
+        return zstandard.train_dictionary(size, [t.encode("utf-8") for t in texts]).as_bytes()
+    except ImportError:
+        pass
+    except Exception as e:  # 샘플이 너무 적으면 zstd 학습 실패 → raw 사전으로
+        print(f"⚠️ zstd 사전 학습 실패({e}) → 빈도 기반 사전 사용")
+
+    counts: Counter = Counter()
+    for t in texts:
+        counts.update(_TOKEN_RE.findall(t))
+    ranked = sorted(counts.items(), key=lambda kv: kv[1] * len(kv[0].encode("utf-8")), reverse=True)
+    picked, used = [], 0
+    for tok, n in ranked:
+        if n < 2:
+            break
+        b = tok.encode("utf-8")
+        if used + len(b) > size:
+            continue
+        picked.append(b)
+        used += len(b)
+    # deflate는 가까운 바이트를 더 싸게 참조 → 가장 가치 있는 토큰을 끝에
+    return b"".join(reversed(picked)) or _BUILTIN_DICT
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 모델 필드
+# ──────────────────────────────────────────────────────────────────────────────
+class CompressedTextField(models.TextField):
+    """
+    TextField처럼 쓰되 DB에는 압축 BLOB으로 저장(MySQL LONGBLOB / PostgreSQL BYTEA / SQLite BLOB).
+    폼/DRF 시리얼라이저에서는 일반 TextField로 보임.
+    ⚠️ contains/icontains 같은 부분 문자열 검색은 DB에서 동작하지 않음(압축 바이트 비교).
+    """
+
+    description = "Compressed text"
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return decompress_text(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return decompress_text(value)
+        return super().to_python(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None:
+            return None
+        return connection.Database.Binary(compress_text(value))
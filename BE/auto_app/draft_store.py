@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+draft_store.py
+- RequirementDraft 쓰기/읽기 단일 경로: content(JSON 문자열)는 그대로 보관하되
+  생성 시 1회 파싱해 기능별 DraftFeature 행(feature_name/priority 인덱스 + 파싱된 data)으로 정규화
+  → G2 정제 / finalize / G3 보고서 / 최종문서 / 업무 자동배정이 매번 큰 JSON을 json.loads 하지 않음
+- content가 기능 배열이 아니면(문자열 결과 등) 행을 만들지 않음 → draft_features()는 None
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+
+from .models import DraftFeature, RequirementDraft
+
+__all__ = [
+    "features_from_payload",
+    "feature_columns",
+    "flatten_strings",
+    "create_draft",
+    "save_draft_features",
+    "draft_feature_rows",
+    "draft_features",
+]
+
+# 기능 배열을 감싸는 키(G2 정제 결과 등)
+_LIST_KEYS = ("정제기획서", "기능목록", "features", "items")
+
+_CODE_MAX = DraftFeature._meta.get_field("feature_code").max_length
+_NAME_MAX = DraftFeature._meta.get_field("feature_name").max_length
+_PRIO_MAX = DraftFeature._meta.get_field("priority").max_length
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 파싱(순수 함수 — 0009 마이그레이션에 같은 로직을 고정 복사해 둠)
+# ──────────────────────────────────────────────────────────────────────────────
+def features_from_payload(payload: Any) -> Optional[List[Any]]:
+    """기능 배열 또는 {"정제기획서"|"기능목록"|"features"|"items": [...]} 또는 그 JSON 문자열 → list. 아니면 None."""
+    if isinstance(payload, (str, bytes)):
+        raw = payload.strip() if isinstance(payload, str) else payload
+        if not raw:
+            return None
+        try:
+            payload = json.loads(raw)
+        except Exception:
+            return None
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        for key in _LIST_KEYS:
+            if isinstance(payload.get(key), list):
+                return payload[key]
+    return None
+
+
+def flatten_strings(x: Any, bag: Optional[List[str]] = None) -> List[str]:
+    """중첩 dict/list의 문자열 값만 순서대로 수집."""
+    bag = [] if bag is None else bag
+    if isinstance(x, dict):
+        for v in x.values():
+            flatten_strings(v, bag)
+    elif isinstance(x, list):
+        for v in x:
+            flatten_strings(v, bag)
+    elif isinstance(x, str):
+        bag.append(x)
+    return bag
+
+
+def _text(v: Any) -> str:
+    return v.strip() if isinstance(v, str) else ""
+
+
+def feature_columns(item: Any) -> Dict[str, Any]:
+    """기능 객체 1개 → DraftFeature 컬럼 값(feature_code/feature_name/summary/priority/data/search_text)."""
+    if not isinstance(item, dict):
+        text = str(item)
+        return {
+            "feature_code": "", "feature_name": text[:_NAME_MAX] or "기능명 없음", "summary": "",
+            "priority": "", "data": item, "search_text": text,
+        }
+    name = (_text(item.get("기능명")) or _text(item.get("feature_name"))
+            or _text(item.get("name")) or _text(item.get("title")))
+    desc = item.get("기능설명")
+    summary = ""
+    if isinstance(desc, dict):
+        summary = _text(desc.get("목적")) or _text(desc.get("핵심역할"))
+    elif isinstance(desc, str):
+        summary = desc.strip()
+    if not summary:
+        outputs = item.get("출력값")
+        if isinstance(outputs, dict):
+            summary = _text(outputs.get("요약정보"))
+    summary = summary or _text(item.get("summary")) or _text(item.get("description")) or _text(item.get("설명"))
+    return {
+        "feature_code": str(item.get("기능ID") or item.get("feature_id") or "")[:_CODE_MAX],
+        "feature_name": (name or "기능명 없음")[:_NAME_MAX],
+        "summary": summary,
+        "priority": str(item.get("기능우선순위") or item.get("priority") or "").strip()[:_PRIO_MAX],
+        "data": item,
+        "search_text": " ".join(flatten_strings(item)),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 쓰기
+# ──────────────────────────────────────────────────────────────────────────────
+def save_draft_features(draft: RequirementDraft, features: Optional[Iterable[Any]]) -> int:
+    """draft의 기능 행을 features로 교체. 반환: 저장한 행 수."""
+    rows = [
+        DraftFeature(draft=draft, position=i, **feature_columns(item))
+        for i, item in enumerate(features or [])
+    ]
+    with transaction.atomic():
+        DraftFeature.objects.filter(draft=draft).delete()
+        if rows:
+            DraftFeature.objects.bulk_create(rows)
+    return len(rows)
+
+
+def create_draft(project, payload: Any, content: Optional[str] = None, **fields) -> RequirementDraft:
+    """
+    RequirementDraft 생성 + 기능 행 정규화(한 트랜잭션).
+    payload: 기능 배열/래핑 dict/문자열. content를 안 주면 문자열은 그대로, 나머지는 JSON으로 저장.
+    fields: source, generated_by, feature_name, summary, score_by_model ...
+    """
+    if content is None:
+        content = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+    with transaction.atomic():
+        draft = RequirementDraft.objects.create(project=project, content=content, **fields)
+        save_draft_features(draft, features_from_payload(payload))
+    return draft
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 읽기
+# ──────────────────────────────────────────────────────────────────────────────
+def draft_feature_rows(draft: RequirementDraft) -> List[DraftFeature]:
+    """position 순 DraftFeature 목록(prefetch_related("features")가 있으면 그대로 사용)."""
+    return list(draft.features.all())
+
+
+def draft_features(draft: RequirementDraft) -> Optional[List[Any]]:
+    """초안의 기능 배열(파싱된 상태). 기능 배열로 저장된 초안이 아니면 None."""
+    rows = draft_feature_rows(draft)
+    return [r.data for r in rows] if rows else None
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+gantt_render.py
+- 서버 측 간트 렌더러: GanttChart(+delta 합성 작업) → SVG / PNG
+  모바일·문서 삽입용. 화면 렌더링은 기존처럼 GET .../gantt/latest/tasks/ JSON 사용
+- 레이아웃은 열(column) 단위 일괄 계산: 행마다 객체를 만들지 않고 x/폭/y 배열을 한 번에 만든 뒤
+  파트별 <g> 안에 문자열 템플릿으로 이어 붙임 → 작업 수천 개도 수 ms
+- 캐시: media/gantt/render/gantt{id}_v{version}_r{REV}.svg (+ _{scale}x.png, scale은 PNG_SCALES로 맞춤 → 차트당 PNG 최대 4개)
+  버전은 생성 후 바뀌지 않으므로(재계획은 새 버전) id+version이 곧 내용 키. 렌더 모양을 바꾸면 _RENDER_REV 올리기
+- PNG: cairosvg 설치 시에만(선택 의존성). 없으면 PngUnavailable
+- DOCX: add_gantt_to_docx(doc, chart) → PNG 그림, PNG를 못 만들면 같은 레이아웃으로 주차 표(셀 음영)
+
+설정(.env):
+  GANTT_RENDER_MAX_PX    = 차트 영역 최대 폭(px, 기본 960). 주차 칸 폭 = 이 값 / total_weeks (14~48px)
+  GANTT_DOCX_MAX_ROWS    = DOCX 표 대체 렌더 시 최대 행 수(기본 60)
+"""
+
+import os
+import uuid
+from datetime import timedelta
+from html import escape
+from typing import List, NamedTuple, Optional
+
+from .artifact_serving import media_root
+from .gantt_store import materialize_tasks
+from .gemini_gantt import COLOR_MAP
+
+__all__ = [
+    "GanttLayout",
+    "PngUnavailable",
+    "layout_tasks",
+    "render_svg",
+    "render_png",
+    "chart_svg",
+    "PNG_SCALES",
+    "snap_scale",
+    "rendered_path",
+    "add_gantt_to_docx",
+]
+
+_RENDER_REV = 1
+
+# PNG 배율(캐시 키). 요청 값은 가장 가까운 배율로 맞춤
+PNG_SCALES = (1, 2, 3, 4)
+
+# 치수(px)
+LABEL_PART_W = 90
+LABEL_NAME_W = 180
+HEADER_H = 42
+ROW_H = 22
+BAR_PAD = 4
+FONT = "'Malgun Gothic','Apple SD Gothic Neo','Noto Sans KR',sans-serif"
+_DEFAULT_COLOR = "AAAAAA"
+
+
+class PngUnavailable(RuntimeError):
+    """cairosvg 미설치 → PNG 변환 불가."""
+
+
+class GanttLayout(NamedTuple):
+    """열 단위 레이아웃(행 i의 값은 각 목록의 i번째)."""
+    total_weeks: int
+    week_w: float
+    width: int
+    height: int
+    parts: List[str]              # 그려진 파트(순서)
+    part_rows: List[tuple]        # 파트별 (첫 행, 행 수)
+    names: List[str]
+    part_of: List[int]            # 행 → parts 인덱스
+    starts: List[int]             # 시작 주차(1부터)
+    durs: List[int]               # 기간(주)
+    x: List[float]
+    w: List[float]
+    y: List[int]
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _week_width(total_weeks: int) -> float:
+    max_px = max(200, _int_env("GANTT_RENDER_MAX_PX", 960))
+    return float(min(48, max(14, max_px / max(1, total_weeks))))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 레이아웃
+# ──────────────────────────────────────────────────────────────────────────────
+def layout_tasks(tasks, total_weeks: int, parts_order: Optional[List[str]] = None) -> GanttLayout:
+    """
+    tasks: GanttTask 행(materialize_tasks 결과) — part/feature_name/start_week/duration_weeks/order 사용
+    정렬: parts_order 순(나머지 파트는 이름순) → 시작주차 → order → PK (LatestGanttTasksView와 동일)
+    """
+    total_weeks = max(1, int(total_weeks or 1))
+    rows = sorted(tasks, key=lambda t: (t.part, t.start_week, t.order, t.pk or 0))
+    seen = list(dict.fromkeys(t.part for t in rows))
+    order = [p for p in (parts_order or []) if p in seen]
+    order += sorted(p for p in seen if p not in order)
+    rank = {p: i for i, p in enumerate(order)}
+    rows.sort(key=lambda t: rank[t.part])  # 안정 정렬 → 파트 안의 순서 유지
+
+    # 열 추출 + 범위 보정(주차 밖 막대 방지)
+    part_of = [rank[t.part] for t in rows]
+    starts = [min(max(1, t.start_week or 1), total_weeks) for t in rows]
+    durs = [max(1, min(t.duration_weeks or 1, total_weeks - s + 1)) for t, s in zip(rows, starts)]
+    names = [t.feature_name or "작업" for t in rows]
+
+    week_w = _week_width(total_weeks)
+    x0 = LABEL_PART_W + LABEL_NAME_W
+    n = len(rows)
+    x = [x0 + (s - 1) * week_w for s in starts]
+    w = [d * week_w for d in durs]
+    y = [HEADER_H + i * ROW_H for i in range(n)]
+
+    part_rows, first = [], 0
+    for i in range(len(order)):
+        count = part_of.count(i)
+        part_rows.append((first, count))
+        first += count
+
+    width = int(x0 + total_weeks * week_w) + 1
+    height = HEADER_H + n * ROW_H + 1
+    return GanttLayout(total_weeks, week_w, width, height, order, part_rows,
+                       names, part_of, starts, durs, x, w, y)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SVG
+# ──────────────────────────────────────────────────────────────────────────────
+def _color(part: str) -> str:
+    return "#" + COLOR_MAP.get(part, _DEFAULT_COLOR)
+
+
+def render_svg(lay: GanttLayout, start_date=None, title: str = "") -> str:
+    """레이아웃 → SVG 문자열(UTF-8, 외부 리소스 없음)."""
+    x0 = LABEL_PART_W + LABEL_NAME_W
+    ww = lay.week_w
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{lay.width}" height="{lay.height}" '
+        f'viewBox="0 0 {lay.width} {lay.height}" font-family="{FONT}" font-size="11">',
+        f"<title>{escape(title or '간트차트')}</title>",
+        f'<rect width="{lay.width}" height="{lay.height}" fill="#fff"/>',
+    ]
+
+    # 헤더: 주차 + (기준일이 있으면) 주 시작 날짜
+    out.append('<g text-anchor="middle" fill="#333">')
+    out.append(f'<text x="{LABEL_PART_W / 2}" y="26" font-weight="bold">파트</text>')
+    out.append(f'<text x="{LABEL_PART_W + LABEL_NAME_W / 2}" y="26" font-weight="bold">기능명</text>')
+    label_every = 1 if ww >= 28 else (2 if ww >= 18 else 4)
+    for wk in range(1, lay.total_weeks + 1, label_every):
+        cx = x0 + (wk - 0.5) * ww
+        out.append(f'<text x="{cx:.1f}" y="18">{wk}주</text>')
+        if start_date is not None:
+            d = start_date + timedelta(weeks=wk - 1)
+            out.append(f'<text x="{cx:.1f}" y="34" font-size="9" fill="#888">{d.month}/{d.day}</text>')
+    out.append("</g>")
+
+    # 격자: 세로선/가로선을 path 1개씩
+    bottom = lay.height - 1
+    vlines = "".join(f"M{x0 + i * ww:.1f} {HEADER_H}V{bottom}" for i in range(lay.total_weeks + 1))
+    hlines = "".join(f"M0 {HEADER_H + i * ROW_H}H{lay.width - 1}" for i in range(len(lay.y) + 1))
+    out.append(f'<path d="{vlines}" stroke="#e3e3e3" stroke-width="1"/>')
+    out.append(f'<path d="{hlines}" stroke="#eee" stroke-width="1"/>')
+
+    # 파트별: 막대(<g fill>) + 파트 라벨 + 기능명
+    bar_h = ROW_H - 2 * BAR_PAD
+    for pi, part in enumerate(lay.parts):
+        first, count = lay.part_rows[pi]
+        if not count:
+            continue
+        end = first + count
+        bars = "".join(
+            f'<rect x="{x:.1f}" y="{y + BAR_PAD}" width="{w:.1f}" height="{bar_h}" rx="3"/>'
+            for x, w, y in zip(lay.x[first:end], lay.w[first:end], lay.y[first:end])
+        )
+        out.append(f'<g fill="{_color(part)}">{bars}</g>')
+        names = "".join(
+            f'<text x="{LABEL_PART_W + 6}" y="{y + ROW_H - 7}">{escape(nm[:28])}</text>'
+            for nm, y in zip(lay.names[first:end], lay.y[first:end])
+        )
+        out.append(f'<g fill="#222">{names}</g>')
+        top = HEADER_H + first * ROW_H
+        out.append(
+            f'<rect x="0" y="{top}" width="{LABEL_PART_W}" height="{count * ROW_H}" fill="{_color(part)}" '
+            f'fill-opacity="0.15" stroke="#ccc"/>'
+            f'<text x="{LABEL_PART_W / 2}" y="{top + count * ROW_H / 2 + 4:.1f}" text-anchor="middle" '
+            f'font-weight="bold" fill="#333">{escape(part)}</text>'
+        )
+
+    if not lay.y:
+        out.append(f'<text x="{lay.width / 2:.1f}" y="{HEADER_H + 16}" text-anchor="middle" fill="#999">작업 없음</text>')
+    out.append("</svg>")
+    return "".join(out)
+
+
+def render_png(svg: str, scale: float = 1.0) -> bytes:
+    """SVG → PNG(cairosvg). 미설치면 PngUnavailable."""
+    try:
+        import cairosvg
+    except ImportError:
+        raise PngUnavailable("PNG 변환에는 cairosvg가 필요합니다(pip install cairosvg). SVG를 사용하세요.")
+    return cairosvg.svg2png(bytestring=svg.encode("utf-8"), scale=scale)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 캐시
+# ──────────────────────────────────────────────────────────────────────────────
+def _render_dir() -> str:
+    path = os.path.join(media_root(), "gantt", "render")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    # 같은 프로세스의 여러 스레드가 같은 차트/배율을 동시에 그려도 임시 파일이 겹치지 않게 uuid
+    tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def chart_svg(chart) -> str:
+    """GanttChart → SVG(캐시 없이)."""
+    lay = layout_tasks(materialize_tasks(chart), chart.total_weeks, list(chart.parts or []))
+    title = f"{getattr(chart.project, 'title', '')} 간트차트 v{chart.version}".strip()
+    return render_svg(lay, chart.start_date, title)
+
+
+def snap_scale(scale: float) -> int:
+    """임의 배율 → PNG_SCALES 중 가장 가까운 값(같으면 작은 쪽)."""
+    scale = min(max(scale, PNG_SCALES[0]), PNG_SCALES[-1])
+    return min(PNG_SCALES, key=lambda s: (abs(s - scale), s))
+
+
+def rendered_path(chart, fmt: str = "svg", scale: float = 1.0) -> str:
+    """
+    캐시된 렌더 파일 절대경로(없으면 생성). fmt: "svg" | "png"
+    PNG는 같은 버전의 SVG 캐시에서 변환. scale은 snap_scale로 맞춘 값만 사용.
+    """
+    base = os.path.join(_render_dir(), f"gantt{chart.pk}_v{chart.version}_r{_RENDER_REV}")
+    svg_path = base + ".svg"
+    if not os.path.isfile(svg_path):
+        _write_atomic(svg_path, chart_svg(chart).encode("utf-8"))
+    if fmt == "svg":
+        return svg_path
+
+    scale = snap_scale(scale)
+    png_path = f"{base}_{scale}x.png"
+    if not os.path.isfile(png_path):
+        with open(svg_path, encoding="utf-8") as f:
+            _write_atomic(png_path, render_png(f.read(), scale))
+    return png_path
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# DOCX
+# ──────────────────────────────────────────────────────────────────────────────
+def _shade(cell, hex_color: str) -> None:
+    from docx.oxml.ns import qn
+    from docx.oxml.shared import OxmlElement
+
+    shd = OxmlElement("w:shd")
+    shd.set(qn("w:val"), "clear")
+    shd.set(qn("w:color"), "auto")
+    shd.set(qn("w:fill"), hex_color)
+    cell._tc.get_or_add_tcPr().append(shd)
+
+
+def _docx_table(doc, lay: GanttLayout) -> None:
+    """PNG를 못 만들 때: 같은 레이아웃을 주차 표(막대 = 셀 음영)로."""
+    max_rows = max(1, _int_env("GANTT_DOCX_MAX_ROWS", 60))
+    n = min(len(lay.y), max_rows)
+    table = doc.add_table(rows=n + 1, cols=2 + lay.total_weeks)
+    table.style = "Table Grid"
+    head = table.rows[0].cells
+    head[0].text, head[1].text = "파트", "기능명"
+    for wk in range(lay.total_weeks):
+        head[2 + wk].text = str(wk + 1)
+    for i in range(n):
+        cells = table.rows[i + 1].cells
+        part = lay.parts[lay.part_of[i]]
+        cells[0].text, cells[1].text = part, lay.names[i]
+        color = COLOR_MAP.get(part, _DEFAULT_COLOR)
+        for wk in range(lay.starts[i] - 1, lay.starts[i] - 1 + lay.durs[i]):
+            _shade(cells[2 + wk], color)
+    if len(lay.y) > n:
+        doc.add_paragraph(f"(작업 {len(lay.y)}개 중 {n}개만 표시)")
+
+
+def add_gantt_to_docx(doc, chart, width_inches: float = 6.5, heading: Optional[str] = "간트차트") -> bool:
+    """
+    python-docx Document에 간트차트 삽입(PNG 그림, 불가하면 주차 표).
+    반환: 그림으로 넣었으면 True, 표로 넣었으면 False.
+    """
+    from docx.shared import Inches
+
+    if heading:
+        doc.add_heading(heading, level=2)
+    try:
+        path = rendered_path(chart, "png", scale=2.0)
+    except PngUnavailable:
+        path = None
+    if path:
+        doc.add_picture(path, width=Inches(width_inches))
+        return True
+    _docx_table(doc, layout_tasks(materialize_tasks(chart), chart.total_weeks, list(chart.parts or [])))
+    return False
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+gantt_replan.py
+- 간트 부분 재계획: 최신(또는 지정) GanttChart + 바뀐 Requirement/피드백 → 새 버전(delta)
+  1) 바뀐 작업(seed) 찾기
+     · requirement_ids 지정 시 그 기능들, 없으면 base 생성 이후 수정된 확정 기능(updated_at)
+     · base에 없는 확정 기능 = 새 작업, base 작업의 기능이 확정 해제 = 삭제
+     · task_keys 지정 / 피드백에 작업명이 언급된 작업
+  2) seed + 선후관계 이웃(GANTT_REPLAN_HOPS 단계)만 LLM에 전송, 바깥 작업은 고정 주차로만 전달
+  3) 응답을 base에 덮어쓰고(splice) 선행작업보다 먼저 시작하는 후속 작업은 뒤로 밀기(로컬 보정)
+  4) base 대비 달라진 작업만 delta로 저장(gantt_store.save_delta_tasks)
+
+설정(.env):
+  GANTT_REPLAN_HOPS = 이웃 확장 단계(기본 1)
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from django.db import transaction
+
+from .gantt_store import (
+    materialize_tasks,
+    normalize_items,
+    save_chart_tasks,
+    save_delta_tasks,
+    should_snapshot,
+    tasks_to_items,
+)
+from .gemini_gantt import call_gemini, make_replan_prompt, parse_llm_array
+from .models import GanttChart, Requirement
+
+__all__ = [
+    "ReplanError",
+    "ReplanPlan",
+    "plan_replan",
+    "call_replan",
+    "splice",
+    "save_replan",
+]
+
+# 비교/저장 대상 필드(normalize_item 결과)
+_TASK_FIELDS = ("feature_name", "parts", "start_week", "duration_weeks", "predecessors", "requirement_pk")
+
+
+class ReplanError(ValueError):
+    """재계획할 대상이 없거나 입력이 잘못됨 → 400."""
+
+
+class ReplanPlan(NamedTuple):
+    base: GanttChart
+    base_rows: list                   # base 버전의 실제 작업 행(materialize_tasks)
+    base_tasks: Dict[str, Dict]       # task_key → 정규화된 작업
+    editable: List[str]               # LLM이 다시 계획할 기존 작업 키(seed + 이웃)
+    new_keys: Dict[str, int]          # 새 기능 작업 키 → Requirement PK
+    removed_keys: List[str]           # 삭제할 작업 키
+    req_map: Dict[int, Any]           # 확정 Requirement(pk → 객체)
+    prompt: Optional[str]             # None이면 LLM 호출 없음(삭제만 있는 경우)
+
+
+def _hops() -> int:
+    try:
+        return max(0, int(os.getenv("GANTT_REPLAN_HOPS", "1")))
+    except ValueError:
+        return 1
+
+
+def _end(task: Dict) -> int:
+    return task["start_week"] + task["duration_weeks"] - 1
+
+
+def _task_json(key: str, task: Dict) -> Dict[str, Any]:
+    return {
+        "기능ID": key,
+        "기능명": task["feature_name"],
+        "파트": task["parts"],
+        "기간": task["duration_weeks"],
+        "시작주차": task["start_week"],
+        "선행작업": task["predecessors"] or None,
+    }
+
+
+def _feature_json(key: str, req: Requirement) -> Dict[str, Any]:
+    try:
+        src = json.loads(req.description) if req.description else {}
+    except Exception:
+        src = {}
+    return {"기능ID": key, "기능명": req.feature_name, "요약": req.summary, "원본": src}
+
+
+def _neighborhood(tasks: Dict[str, Dict], seeds: Set[str], hops: int) -> Set[str]:
+    """seeds에서 선행/후행 관계를 hops 단계까지 확장."""
+    succ: Dict[str, Set[str]] = {}
+    for key, t in tasks.items():
+        for p in t["predecessors"]:
+            succ.setdefault(p, set()).add(key)
+    found, frontier = set(seeds), set(seeds)
+    for _ in range(hops):
+        nxt = set()
+        for key in frontier:
+            t = tasks.get(key)
+            nxt.update(p for p in (t["predecessors"] if t else []) if p in tasks)
+            nxt.update(succ.get(key, ()))
+        frontier = nxt - found
+        found |= frontier
+        if not frontier:
+            break
+    return found
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1) 계획: 어떤 작업을 보낼지
+# ──────────────────────────────────────────────────────────────────────────────
+def plan_replan(
+    project,
+    base: GanttChart,
+    requirement_ids: Optional[Iterable[int]] = None,
+    task_keys: Optional[Iterable[str]] = None,
+    feedback: str = "",
+) -> ReplanPlan:
+    base_rows = materialize_tasks(base)
+    items = tasks_to_items(base_rows)
+    base_tasks = {n["key"]: n for n in normalize_items(items, base.total_weeks)}
+    # tasks_to_items의 requirement_id(실제 FK)를 우선(기능ID 숫자 추출값보다 정확)
+    for item in items:
+        base_tasks[item["기능ID"]]["requirement_pk"] = item["requirement_id"]
+
+    confirmed = Requirement.objects.filter(project=project, confirmed_by_user=True)
+    req_map = {r.pk: r for r in confirmed}
+    key_by_req: Dict[int, str] = {}
+    for key, t in base_tasks.items():
+        if t["requirement_pk"] is not None:
+            key_by_req.setdefault(t["requirement_pk"], key)
+
+    if requirement_ids is not None:
+        changed_ids = {int(i) for i in requirement_ids}
+        unknown = changed_ids - set(req_map) - set(key_by_req)
+        if unknown:
+            raise ReplanError(f"이 프로젝트의 Requirement가 아닙니다: {sorted(unknown)}")
+    else:
+        changed_ids = {pk for pk, r in req_map.items() if r.updated_at and r.updated_at > base.created_at}
+        changed_ids |= set(req_map) - set(key_by_req)       # 새로 확정된 기능
+        changed_ids |= set(key_by_req) - set(req_map)       # 확정 해제된 기능
+
+    seeds: Set[str] = set()
+    new_reqs: List[Requirement] = []
+    removed: List[str] = []
+    for pk in sorted(changed_ids):
+        key = key_by_req.get(pk)
+        if pk not in req_map:
+            if key:
+                removed.append(key)
+        elif key:
+            seeds.add(key)
+        else:
+            new_reqs.append(req_map[pk])
+
+    for key in task_keys or ():
+        key = str(key).strip()
+        if key not in base_tasks:
+            raise ReplanError(f"base 간트에 없는 작업입니다: {key}")
+        seeds.add(key)
+    if feedback:
+        seeds.update(k for k, t in base_tasks.items() if t["feature_name"] and t["feature_name"] in feedback)
+
+    if not seeds and not new_reqs and not removed:
+        raise ReplanError("변경된 기능이 없습니다. requirement_ids 또는 task_keys를 지정하거나 피드백에 작업명을 적어주세요.")
+
+    editable_set = _neighborhood(base_tasks, seeds, _hops()) - set(removed)
+    editable = [k for k in base_tasks if k in editable_set]
+    # 새 작업 키는 Requirement PK(전체 생성 프롬프트의 기능ID와 동일), 기존 키와 겹치면 R 접두사
+    new_keys = {(str(r.pk) if str(r.pk) not in base_tasks else f"R{r.pk}"): r.pk for r in new_reqs}
+    key_of = {**key_by_req, **{pk: key for key, pk in new_keys.items()}}
+
+    prompt = None
+    if editable or new_reqs:
+        fixed_pred, fixed_succ = {}, {}
+        for key in editable:
+            for p in base_tasks[key]["predecessors"]:
+                if p in base_tasks and p not in editable_set and p not in removed:
+                    fixed_pred[p] = _end(base_tasks[p])
+        for key, t in base_tasks.items():
+            if key in editable_set or key in removed:
+                continue
+            if any(p in editable_set for p in t["predecessors"]):
+                fixed_succ[key] = t["start_week"]
+        payload = {
+            "project": {"title": project.title},
+            "수정대상": [_task_json(k, base_tasks[k]) for k in editable],
+            "변경된기능": [_feature_json(key_of[pk], req_map[pk]) for pk in sorted(changed_ids) if pk in req_map],
+            "삭제된기능": removed,
+            "고정선행작업": fixed_pred,
+            "고정후행작업": fixed_succ,
+        }
+        prompt = make_replan_prompt(payload, list(base.parts or []), base.total_weeks, feedback or None)
+
+    return ReplanPlan(base, base_rows, base_tasks, editable, new_keys, removed, req_map, prompt)
+
+
+def call_replan(plan: ReplanPlan) -> tuple:
+    """LLM 호출 → (원문, 정규화된 작업 목록). 프롬프트가 없으면 ("", [])."""
+    if plan.prompt is None:
+        return "", []
+    text = call_gemini(plan.prompt)
+    parsed = parse_llm_array(text)
+    if not isinstance(parsed, list):
+        raise ValueError("LLM 응답이 유효한 작업 리스트가 아닙니다.")
+    return text, normalize_items(parsed, plan.base.total_weeks)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2) 덮어쓰기 + 선후관계 보정
+# ──────────────────────────────────────────────────────────────────────────────
+def _push_successors(tasks: Dict[str, Dict], total_weeks: int) -> Set[str]:
+    """선행작업 종료 전에 시작하는 작업을 뒤로 밀기(순환은 작업 수만큼 반복 후 중단). 반환: 밀린 키."""
+    moved: Set[str] = set()
+    for _ in range(len(tasks)):
+        changed = False
+        for key, t in tasks.items():
+            ends = [_end(tasks[p]) for p in t["predecessors"] if p in tasks]
+            if not ends or t["start_week"] > max(ends):
+                continue
+            start = min(max(ends) + 1, total_weeks)
+            if start == t["start_week"]:
+                continue
+            tasks[key] = dict(t, start_week=start, duration_weeks=max(1, min(t["duration_weeks"], total_weeks - start + 1)))
+            moved.add(key)
+            changed = True
+        if not changed:
+            break
+    return moved
+
+
+def splice(plan: ReplanPlan, returned: List[Dict]) -> tuple:
+    """
+    base 작업에 LLM 결과를 덮어씀(수정 대상/새 기능 키만 반영, 나머지 키는 무시).
+    반환: (delta로 저장할 작업 목록, 삭제 키 목록, 새 버전 전체 작업 목록)
+    """
+    allowed = set(plan.editable) | set(plan.new_keys)
+    tasks = {k: dict(t) for k, t in plan.base_tasks.items() if k not in plan.removed_keys}
+    for norm in returned:
+        key = norm["key"]
+        if key not in allowed:
+            continue
+        if key in plan.new_keys:
+            norm = dict(norm, requirement_pk=plan.new_keys[key])
+        else:
+            norm = dict(norm, requirement_pk=plan.base_tasks[key]["requirement_pk"])
+        tasks[key] = norm
+    _push_successors(tasks, plan.base.total_weeks)
+
+    delta = [
+        t for k, t in tasks.items()
+        if k not in plan.base_tasks or any(t[f] != plan.base_tasks[k][f] for f in _TASK_FIELDS)
+    ]
+    return delta, list(plan.removed_keys), list(tasks.values())
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 3) 저장
+# ──────────────────────────────────────────────────────────────────────────────
+def save_replan(project, plan: ReplanPlan, llm_text: str, delta: List[Dict], removed: List[str],
+                all_tasks: List[Dict]) -> GanttChart:
+    """새 버전 저장. delta 깊이가 GANTT_MAX_DELTA_DEPTH를 넘으면 전체 스냅샷으로 저장."""
+    base = plan.base
+    snapshot = should_snapshot(base)
+    with transaction.atomic():
+        chart = GanttChart.objects.create(
+            project=project,
+            start_date=base.start_date,
+            total_weeks=base.total_weeks,
+            parts=base.parts,
+            generated_by="gemini_3",
+            source_text=llm_text,
+            version=GanttChart.objects.filter(project=project).count() + 1,
+            parent=base,
+            is_delta=not snapshot,
+        )
+        if snapshot:
+            save_chart_tasks(chart, all_tasks, plan.req_map)
+        else:
+            save_delta_tasks(chart, delta, removed, plan.base_rows, plan.req_map)
+    return chart
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+gantt_store.py
+- GanttTask 쓰기/읽기 단일 경로
+  · 전체 생성(GanttChartGenerateView): 모든 작업을 행으로 저장(스냅샷)
+  · 부분 재계획(gantt_replan): parent 버전 대비 바뀐 작업만 저장(is_delta=True)
+    같은 task_key의 행 묶음이 parent의 것을 통째로 대체, deleted=True 행은 작업 삭제
+- materialize_tasks(chart): 스냅샷까지 parent를 거슬러 올라가 delta를 순서대로 적용한 '현재' 작업 목록
+- 한 작업(LLM 항목 1개)은 파트 수만큼 행을 가짐 → 버전 간 비교 단위는 task_key
+
+설정(.env):
+  GANTT_MAX_DELTA_DEPTH = 연속 delta 최대 깊이(기본 8). 넘으면 전체 스냅샷으로 저장해 읽기 비용 상한 유지
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from .models import GanttChart, GanttTask
+
+__all__ = [
+    "to_int_pk",
+    "normalize_item",
+    "normalize_items",
+    "row_key",
+    "save_chart_tasks",
+    "save_delta_tasks",
+    "delta_depth",
+    "should_snapshot",
+    "materialize_tasks",
+    "tasks_to_items",
+]
+
+_KEY_MAX = GanttTask._meta.get_field("task_key").max_length
+
+
+def _max_depth() -> int:
+    try:
+        return max(0, int(os.getenv("GANTT_MAX_DELTA_DEPTH", "8")))
+    except ValueError:
+        return 8
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# LLM 항목 정규화
+# ──────────────────────────────────────────────────────────────────────────────
+def to_int_pk(value: Any) -> Optional[int]:
+    """문자/라벨('F-001','REQ-12') → 끝자리 숫자 추출해서 int로. 못 찾으면 None."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    s = str(value).strip()
+    if s.isdigit():  # "17"
+        return int(s)
+    m = re.search(r"(\d+)$", s)  # "F-001" → "001"
+    return int(m.group(1)) if m else None
+
+
+def _key(value: Any) -> str:
+    return str(value).strip()[:_KEY_MAX] if value not in (None, "") else ""
+
+
+def _keys(value: Any) -> List[str]:
+    """선행작업(null / 단일 값 / 목록 / "F-1, F-2") → task_key 목록."""
+    if value in (None, "", []):
+        return []
+    if isinstance(value, str):
+        value = [v for v in re.split(r"[,\s]+", value) if v]
+    elif not isinstance(value, list):
+        value = [value]
+    return [k for k in (_key(v) for v in value) if k]
+
+
+def normalize_item(item: Dict[str, Any], total_weeks: int, index: int = 0) -> Dict[str, Any]:
+    """
+    LLM 작업 항목 1개 → 저장용 값.
+    반환: {key, feature_name, parts, start_week, duration_weeks, predecessors, requirement_pk}
+    """
+    # 기능명/작업명 잡기(여러 키 지원)
+    feature = (
+        item.get("기능명")
+        or item.get("feature_name")
+        or item.get("작업명")
+        or item.get("task")
+        or str(item.get("기능ID") or "작업")
+    )
+
+    # 파트가 문자열로 올 수도 있음 → 리스트로 정규화
+    parts = item.get("파트") or item.get("part") or item.get("parts") or ["기타"]
+    if isinstance(parts, str):
+        parts = [p.strip() for p in parts.split(",") if p.strip()]
+    if not isinstance(parts, list) or not parts:
+        parts = ["기타"]
+    parts = list(dict.fromkeys(str(p).strip() for p in parts if str(p).strip())) or ["기타"]
+
+    # 주차/기간 정수화 + 범위 보정
+    try:
+        start_w = int(item.get("시작주차") or item.get("start_week") or 1)
+    except Exception:
+        start_w = 1
+    try:
+        dur_w = int(item.get("기간") or item.get("duration") or item.get("duration_weeks") or 1)
+    except Exception:
+        dur_w = 1
+    start_w = min(max(start_w, 1), total_weeks)
+    dur_w = max(1, min(dur_w, total_weeks - start_w + 1))
+
+    rid_raw = item.get("requirement_id") or item.get("기능ID")
+    key = _key(item.get("기능ID")) or _key(item.get("requirement_id")) or f"T{index + 1}"
+    return {
+        "key": key,
+        "feature_name": str(feature),
+        "parts": parts,
+        "start_week": start_w,
+        "duration_weeks": dur_w,
+        "predecessors": [k for k in _keys(item.get("선행작업") or item.get("predecessors")) if k != key],
+        "requirement_pk": to_int_pk(rid_raw),
+    }
+
+
+def normalize_items(items: Iterable[Dict[str, Any]], total_weeks: int) -> List[Dict[str, Any]]:
+    """LLM 작업 배열 정규화 + 중복 기능ID는 "-2", "-3"… 접미사로 구분."""
+    out, seen = [], {}
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        norm = normalize_item(item, total_weeks, i)
+        n = seen[norm["key"]] = seen.get(norm["key"], 0) + 1
+        if n > 1:
+            norm["key"] = f"{norm['key'][:_KEY_MAX - 4]}-{n}"
+        out.append(norm)
+    return out
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 쓰기
+# ──────────────────────────────────────────────────────────────────────────────
+def _rows_for(chart: GanttChart, norm: Dict[str, Any], req_map: Dict[int, Any], order_of) -> List[GanttTask]:
+    req_pk = norm["requirement_pk"]
+    req_obj = req_map.get(req_pk) if req_pk is not None else None
+    return [
+        GanttTask(
+            gantt_chart=chart,
+            requirement=req_obj,          # None 허용
+            part=part,
+            feature_name=norm["feature_name"][:255],
+            start_week=norm["start_week"],
+            duration_weeks=norm["duration_weeks"],
+            order=order_of(part, norm["key"]),
+            task_key=norm["key"],
+            predecessors=norm["predecessors"],
+        )
+        for part in norm["parts"]
+    ]
+
+
+def save_chart_tasks(chart: GanttChart, items: Iterable[Dict[str, Any]], req_map: Dict[int, Any]) -> int:
+    """전체 스냅샷 저장(정규화된 항목 목록). 반환: 저장한 행 수."""
+    counters: Dict[str, int] = {}
+
+    def order_of(part, _key_):
+        counters[part] = counters.get(part, 0) + 1
+        return counters[part]
+
+    rows = [row for norm in items for row in _rows_for(chart, norm, req_map, order_of)]
+    if rows:
+        GanttTask.objects.bulk_create(rows)
+    return len(rows)
+
+
+def save_delta_tasks(
+    chart: GanttChart,
+    changed: Iterable[Dict[str, Any]],
+    removed_keys: Iterable[str],
+    base_rows: List[GanttTask],
+    req_map: Dict[int, Any],
+) -> int:
+    """
+    chart(is_delta=True)에 바뀐 작업 행 + 삭제 표시만 저장.
+    같은 파트의 기존 작업이면 기존 order 유지, 새 작업은 파트 끝에 붙임.
+    """
+    old_order = {(t.part, row_key(t)): t.order for t in base_rows}
+    counters: Dict[str, int] = {}
+    for t in base_rows:
+        counters[t.part] = max(counters.get(t.part, 0), t.order)
+
+    def order_of(part, key):
+        if (part, key) in old_order:
+            return old_order[(part, key)]
+        counters[part] = counters.get(part, 0) + 1
+        return counters[part]
+
+    rows = [row for norm in changed for row in _rows_for(chart, norm, req_map, order_of)]
+    rows += [
+        GanttTask(gantt_chart=chart, part="", feature_name="", task_key=key, deleted=True)
+        for key in removed_keys
+    ]
+    if rows:
+        GanttTask.objects.bulk_create(rows)
+    return len(rows)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 읽기
+# ──────────────────────────────────────────────────────────────────────────────
+def row_key(task: GanttTask) -> str:
+    """버전 간 작업 식별자. task_key가 없던 기존 행은 Requirement PK, 그것도 없으면 행 자체."""
+    if task.task_key:
+        return task.task_key
+    if task.requirement_id:
+        return str(task.requirement_id)
+    return f"#{task.pk}"
+
+
+def _chain(chart: GanttChart) -> List[GanttChart]:
+    """[chart, parent, ..., 스냅샷] (delta가 아닌 버전에서 멈춤)."""
+    chain = [chart]
+    while chain[-1].is_delta and chain[-1].parent_id:
+        chain.append(GanttChart.objects.only("GanttChart", "parent_id", "is_delta").get(pk=chain[-1].parent_id))
+    return chain
+
+
+def delta_depth(chart: GanttChart) -> int:
+    """chart 위에 쌓인 delta 수(스냅샷이면 0)."""
+    return len(_chain(chart)) - 1
+
+
+def should_snapshot(parent: GanttChart) -> bool:
+    """parent 위에 delta를 하나 더 쌓으면 GANTT_MAX_DELTA_DEPTH를 넘는지."""
+    return delta_depth(parent) + 1 > _max_depth()
+
+
+def materialize_tasks(chart: GanttChart, select_related: bool = False) -> List[GanttTask]:
+    """chart 버전의 실제 작업 행 목록(스냅샷 + delta 적용, 삭제 표시 제외). 정렬은 호출 측에서."""
+    chain = _chain(chart)
+    qs = GanttTask.objects.filter(gantt_chart_id__in=[c.pk for c in chain]).order_by("GanttTask")
+    if select_related:
+        qs = qs.select_related("requirement")
+    by_chart: Dict[int, List[GanttTask]] = {}
+    for t in qs:
+        by_chart.setdefault(t.gantt_chart_id, []).append(t)
+
+    state: Dict[str, List[GanttTask]] = {}
+    for c in reversed(chain):  # 스냅샷 → 최신 delta
+        grouped: Dict[str, List[GanttTask]] = {}
+        for t in by_chart.get(c.pk, []):
+            grouped.setdefault(row_key(t), []).append(t)
+        for key, rows in grouped.items():
+            state.pop(key, None)
+            if not any(r.deleted for r in rows):
+                state[key] = rows
+    return [t for rows in state.values() for t in rows]
+
+
+def tasks_to_items(rows: Iterable[GanttTask]) -> List[Dict[str, Any]]:
+    """작업 행(파트별) → LLM 항목 형식(작업당 1개, 파트 목록). 엑셀 생성/재계획 프롬프트에 사용."""
+    items: Dict[str, Dict[str, Any]] = {}
+    for t in rows:
+        key = row_key(t)
+        item = items.get(key)
+        if item is None:
+            item = items[key] = {
+                "기능ID": key,
+                "기능명": t.feature_name,
+                "파트": [],
+                "기간": t.duration_weeks,
+                "시작주차": t.start_week,
+                "선행작업": list(t.predecessors or []) or None,
+                "requirement_id": t.requirement_id,
+            }
+        if t.part not in item["파트"]:
+            item["파트"].append(t.part)
+    return list(items.values())
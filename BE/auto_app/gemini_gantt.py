@@ -6,22 +6,16 @@
 
 import os
 import json
-import re
 from datetime import datetime
 from collections import defaultdict
 
-import openpyxl
-from openpyxl.styles import PatternFill, Border, Side, Alignment
-from openpyxl.utils import get_column_letter
-
-import google.generativeai as genai
-from dotenv import load_dotenv
+from .gemini_pool import gemini_model
+from .structured_output import GANTT_TASKS_SCHEMA, gemini_config, parse_structured
 
 # ─────────────────────────────────────────────────────────────
 # 1) 환경변수/LLM 설정
 # ─────────────────────────────────────────────────────────────
-load_dotenv()  # .env 에서 GEMINI_API_KEY_3 로드
-genai.configure(api_key=os.getenv("GEMINI_API_KEY_3"))
+# .env(GEMINI_API_KEY_3)는 gemini_pool이 첫 호출 때 로드, openpyxl은 build_gantt_xlsx에서만 import
 
 # ─────────────────────────────────────────────────────────────
 # 2) 색상 맵 (파트별 채우기 색상)
@@ -130,15 +124,51 @@ def make_prompt(json_data: dict, parts: list, total_weeks: int, feedback: str =
     base_prompt += f"\n\n✍️ 프로젝트/기능 전체 데이터(JSON):\n```json\n{json.dumps(json_data, ensure_ascii=False, indent=2)}\n```"
     return base_prompt
 
+# ─────────────────────────────────────────────────────────────
+# 4-1) 부분 재계획 프롬프트 (gantt_replan)
+#    - 바뀐 작업과 선후관계 이웃만 보내고, 나머지는 경계 조건(고정 주차)으로만 전달
+# ─────────────────────────────────────────────────────────────
+def make_replan_prompt(json_data: dict, parts: list, total_weeks: int, feedback: str = None) -> str:
+    """
+    json_data: gantt_replan.plan_replan이 만든 dict
+      {"project": {"title"}, "수정대상": [...작업], "변경된기능": [...], "삭제된기능": [...],
+       "고정선행작업": {기능ID: 종료주차}, "고정후행작업": {기능ID: 시작주차}}
+    """
+    base_prompt = f"""
+당신은 소프트웨어 기획 전문가이자 프로젝트 매니저입니다.
+
+아래는 이미 만들어진 간트차트 중 '수정 대상' 작업들과, 그 사이에 바뀐 기능명세입니다.
+전체 기간 {total_weeks}주 안에서 수정 대상 작업과 새 기능의 일정만 다시 계획하세요.
+(수정 대상에 없는 작업은 그대로 유지되므로 출력하지 마세요.)
+
+✅ 개발 파트 목록:
+- {", ".join(parts)}
+
+✅ 지켜야 할 규칙:
+1) "수정대상" 작업과 "변경된기능" 중 새 기능만 출력하세요. 기존 작업의 "기능ID"는 절대 바꾸지 마세요.
+2) 새 기능의 "기능ID"는 "변경된기능"에 적힌 값을 그대로 쓰세요.
+3) "고정선행작업"의 작업은 적힌 종료주차 이후에 시작해야 합니다.
+4) "고정후행작업"의 작업이 적힌 시작주차 전에 끝나도록 하세요.
+5) "기간"은 주 단위 정수, "시작주차"는 1부터 시작하는 정수입니다.
+6) 출력은 반드시 JSON 배열만 반환하세요. (설명 텍스트 금지, 형식은 기존 간트 작업과 동일)
+""".strip()
+
+    if feedback:
+        base_prompt += f"\n\n📌 사용자 피드백:\n{feedback}"
+
+    base_prompt += f"\n\n✍️ 재계획 데이터(JSON):\n```json\n{json.dumps(json_data, ensure_ascii=False, indent=1)}\n```"
+    return base_prompt
+
 # ─────────────────────────────────────────────────────────────
 # 5) Gemini 호출
 # ─────────────────────────────────────────────────────────────
 def call_gemini(prompt: str) -> str:
     """
     Gemini 2.5 Flash 호출. text 결과만 반환.
+    응답은 GANTT_TASKS_SCHEMA(JSON 배열)로 강제.
     """
-    model = genai.GenerativeModel("gemini-1.5-flash")
-    resp = model.generate_content(prompt)
+    model = gemini_model("gemini-1.5-flash", prefer="GEMINI_API_KEY_3")
+    resp = model.generate_content(prompt, generation_config=gemini_config(GANTT_TASKS_SCHEMA, temperature=0.2))
     return (resp.text or "").strip()
 
 # ─────────────────────────────────────────────────────────────
@@ -146,21 +176,14 @@ def call_gemini(prompt: str) -> str:
 # ─────────────────────────────────────────────────────────────
 def parse_llm_array(text: str):
     """
-    LLM이 JSON 외 설명을 섞어줄 수 있으므로, 배열 부분만 안전 추출.
+    LLM이 JSON 외 설명을 섞거나 중간에 잘려도 structured_output으로 배열을 살리고,
+    스키마와 다른 필드("2주" 등)만 고쳐서 반환.
     반환: list (작업 항목들)
     """
     try:
-        data = json.loads(text)
-        if isinstance(data, list):
-            return data
-        # dict 등으로 감싸져 온 경우 배열 후보 추출
-    except Exception:
-        pass
-
-    m = re.search(r"\[\s*\{.*?\}\s*\]", text, re.DOTALL)
-    if not m:
+        return parse_structured(text, GANTT_TASKS_SCHEMA, "gantt")
+    except ValueError:
         raise ValueError("LLM 응답에서 유효한 JSON 배열을 찾지 못했습니다.")
-    return json.loads(m.group(0))
 
 # ─────────────────────────────────────────────────────────────
 # 7) 간트차트 엑셀(.xlsx) 생성
@@ -178,6 +201,10 @@ def build_gantt_xlsx(parsed_data: list, total_weeks: int, available_parts: list,
       "선행작업": null 또는 ["F-000"] 등
     }
     """
+    import openpyxl
+    from openpyxl.styles import PatternFill, Border, Side, Alignment
+    from openpyxl.utils import get_column_letter
+
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "Gantt Chart"
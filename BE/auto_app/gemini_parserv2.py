@@ -1,20 +1,23 @@
 # -*- coding: utf-8 -*-
 import os
 import json
-from dotenv import load_dotenv
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
 import datetime
 import glob
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-# 1. .env에서 API Key 로드
-load_dotenv()
-# API 키 환경 변수 이름을 "GOOGLE_API_KEY"로 통일합니다.
-api_key = os.getenv("GEMINI_API_KEY_1")
-if not api_key:
-    raise ValueError("GEMINI_API_KEY_1 환경 변수가 설정되지 않았습니다.")
-genai.configure(api_key=api_key)
+from .plan_mapreduce import (
+    split_plan_sections,
+    run_segments_parallel,
+    merge_feature_lists,
+    renumber_features,
+    fill_missing_fields,
+)
+
+from .gemini_pool import gemini_model
+from .structured_output import G1_FEATURES_SCHEMA, StructuredOutputError, gemini_config, parse_structured
+
+# 1. 키/.env는 gemini_pool이 첫 호출 때 로드(import 시점 부작용 없음 — 전역 genai.configure 사용 안 함)
 
 
 def make_prompt(plan_text: str, existing_features: list = None) -> str:
@@ -92,33 +95,140 @@ def make_prompt(plan_text: str, existing_features: list = None) -> str:
     **오직 JSON 배열로만 출력하십시오. 다른 설명은 출력하지 마십시오.**
     '''
 
-def generate_feature_list(plan_text: str, existing_features: list = None):
+def generate_feature_list(plan_text: str, existing_features: list = None, prefer: str = "GEMINI_API_KEY_1"):
     """
     Gemini를 호출하여 기능 목록을 생성합니다.
+    prefer: 우선 사용할 풀 키 별칭(뷰가 settings 키를 등록한 별칭을 넘김)
     """
     prompt = make_prompt(plan_text, existing_features)
-    model = genai.GenerativeModel("gemini-1.5-flash") # 1.5-flash가 긴 컨텍스트 처리에 더 유리할 수 있음
-    response = model.generate_content(prompt, generation_config=GenerationConfig(temperature=0.1))
+    model = gemini_model("gemini-1.5-flash", prefer=prefer) # 1.5-flash가 긴 컨텍스트 처리에 더 유리할 수 있음
+    response = model.generate_content(prompt, generation_config=gemini_config(G1_FEATURES_SCHEMA, temperature=0.1))
 
     raw = response.text.strip()
     # 응답이 비어있는 경우 빈 리스트 반환
     if not raw:
         return []
 
-    raw = raw.replace("```json", "").replace("```", "").strip()
-
+    # 잘린 배열/코드펜스/필드 타입 오류는 structured_output이 살림(재호출 없음)
     try:
-        data = json.loads(raw)
-        if isinstance(data, list):
-            return data
-        else:
-            print("❌ 예상과 다른 구조(리스트가 아님):", type(data))
-            return []
-    except Exception as e:
+        return parse_structured(raw, G1_FEATURES_SCHEMA, "g1_features")
+    except StructuredOutputError as e:
         print("❌ JSON 파싱 실패:", e)
-        print("🔎 원본 출력:\n", raw)
+        print("🔎 원본 출력:\n", raw[:2000])
         return []
 
+# ──────────────────────────────────────────────────────────────────────────────
+# 맵-리듀스 추출 (긴 기획서: 섹션 분할 → 병렬 추출 → 로컬 병합 → 선택적 통합 1회)
+# ──────────────────────────────────────────────────────────────────────────────
+_GROUPS_SCHEMA = {"type": "array", "items": {"type": "array", "items": {"type": "string"}}}
+
+
+def make_consolidate_prompt(index_rows: List[Dict[str, str]]) -> str:
+    """기능ID/기능명/목적 요약만 보내 '같은 기능' 묶음을 받아오는 프롬프트."""
+    return f'''
+    아래는 하나의 기획서를 여러 구간으로 나눠 추출한 기능 목록(요약)입니다.
+    서로 다른 구간에서 **같은 기능을 다른 이름으로** 추출한 경우만 찾아 묶으십시오.
+
+    ```json
+    {json.dumps(index_rows, indent=2, ensure_ascii=False)}
+    ```
+
+    - 출력: 같은 기능끼리 묶은 기능ID 배열들의 JSON 배열. 예: [["FEAT-003", "FEAT-017"], ["FEAT-005", "FEAT-021"]]
+    - 확실하지 않으면 묶지 마십시오. 묶을 것이 없으면 []를 출력하십시오.
+    **오직 JSON 배열로만 출력하십시오.**
+    '''
+
+def consolidate_features(features: List[Dict[str, Any]],
+                         prefer: str = "GEMINI_API_KEY_1") -> Tuple[List[Dict[str, Any]], int]:
+    """
+    선택적 통합 호출(1회). 의미상 중복 묶음을 받아 첫 항목으로 병합한다.
+    반환: (병합 후 기능 목록, 제거된 개수). 실패 시 원본 그대로.
+    """
+    rows = []
+    for f in features:
+        desc = f.get("기능설명") or {}
+        rows.append({
+            "기능ID": str(f.get("기능ID", "")),
+            "기능명": str(f.get("기능명", "")),
+            "목적": str(desc.get("목적", "") if isinstance(desc, dict) else "")[:120],
+        })
+    try:
+        model = gemini_model("gemini-1.5-flash", prefer=prefer)
+        response = model.generate_content(
+            make_consolidate_prompt(rows),
+            generation_config=gemini_config(_GROUPS_SCHEMA, temperature=0.0),
+        )
+        groups = parse_structured(response.text or "[]", _GROUPS_SCHEMA, "g1_consolidate")
+    except Exception as e:
+        print("⚠️ 기능 통합 호출 실패(로컬 병합 결과 사용):", e)
+        return features, 0
+
+    by_id = {str(f.get("기능ID")): f for f in features}
+    drop = set()
+    for group in groups if isinstance(groups, list) else []:
+        ids = [str(x) for x in group if str(x) in by_id and str(x) not in drop] if isinstance(group, list) else []
+        if len(ids) < 2:
+            continue
+        keep = by_id[ids[0]]
+        for other in ids[1:]:
+            fill_missing_fields(keep, by_id[other])
+            drop.add(other)
+    kept = [f for f in features if str(f.get("기능ID")) not in drop]
+    return kept, len(drop)
+
+def generate_feature_list_mapreduce(
+    plan_text: str,
+    segment_chars: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    consolidate: Optional[bool] = None,
+    prefer: str = "GEMINI_API_KEY_1",
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    원문을 자르지 않고 전체 구간에서 기능을 추출합니다.
+    1) split_plan_sections로 세그먼트 분할
+    2) 세그먼트별 generate_feature_list를 병렬 호출
+    3) 기능명 기준 로컬 병합/중복 제거
+    4) (옵션) consolidate_features 1회 → 기능ID 재부여
+    prefer: 모든 Gemini 호출에 넘길 풀 키 별칭
+    반환: (기능 목록, 통계 dict). 모든 세그먼트가 실패하면 첫 예외를 그대로 올립니다.
+    """
+    started = time.time()
+    segments = split_plan_sections(plan_text, segment_chars)
+    if consolidate is None:
+        consolidate = os.getenv("PLAN_CONSOLIDATE", "1") not in ("0", "false", "False")
+
+    def _extract(i: int, seg: str) -> List[Dict[str, Any]]:
+        t0 = time.time()
+        feats = generate_feature_list(seg, prefer=prefer)
+        print(f"   (세그먼트 {i + 1}/{len(segments)}: {len(feats)}개, {time.time() - t0:.1f}s)")
+        return feats
+
+    print(f"-> 맵-리듀스 추출: {len(plan_text)}자 → {len(segments)}개 세그먼트")
+    results, errors = run_segments_parallel(_extract, segments, max_workers)
+    if errors and len(errors) == len(segments):
+        raise errors[0][1]
+
+    raw_count = sum(len(r or []) for r in results)
+    features = renumber_features(merge_feature_lists(results))
+    merged_count = len(features)
+
+    removed = 0
+    if consolidate and len(segments) > 1 and len(features) > 1:
+        features, removed = consolidate_features(features, prefer=prefer)
+        renumber_features(features)
+
+    stats = {
+        "mode": "mapreduce",
+        "plan_chars": len(plan_text),
+        "segments": len(segments),
+        "raw_features": raw_count,
+        "merged_features": merged_count,
+        "consolidated_removed": removed,
+        "failed_segments": [i + 1 for i, _ in errors],
+        "elapsed_sec": round(time.time() - started, 2),
+    }
+    return features, stats
+
 def _safe_get(mapping: Dict[str, Any], key: str, default: Any = "") -> Any:
     return mapping.get(key, default) if isinstance(mapping, dict) else default
 
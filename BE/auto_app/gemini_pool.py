@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+"""
+gemini_pool.py
+- 여러 Gemini 키(GEMINI_API_KEY_1~4, GOOGLE_API_KEY, GEMINI_API_KEY)를 한 프로세스에서 동시에 쓰기 위한 클라이언트 풀
+- genai.configure(전역 상태)를 쓰지 않고, 키마다 독립 GenerativeServiceClient를 만들어 모델에 주입
+- 키별 RPM/TPM 카운터(최근 60초), 429 쿨다운/인증 실패 격리, 가장 한가한 정상 키로 라우팅
+- 호출부는 genai.GenerativeModel(...) 대신 gemini_model(...)을 쓰면 됨
+  (generate_content / start_chat().send_message 동일 인터페이스)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+try:
+    from . import llm_telemetry, llm_transport
+except ImportError:  # 단독 스크립트 실행(chat.py / auto_document.py의 폴백 import)
+    import llm_telemetry
+    import llm_transport
+
+__all__ = [
+    "GeminiPoolExhausted",
+    "GeminiKeyPool",
+    "get_pool",
+    "gemini_model",
+    "is_rate_limit_error",
+    "is_auth_error",
+]
+
+# 키를 찾을 환경변수(순서 = 동점일 때 우선순위)
+KEY_ENV_NAMES = (
+    "GEMINI_API_KEY_1",
+    "GEMINI_API_KEY_2",
+    "GEMINI_API_KEY_3",
+    "GEMINI_API_KEY_4",
+    "GOOGLE_API_KEY",
+    "GEMINI_API_KEY",
+)
+
+_WINDOW_SEC = 60.0
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class GeminiPoolExhausted(RuntimeError):
+    """사용 가능한 키가 없음(전부 쿨다운/한도 초과). 메시지에 429를 포함해 기존 뷰의 429 매핑을 그대로 탄다."""
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    name = type(exc).__name__
+    low = str(exc).lower()
+    return (
+        name in ("ResourceExhausted", "TooManyRequests", "GeminiPoolExhausted")
+        or "429" in low
+        or "quota" in low
+        or "rate limit" in low
+        or "resource has been exhausted" in low
+    )
+
+
+def is_auth_error(exc: Exception) -> bool:
+    name = type(exc).__name__
+    low = str(exc).lower()
+    return (
+        name in ("PermissionDenied", "Unauthenticated")
+        or "api_key_invalid" in low
+        or "api key not valid" in low
+    )
+
+
+def _usage_tokens(resp: Any) -> int:
+    usage = getattr(resp, "usage_metadata", None)
+    try:
+        return int(getattr(usage, "total_token_count", 0) or 0)
+    except Exception:
+        return 0
+
+
+def _estimate_tokens(contents: Any) -> int:
+    # 사전 TPM 체크용 대략치(한글 기준 글자/3)
+    try:
+        return max(1, len(str(contents)) // 3)
+    except Exception:
+        return 1
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 키 슬롯: 키 1개당 클라이언트 + 사용량/상태
+# ──────────────────────────────────────────────────────────────────────────────
+class _KeySlot:
+    def __init__(self, alias: str, api_key: str, order: int):
+        self.alias = alias
+        self.aliases = [alias]          # 같은 키가 여러 환경변수에 있으면 묶음
+        self.api_key = api_key
+        self.order = order
+        self.calls = deque()            # 최근 60초 호출 시각
+        self.tokens = deque()           # 최근 60초 (시각, 토큰)
+        self.token_sum = 0
+        self.inflight = 0
+        self.cooldown_until = 0.0
+        self.consecutive_errors = 0
+        self.total_calls = 0
+        self.total_tokens = 0
+        self.total_429 = 0
+        self.total_errors = 0
+        self.last_error = ""
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def client(self):
+        """키 전용 GenerativeServiceClient (전역 genai.configure와 무관)."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from google.ai import generativelanguage as glm
+                    kwargs: Dict[str, Any] = {"client_options": {"api_key": self.api_key}}
+                    transport = os.getenv("GEMINI_TRANSPORT")
+                    if transport:
+                        kwargs["transport"] = transport
+                    self._client = glm.GenerativeServiceClient(**kwargs)
+        return self._client
+
+    def trim(self, now: float) -> None:
+        while self.calls and now - self.calls[0] >= _WINDOW_SEC:
+            self.calls.popleft()
+        while self.tokens and now - self.tokens[0][0] >= _WINDOW_SEC:
+            self.token_sum -= self.tokens.popleft()[1]
+
+    def available(self, now: float, rpm: int, tpm: int, est_tokens: int) -> bool:
+        if now < self.cooldown_until:
+            return False
+        if rpm and len(self.calls) >= rpm:
+            return False
+        if tpm and self.token_sum and self.token_sum + est_tokens > tpm:
+            return False
+        return True
+
+    def wait_hint(self, now: float, rpm: int, tpm: int) -> float:
+        waits = [max(0.0, self.cooldown_until - now)]
+        if rpm and len(self.calls) >= rpm:
+            waits.append(_WINDOW_SEC - (now - self.calls[0]))
+        if tpm and self.tokens and self.token_sum >= tpm:
+            waits.append(_WINDOW_SEC - (now - self.tokens[0][0]))
+        return max(waits)
+
+    def load(self, rpm: int) -> float:
+        return self.inflight + (len(self.calls) / rpm if rpm else 0.0)
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "alias": self.alias,
+            "aliases": list(self.aliases),
+            "inflight": self.inflight,
+            "rpm_used": len(self.calls),
+            "tpm_used": self.token_sum,
+            "cooldown_sec": round(max(0.0, self.cooldown_until - now), 1),
+            "total_calls": self.total_calls,
+            "total_tokens": self.total_tokens,
+            "total_429": self.total_429,
+            "total_errors": self.total_errors,
+            "last_error": self.last_error or None,
+        }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 풀
+# ──────────────────────────────────────────────────────────────────────────────
+class GeminiKeyPool:
+    """
+    키 슬롯 묶음 + 라우팅.
+    - rpm/tpm: 키당 한도(0이면 무제한). 초과 키는 창이 비워질 때까지 건너뜀
+    - 429: 지수 쿨다운(cooldown_sec * 2^연속실패, 최대 16배) 후 다른 키로 즉시 재시도
+    - 인증 실패: auth_cooldown_sec 동안 격리
+    - 모두 불가하면 max_wait_sec까지 대기 후 GeminiPoolExhausted
+    """
+
+    def __init__(
+        self,
+        keys: Optional[List[tuple]] = None,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        cooldown_sec: Optional[float] = None,
+        auth_cooldown_sec: Optional[float] = None,
+        max_wait_sec: Optional[float] = None,
+    ):
+        self.rpm = int(rpm if rpm is not None else _env_num("GEMINI_RPM_PER_KEY", 15))
+        self.tpm = int(tpm if tpm is not None else _env_num("GEMINI_TPM_PER_KEY", 1000000))
+        self.cooldown_sec = cooldown_sec if cooldown_sec is not None else _env_num("GEMINI_COOLDOWN_SEC", 30)
+        self.auth_cooldown_sec = auth_cooldown_sec if auth_cooldown_sec is not None else _env_num("GEMINI_AUTH_COOLDOWN_SEC", 600)
+        self.max_wait_sec = max_wait_sec if max_wait_sec is not None else _env_num("GEMINI_POOL_WAIT_SEC", 60)
+        self._cond = threading.Condition()
+        self._slots: List[_KeySlot] = []
+        self._by_alias: Dict[str, _KeySlot] = {}
+        self._by_key: Dict[str, _KeySlot] = {}
+        for alias, key in keys or []:
+            self.add_key(alias, key)
+
+    @classmethod
+    def from_env(cls) -> "GeminiKeyPool":
+        load_dotenv()
+        keys = [(name, os.getenv(name, "").strip()) for name in KEY_ENV_NAMES]
+        keys = [(a, k) for a, k in keys if k]
+        if not keys and llm_transport.replaying():
+            keys = [("REPLAY", "replay")]  # 카세트 재생: 실제 키 없이 풀 동작
+        return cls(keys=keys)
+
+    # ── 키 관리 ──
+    def add_key(self, alias: str, api_key: str) -> str:
+        """키 등록(이미 있는 키면 별칭만 추가). 반환: 대표 별칭."""
+        api_key = (api_key or "").strip()
+        if not api_key:
+            return ""
+        with self._cond:
+            slot = self._by_key.get(api_key)
+            if slot is None:
+                slot = _KeySlot(alias, api_key, len(self._slots))
+                self._slots.append(slot)
+                self._by_key[api_key] = slot
+            elif alias not in slot.aliases:
+                slot.aliases.append(alias)
+            self._by_alias[alias] = slot
+            self._cond.notify_all()
+            return slot.alias
+
+    def ensure_key(self, api_key: str, alias: Optional[str] = None) -> str:
+        """외부에서 받은 키(CLI 인자 등)를 풀에 넣고 별칭 반환."""
+        api_key = (api_key or "").strip()
+        slot = self._by_key.get(api_key)
+        if slot is not None:
+            return slot.alias
+        return self.add_key(alias or f"key_{len(self._slots) + 1}", api_key)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # ── 임대/반납 ──
+    def _acquire(self, prefer: Optional[str], est_tokens: int) -> _KeySlot:
+        if not self._slots:
+            raise RuntimeError(
+                "Gemini API 키가 없습니다. .env에 " + ", ".join(KEY_ENV_NAMES) + " 중 하나 이상을 설정하세요."
+            )
+        preferred = self._by_alias.get(prefer) if prefer else None
+        deadline = time.monotonic() + self.max_wait_sec
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready = []
+                for s in self._slots:
+                    s.trim(now)
+                    if s.available(now, self.rpm, self.tpm, est_tokens):
+                        ready.append(s)
+                if ready:
+                    slot = min(ready, key=lambda s: (s.load(self.rpm), s is not preferred, s.order))
+                    slot.inflight += 1
+                    slot.calls.append(now)
+                    slot.total_calls += 1
+                    return slot
+                wait = min(s.wait_hint(now, self.rpm, self.tpm) for s in self._slots)
+                remain = deadline - now
+                if remain <= 0:
+                    raise GeminiPoolExhausted(
+                        f"429 모든 Gemini 키가 쿨다운/한도 상태입니다. 약 {wait:.0f}초 후 재시도하세요."
+                    )
+                self._cond.wait(timeout=max(0.05, min(wait, remain)))
+
+    def _release(self, slot: _KeySlot, tokens: int, error: Optional[Exception]) -> None:
+        with self._cond:
+            now = time.monotonic()
+            slot.inflight = max(0, slot.inflight - 1)
+            if tokens:
+                slot.tokens.append((now, tokens))
+                slot.token_sum += tokens
+                slot.total_tokens += tokens
+            if error is None:
+                slot.consecutive_errors = 0
+            elif is_rate_limit_error(error):
+                slot.total_429 += 1
+                slot.cooldown_until = now + self.cooldown_sec * (2 ** min(slot.consecutive_errors, 4))
+                slot.consecutive_errors += 1
+                slot.last_error = str(error)[:200]
+                print(f"⏳ Gemini 키 {slot.alias} 429 → {slot.cooldown_until - now:.0f}s 쿨다운")
+            elif is_auth_error(error):
+                slot.total_errors += 1
+                slot.cooldown_until = now + self.auth_cooldown_sec
+                slot.last_error = str(error)[:200]
+                print(f"🚫 Gemini 키 {slot.alias} 인증 실패 → {self.auth_cooldown_sec:.0f}s 격리")
+            else:
+                slot.total_errors += 1
+                slot.last_error = str(error)[:200]
+            self._cond.notify_all()
+
+    def call(self, fn: Callable[[Any], Any], model_name: str, model_kwargs: Dict[str, Any],
+             prefer: Optional[str] = None, est_tokens: int = 1) -> Any:
+        """
+        fn(바인딩된 GenerativeModel) 실행. 429면 해당 키를 쿨다운시키고
+        남은 키 수만큼 다른 키로 재시도. 그 외 예외는 그대로 올림.
+        호출 1건(재시도 포함)마다 llm_telemetry에 기록.
+        """
+        attempts = max(1, len(self._slots))
+        last_exc: Optional[Exception] = None
+        t0 = time.perf_counter()
+        tries, limited, alias, resp = 0, 0, "", None
+        try:
+            for _ in range(attempts):
+                slot = self._acquire(prefer, est_tokens)
+                tries += 1
+                alias = slot.alias
+                # 모델/클라이언트 생성은 네트워크를 타지 않음(replay 모드에서도 안전)
+                import google.generativeai as genai  # 첫 호출 때만 실제 import(서버 기동 시간 절약)
+
+                model = genai.GenerativeModel(model_name, **model_kwargs)
+                model._client = slot.client()
+                try:
+                    resp = fn(model)
+                except Exception as e:
+                    self._release(slot, 0, e)
+                    last_exc = e
+                    if is_rate_limit_error(e):
+                        limited += 1
+                        continue
+                    raise
+                self._release(slot, _usage_tokens(resp) or est_tokens, None)
+                return resp
+            raise last_exc  # type: ignore[misc]
+        except Exception as e:
+            last_exc = e
+            raise
+        finally:
+            if isinstance(last_exc, GeminiPoolExhausted):
+                outcome = "exhausted"
+            elif resp is None and last_exc is not None:
+                outcome = "rate_limited" if is_rate_limit_error(last_exc) else "error"
+            else:
+                outcome = "ok"
+            prompt_tokens, output_tokens = llm_telemetry.genai_usage(resp)
+            llm_telemetry.emit(
+                "gemini",
+                model=model_name,
+                key_alias=alias,
+                prompt_tokens=prompt_tokens,
+                output_tokens=output_tokens,
+                latency_sec=time.perf_counter() - t0,
+                retries=max(0, tries - 1),
+                rate_limited=limited,
+                cache_hit=bool(getattr(resp, "replayed", False)),
+                outcome=outcome,
+                error="" if outcome == "ok" else f"{type(last_exc).__name__}: {last_exc}",
+            )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            now = time.monotonic()
+            for s in self._slots:
+                s.trim(now)
+            return [s.snapshot(now) for s in self._slots]
+
+    # ── 모델 팩토리 ──
+    def model(self, model_name: str, prefer: Optional[str] = None, **model_kwargs) -> "PooledModel":
+        return PooledModel(self, model_name, prefer=prefer, **model_kwargs)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# genai.GenerativeModel 대체 래퍼
+# ──────────────────────────────────────────────────────────────────────────────
+class PooledModel:
+    """호출마다 풀에서 키를 임대해 실행하는 GenerativeModel 호환 객체(상태 없음, 스레드 안전)."""
+
+    def __init__(self, pool: GeminiKeyPool, model_name: str, prefer: Optional[str] = None, **model_kwargs):
+        self._pool = pool
+        self.model_name = model_name
+        self.prefer = prefer
+        self.model_kwargs = model_kwargs
+
+    def _request(self, contents, kwargs, history=None) -> Dict[str, Any]:
+        """카세트 키용 요청 요약(키/클라이언트 제외)."""
+        return {
+            "model": self.model_name,
+            "model_kwargs": self.model_kwargs,
+            "history": history,
+            "contents": contents,
+            "kwargs": kwargs,
+        }
+
+    def generate_content(self, contents, **kwargs):
+        req = self._request(contents, kwargs)
+        return self._pool.call(
+            lambda m: llm_transport.genai_exchange(req, lambda: m.generate_content(contents, **kwargs)),
+            self.model_name, self.model_kwargs, self.prefer, _estimate_tokens(contents),
+        )
+
+    def count_tokens(self, contents, **kwargs):
+        return self._pool.call(
+            lambda m: m.count_tokens(contents, **kwargs),
+            self.model_name, self.model_kwargs, self.prefer, 1,
+        )
+
+    def start_chat(self, history=None, **kwargs) -> "PooledChat":
+        return PooledChat(self, history, **kwargs)
+
+
+class PooledChat:
+    """ChatSession 호환: send_message마다 키를 임대하고 history는 이 객체가 유지."""
+
+    def __init__(self, pmodel: PooledModel, history=None, **kwargs):
+        self._pmodel = pmodel
+        self._kwargs = kwargs
+        self.history = list(history or [])
+
+    def send_message(self, content, **kwargs):
+        req = self._pmodel._request(content, kwargs, history=self.history)
+
+        def _live(m):
+            chat = m.start_chat(history=self.history, **self._kwargs)
+            resp = chat.send_message(content, **kwargs)
+            self.history = list(chat.history)
+            return resp
+
+        def _send(m):
+            resp = llm_transport.genai_exchange(req, lambda: _live(m))
+            if getattr(resp, "replayed", False):
+                self.history = self.history + [
+                    {"role": "user", "parts": [content]},
+                    {"role": "model", "parts": [resp.text]},
+                ]
+            return resp
+
+        pm = self._pmodel
+        return pm._pool.call(_send, pm.model_name, pm.model_kwargs, pm.prefer,
+                             _estimate_tokens(self.history) + _estimate_tokens(content))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 프로세스 단일 풀
+# ──────────────────────────────────────────────────────────────────────────────
+_POOL: Optional[GeminiKeyPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> GeminiKeyPool:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = GeminiKeyPool.from_env()
+                print(f"🔑 Gemini 키 풀 초기화: {len(_POOL)}개 키")
+    return _POOL
+
+
+def gemini_model(model_name: str, prefer: Optional[str] = None, **model_kwargs) -> PooledModel:
+    """genai.GenerativeModel(model_name, **kwargs) 대체. prefer는 동점일 때 우선할 키 별칭(환경변수명)."""
+    return get_pool().model(model_name, prefer=prefer, **model_kwargs)
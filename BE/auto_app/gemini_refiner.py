@@ -1,16 +1,17 @@
 import os
 import json
-from typing import Dict, List, Optional
-from dotenv import load_dotenv
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
-
-# 1. 환경 변수 로드 및 Gemini 설정
-load_dotenv()
-# GOOGLE_API_KEY 또는 GEMINI_API_KEY_2를 사용하도록 유연하게 변경
-api_key = os.getenv("GEMINI_API_KEY_2") or os.getenv("GOOGLE_API_KEY")
-if api_key:
-    genai.configure(api_key=api_key)
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# 1. 키/.env는 gemini_pool이 첫 호출 때 로드(GEMINI_API_KEY_2 우선, 혼잡 시 다른 키로 분산)
+from .gemini_pool import gemini_model
+from .structured_output import StructuredOutputError, gemini_config, parse_json
+from .plan_mapreduce import (
+    plan_segment_chars,
+    split_plan_sections,
+    run_segments_parallel,
+    select_relevant_segments,
+)
 
 # ======================================================================
 # ✅ 2. Gemini 프롬프트 생성 함수 (수정된 부분)
@@ -42,6 +43,80 @@ def make_refine_prompt(plan_text, feature_list):
 이제 위 규칙을 반드시 준수하여, 아래 기능 명세 목록을 정제한 최종 JSON 배열을 출력하십시오.
 """
 
+# ======================================================================
+# ✅ 2-1. 맵-리듀스 정제 (긴 기획서: 원문을 자르지 않고 기능 묶음별 병렬 정제)
+# ======================================================================
+def refine_call(prompt: str, model_name: str = "gemini-2.5-flash", prefer: str = "GEMINI_API_KEY_2") -> Any:
+    """정제 프롬프트 1회 호출 → JSON 파싱(실패 시 원문 텍스트)."""
+    model = gemini_model(model_name, prefer=prefer)
+    resp = model.generate_content(
+        prompt,
+        generation_config=gemini_config(temperature=0.2),
+    )
+    text = getattr(resp, "text", "") or ""
+    # 정제 결과는 원본 구조를 그대로 유지해야 하므로 스키마 없이 관대한 파싱만(코드펜스/잘림 복구)
+    try:
+        return parse_json(text, expect="array")[0]
+    except StructuredOutputError:
+        return text.strip()
+
+
+def refine_features_mapreduce(
+    plan_text: str,
+    features: List[dict],
+    batch_size: Optional[int] = None,
+    segment_chars: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    model_name: str = "gemini-2.5-flash",
+    prefer: str = "GEMINI_API_KEY_2",
+) -> Tuple[List[dict], Dict[str, Any]]:
+    """
+    긴 기획서용 정제.
+    - 원문은 split_plan_sections로 세그먼트화(손실 없음)
+    - 기능 목록을 batch_size 단위로 나누고, 각 묶음과 관련된 세그먼트만 골라 컨텍스트 구성
+    - 묶음별 make_refine_prompt 호출을 병렬 실행 후 원래 순서대로 이어 붙임
+    - 응답이 배열이 아니거나 실패한 묶음은 원본 기능을 그대로 유지(통계에 기록)
+    - prefer: 묶음별 호출에 넘길 풀 키 별칭(뷰가 settings 키를 등록한 별칭)
+    모든 묶음이 실패하면 첫 예외를 그대로 올립니다(뷰에서 429/401 매핑).
+    """
+    started = time.time()
+    segment_chars = segment_chars or plan_segment_chars()
+    if batch_size is None:
+        try:
+            batch_size = max(1, int(os.getenv("REFINE_BATCH_SIZE", "12")))
+        except ValueError:
+            batch_size = 12
+
+    segments = split_plan_sections(plan_text, segment_chars)
+    batches = [features[i:i + batch_size] for i in range(0, len(features), batch_size)]
+
+    def _refine(i: int, batch: List[dict]) -> List[dict]:
+        context = select_relevant_segments(segments, batch, segment_chars)
+        out = refine_call(make_refine_prompt(context, batch), model_name, prefer=prefer)
+        if not isinstance(out, list) or not out:
+            raise ValueError(f"묶음 {i + 1}: 정제 결과가 JSON 배열이 아닙니다.")
+        return out
+
+    print(f"-> 맵-리듀스 정제: {len(plan_text)}자/{len(segments)}개 세그먼트, 기능 {len(features)}개 → {len(batches)}개 묶음")
+    results, errors = run_segments_parallel(_refine, batches, max_workers)
+    if errors and len(errors) == len(batches):
+        raise errors[0][1]
+
+    refined: List[dict] = []
+    for batch, out in zip(batches, results):
+        refined.extend(out if out is not None else batch)
+
+    stats = {
+        "mode": "mapreduce",
+        "plan_chars": len(plan_text),
+        "segments": len(segments),
+        "batches": len(batches),
+        "failed_batches": [i + 1 for i, _ in errors],
+        "failed_detail": [str(e)[:200] for _, e in errors] or None,
+        "elapsed_sec": round(time.time() - started, 2),
+    }
+    return refined, stats
+
 # 3. 메인 실행 함수 (테스트용)
 def refine_features():
     # ... (이하 코드는 기존과 동일하게 유지) ...
@@ -58,8 +133,8 @@ def refine_features():
 
     # Gemini 호출
     prompt = make_refine_prompt(plan_text, feature_list)
-    model = genai.GenerativeModel("gemini-1.5-flash") # 모델명은 상황에 맞게 조정 가능
-    response = model.generate_content(prompt, generation_config=GenerationConfig(temperature=0.2, response_mime_type="application/json"))
+    model = gemini_model("gemini-1.5-flash", prefer="GEMINI_API_KEY_2") # 모델명은 상황에 맞게 조정 가능
+    response = model.generate_content(prompt, generation_config=gemini_config(temperature=0.2))
     result_text = response.text.strip()
 
     try:
@@ -3,14 +3,22 @@ import json
 import time
 import itertools
 import base64
-import chardet
-from github import Github, RateLimitExceededException, UnknownObjectException, GithubException
 from dotenv import load_dotenv
 
-# .env 파일에서 환경 변수 로드
-load_dotenv()
+# PyGithub는 첫 사용 때 import(서버 기동 시간 절약). 예외 클래스도 여기서 꺼내 씀
+def _gh():
+    import github
+    return github
+
+
+def _detect_encoding(raw: bytes) -> str:
+    import chardet  # 인코딩 추정 테이블이 커서 필요할 때만 로드
+    return (chardet.detect(raw) or {}).get("encoding") or "utf-8"
+
 
 def get_github_instance():
+    load_dotenv()  # .env의 GITHUB_TOKEN (import 시점이 아니라 호출 시점에 로드)
+    Github = _gh().Github
     token = os.getenv("GITHUB_TOKEN")
     if not token:
         print("⚠️ 경고: GitHub 토큰이 설정되지 않았습니다. API 요청 제한이 매우 낮을 수 있습니다.")
@@ -20,6 +28,7 @@ def get_github_instance():
 
 
 def search_repositories(g, keywords, max_repos_per_query=5):
+    RateLimitExceededException = _gh().RateLimitExceededException
     all_repos = {}
 
     # 1) 단일 키워드 검색
@@ -78,9 +87,10 @@ def get_readme_content(repo):
     - content/encoding 경로는 base64 우선 처리
     - 어떤 형식이든 결국 str을 반환(에러 시 빈 문자열)
     """
+    gh = _gh()
     try:
         readme = repo.get_readme()
-    except (UnknownObjectException, GithubException):
+    except (gh.UnknownObjectException, gh.GithubException):
         return ""  # README 없음/접근 불가
 
     # 1) 가장 안전: decoded_content (bytes)
@@ -89,7 +99,7 @@ def get_readme_content(repo):
         try:
             return data.decode("utf-8", errors="replace")
         except Exception:
-            enc = (chardet.detect(data) or {}).get("encoding") or "utf-8"
+            enc = _detect_encoding(data)
             try:
                 return data.decode(enc, errors="replace")
             except Exception:
@@ -109,7 +119,7 @@ def get_readme_content(repo):
             try:
                 return raw.decode("utf-8")
             except UnicodeDecodeError:
-                enc = (chardet.detect(raw) or {}).get("encoding") or "utf-8"
+                enc = _detect_encoding(raw)
                 return raw.decode(enc, errors="replace")
         except Exception:
             # base64 디코딩 실패 시 폴백
@@ -117,7 +127,7 @@ def get_readme_content(repo):
 
     # 3) 마지막 폴백: content를 그냥 추정 디코딩
     if isinstance(content, (bytes, bytearray)):
-        enc = (chardet.detect(content) or {}).get("encoding") or "utf-8"
+        enc = _detect_encoding(content)
         try:
             return content.decode(enc, errors="replace")
         except Exception:
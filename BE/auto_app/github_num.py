@@ -2,32 +2,86 @@
 """
 github_num.py
 - Gemini로 레포지터리 유사도 점수(0~5, 소수점 허용)와 비교 코멘트를 생성
-- 프롬프트: 첫 줄은 '0~5 사이 실수 한 개'만 출력하도록 강제
-- 파싱: 정규식으로 어디에 있든 첫 번째 0~5 실수를 뽑고, 실패 시 '숫자만' 재요청
+- 응답: SIMILARITY_SCHEMA({"score": 0~5, "comment": str})로 강제 → structured_output으로 파싱/복구
+- 파싱 실패 시 정규식으로 어디에 있든 첫 번째 0~5 실수를 뽑고, 그래도 없을 때만 '숫자만' 재요청
+- 배치 평가(gemini_similarity_batch): 요구사항 텍스트는 한 번만 보내고 후보 K개의 README 요약을 묶어
+  한 번에 [{repo, score, comment}, ...]로 받음 → G3 입력 토큰 ≈ 1/K
+  검증에 실패한 항목(누락/점수 없음/알 수 없는 repo)만 후보별 단건 평가로 폴백
+- 429(풀 소진 포함)/인증 실패는 재시도·폴백 없이 바로 올림 → 뷰가 휴리스틱/401 안내로 처리
+  그 외 오류 재시도는 배치+폴백 전체에서 G3_MAX_RETRIES회까지만
+
+환경변수:
+  G3_BATCH_SIZE          = 한 번에 평가할 후보 수(기본 8, 1이면 기존 단건 평가)
+  G3_README_DIGEST_CHARS = 배치 프롬프트에 넣을 후보별 README 요약 길이(기본 1200자)
+  G3_MAX_RETRIES         = G3 한 번에 허용할 재시도 총량(기본 6)
 """
 
 import os
 import time
 import re
-from dotenv import load_dotenv
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .gemini_pool import gemini_model, get_pool, is_auth_error, is_rate_limit_error
+from .structured_output import (
+    SIMILARITY_BATCH_SCHEMA,
+    SIMILARITY_SCHEMA,
+    StructuredOutputError,
+    gemini_config,
+    parse_structured,
+)
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 환경 설정: 제미나이 키(.env: GEMINI_API_KEY_3)
+# 환경 설정: 제미나이 키(.env: GEMINI_API_KEY_3 우선, gemini_pool이 첫 호출 때 로드·키별로 분산)
 # ──────────────────────────────────────────────────────────────────────────────
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY_3")
-if not api_key:
-    # 키가 없어도 모듈 import는 되게 두고, 호출 시 에러 메시지 반환
-    pass
-genai.configure(api_key=api_key)
-
-# 모델/설정
 _GEMINI_MODEL = "gemini-2.5-flash"
-_GENCFG = GenerationConfig(temperature=0.1)
 
-__all__ = ["make_similarity_prompt", "gemini_similarity_eval"]
+
+# GenerationConfig는 SDK import가 필요하므로 첫 호출 때 만든다
+@lru_cache(maxsize=None)
+def _gencfg():
+    return gemini_config(SIMILARITY_SCHEMA, temperature=0.1)
+
+
+@lru_cache(maxsize=None)
+def _batch_gencfg():
+    return gemini_config(SIMILARITY_BATCH_SCHEMA, temperature=0.1)
+
+# 단건 평가 프롬프트에 넣던 README 길이(뷰 기존 값과 동일)
+_SINGLE_README_CHARS = 3500
+
+__all__ = [
+    "make_similarity_prompt",
+    "gemini_similarity_eval",
+    "readme_digest",
+    "make_batch_similarity_prompt",
+    "gemini_similarity_batch",
+]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _fatal(exc: Exception) -> bool:
+    """재시도해도 소용없는 오류. 429는 풀이 이미 다른 키로 돌려 본 뒤라 사실상 소진 상태."""
+    return is_rate_limit_error(exc) or is_auth_error(exc)
+
+
+class _RetryBudget:
+    """G3 한 번(배치 + 단건 폴백 전체)에서 쓸 수 있는 재시도 총량."""
+
+    def __init__(self, total: int):
+        self.left = max(0, total)
+
+    def take(self) -> bool:
+        if self.left <= 0:
+            return False
+        self.left -= 1
+        return True
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -48,6 +102,34 @@ def _extract_float_0_5(s: str):
         return None
 
 
+_MD_CODE = re.compile(r"```[\s\S]*?(?:```|$)")
+_MD_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MD_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HTML_TAG = re.compile(r"<[^>]+>")
+_URL = re.compile(r"https?://\S+")
+
+
+def readme_digest(readme: str, limit: Optional[int] = None) -> str:
+    """
+    배치 프롬프트용 README 요약: 코드블록/배지·이미지/HTML/URL을 걷어내고
+    제목과 본문 앞부분만 limit자 안으로 남김(기능 비교에 필요 없는 설치 스크립트 등 제거).
+    """
+    limit = limit or _env_int("G3_README_DIGEST_CHARS", 1200)
+    text = _MD_CODE.sub(" ", readme or "")
+    text = _MD_IMAGE.sub(" ", text)
+    text = _MD_LINK.sub(r"\1", text)
+    text = _HTML_TAG.sub(" ", text)
+    text = _URL.sub(" ", text)
+    lines = []
+    for ln in text.splitlines():
+        ln = re.sub(r"[ \t]+", " ", ln).strip()
+        if not ln or set(ln) <= set("-=*_|: #"):
+            continue
+        lines.append(ln)
+    out = "\n".join(lines)
+    return out if len(out) <= limit else out[:limit].rstrip() + " …"
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 프롬프트
 # ──────────────────────────────────────────────────────────────────────────────
@@ -68,8 +150,8 @@ def make_similarity_prompt(requirement_text: str, repo_desc: str, repo_readme: s
 - 단순 키워드/이름 유사도는 점수에 큰 영향 주지마.
 
 [⚠️ 출력 형식(매우 중요)]
-- **첫 줄에는 0~5 사이의 실수(소수점 허용) 한 개만** 출력한다. 다른 문자/기호/설명 금지.
-- **두 번째 줄부터** 상세 비교 분석을 3~5줄 이상 작성한다(핵심 유사점·차이, 참고 포인트, 부족한 점 등).
+- JSON 객체 하나만 출력한다: {{"score": 0~5 사이 실수(소수점 허용), "comment": "상세 비교 분석"}}
+- comment에는 상세 비교 분석을 3~5줄 이상 작성한다(핵심 유사점·차이, 참고 포인트, 부족한 점 등).
 
 [1] 내 기술명세서:
 {requirement_text}
@@ -82,33 +164,84 @@ def make_similarity_prompt(requirement_text: str, repo_desc: str, repo_readme: s
 """.strip()
 
 
+def make_batch_similarity_prompt(requirement_text: str, candidates: List[Dict]) -> str:
+    """
+    requirement_text: 내 요구사항 요약(한 번만 포함)
+    candidates: [{"name": "owner/repo", "description": str, "readme": str}, ...]
+                readme는 호출부에서 readme_digest()로 줄여서 넘김
+    """
+    blocks = []
+    for i, c in enumerate(candidates, start=1):
+        blocks.append(
+            f"[후보 {i}] repo: {c['name']}\n"
+            f"- 설명: {c.get('description') or '(없음)'}\n"
+            f"- README 요약:\n{c.get('readme') or '(없음)'}"
+        )
+    joined = "\n\n".join(blocks)
+    return f"""
+너는 인공지능 소프트웨어 평가 전문가야.
+아래 1번은 내가 만들고자 하는 소프트웨어 '기술명세서'이고,
+2번은 평가 대상이 되는 깃허브 오픈소스 후보 {len(candidates)}개의 설명 및 README 요약이야.
+
+[평가 방법]
+- 각 후보마다 1번과의 유사도를 0~5점(5=거의 완전 유사/복붙 가능, 2.5=절반 정도 유사, 0=거의 무관)으로 **독립적으로** 평가해.
+- 실제 기능/핵심 역할/데이터 연동/알고리즘/구현 구조 같은 **핵심 구현 요소** 기준으로 판단.
+- 단순 키워드/이름 유사도는 점수에 큰 영향 주지마.
+
+[⚠️ 출력 형식(매우 중요)]
+- JSON 배열 하나만 출력한다. 후보마다 원소 하나, 후보 순서대로:
+  [{{"repo": "후보의 repo 값 그대로", "score": 0~5 사이 실수(소수점 허용), "comment": "상세 비교 분석"}}, ...]
+- repo는 위에 적힌 owner/repo 문자열을 그대로 쓴다.
+- comment에는 비교 분석을 2~4줄 작성한다(핵심 유사점·차이, 참고 포인트, 부족한 점 등).
+
+[1] 내 기술명세서:
+{requirement_text}
+
+[2] 오픈소스 후보:
+{joined}
+""".strip()
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 호출/파싱
 # ──────────────────────────────────────────────────────────────────────────────
-def gemini_similarity_eval(prompt: str, retry: int = 6, delay: float = 1.5):
+def gemini_similarity_eval(prompt: str, retry: int = 6, delay: float = 1.5,
+                           budget: Optional[_RetryBudget] = None):
     """
     Gemini로 유사도 점수와 코멘트를 생성.
     반환: (score:float[0..5], comment:str)
       - score: 0~5 (소수 허용). 실패/파싱오류 시 0.0을 반환해 항상 숫자 보장.
       - comment: 상세 비교 분석(첫 응답의 전체 텍스트를 그대로 보관)
+    429/인증 실패는 그대로 올림. budget을 주면 재시도마다 거기서 차감(바닥나면 중단).
     """
-    if not api_key:
-        return 0.0, "Gemini API Key 미설정(GEMINI_API_KEY_3)."
+    if not len(get_pool()):
+        return 0.0, "Gemini API Key 미설정(키 풀 비어 있음: GEMINI_API_KEY* 중 하나 이상 필요)."
 
-    model = genai.GenerativeModel(_GEMINI_MODEL)
+    model = gemini_model(_GEMINI_MODEL, prefer="GEMINI_API_KEY_3")
     curr = delay
 
     for _ in range(retry):
         try:
-            res = model.generate_content(prompt, generation_config=_GENCFG)
+            res = model.generate_content(prompt, generation_config=_gencfg())
             txt = (res.text or "").strip()
 
-            # 1차: 전체에서 0~5 실수 스캔(첫 줄 강제했더라도 전범위 방어)
+            # 1차: 스키마 JSON 파싱(잘림/타입 오류는 필드 단위 복구)
+            try:
+                fixes = []
+                data = parse_structured(txt, SIMILARITY_SCHEMA, "similarity", fixes=fixes)
+                comment = (data.get("comment") or "").strip() or txt
+                # score가 없거나 숫자를 못 읽어 기본값으로 채워진 경우는 아래 단계로
+                if not any(f.startswith("$.score:") and ("missing" in f or "default" in f) for f in fixes):
+                    return float(data["score"]), comment
+            except StructuredOutputError:
+                pass
+
+            # 2차: 전체에서 0~5 실수 스캔(스키마 미지원 SDK 등 자유 텍스트 응답 방어)
             score = _extract_float_0_5(txt)
             if score is not None:
                 return float(score), txt
 
-            # 2차: 숫자만 재요청
+            # 3차: 숫자만 재요청
             res2 = model.generate_content(
                 "방금 비교 평가의 유사도 점수를 0~5 사이 실수 **한 줄만** 출력해. (예: 3.7)"
             )
@@ -117,9 +250,154 @@ def gemini_similarity_eval(prompt: str, retry: int = 6, delay: float = 1.5):
             if score is not None:
                 return float(score), txt  # 코멘트는 1차 전체 응답을 유지
 
-        except Exception:
+        except Exception as e:
+            if _fatal(e):
+                raise
+            if budget is not None and not budget.take():
+                break
             time.sleep(curr)
             curr = min(curr * 2, 12)
 
     # 최종 실패
     return 0.0, "Gemini 평가 실패"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 배치 평가
+# ──────────────────────────────────────────────────────────────────────────────
+def _repo_key(name: str) -> str:
+    name = (name or "").strip().lower().rstrip("/")
+    if "github.com/" in name:
+        name = name.split("github.com/", 1)[1]
+    return name
+
+
+def _bad_score_indices(fixes: List[str]) -> set:
+    """coerce가 score를 기본값으로 채운 항목의 원래 인덱스."""
+    bad = set()
+    for f in fixes:
+        m = re.match(r"\$\[(\d+)\]\.score: .*(missing|default)", f)
+        if m:
+            bad.add(int(m.group(1)))
+    return bad
+
+
+def _validated_batch(items: List[Dict], fixes: List[str], names: List[str]) -> Dict[str, Tuple[float, str]]:
+    """
+    배치 응답 → {repo_key: (score, comment)}. 검증 통과 항목만 담는다.
+    - repo가 이번 배치 후보 중 하나(전체 이름 또는 owner 없는 이름)와 일치
+    - score가 실제 숫자(누락/해석 불가로 기본값이 채워진 것은 제외)
+    - comment가 비어 있지 않음
+    - 같은 repo가 두 번 나오면 첫 항목만 사용
+    """
+    keys = {_repo_key(n) for n in names}
+    short: Dict[str, List[str]] = {}
+    for k in keys:
+        short.setdefault(k.split("/")[-1], []).append(k)
+
+    # coerce가 비객체 원소를 버렸으면 fixes 인덱스(원본 기준)와 items 인덱스가 어긋나므로 보정
+    dropped = sorted(int(m.group(1)) for m in (re.match(r"\$\[(\d+)\]: dropped", f) for f in fixes) if m)
+    bad = _bad_score_indices(fixes)
+
+    out: Dict[str, Tuple[float, str]] = {}
+    orig = 0
+    for it in items:
+        while orig in dropped:
+            orig += 1
+        idx, orig = orig, orig + 1
+        if idx in bad:
+            continue
+        k = _repo_key(it.get("repo", ""))
+        if k not in keys:
+            cands = short.get(k.split("/")[-1], [])
+            if len(cands) != 1:
+                continue
+            k = cands[0]
+        comment = (it.get("comment") or "").strip()
+        if k in out or not comment:
+            continue
+        out[k] = (float(it["score"]), comment)
+    return out
+
+
+def _eval_chunk(model, requirement_text: str, chunk: List[Dict], digest_chars: int,
+                retry: int, delay: float, budget: _RetryBudget) -> Dict[str, Tuple[float, str]]:
+    prompt = make_batch_similarity_prompt(
+        requirement_text,
+        [{"name": c["name"], "description": c.get("description", ""),
+          "readme": readme_digest(c.get("readme", ""), digest_chars)} for c in chunk],
+    )
+    curr = delay
+    for _ in range(retry):
+        try:
+            res = model.generate_content(prompt, generation_config=_batch_gencfg())
+            txt = (res.text or "").strip()
+            fixes: List[str] = []
+            items = parse_structured(txt, SIMILARITY_BATCH_SCHEMA, "similarity_batch", fixes=fixes)
+            return _validated_batch(items, fixes, [c["name"] for c in chunk])
+        except StructuredOutputError:
+            return {}
+        except Exception as e:
+            if _fatal(e):
+                raise
+            if not budget.take():
+                print(f"⚠️ 배치 유사도 평가 실패(재시도 한도 소진): {e}")
+                break
+            print(f"⚠️ 배치 유사도 평가 실패(재시도): {e}")
+            time.sleep(curr)
+            curr = min(curr * 2, 12)
+    return {}
+
+
+def gemini_similarity_batch(
+    requirement_text: str,
+    candidates: List[Dict],
+    batch_size: Optional[int] = None,
+    digest_chars: Optional[int] = None,
+    sleep: float = 0.0,
+    retry: int = 3,
+    delay: float = 1.5,
+) -> List[Tuple[float, str]]:
+    """
+    후보 여러 개를 배치 프롬프트로 평가. candidates와 같은 순서의 [(score, comment), ...] 반환.
+    candidates: [{"name": "owner/repo", "description": str, "readme": str}, ...] (readme는 원문 그대로)
+    검증 실패/누락 항목만 gemini_similarity_eval 단건 평가로 폴백(README 3500자, 기존 프롬프트).
+    429(풀 소진)/인증 실패는 폴백 없이 그대로 올림. 재시도는 전체 G3_MAX_RETRIES회까지.
+    """
+    if not candidates:
+        return []
+    if not len(get_pool()):
+        return [(0.0, "Gemini API Key 미설정(키 풀 비어 있음: GEMINI_API_KEY* 중 하나 이상 필요).")] * len(candidates)
+
+    batch_size = max(1, batch_size or _env_int("G3_BATCH_SIZE", 8))
+    digest_chars = digest_chars or _env_int("G3_README_DIGEST_CHARS", 1200)
+    model = gemini_model(_GEMINI_MODEL, prefer="GEMINI_API_KEY_3")
+    budget = _RetryBudget(_env_int("G3_MAX_RETRIES", 6))
+
+    scored: Dict[str, Tuple[float, str]] = {}
+    if batch_size > 1:
+        for i in range(0, len(candidates), batch_size):
+            chunk = candidates[i:i + batch_size]
+            got = _eval_chunk(model, requirement_text, chunk, digest_chars, retry, delay, budget)
+            scored.update(got)
+            print(f"🧮 G3 배치 평가: {len(got)}/{len(chunk)}개 유효")
+            if sleep:
+                time.sleep(sleep)
+
+    results: List[Tuple[float, str]] = []
+    fallback = 0
+    for c in candidates:
+        hit = scored.get(_repo_key(c["name"]))
+        if hit is None:
+            fallback += 1
+            prompt = make_similarity_prompt(
+                requirement_text, c.get("description", "") or "",
+                (c.get("readme", "") or "")[:_SINGLE_README_CHARS],
+            )
+            hit = gemini_similarity_eval(prompt, budget=budget)
+            if sleep:
+                time.sleep(sleep)
+        results.append(hit)
+    if fallback:
+        print(f"↩️ G3 단건 평가 폴백: {fallback}/{len(candidates)}개")
+    return results
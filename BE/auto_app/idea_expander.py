@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
-import os
 import json
 from dotenv import load_dotenv
-import google.generativeai as genai
+
+from .gemini_pool import gemini_model
 
 class IdeaExpander:
     def __init__(self):
@@ -11,11 +11,8 @@ class IdeaExpander:
         환경 변수에서 API 키를 로드하고 Gemini 모델을 설정합니다.
         """
         load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY_4")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.")
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        # 키는 gemini_pool이 관리(GEMINI_API_KEY_4 우선, 혼잡/429 시 다른 키로 분산)
+        self.model = gemini_model('gemini-2.5-flash', prefer="GEMINI_API_KEY_4")
         print("IdeaExpander가 활성화되었습니다. (Gemini AI 사용)")
 
     def _make_prompt(self, refined_data: dict) -> str:
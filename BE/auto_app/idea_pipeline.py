@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+idea_pipeline.py
+- 아이디어 파이프라인(정제 → 확장 / 유사맵)을 프로세스 공용 인스턴스 + 스레드풀로 실행
+- IdeaRefiner/IdeaExpander는 프로세스당 1개만 생성(요청마다 load_dotenv·모델 생성·print 반복 제거)
+  gemini_pool의 PooledModel은 스레드 안전하므로 동시 요청이 같은 인스턴스를 써도 됨
+- 단계 간 의존성만 지키고 나머지는 동시에 실행:
+    refine ─┬─ expand          (둘 다 refine 결과에만 의존 → 병렬)
+            └─ similar_map
+- 단계별 소요 시간(ms)을 함께 반환 → 응답 "timings"
+
+환경변수:
+  IDEA_PIPELINE_WORKERS = 공용 스레드풀 크기(기본 8, 동시 요청 전체가 공유)
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+__all__ = [
+    "get_refiner",
+    "get_expander",
+    "run_stages",
+    "run_idea_pipeline",
+    "IDEA_STAGES",
+]
+
+# 단계 이름 → 의존 단계
+IDEA_STAGES: Dict[str, Tuple[str, ...]] = {
+    "refine": (),
+    "expand": ("refine",),
+    "similar_map": ("refine",),
+}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 프로세스 공용 인스턴스
+# ──────────────────────────────────────────────────────────────────────────────
+_lock = threading.Lock()
+_refiner = None
+_expander = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_refiner():
+    global _refiner
+    if _refiner is None:
+        with _lock:
+            if _refiner is None:
+                from .idea_refiner import IdeaRefiner
+                _refiner = IdeaRefiner()
+    return _refiner
+
+
+def get_expander():
+    global _expander
+    if _expander is None:
+        with _lock:
+            if _expander is None:
+                from .idea_expander import IdeaExpander
+                _expander = IdeaExpander()
+    return _expander
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                try:
+                    workers = max(2, int(os.getenv("IDEA_PIPELINE_WORKERS", "8")))
+                except ValueError:
+                    workers = 8
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="idea-pipe")
+    return _executor
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 실행기
+# ──────────────────────────────────────────────────────────────────────────────
+def run_stages(
+    stages: Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Sequence[str]]],
+    ctx: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    stages: {이름: (fn(ctx) -> 결과, 의존 단계들)}
+    의존 단계가 모두 끝난 단계부터 공용 스레드풀에서 동시에 실행. 결과는 ctx[이름]에 저장.
+    ctx에 이미 값이 있는 이름은 완료된 것으로 보고 건너뜀(예: refined를 직접 넘긴 경우).
+    반환: (ctx, {단계: ms, ..., "total": ms})
+    한 단계라도 예외면 남은 단계는 취소하고 그 예외를 그대로 올림.
+    """
+    ctx = dict(ctx or {})
+    timings: Dict[str, float] = {}
+    done = {name for name in stages if name in ctx}
+    for name, (_fn, deps) in stages.items():
+        missing = [d for d in deps if d not in stages and d not in ctx]
+        if missing:
+            raise ValueError(f"단계 '{name}'의 의존 단계가 없습니다: {missing}")
+
+    t_all = time.perf_counter()
+    running: Dict[Future, Tuple[str, float]] = {}
+    pool = _pool()
+
+    def _submit_ready():
+        started = {n for n, _ in running.values()}
+        for name, (fn, deps) in stages.items():
+            if name in done or name in started:
+                continue
+            if all(d in done or d in ctx for d in deps):
+                snap = dict(ctx)
+                # 요청 문맥(contextvars)을 작업 스레드로 복사 → LLM 텔레메트리에 stage/project 유지
+                running[pool.submit(contextvars.copy_context().run, fn, snap)] = (name, time.perf_counter())
+
+    _submit_ready()
+    while running:
+        finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+        for fut in finished:
+            name, t0 = running.pop(fut)
+            timings[name] = round((time.perf_counter() - t0) * 1000, 1)
+            try:
+                ctx[name] = fut.result()
+            except Exception:
+                for other in running:
+                    other.cancel()
+                raise
+            done.add(name)
+        _submit_ready()
+
+    timings["total"] = round((time.perf_counter() - t_all) * 1000, 1)
+    return ctx, timings
+
+
+def run_idea_pipeline(
+    idea: Optional[str] = None,
+    refined: Optional[Dict[str, Any]] = None,
+    stages: Iterable[str] = ("expand", "similar_map"),
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    아이디어 문장(idea) 또는 이미 정제된 dict(refined)로 파이프라인 실행.
+    stages: refine 이후 실행할 단계("expand", "similar_map"). 빠진 단계 결과는 빈 값.
+    반환: ({"refined", "suggestions", "similar_map"}, timings)
+    """
+    if refined is None and not idea:
+        raise ValueError("idea 또는 refined가 필요합니다.")
+
+    from .idea_to_plan_generator import build_similar_map
+
+    wanted = set(stages)
+    plan: Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Sequence[str]]] = {}
+    ctx: Dict[str, Any] = {}
+    if refined is not None:
+        ctx["refine"] = refined
+    else:
+        plan["refine"] = (lambda c: get_refiner().refine(idea), IDEA_STAGES["refine"])
+    if "expand" in wanted:
+        plan["expand"] = (lambda c: get_expander().expand(c["refine"]), IDEA_STAGES["expand"])
+    if "similar_map" in wanted:
+        plan["similar_map"] = (
+            lambda c: build_similar_map(c["refine"].get("core_features") or []),
+            IDEA_STAGES["similar_map"],
+        )
+
+    ctx, timings = run_stages(plan, ctx)
+    print(f"⏱️ idea pipeline: {timings}")
+    return {
+        "refined": ctx["refine"],
+        "suggestions": ctx.get("expand", []),
+        "similar_map": ctx.get("similar_map", {}),
+    }, timings
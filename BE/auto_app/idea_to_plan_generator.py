@@ -1,25 +1,16 @@
 # -*- coding: utf-8 -*-
 import glob
-import time
-import json
 import os
 import requests
 from dotenv import load_dotenv
 
 # DRF 뷰에서는 아래 세 함수만 사용합니다.
 # 콘솔용(정제/확장/대화) 클래스들은 main() 내부에서만 임포트합니다.
+# python-docx는 Word 생성 함수 안에서만 임포트(서버 기동 시 불필요).
 
-from docx import Document
-from docx.shared import RGBColor
-from docx.oxml.shared import OxmlElement
-from docx.oxml.ns import qn
-from docx.opc.constants import RELATIONSHIP_TYPE as RT
-
-import google.generativeai as genai
+from .keyword_extractor import extract_keywords
 
 # ===================== 환경변수 / 상수 =====================
-ENV_KEY_NAME = "GEMINI_API_KEY_4"   # 이 키로 Gemini API Key를 읽습니다.
-_GEMINI_MODEL = None                # 지연 초기화용 캐시
 _GITHUB_WARNED = False              # 토큰 경고 1회만 표시
 
 # GitHub 검색 상한
@@ -28,28 +19,6 @@ MAX_REPOS_PER_FEATURE = 3
 GITHUB_PER_PAGE = MAX_REPOS_PER_FEATURE * 2  # 중복 제거 전 여유 수집
 
 
-def _get_gemini_model():
-    """
-    Gemini 모델 지연 초기화.
-    - 모듈 import 시점에 환경변수 없어서 서버가 죽는 문제를 방지
-    - 실제 호출 시점에만 환경변수 로드/검증
-    """
-    global _GEMINI_MODEL
-    if _GEMINI_MODEL is not None:
-        return _GEMINI_MODEL
-
-    load_dotenv()
-    api_key = os.getenv(ENV_KEY_NAME)
-    if not api_key:
-        raise RuntimeError(
-            f"{ENV_KEY_NAME} 환경 변수가 없습니다. "
-            f".env 또는 서버 환경에 {ENV_KEY_NAME}=<YOUR_KEY> 를 설정하세요."
-        )
-    genai.configure(api_key=api_key)
-    _GEMINI_MODEL = genai.GenerativeModel('gemini-1.5-flash')
-    return _GEMINI_MODEL
-
-
 def _get_github_token():
     """
     GitHub 토큰 지연 로드(없어도 동작하지만 rate limit이 낮습니다).
@@ -64,22 +33,6 @@ def _get_github_token():
 
 
 # ===================== 공통 유틸 =====================
-def gemini_call_with_retry(prompt: str, max_retries: int = 3) -> str:
-    """Gemini 호출 with 재시도 (지연 초기화 포함)"""
-    model = _get_gemini_model()
-    for attempt in range(max_retries):
-        try:
-            resp = model.generate_content(prompt)
-            return (resp.text or "").strip()
-        except Exception as e:
-            print(f"❌ Gemini 호출 실패: {e}")
-            if attempt < max_retries - 1:
-                print(f"⏳ {attempt + 1}회 실패 → 재시도 중...")
-                time.sleep(2)
-            else:
-                raise
-
-
 def github_search_repos(query: str, per_page: int = GITHUB_PER_PAGE):
     """GitHub 저장소 검색 → dict 리스트 반환(name, full_name, url, stars, desc)."""
     url = "https://api.github.com/search/repositories"
@@ -103,39 +56,7 @@ def github_search_repos(query: str, per_page: int = GITHUB_PER_PAGE):
     return out
 
 
-def _flatten_to_strings(maybe_nested):
-    """리스트/딕셔너리/문자열 등이 섞인 구조를 납작한 문자열 리스트로 변환."""
-    out = []
-    def walk(x):
-        if x is None:
-            return
-        if isinstance(x, str):
-            s = x.strip()
-            if s:
-                out.append(s)
-        elif isinstance(x, (list, tuple, set)):
-            for it in x:
-                walk(it)
-        elif isinstance(x, dict):
-            for v in x.values():
-                walk(v)
-        else:
-            out.append(str(x))
-    walk(maybe_nested)
-    return out
-
-
-def _json_from_gemini_text(resp_text: str):
-    """```json ... ``` 래퍼 제거 + JSON 파싱"""
-    t = (resp_text or "").strip()
-    if t.startswith("```json"):
-        t = t[7:]
-    if t.endswith("```"):
-        t = t[:-3]
-    return json.loads(t or "[]")
-
-
-# ===================== 유사 기능 자동 검색 (Gemini + GitHub) =====================
+# ===================== 유사 기능 자동 검색 (로컬 키워드 + GitHub) =====================
 def build_similar_map(core_features):
     """
     반환:
@@ -148,32 +69,19 @@ def build_similar_map(core_features):
     }
     """
     result = {f: [] for f in core_features}
-    chunk_size = 2
 
-    # 1) 기능별 키워드 추출 (Gemini)
+    # 1) 기능별 키워드 추출 (로컬 TF-IDF, LLM 호출 없음)
+    #    다른 핵심 기능 문장들을 코퍼스로 넘겨 기능 간 공통어는 감점 → 기능마다 변별력 있는 검색어
+    #    검색어 하나 = 상위 용어 2개 조합(단어 하나는 너무 넓음)
     feature_keywords = {}
-    for i in range(0, len(core_features), chunk_size):
-        chunk = core_features[i:i+chunk_size]
-        prompt = f"""
-        다음 기능 문장들 각각에 대해 검색에 유용한 핵심 키워드 1~3개를 뽑아
-        기능문장을 key로 하는 JSON 객체로만 출력하세요.
-        예:
-        {{"GPS 기반 방문 인증": ["geofencing","GPS check-in"]}}
-        기능:
-        {chunk}
-        """
-        try:
-            data = _json_from_gemini_text(gemini_call_with_retry(prompt))
-            for feat, kws in (data or {}).items():
-                flat = _flatten_to_strings(kws)
-                clean = []
-                for k in flat:
-                    k = k.strip()
-                    if len(k) >= 2 and k.lower() not in [x.lower() for x in clean]:
-                        clean.append(k)
-                feature_keywords[feat] = clean[:MAX_KEYWORDS_PER_FEATURE]
-        except Exception as e:
-            print(f"⚠ Gemini 키워드 추출 실패: {e}")
+    for feat in core_features:
+        terms = extract_keywords(feat, top_k=MAX_KEYWORDS_PER_FEATURE * 2, corpus=core_features)
+        queries = []
+        for i in range(0, len(terms), 2):
+            q = " ".join(terms[i:i + 2])
+            if q and q.lower() not in [x.lower() for x in queries]:
+                queries.append(q)
+        feature_keywords[feat] = queries[:MAX_KEYWORDS_PER_FEATURE]
 
     # 2) 키워드로 GitHub 검색 (상위 N개만), 중복 제거
     for feat in core_features:
@@ -263,6 +171,10 @@ def generate_markdown(idea_data, suggestions, similar_map):
 
 # ===================== Word 생성 (하이퍼링크/별점) =====================
 def _add_hyperlink(paragraph, url, text, bold=False):
+    from docx.oxml.shared import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
     part = paragraph.part
     r_id = part.relate_to(url, RT.HYPERLINK, is_external=True)
     hyperlink = OxmlElement('w:hyperlink')
@@ -281,6 +193,9 @@ def _add_hyperlink(paragraph, url, text, bold=False):
 
 
 def generate_word(idea_data, suggestions, similar_map, file_name):
+    from docx import Document
+    from docx.shared import RGBColor
+
     doc = Document()
     doc.add_heading("프로젝트 기획서", level=1)
 
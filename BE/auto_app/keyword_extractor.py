@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+keyword_extractor.py
+- 요구사항/기능 문장 → GitHub 검색 키워드 (로컬, LLM 호출 없음, 수 ms)
+- 토큰화: 한글 어절의 조사/어미 제거 + 복합명사 분해("얼굴인식" → 얼굴/인식), 영문/숫자/+#-. 유지
+- 정규화: 한↔영 용어집(KO_EN_GLOSSARY)으로 영어 검색어로 변환 → SYNONYM_MAP으로 표기 통일(js → javascript 등)
+  영어로 바뀌지 않은 한글 토큰("만든", "한다", "체크" 등)은 GitHub 검색어로 쓸모가 없어 결과에서 제외
+- 점수: TF-IDF(내장 배경 코퍼스 + 호출부가 넘긴 같은 요청의 다른 문장들) × 첫 등장 위치 가중치(YAKE식)
+        × 기술 용어 가중치 → "사용자/기능/관리"처럼 어디에나 나오는 말은 자동으로 밀려남
+
+사용:
+  extract_keywords("GPS 기반 방문 인증과 리워드 적립", top_k=3)       → ["gps", "visit", "authentication"]
+  extract_keywords(text, top_k=10, corpus=[다른 기능 문장들...])     → 문장 간 변별력 있는 키워드 우선
+
+CLI(github_crawler.crawl_github 입력 생성):
+  python -m auto_app.keyword_extractor plan.md --top-k 10   → keywords.json
+"""
+
+import json
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+__all__ = [
+    "SYNONYM_MAP",
+    "KO_EN_GLOSSARY",
+    "tokenize",
+    "normalize_token",
+    "KeywordExtractor",
+    "get_extractor",
+    "extract_keywords",
+]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 동의어 정규화 (AutoAssignTasksView 역할 매칭과 공용)
+# ──────────────────────────────────────────────────────────────────────────────
+SYNONYM_MAP = {
+    # 언어/런타임
+    r"\bc\+\+\b": "cpp", r"\bc sharp\b|\bc#\b": "csharp", r"\bpy(thon)?\b": "python",
+    r"\bjs\b|\bjavascript\b": "javascript", r"\bts\b|\btypescript\b": "typescript",
+    r"\bnode\.?js\b|\bnodejs\b|\bnode\b": "node", r"\bjava\b": "java",
+    r"\bgo(lang)?\b": "golang", r"\brust\b": "rust", r"\bphp\b": "php",
+    r"\bkotlin\b": "kotlin", r"\bswift\b": "swift",
+    # 프레임워크 / FE
+    r"\bdjango\b": "django", r"\bfastapi\b": "fastapi", r"\bspring\b|\bspringboot\b": "spring",
+    r"\breact ?native\b": "reactnative", r"\breact\b": "react", r"\bvue(js)?\b": "vue",
+    r"\bangular\b": "angular", r"\bnext\.?js\b": "nextjs", r"\btailwind\b": "tailwind",
+    # 데이터/DB
+    r"\bmysql\b": "mysql", r"\bpostgres(ql)?\b": "postgres", r"\bmaria(db)?\b": "mariadb",
+    r"\bredis\b": "redis", r"\bkafka\b": "kafka", r"\bsql\b": "sql", r"\brdbms\b": "db",
+    r"\bmongo(db)?\b": "mongodb",
+    # 인프라/클라우드/DevOps
+    r"\baws\b": "aws", r"\bgcp\b": "gcp", r"\bazure\b": "azure",
+    r"\bk8s\b|\bkubernetes\b": "kubernetes", r"\bdocker\b": "docker",
+    r"\bterraform\b": "terraform", r"\bci/?cd\b|\bpipeline\b": "cicd",
+    # AI/데이터
+    r"\bai\b|\bml\b|\bmachine learning\b": "ml",
+    r"\bpytorch\b": "pytorch", r"\btensorflow\b|\btf\b": "tensorflow",
+    r"\bnlp\b": "nlp", r"\bcv\b|\bcomputer vision\b": "cv",
+    r"\bllm\b": "llm", r"\binference\b": "inference", r"\bembedding(s)?\b": "embedding",
+    # 기타 도메인/역할
+    r"\bbackend\b|백엔드": "backend", r"\bfrontend\b|프론트(엔드)?": "frontend",
+    r"\bfull[- ]?stack\b": "fullstack",
+    r"\bdevops\b|인프라": "devops", r"\bqa\b|\btest(ing)?\b|테스트": "qa",
+    r"\bpm\b|\bproduct manager\b|기획|문서|문서화|스펙|요구사항": "docs",
+    r"\bmobile\b|안드로이드|iOS": "mobile",
+    r"\bui\b|\bux\b|디자인": "design",
+    r"\bapi\b|rest|grpc|msa|microservice": "api",
+    r"데이터|분석|통계|bi|warehouse|etl|spark|airflow": "data"
+}
+
+# 토큰 단위 정규화용(부분 문자열 치환이 아니라 토큰 전체가 일치할 때만 → "mobile" 안의 "bi" 오치환 방지)
+_SYNONYM_FULL = [(re.compile(f"(?:{p})", re.IGNORECASE), rep) for p, rep in SYNONYM_MAP.items()]
+
+# 검색어로 쓰기엔 너무 넓은 역할 표기(정규화 결과가 이것이면 원래 단어를 유지)
+_ROLE_ONLY = {"docs", "data", "qa", "design"}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 한↔영 용어집 (GitHub README/description은 대부분 영어)
+# ──────────────────────────────────────────────────────────────────────────────
+KO_EN_GLOSSARY = {
+    # 계정/보안
+    "로그인": "login", "회원가입": "signup", "인증": "authentication", "권한": "authorization",
+    "계정": "account", "비밀번호": "password", "소셜로그인": "oauth", "보안": "security", "암호화": "encryption",
+    "프로필": "profile",
+    # 커뮤니케이션
+    "채팅": "chat", "챗봇": "chatbot", "메신저": "messenger", "알림": "notification", "푸시": "push notification",
+    "이메일": "email", "댓글": "comment", "게시판": "board", "커뮤니티": "community", "피드": "feed",
+    "친구": "friends", "팔로우": "follow", "좋아요": "like", "공유": "share", "소셜": "social",
+    # 커머스/결제
+    "결제": "payment", "주문": "order", "장바구니": "cart", "쇼핑": "ecommerce", "쇼핑몰": "ecommerce",
+    "상품": "product", "재고": "inventory", "배송": "shipping", "배달": "delivery", "쿠폰": "coupon",
+    "포인트": "points", "리워드": "reward", "적립": "reward", "구독": "subscription", "정산": "settlement",
+    "예약": "reservation", "리뷰": "review", "평점": "rating", "경매": "auction",
+    # 위치/지도
+    "지도": "map", "위치": "location", "gps": "gps", "경로": "route", "내비게이션": "navigation",
+    "방문": "visit", "출석": "attendance", "체크인": "check-in", "주변": "nearby", "여행": "travel",
+    # 일정/업무
+    "일정": "schedule", "캘린더": "calendar", "달력": "calendar", "간트": "gantt", "차트": "chart", "할일": "todo",
+    "업무": "task", "프로젝트": "project", "협업": "collaboration", "회의": "meeting", "칸반": "kanban",
+    "타이머": "timer", "출퇴근": "attendance",
+    # 콘텐츠/미디어
+    "이미지": "image", "사진": "photo", "영상": "video", "동영상": "video", "음성": "speech", "음악": "music",
+    "스트리밍": "streaming", "카메라": "camera", "업로드": "upload", "다운로드": "download", "파일": "file",
+    "뉴스": "news", "블로그": "blog", "웹툰": "webtoon", "게임": "game", "퀴즈": "quiz",
+    # AI/데이터
+    "인공지능": "ai", "머신러닝": "machine learning", "딥러닝": "deep learning", "추천": "recommendation",
+    "검색": "search", "번역": "translation", "요약": "summarization", "분류": "classification",
+    "예측": "prediction", "인식": "recognition", "얼굴": "face", "객체": "object detection",
+    "감정": "sentiment", "자연어": "nlp", "음성인식": "speech recognition", "생성": "generation",
+    "크롤링": "crawler", "크롤러": "crawler", "시각화": "visualization", "대시보드": "dashboard",
+    "통계": "statistics", "분석": "analytics", "리포트": "report", "보고서": "report",
+    # 도메인
+    "건강": "health", "운동": "fitness", "식단": "diet", "병원": "hospital", "의료": "medical",
+    "교육": "education", "학습": "learning", "강의": "lecture", "학교": "school", "도서": "book",
+    "부동산": "real estate", "주식": "stock", "금융": "finance", "가계부": "budget", "날씨": "weather",
+    "반려동물": "pet", "음식": "food", "레시피": "recipe", "맛집": "restaurant", "중고": "secondhand",
+    "채용": "recruitment", "이력서": "resume", "설문": "survey", "투표": "voting", "번역기": "translator",
+    # 기술
+    "실시간": "realtime", "동기화": "sync", "웹소켓": "websocket", "크로스플랫폼": "cross-platform", "웹": "web", "앱": "app",
+    "모바일": "mobile", "서버": "server", "데이터베이스": "database", "클라우드": "cloud",
+    "블록체인": "blockchain", "관리자": "admin", "엑셀": "excel", "문서": "document", "코드": "code",
+    "자동화": "automation", "스케줄러": "scheduler", "센서": "sensor", "아두이노": "arduino",
+    "라즈베리파이": "raspberry pi", "드론": "drone", "로봇": "robot", "스마트홈": "smart home",
+}
+
+# 복합어 분해용(긴 단어부터 최장 일치)
+_GLOSSARY_KEYS = sorted(KO_EN_GLOSSARY, key=len, reverse=True)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 토큰화
+# ──────────────────────────────────────────────────────────────────────────────
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]|[가-힣]+", re.IGNORECASE)
+_HANGUL = re.compile(r"^[가-힣]+$")
+_HAS_HANGUL = re.compile(r"[가-힣]")
+
+# 어절 끝 조사/어미(긴 것부터). 떼고 남은 부분이 2글자 이상일 때만 제거
+_KO_SUFFIXES = sorted([
+    "에서는", "으로는", "으로써", "에게서", "입니다", "합니다", "됩니다", "했습니다",
+    "에서", "으로", "에게", "까지", "부터", "처럼", "보다", "하여", "하고", "하는", "하며", "하면",
+    "하기", "해서", "해야", "된다", "한다", "되는", "되어", "이며", "이고", "이나", "라는", "에는", "와의", "과의",
+    "은", "는", "이", "가", "을", "를", "에", "의", "와", "과", "도", "만", "로", "며", "및",
+    "된", "한", "든", "던", "될", "할",  # 관형형 어미("업로드된" → 업로드)
+], key=len, reverse=True)
+
+_KO_STOP = {
+    "기능", "사용자", "시스템", "제공", "통해", "위한", "위해", "대한", "관련", "경우", "가능", "서비스",
+    "기반", "정보", "화면", "페이지", "처리", "자동", "자동으로", "해당", "모든", "각각", "여러", "다양한",
+    "쉽게", "간편하게", "목록", "조회", "입력", "출력", "결과", "요청", "선택", "설정", "확인", "표시",
+    "등록", "수정", "삭제", "관리", "지원", "이용", "사용", "활용", "제작", "개발", "구현", "구축", "방식",
+    "있는", "있다", "없는", "같은", "그리고", "또는", "그", "이", "저", "것", "수", "등", "및", "내", "나의",
+    "우리", "간단한", "직접", "바로", "함께", "이후", "이전", "단계", "항목", "내용", "형태", "기본",
+    "이용한", "사용한", "활용한", "통한", "맞춤형", "기반의", "가능한",
+}
+
+_EN_STOP = {
+    "and", "the", "for", "with", "from", "that", "this", "into", "your", "you", "are", "can", "have", "has",
+    "how", "use", "using", "based", "user", "users", "feature", "features", "system", "service", "support",
+    "provide", "provides", "allow", "allows", "will", "should", "via", "its", "their", "our", "not", "all",
+    "any", "each", "more", "new", "app", "web", "page", "list", "view", "data", "etc", "e.g", "i.e",
+}
+
+
+def _strip_josa(tok: str) -> str:
+    if tok in KO_EN_GLOSSARY or tok in _KO_STOP:
+        return tok
+    for suf in _KO_SUFFIXES:
+        if tok.endswith(suf) and len(tok) - len(suf) >= 2:
+            return tok[: -len(suf)]
+    return tok
+
+
+def _split_compound(tok: str) -> List[str]:
+    """한글 복합명사를 용어집 단어로 최장 일치 분해. 분해가 안 되는 부분이 있으면 원형 유지."""
+    if tok in KO_EN_GLOSSARY or len(tok) < 4:
+        return [tok]
+    parts, i = [], 0
+    while i < len(tok):
+        hit = next((k for k in _GLOSSARY_KEYS if tok.startswith(k, i)), None)
+        if hit is None:
+            return [tok]
+        parts.append(hit)
+        i += len(hit)
+    return parts
+
+
+def tokenize(text: str) -> List[str]:
+    """소문자 토큰 목록(등장 순서 유지, 불용어 제외). 한글은 조사 제거 + 복합어 분해."""
+    out: List[str] = []
+    for raw in _TOKEN_RE.findall((text or "").lower()):
+        if _HANGUL.match(raw):
+            tok = _strip_josa(raw)
+            if tok in _KO_STOP or len(tok) < 2:
+                continue
+            out.extend(p for p in _split_compound(tok) if p not in _KO_STOP)
+        else:
+            tok = raw.strip(".-")
+            if len(tok) < 2 or tok in _EN_STOP or tok.isdigit():
+                continue
+            out.append(tok)
+    return out
+
+
+def normalize_token(tok: str) -> str:
+    """검색어 표기: 한글은 용어집으로 영어 변환, 이후 SYNONYM_MAP 토큰 전체 일치로 통일."""
+    term = KO_EN_GLOSSARY.get(tok, tok)
+    for rx, rep in _SYNONYM_FULL:
+        if rx.fullmatch(term):
+            return term if rep in _ROLE_ONLY else rep
+    return term
+
+
+def _is_known(tok: str) -> bool:
+    return tok in KO_EN_GLOSSARY or any(rx.fullmatch(tok) for rx, _ in _SYNONYM_FULL)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 배경 코퍼스: 기획서에 흔히 나오는 일반 문장 → 흔한 말의 IDF를 낮춤
+# ──────────────────────────────────────────────────────────────────────────────
+_BACKGROUND = (
+    "사용자는 회원가입과 로그인을 통해 서비스를 이용할 수 있다",
+    "관리자는 사용자 정보를 조회하고 수정 및 삭제할 수 있는 관리 기능을 제공한다",
+    "사용자가 입력한 정보를 저장하고 목록 화면에서 확인할 수 있다",
+    "시스템은 요청 결과를 화면에 표시하고 오류 발생 시 알림을 제공한다",
+    "사용자 맞춤형 추천 기능을 제공하여 편의성을 높인다",
+    "데이터를 분석하여 통계 결과를 대시보드로 시각화한다",
+    "게시판에 글을 작성하고 댓글을 달 수 있는 커뮤니티 기능",
+    "모바일 앱과 웹에서 동일한 기능을 사용할 수 있도록 지원한다",
+    "실시간으로 상태를 확인하고 변경 사항을 자동으로 반영한다",
+    "파일을 업로드하면 자동으로 내용을 처리하여 결과를 제공한다",
+    "검색 기능을 통해 원하는 항목을 빠르게 찾을 수 있다",
+    "설정 화면에서 알림과 개인 정보를 관리할 수 있다",
+    "the user can sign up and log in to use the service",
+    "admin dashboard to manage users and view statistics",
+    "provides a simple web interface and rest api for the app",
+    "users can search, filter and view the list of items",
+    "supports file upload and download with progress notification",
+    "real time updates and push notifications for mobile users",
+)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 추출기
+# ──────────────────────────────────────────────────────────────────────────────
+class KeywordExtractor:
+    """TF-IDF × 첫 등장 위치 × 기술 용어 가중치. 배경 코퍼스 문서빈도는 생성 시 1회 계산."""
+
+    KNOWN_BOOST = 1.5     # 용어집/동의어 사전에 있는 단어(검색어로 쓸모 있음)
+    ASCII_BOOST = 1.2     # 원문에 영문으로 쓴 기술명(Django, GPS 등)
+
+    def __init__(self, background: Iterable[str] = _BACKGROUND):
+        self._bg_df: Counter = Counter()
+        self._bg_n = 0
+        for doc in background:
+            self._bg_df.update(set(tokenize(doc)))
+            self._bg_n += 1
+
+    def _idf(self, tok: str, ctx_df: Counter, ctx_n: int) -> float:
+        n = self._bg_n + ctx_n
+        df = self._bg_df.get(tok, 0) + ctx_df.get(tok, 0)
+        return math.log((n + 1) / (df + 1)) + 1.0
+
+    def extract_scored(self, text: str, top_k: int = 5,
+                       corpus: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+        """
+        text의 키워드 [(검색어, 점수), ...] 점수 내림차순.
+        corpus: 같은 요청의 다른 문장들(예: 핵심 기능 전체) → 공통으로 나오는 단어는 감점
+        """
+        toks = tokenize(text)
+        if not toks:
+            return []
+        ctx_df: Counter = Counter()
+        ctx_docs = [d for d in (corpus or []) if d and d != text]
+        for doc in ctx_docs:
+            ctx_df.update(set(tokenize(doc)))
+
+        tf = Counter(toks)
+        first = {}
+        for i, t in enumerate(toks):
+            first.setdefault(t, i)
+        total = len(toks)
+
+        scored: Dict[str, float] = {}
+        for tok, cnt in tf.items():
+            s = (cnt / total) * self._idf(tok, ctx_df, len(ctx_docs))
+            s *= 1.0 + 1.0 / (1.0 + first[tok] / 3.0)   # 앞쪽에 나온 단어일수록 주제어
+            if _is_known(tok):
+                s *= self.KNOWN_BOOST
+            elif tok.isascii():
+                s *= self.ASCII_BOOST
+            term = normalize_token(tok)
+            if _HAS_HANGUL.search(term):
+                continue  # 용어집에 없는 한글(동사/관형형 등) → 영어 저장소 검색에 안 맞음
+            scored[term] = max(scored.get(term, 0.0), s)  # 정규화 후 같은 검색어는 최고점만
+
+        ranked = sorted(scored.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [(k, round(v, 4)) for k, v in ranked[:top_k]]
+
+    def extract(self, text: str, top_k: int = 5, corpus: Optional[Sequence[str]] = None) -> List[str]:
+        return [k for k, _ in self.extract_scored(text, top_k, corpus)]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 싱글턴
+# ──────────────────────────────────────────────────────────────────────────────
+_extractor: Optional[KeywordExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor() -> KeywordExtractor:
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = KeywordExtractor()
+    return _extractor
+
+
+def extract_keywords(text: str, top_k: int = 5, corpus: Optional[Sequence[str]] = None) -> List[str]:
+    return get_extractor().extract(text, top_k=top_k, corpus=corpus)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# CLI: 기획서 파일 → keywords.json (github_crawler.crawl_github 입력)
+# ──────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="기획서에서 GitHub 검색 키워드 추출(로컬)")
+    ap.add_argument("plan_file", help="기획서 텍스트/마크다운 파일")
+    ap.add_argument("--top-k", type=int, default=10)
+    ap.add_argument("--out", default="keywords.json")
+    args = ap.parse_args()
+
+    with open(args.plan_file, "r", encoding="utf-8", errors="ignore") as f:
+        plan = f.read()
+    lines = [ln.strip() for ln in plan.splitlines() if ln.strip()]
+    kws = extract_keywords(plan, top_k=args.top_k, corpus=lines)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(kws, f, ensure_ascii=False, indent=2)
+    print(f"🔑 키워드 {len(kws)}개 → {args.out}: {kws}")
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+list_api.py
+- 프로젝트 단위 목록 API 공용 계층 (확정 기능 / 기능 초안 / 간트 목록 등 폴링되는 엔드포인트)
+- keyset 페이지네이션: (created_at, pk) 커서 → OFFSET 없이 인덱스 범위 스캔
+    ?limit=50             → {"results": [...], "next_cursor": "..."}  (limit 없으면 기존처럼 전체 배열)
+    ?limit=50&cursor=...  → 다음 페이지 (next_cursor가 null이면 끝)
+- 희소 필드: ?fields=feature_name,summary → 요청한 필드에 필요한 컬럼만 SELECT
+  (description/content 같은 TEXT 컬럼은 요청할 때만 읽음)
+- 약한 ETag: 목록 전체의 count / max(updated_at) / max(pk) + 쿼리스트링 해시
+  If-None-Match 일치 → 304 (본문 직렬화/전송 없음, 집계 쿼리 1회만)
+
+설정(.env):
+  LIST_MAX_LIMIT = limit 상한(기본 200)
+"""
+
+import base64
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.db.models import Count, Max, Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+
+from .artifact_serving import etag_matches
+
+__all__ = [
+    "Field",
+    "col",
+    "computed",
+    "ListError",
+    "parse_fields",
+    "validate_params",
+    "list_etag",
+    "keyset_page",
+    "ListResult",
+    "build_list",
+    "list_response",
+    "not_modified",
+    "with_etag",
+]
+
+_CACHE_CONTROL = "private, no-cache"  # 매번 재검증(304) 허용, 공유 캐시 금지
+
+
+class Field(NamedTuple):
+    """출력 필드 1개: 필요한 DB 컬럼들 + values() 행 → 값."""
+    cols: Tuple[str, ...]
+    get: Callable[[Dict[str, Any]], Any]
+
+
+def col(source: str) -> Field:
+    """DB 컬럼을 그대로 내보내는 필드."""
+    return Field((source,), lambda row: row[source])
+
+
+def computed(cols: Sequence[str], fn: Callable[[Dict[str, Any]], Any]) -> Field:
+    """여러 컬럼(또는 prepare 단계에서 붙인 키)으로 계산하는 필드."""
+    return Field(tuple(cols), fn)
+
+
+class ListError(ValueError):
+    """잘못된 fields/limit/cursor → 400."""
+
+
+def _max_limit() -> int:
+    try:
+        return max(1, int(os.getenv("LIST_MAX_LIMIT", "200")))
+    except ValueError:
+        return 200
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 요청 파라미터
+# ──────────────────────────────────────────────────────────────────────────────
+def parse_fields(request, spec: Dict[str, Field], param: str = "fields") -> List[str]:
+    """?fields=a,b → ["a","b"]. 없으면 spec 전체(기존 응답과 동일). 모르는 필드면 ListError."""
+    raw = (request.query_params.get(param) or "").strip()
+    if not raw:
+        return list(spec)
+    names = [n.strip() for n in raw.split(",") if n.strip()]
+    unknown = [n for n in names if n not in spec]
+    if unknown:
+        raise ListError(f"알 수 없는 필드: {', '.join(unknown)} (사용 가능: {', '.join(spec)})")
+    return list(dict.fromkeys(names))
+
+
+def _parse_limit(request) -> Optional[int]:
+    raw = request.query_params.get("limit")
+    if raw in (None, ""):
+        return None
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ListError("limit은 정수여야 합니다.")
+    if limit < 1:
+        raise ListError("limit은 1 이상이어야 합니다.")
+    return min(limit, _max_limit())
+
+
+def validate_params(request, spec: Dict[str, Field]) -> None:
+    """fields/limit/cursor를 미리 검사(잘못되면 ListError). ETag 304보다 먼저 불러 400이 304에 가려지지 않게 한다."""
+    parse_fields(request, spec)
+    _parse_limit(request)
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        _decode_cursor(cursor)
+
+
+def _encode_cursor(created_at, pk) -> str:
+    raw = json.dumps([created_at.isoformat(), pk], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, pk = json.loads(raw)
+        created_at = parse_datetime(ts)
+    except Exception:
+        created_at, pk = None, None
+    if created_at is None or not isinstance(pk, int):
+        raise ListError("잘못된 cursor 입니다.")
+    return created_at, pk
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# ETag
+# ──────────────────────────────────────────────────────────────────────────────
+def list_etag(request, *querysets: QuerySet) -> str:
+    """
+    약한 ETag: 각 queryset의 (count, max(updated_at), max(pk)) + 쿼리스트링.
+    updated_at이 없는 모델은 count/max(pk)만 사용(추가·삭제만 감지).
+    """
+    parts: List[Any] = [request.META.get("QUERY_STRING", "")]
+    for qs in querysets:
+        aggs = {"n": Count("pk"), "p": Max("pk")}
+        if any(f.name == "updated_at" for f in qs.model._meta.concrete_fields):
+            aggs["u"] = Max("updated_at")
+        row = qs.order_by().aggregate(**aggs)
+        parts.append([qs.model._meta.label_lower, row["n"], row["p"], str(row.get("u") or "")])
+    digest = hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def not_modified(request, etag: str) -> Optional[Response]:
+    """If-None-Match가 etag와 일치하면 304 응답, 아니면 None."""
+    # etag_matches는 헤더 쪽 W/만 벗기므로 비교는 따옴표 값으로
+    if etag_matches(request.META.get("HTTP_IF_NONE_MATCH", ""), etag[2:]):
+        return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+    return None
+
+
+def with_etag(resp: Response, etag: str) -> Response:
+    resp["ETag"] = etag
+    resp["Cache-Control"] = _CACHE_CONTROL
+    return resp
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# keyset 페이지 + 필드 투영
+# ──────────────────────────────────────────────────────────────────────────────
+def keyset_page(
+    qs: QuerySet,
+    cols: Iterable[str],
+    limit: Optional[int],
+    cursor: Optional[str] = None,
+    descending: bool = True,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    (created_at, pk) 순서로 cols만 SELECT. limit=None이면 전체.
+    반환: (values 행 목록, next_cursor 또는 None)
+    """
+    pk = qs.model._meta.pk.attname
+    sign = "-" if descending else ""
+    qs = qs.order_by(f"{sign}created_at", f"{sign}{pk}")
+    if cursor:
+        ts, last = _decode_cursor(cursor)
+        op = "lt" if descending else "gt"
+        qs = qs.filter(Q(**{f"created_at__{op}": ts}) | Q(created_at=ts, **{f"{pk}__{op}": last}))
+
+    select = list(dict.fromkeys([*cols, "created_at", pk]))
+    qs = qs.values(*select)
+    if limit is None:
+        return list(qs), None
+
+    rows = list(qs[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(rows[-1]["created_at"], rows[-1][pk]) if has_more and rows else None
+    return rows, next_cursor
+
+
+def _model_cols(qs: QuerySet) -> set:
+    opts = qs.model._meta
+    return {f.attname for f in opts.concrete_fields} | {f.name for f in opts.concrete_fields}
+
+
+class ListResult(NamedTuple):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    paginated: bool
+
+    def payload(self):
+        if self.paginated:
+            return {"results": self.items, "next_cursor": self.next_cursor}
+        return self.items
+
+
+def build_list(
+    request,
+    qs: QuerySet,
+    spec: Dict[str, Field],
+    descending: bool = True,
+    prepare: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+) -> ListResult:
+    """
+    fields/limit/cursor를 읽어 한 페이지를 만들고 spec대로 투영.
+    prepare(rows): 투영 전에 페이지 행에 값을 덧붙이는 훅(예: 다운로드 문서 ID 일괄 조회).
+    """
+    names = parse_fields(request, spec)
+    limit = _parse_limit(request)
+    cursor = request.query_params.get("cursor") or None
+    known = _model_cols(qs)
+    db_cols = [c for n in names for c in spec[n].cols if c in known]
+    rows, next_cursor = keyset_page(qs, db_cols, limit, cursor, descending=descending)
+    if prepare:
+        prepare(rows)
+    items = [{n: spec[n].get(r) for n in names} for r in rows]
+    return ListResult(items, next_cursor, limit is not None or bool(cursor))
+
+
+def list_response(
+    request,
+    qs: QuerySet,
+    spec: Dict[str, Field],
+    descending: bool = True,
+    prepare: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    etag_querysets: Sequence[QuerySet] = (),
+) -> Response:
+    """단일 목록 엔드포인트: 파라미터 검사(400) → ETag(304) → keyset 페이지 → 필드 투영 → 200."""
+    try:
+        validate_params(request, spec)
+    except ListError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    etag = list_etag(request, qs, *etag_querysets)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    result = build_list(request, qs, spec, descending=descending, prepare=prepare)
+    return with_etag(Response(result.payload(), status=status.HTTP_200_OK), etag)
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+llm_telemetry.py
+- LLM 호출(Gemini 키 풀 / gpt-oss) 1건마다 텔레메트리 1건 → LLMCall 테이블
+  필드: 호출 위치(call_site), 단계(stage), 프로젝트, 모델, 키 별칭, 입력/출력 토큰, 지연, 재시도, 429, 캐시 적중, 결과
+- 요청 문맥: TelemetryContextMiddleware가 URL 이름(stage)과 project_id를 contextvar에 넣음
+  뷰 밖(CLI/스레드풀)에서는 telemetry_context(stage=..., project_id=...)로 지정
+  스레드풀로 넘길 때는 contextvars.copy_context().run 으로 감싸야 문맥이 따라감
+- 저장: 호출 스레드는 큐에 넣기만 하고, 백그라운드 스레드가 모아서 bulk_create
+  (LLM_TELEMETRY_BATCH건 또는 LLM_TELEMETRY_FLUSH_SEC초마다). 큐가 가득 차면 버리고 dropped 집계
+- 집계: dashboard_stats() — 단계/프로젝트별 p50/p95 지연, 토큰, 오류율 (admin 대시보드에서 사용)
+
+설정(.env):
+  LLM_TELEMETRY            = "1"(기본) | "0"(끄기)
+  LLM_TELEMETRY_BATCH      = 한 번에 저장할 최대 건수(기본 200)
+  LLM_TELEMETRY_FLUSH_SEC  = 최대 저장 지연(기본 2초)
+  LLM_TELEMETRY_MAX_QUEUE  = 큐 상한(기본 10000)
+"""
+
+import atexit
+import contextvars
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+__all__ = [
+    "enabled",
+    "telemetry_context",
+    "current_context",
+    "call_site",
+    "emit",
+    "flush",
+    "stats",
+    "genai_usage",
+    "dashboard_stats",
+    "TelemetryContextMiddleware",
+]
+
+# 호출 위치를 찾을 때 건너뛸 모듈(전송/풀/텔레메트리 자체, 표준 스레드 모듈)
+_SKIP_MODULES = {
+    "auto_app.llm_telemetry", "auto_app.gemini_pool", "auto_app.llm_transport", "auto_app.oss_client",
+    "llm_telemetry", "gemini_pool", "llm_transport", "oss_client",
+    "threading", "concurrent.futures.thread", "contextlib",
+}
+
+_ctx: contextvars.ContextVar = contextvars.ContextVar("llm_telemetry_ctx", default={})
+
+_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_counters = {"emitted": 0, "written": 0, "dropped": 0, "failed": 0}
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def enabled() -> bool:
+    return os.getenv("LLM_TELEMETRY", "1").strip().lower() not in ("0", "false", "off", "no")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 문맥(stage / project)
+# ──────────────────────────────────────────────────────────────────────────────
+@contextmanager
+def telemetry_context(stage: Optional[str] = None, project_id: Optional[int] = None):
+    """이 블록 안의 LLM 호출에 stage/project를 붙임(바깥 문맥 값은 지정하지 않은 항목만 상속)."""
+    merged = dict(_ctx.get())
+    if stage is not None:
+        merged["stage"] = stage
+    if project_id is not None:
+        merged["project_id"] = project_id
+    token = _ctx.set(merged)
+    try:
+        yield merged
+    finally:
+        _ctx.reset(token)
+
+
+def current_context() -> Dict[str, Any]:
+    return dict(_ctx.get())
+
+
+def call_site(depth_limit: int = 30) -> str:
+    """풀/전송 계층을 건너뛴 첫 호출 프레임 → "모듈.함수"."""
+    f = sys._getframe(1)
+    for _ in range(depth_limit):
+        if f is None:
+            break
+        mod = f.f_globals.get("__name__", "")
+        if mod not in _SKIP_MODULES:
+            return f"{mod.rsplit('.', 1)[-1]}.{f.f_code.co_name}"[:120]
+        f = f.f_back
+    return ""
+
+
+class TelemetryContextMiddleware:
+    """요청 동안 stage = URL 이름, project_id = URL의 project_id."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        token = getattr(request, "_llm_telemetry_token", None)
+        if token is not None:
+            _ctx.reset(token)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = getattr(request, "resolver_match", None)
+        # URL 이름이 없으면 뷰 클래스명(as_view()가 만든 함수 이름은 모두 "view")
+        stage = getattr(match, "url_name", None) or getattr(getattr(view_func, "view_class", view_func), "__name__", "")
+        project_id = view_kwargs.get("project_id")
+        try:
+            project_id = int(project_id) if project_id is not None else None
+        except (TypeError, ValueError):
+            project_id = None
+        request._llm_telemetry_token = _ctx.set({"stage": stage, "project_id": project_id})
+        return None
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 기록
+# ──────────────────────────────────────────────────────────────────────────────
+def genai_usage(resp: Any) -> tuple:
+    """Gemini 응답 → (입력 토큰, 출력 토큰)."""
+    usage = getattr(resp, "usage_metadata", None)
+    try:
+        return (int(getattr(usage, "prompt_token_count", 0) or 0),
+                int(getattr(usage, "candidates_token_count", 0) or 0))
+    except Exception:
+        return 0, 0
+
+
+def emit(provider: str, *, model: str = "", key_alias: str = "", prompt_tokens: int = 0, output_tokens: int = 0,
+         latency_sec: float = 0.0, retries: int = 0, rate_limited: int = 0, cache_hit: bool = False,
+         outcome: str = "ok", error: str = "", site: Optional[str] = None) -> None:
+    """LLM 호출 1건 기록(큐에 넣기만 함, 예외를 올리지 않음)."""
+    if not enabled():
+        return
+    try:
+        from django.conf import settings
+        from django.utils import timezone
+
+        if not settings.configured:  # oss_client/test_client2를 단독 스크립트로 돌릴 때
+            return
+        ctx = _ctx.get()
+        row = {
+            "project_id": ctx.get("project_id"),
+            "stage": (ctx.get("stage") or "")[:80],
+            "call_site": site if site is not None else call_site(),
+            "provider": provider,
+            "model": (model or "")[:80],
+            "key_alias": (key_alias or "")[:80],
+            "prompt_tokens": max(0, int(prompt_tokens or 0)),
+            "output_tokens": max(0, int(output_tokens or 0)),
+            "latency_ms": max(0, int(latency_sec * 1000)),
+            "retries": min(32767, max(0, retries)),
+            "rate_limited": min(32767, max(0, rate_limited)),
+            "cache_hit": bool(cache_hit),
+            "outcome": outcome,
+            "error": (error or "")[:200],
+            "created_at": timezone.now(),
+        }
+        if _queue.qsize() >= int(_env_num("LLM_TELEMETRY_MAX_QUEUE", 10000)):
+            _counters["dropped"] += 1
+            return
+        _queue.put_nowait(row)
+        _counters["emitted"] += 1
+        _ensure_writer()
+    except Exception as e:
+        print(f"⚠️ LLM 텔레메트리 기록 실패: {e}")
+
+
+def _drain(limit: int) -> List[Dict[str, Any]]:
+    rows = []
+    while len(rows) < limit:
+        try:
+            rows.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return rows
+
+
+def flush(limit: Optional[int] = None) -> int:
+    """큐에 쌓인 기록을 DB에 저장. 반환: 저장 건수."""
+    from django.db import close_old_connections
+
+    from .models import LLMCall
+
+    batch = max(1, int(_env_num("LLM_TELEMETRY_BATCH", 200)))
+    written = 0
+    with _flush_lock:
+        while limit is None or written < limit:
+            rows = _drain(batch)
+            if not rows:
+                break
+            try:
+                LLMCall.objects.bulk_create([LLMCall(**r) for r in rows])
+                written += len(rows)
+                _counters["written"] += len(rows)
+            except Exception as e:
+                _counters["failed"] += len(rows)
+                print(f"⚠️ LLM 텔레메트리 저장 실패({len(rows)}건 버림): {e}")
+                close_old_connections()
+    return written
+
+
+def _writer_loop() -> None:
+    from django.db import connection
+
+    while True:
+        interval = max(0.1, _env_num("LLM_TELEMETRY_FLUSH_SEC", 2.0))
+        deadline = time.monotonic() + interval
+        batch = max(1, int(_env_num("LLM_TELEMETRY_BATCH", 200)))
+        while time.monotonic() < deadline and _queue.qsize() < batch:
+            time.sleep(min(0.2, interval))
+        if _queue.qsize():
+            flush()
+            connection.close()  # 유휴 동안 DB 연결을 잡고 있지 않음
+
+
+def _ensure_writer() -> None:
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writer_loop, name="llm-telemetry", daemon=True)
+            _writer.start()
+
+
+def _flush_at_exit() -> None:
+    if _queue.qsize():
+        try:
+            flush()
+        except Exception:
+            pass
+
+
+atexit.register(_flush_at_exit)
+
+
+def stats() -> Dict[str, int]:
+    return dict(_counters, queued=_queue.qsize())
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 집계(대시보드)
+# ──────────────────────────────────────────────────────────────────────────────
+def _pct(values: List[int], p: float) -> Optional[int]:
+    """정렬된 values의 p 백분위(nearest-rank: ceil(p·n)번째 값)."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(p * len(values)) - 1)]
+
+
+def _group(rows, key) -> List[Dict[str, Any]]:
+    groups: Dict[Any, Dict[str, Any]] = {}
+    for r in rows:
+        k = key(r)
+        g = groups.get(k)
+        if g is None:
+            g = groups[k] = {"key": k, "calls": 0, "errors": 0, "rate_limited": 0, "retries": 0,
+                             "cache_hits": 0, "prompt_tokens": 0, "output_tokens": 0, "lat": []}
+        g["calls"] += 1
+        g["errors"] += r["outcome"] != "ok"
+        g["rate_limited"] += r["rate_limited"]
+        g["retries"] += r["retries"]
+        g["cache_hits"] += r["cache_hit"]
+        g["prompt_tokens"] += r["prompt_tokens"]
+        g["output_tokens"] += r["output_tokens"]
+        g["lat"].append(r["latency_ms"])
+    out = []
+    for g in groups.values():
+        lat = sorted(g.pop("lat"))
+        g["p50_ms"], g["p95_ms"] = _pct(lat, 0.5), _pct(lat, 0.95)
+        g["tokens"] = g["prompt_tokens"] + g["output_tokens"]
+        g["error_pct"] = round(100.0 * g["errors"] / g["calls"], 1) if g["calls"] else 0.0
+        out.append(g)
+    out.sort(key=lambda g: g["tokens"], reverse=True)
+    return out
+
+
+def dashboard_stats(days: int = 7, max_rows: int = 200000) -> Dict[str, Any]:
+    """
+    최근 days일 호출 집계. 백분위는 DB마다 함수가 달라 지연값을 읽어 파이썬에서 계산(max_rows 상한).
+    반환: {"total": {...}, "by_stage": [...], "by_project": [...], "by_model": [...], "truncated": bool}
+    """
+    from django.utils import timezone
+
+    from .models import LLMCall, Project
+
+    since = timezone.now() - timedelta(days=days)
+    fields = ("stage", "call_site", "project_id", "model", "outcome", "latency_ms", "retries",
+              "rate_limited", "cache_hit", "prompt_tokens", "output_tokens")
+    rows = list(LLMCall.objects.filter(created_at__gte=since).order_by("-created_at").values(*fields)[:max_rows])
+
+    by_project = _group(rows, lambda r: r["project_id"])
+    titles = dict(Project.objects.filter(pk__in=[g["key"] for g in by_project if g["key"]])
+                  .values_list("project_id", "title"))
+    for g in by_project:
+        g["label"] = f"#{g['key']} {titles.get(g['key'], '(삭제됨)')}" if g["key"] else "(프로젝트 없음)"
+
+    total = _group(rows, lambda r: "전체")
+    return {
+        "days": days,
+        "since": since,
+        "truncated": len(rows) >= max_rows,
+        "total": total[0] if total else None,
+        "by_stage": _group(rows, lambda r: r["stage"] or "(단계 없음)"),
+        "by_call_site": _group(rows, lambda r: r["call_site"] or "-"),
+        "by_project": by_project,
+        "by_model": _group(rows, lambda r: r["model"] or "-"),
+    }
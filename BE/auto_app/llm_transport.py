@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""
+llm_transport.py
+- 외부 호출(Gemini SDK / REST, GitHub 등 requests 기반 HTTP)을 한 곳에서 가로채는 전송 계층
+- 모드(LLM_TRANSPORT_MODE)
+    live   : 그대로 호출(기본). install()된 경우 호출 수/토큰/시간만 집계
+    record : 실제 호출 후 응답을 카세트(JSON)로 저장
+    replay : 카세트에서 응답을 돌려줌(네트워크 없음) + 지연/429 주입
+- 환경변수
+    LLM_CASSETTE_DIR       카세트 폴더(기본: BASE_DIR/cassettes 또는 ./cassettes)
+    LLM_REPLAY_LATENCY_MS  재생 지연. "200" 또는 "100-400"(균등분포)
+    LLM_REPLAY_429_RATE    재생 시 429를 주입할 확률(0~1)
+    LLM_REPLAY_MISS        카세트가 없을 때: "error"(기본) | "live"
+- 연결 지점
+    * Gemini SDK: gemini_pool.PooledModel/PooledChat → genai_exchange()
+    * HTTP: install()이 requests.adapters.HTTPAdapter.send를 감쌈
+      (test_client2의 REST 호출, PyGithub, idea_to_plan_generator의 GitHub 검색 모두 포함)
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+__all__ = [
+    "mode",
+    "set_mode",
+    "install",
+    "genai_exchange",
+    "stats_snapshot",
+    "stats_reset",
+    "CassetteMiss",
+    "ReplayRateLimited",
+]
+
+# 카세트 키/저장에서 제외할 비밀 파라미터/헤더
+_SECRET_PARAMS = {"key", "api_key", "access_token", "token"}
+_KEEP_HEADERS = {"content-type", "retry-after", "x-ratelimit-remaining", "x-ratelimit-reset", "link"}
+
+_local = threading.local()
+_lock = threading.Lock()
+_installed = False
+_mode_override: Optional[str] = None
+
+
+class CassetteMiss(RuntimeError):
+    """replay 모드에서 대응 카세트가 없음."""
+
+
+class ReplayRateLimited(RuntimeError):
+    """replay 모드에서 주입된 429 (gemini_pool이 429로 인식해 쿨다운/재라우팅)."""
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 설정
+# ──────────────────────────────────────────────────────────────────────────────
+def mode() -> str:
+    m = (_mode_override or os.getenv("LLM_TRANSPORT_MODE", "live")).strip().lower()
+    return m if m in ("live", "record", "replay") else "live"
+
+
+def set_mode(value: Optional[str]) -> None:
+    """프로세스 내에서 모드 덮어쓰기(벤치마크 러너용). None이면 환경변수로 복귀."""
+    global _mode_override
+    _mode_override = value
+
+
+def replaying() -> bool:
+    return mode() == "replay"
+
+
+def _cassette_dir() -> Path:
+    d = os.getenv("LLM_CASSETTE_DIR")
+    if not d:
+        try:
+            from django.conf import settings
+            d = os.path.join(str(getattr(settings, "BASE_DIR", os.getcwd())), "cassettes")
+        except Exception:
+            d = "cassettes"
+    return Path(d)
+
+
+def _replay_latency() -> float:
+    raw = (os.getenv("LLM_REPLAY_LATENCY_MS") or "0").strip()
+    try:
+        if "-" in raw:
+            lo, hi = (float(x) for x in raw.split("-", 1))
+            return random.uniform(lo, hi) / 1000.0
+        return float(raw) / 1000.0
+    except ValueError:
+        return 0.0
+
+
+def _replay_429() -> bool:
+    try:
+        rate = float(os.getenv("LLM_REPLAY_429_RATE", "0") or 0)
+    except ValueError:
+        rate = 0.0
+    return rate > 0 and random.random() < rate
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 집계
+# ──────────────────────────────────────────────────────────────────────────────
+_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+
+def _count(channel: str, *, elapsed: float = 0.0, tokens: int = 0, **extra: float) -> None:
+    with _lock:
+        s = _stats[channel]
+        s["calls"] += 1
+        s["elapsed_sec"] += elapsed
+        s["tokens"] += tokens
+        for k, v in extra.items():
+            s[k] += v
+
+
+def stats_snapshot() -> Dict[str, Dict[str, float]]:
+    with _lock:
+        return {ch: dict(v) for ch, v in _stats.items()}
+
+
+def stats_reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 카세트 입출력
+# ──────────────────────────────────────────────────────────────────────────────
+def _digest(obj: Any) -> str:
+    raw = json.dumps(obj, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cassette_path(kind: str, key: str) -> Path:
+    return _cassette_dir() / kind / f"{key}.json"
+
+
+def _save(kind: str, key: str, request: Dict[str, Any], response: Dict[str, Any]) -> None:
+    p = _cassette_path(kind, key)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({"request": request, "response": response, "recorded_at": time.time()},
+                   ensure_ascii=False, indent=2, default=str),
+        encoding="utf-8",
+    )
+    os.replace(tmp, p)
+
+
+def _load(kind: str, key: str) -> Optional[Dict[str, Any]]:
+    p = _cassette_path(kind, key)
+    if not p.exists():
+        return None
+    return json.loads(p.read_text(encoding="utf-8")).get("response")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Gemini SDK (google.generativeai)
+# ──────────────────────────────────────────────────────────────────────────────
+class _Obj:
+    """재생 응답용 속성 컨테이너."""
+
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+def _replay_response(data: Dict[str, Any]) -> _Obj:
+    text = data.get("text") or ""
+    usage = data.get("usage") or {}
+    part = _Obj(text=text)
+    cand = _Obj(content=_Obj(parts=[part], role="model"), finish_reason=data.get("finish_reason"))
+    return _Obj(
+        text=text,
+        candidates=[cand],
+        parts=[part],
+        usage_metadata=_Obj(
+            prompt_token_count=usage.get("prompt"),
+            candidates_token_count=usage.get("candidates"),
+            total_token_count=usage.get("total"),
+        ),
+        replayed=True,
+    )
+
+
+def _serialize_genai(resp: Any) -> Dict[str, Any]:
+    try:
+        text = resp.text
+    except Exception:
+        text = ""
+    usage = getattr(resp, "usage_metadata", None)
+    finish = None
+    try:
+        finish = str(resp.candidates[0].finish_reason)
+    except Exception:
+        pass
+    return {
+        "text": text,
+        "finish_reason": finish,
+        "usage": {
+            "prompt": getattr(usage, "prompt_token_count", None),
+            "candidates": getattr(usage, "candidates_token_count", None),
+            "total": getattr(usage, "total_token_count", None),
+        },
+    }
+
+
+def _genai_tokens(resp: Any) -> int:
+    try:
+        return int(getattr(getattr(resp, "usage_metadata", None), "total_token_count", 0) or 0)
+    except Exception:
+        return 0
+
+
+def genai_exchange(request: Dict[str, Any], live: Callable[[], Any]) -> Any:
+    """
+    Gemini SDK 호출 1회를 모드에 맞게 처리.
+    request: 카세트 키가 될 직렬화 가능한 요청 요약(model, contents, config 등)
+    live: 실제 호출 함수
+    """
+    m = mode()
+    key = _digest(request)
+    t0 = time.time()
+    if m == "replay":
+        data = _load("genai", key)
+        if data is None:
+            if os.getenv("LLM_REPLAY_MISS", "error") != "live":
+                _count("genai", miss=1)
+                raise CassetteMiss(f"카세트 없음(genai/{key[:12]}). record 모드로 먼저 녹화하세요.")
+        else:
+            time.sleep(_replay_latency())
+            if _replay_429():
+                _count("genai", elapsed=time.time() - t0, injected_429=1)
+                raise ReplayRateLimited("429 Resource has been exhausted (replay injected)")
+            resp = _replay_response(data)
+            _count("genai", elapsed=time.time() - t0, tokens=_genai_tokens(resp), replayed=1)
+            return resp
+
+    _local.in_genai = True
+    try:
+        resp = live()
+    finally:
+        _local.in_genai = False
+    if m == "record":
+        _save("genai", key, request, _serialize_genai(resp))
+    _count("genai", elapsed=time.time() - t0, tokens=_genai_tokens(resp))
+    return resp
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# HTTP (requests)
+# ──────────────────────────────────────────────────────────────────────────────
+def _scrub_url(url: str) -> str:
+    parts = urlsplit(url)
+    q = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in _SECRET_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(q)), ""))
+
+
+def _http_request_key(prep) -> Dict[str, Any]:
+    body = prep.body
+    if isinstance(body, bytes):
+        body = hashlib.sha256(body).hexdigest()
+    return {"method": prep.method, "url": _scrub_url(prep.url), "body": body}
+
+
+def _http_channel(url: str) -> str:
+    host = urlsplit(url).netloc
+    if "generativelanguage" in host:
+        return "http:gemini"
+    if "github" in host:
+        return "http:github"
+    return f"http:{host}"
+
+
+def _http_tokens(channel: str, content: bytes) -> int:
+    if channel != "http:gemini" or not content:
+        return 0
+    try:
+        usage = json.loads(content).get("usageMetadata") or {}
+        return int(usage.get("totalTokenCount") or 0)
+    except Exception:
+        return 0
+
+
+def _build_response(prep, data: Dict[str, Any]):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    resp = requests.Response()
+    resp.status_code = int(data.get("status", 200))
+    resp.headers = CaseInsensitiveDict(data.get("headers") or {})
+    body = data.get("body_b64")
+    resp._content = base64.b64decode(body) if body is not None else (data.get("body") or "").encode("utf-8")
+    resp._content_consumed = True
+    resp.encoding = data.get("encoding") or "utf-8"
+    resp.url = prep.url
+    resp.request = prep
+    resp.reason = data.get("reason") or ""
+    return resp
+
+
+def _serialize_http(resp) -> Dict[str, Any]:
+    content = resp.content or b""
+    out: Dict[str, Any] = {
+        "status": resp.status_code,
+        "reason": resp.reason,
+        "encoding": resp.encoding,
+        "headers": {k: v for k, v in resp.headers.items() if k.lower() in _KEEP_HEADERS},
+    }
+    try:
+        out["body"] = content.decode("utf-8")
+    except UnicodeDecodeError:
+        out["body_b64"] = base64.b64encode(content).decode("ascii")
+    return out
+
+
+def _make_send(orig_send):
+    def send(adapter, request, *args, **kwargs):
+        # Gemini SDK 내부(REST transport)에서 나가는 요청은 genai_exchange에서 이미 처리
+        if getattr(_local, "in_genai", False):
+            return orig_send(adapter, request, *args, **kwargs)
+
+        m = mode()
+        channel = _http_channel(request.url)
+        req_key = _http_request_key(request)
+        key = _digest(req_key)
+        t0 = time.time()
+
+        if m == "replay":
+            data = _load("http", key)
+            if data is not None:
+                time.sleep(_replay_latency())
+                if _replay_429():
+                    _count(channel, elapsed=time.time() - t0, injected_429=1)
+                    return _build_response(request, {
+                        "status": 429,
+                        "reason": "Too Many Requests",
+                        "headers": {"Retry-After": "1", "Content-Type": "application/json"},
+                        "body": json.dumps({"error": {"code": 429, "message": "replay injected"}}),
+                    })
+                resp = _build_response(request, data)
+                _count(channel, elapsed=time.time() - t0, tokens=_http_tokens(channel, resp.content), replayed=1)
+                return resp
+            if os.getenv("LLM_REPLAY_MISS", "error") != "live":
+                _count(channel, miss=1)
+                raise CassetteMiss(f"카세트 없음({req_key['method']} {req_key['url'][:120]})")
+
+        resp = orig_send(adapter, request, *args, **kwargs)
+        if m == "record":
+            _save("http", key, req_key, _serialize_http(resp))  # resp.content를 읽어 둠(이후 iter_lines 가능)
+        content = resp.content if m == "record" else b""
+        _count(channel, elapsed=time.time() - t0, tokens=_http_tokens(channel, content))
+        return resp
+
+    return send
+
+
+def install() -> None:
+    """requests 전송 계층에 훅 설치(1회). live 모드에서도 설치하면 호출 집계만 수행."""
+    global _installed
+    with _lock:
+        if _installed:
+            return
+        try:
+            from requests.adapters import HTTPAdapter
+        except ImportError:
+            return
+        HTTPAdapter.send = _make_send(HTTPAdapter.send)
+        _installed = True
+    print(f"🎞️ LLM transport 설치: mode={mode()} cassettes={_cassette_dir()}")
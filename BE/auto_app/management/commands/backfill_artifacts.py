@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+python manage.py backfill_artifacts [--dry-run] [--no-hash]
+
+media/ 하위(drafts, refine, gantt, reports, final, final/_main, ideas)에 이미 있는 산출물을
+파일명 규칙으로 해석해 Artifact 테이블에 등록합니다. 여러 번 실행해도 rel_path 기준으로 갱신만 됩니다.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+
+from auto_app.artifact_registry import media_root, parse_media_path, register_artifact
+from auto_app.models import Artifact, GanttChart, Project, RequirementDraft
+
+SCAN_DIRS = ("drafts", "refine", "gantt", "reports", "final", "final/_main", "ideas")
+
+
+class Command(BaseCommand):
+    help = "기존 media 산출물 파일을 Artifact 레지스트리에 백필"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="DB에 쓰지 않고 집계만 출력")
+        parser.add_argument("--no-hash", action="store_true", help="sha256 계산 생략(대용량 백필 시)")
+
+    def handle(self, *args, **opts):
+        root = media_root()
+        projects = {p.project_id: p for p in Project.objects.select_related("user")}
+        known = set(Artifact.objects.values_list("rel_path", flat=True))
+        # 간트 파일은 파일명에 ts가 없으므로 GanttChart.file_path로 생성 시각을 보완
+        gantt_created = {
+            (g.file_path or "").replace(os.sep, "/"): g.created_at
+            for g in GanttChart.objects.exclude(file_path__isnull=True).exclude(file_path="")
+        }
+
+        counts = {"registered": 0, "updated": 0, "skipped": 0, "orphan": 0}
+        for sub in SCAN_DIRS:
+            base = os.path.join(root, *sub.split("/"))
+            if not os.path.isdir(base):
+                continue
+            for name in sorted(os.listdir(base)):
+                abspath = os.path.join(base, name)
+                if not os.path.isfile(abspath):
+                    continue
+                rel = f"{sub}/{name}"
+                info = parse_media_path(rel)
+                if not info:
+                    counts["skipped"] += 1
+                    continue
+
+                project = None
+                if info["project_id"] is not None:
+                    project = projects.get(info["project_id"])
+                    if project is None:
+                        counts["orphan"] += 1  # 삭제된 프로젝트의 잔여 파일
+                        continue
+
+                created = gantt_created.get(rel) or self._created_at(info["ts"], abspath)
+                source_draft = self._source_draft(project, info)
+
+                if opts["dry_run"]:
+                    counts["updated" if rel in known else "registered"] += 1
+                    continue
+                obj = register_artifact(
+                    abspath, info["kind"],
+                    project=project,
+                    user=getattr(project, "user", None),
+                    source_draft=source_draft,
+                    ts=info["ts"],
+                    seq=info["seq"],
+                    created_at=created,
+                    compute_hash=not opts["no_hash"],
+                )
+                if obj:
+                    counts["updated" if rel in known else "registered"] += 1
+
+        prefix = "🧪 (dry-run) " if opts["dry_run"] else "✅ "
+        self.stdout.write(
+            f"{prefix}신규 {counts['registered']} / 갱신 {counts['updated']} / "
+            f"규칙 외 {counts['skipped']} / 프로젝트 없음 {counts['orphan']}"
+        )
+
+    @staticmethod
+    def _parse_ts(ts):
+        # 뷰에서 timezone.now()(UTC)로 파일명 ts를 만들므로 UTC로 해석
+        try:
+            return datetime.strptime(ts, "%Y%m%d_%H%M%S").replace(tzinfo=dt_timezone.utc)
+        except Exception:
+            return None
+
+    def _created_at(self, ts, abspath):
+        return self._parse_ts(ts) or datetime.fromtimestamp(os.path.getmtime(abspath), tz=dt_timezone.utc)
+
+    def _source_draft(self, project, info):
+        # G1/G2 파일은 파일 ts 전후로 저장된 초안 중 가장 가까운 것과 연결
+        if project is None or info["kind"] not in ("g1_json", "g1_xlsx", "g2_json", "g2_xlsx"):
+            return None
+        at = self._parse_ts(info["ts"])
+        if at is None:
+            return None
+        source = "gemini_1" if info["kind"].startswith("g1") else "gemini_2"
+        window = timedelta(minutes=5)
+        cands = RequirementDraft.objects.filter(
+            project=project, source=source,
+            created_at__gte=at - window, created_at__lte=at + window,
+        )
+        return min(cands, key=lambda d: abs(d.created_at - at), default=None)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+python manage.py bench_auth --requests 200
+
+JWT 인증 경로의 요청당 DB 쿼리 수 / 지연을 비교합니다.
+- JWTAuthentication(기존)      : 매 요청 People SELECT
+- CachedJWTAuthentication(현재): 캐시 적중 시 SELECT 0회
+마지막으로 GET /userinfo/ 를 현재 설정 그대로(APIClient) 호출해 엔드포인트 전체 쿼리 수를 출력합니다.
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from auto_app.auth_cache import CachedJWTAuthentication, invalidate_user
+from auto_app.views import UserInfoView
+
+
+def _measure(auth, request, n):
+    with CaptureQueriesContext(connection) as ctx:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            auth.authenticate(request)
+        elapsed = (time.perf_counter() - t0) * 1000
+    return len(ctx.captured_queries), elapsed
+
+
+class Command(BaseCommand):
+    help = "JWT 인증 사용자 조회 캐시 벤치마크(요청당 쿼리 수/지연)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="인증 반복 횟수(기본 200)")
+        parser.add_argument("--user-email", default="bench@autoplan.local", help="벤치마크용 사용자(없으면 생성)")
+
+    def handle(self, *args, **opts):
+        n = max(1, opts["requests"])
+        User = get_user_model()
+        user = User.objects.filter(email=opts["user_email"]).first()
+        if user is None:
+            user = User.objects.create_user(username="bench", email=opts["user_email"], password="bench-pass-1234")
+
+        access = str(RefreshToken.for_user(user).access_token)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        invalidate_user(user.pk)
+
+        rows = []
+        for label, auth in (("JWTAuthentication", JWTAuthentication()),
+                            ("CachedJWTAuthentication", CachedJWTAuthentication())):
+            queries, ms = _measure(auth, request, n)
+            rows.append((label, queries, ms))
+
+        self.stdout.write(f"{'backend':<26}{'queries':>10}{'q/req':>8}{'total':>11}{'per req':>10}")
+        for label, queries, ms in rows:
+            self.stdout.write(f"{label:<26}{queries:>10}{queries / n:>8.2f}{ms:>9.1f}ms{ms / n * 1000:>8.0f}µs")
+        saved = rows[0][1] - rows[1][1]
+        self.stdout.write(f"🧮 {n}회 인증 중 절약한 쿼리: {saved}")
+
+        # 엔드포인트 전체(현재 설정의 인증 클래스 + 뷰)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        auth_names = [c.__name__ for c in UserInfoView.authentication_classes]
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(reverse("auto_app:userinfo"))
+        self.stdout.write(
+            f"🌐 GET userinfo ({', '.join(auth_names)}): status {resp.status_code}, 쿼리 {len(ctx.captured_queries)}회"
+        )
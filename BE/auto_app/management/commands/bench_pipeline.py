@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+python manage.py bench_pipeline --mode replay --plan-file plan.md
+
+G1 → G2 → finalize → G3 → Gantt → final-doc 를 DRF 엔드포인트 그대로(APIClient) 순서대로 호출하고
+단계별 벽시계 시간 / 외부 호출 수 / 토큰을 표로 출력합니다.
+
+- --mode record : 실제 Gemini/GitHub 호출 결과를 카세트로 저장(최초 1회)
+- --mode replay : 카세트로 오프라인 재생(--latency-ms, --rate-429로 지연/429 주입)
+- --mode live   : 실제 호출 + 집계만
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIClient
+
+from auto_app import llm_transport, structured_output
+from auto_app.models import Project
+
+STAGES = ("g1", "g2", "finalize", "g3", "gantt", "final_doc")
+
+_SAMPLE_PLAN = """# 오토플랜 벤치마크 샘플 기획서
+## 1. 개요
+사용자가 기획서를 업로드하면 기능 명세를 자동 추출하고, 유사 오픈소스와 일정표를 생성하는 서비스.
+## 2. 주요 기능
+- 회원가입/로그인(JWT)
+- 기획서 업로드(PDF/DOCX) 및 기능 추출
+- 기능 정제 및 엑셀 내보내기
+- 유사 GitHub 프로젝트 추천
+- 간트차트 자동 생성
+- 최종 개발 문서(DOCX) 생성
+"""
+
+
+def _diff(after, before):
+    out = {}
+    for ch, vals in after.items():
+        prev = before.get(ch, {})
+        d = {k: v - prev.get(k, 0) for k, v in vals.items()}
+        if any(d.values()):
+            out[ch] = d
+    return out
+
+
+class Command(BaseCommand):
+    help = "엔드-투-엔드 파이프라인(G1→G2→finalize→G3→Gantt→final-doc) 단계별 지연/호출 수/토큰 벤치마크"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=["live", "record", "replay"], default=None,
+                            help="전송 모드(기본: LLM_TRANSPORT_MODE 또는 live)")
+        parser.add_argument("--cassettes", default=None, help="카세트 폴더(LLM_CASSETTE_DIR)")
+        parser.add_argument("--latency-ms", default=None, help='replay 지연 주입. 예: "200" 또는 "100-400"')
+        parser.add_argument("--rate-429", type=float, default=None, help="replay 429 주입 확률(0~1)")
+        parser.add_argument("--plan-file", default=None, help="기획서 텍스트 파일(없으면 내장 샘플)")
+        parser.add_argument("--stages", default=",".join(STAGES), help=f"실행 단계(쉼표). 기본: {','.join(STAGES)}")
+        parser.add_argument("--user-email", default="bench@autoplan.local", help="벤치마크용 사용자(없으면 생성)")
+        parser.add_argument("--keep", action="store_true", help="벤치마크 프로젝트를 삭제하지 않음")
+        parser.add_argument("--json-out", default=None, help="결과 JSON 저장 경로")
+
+    def handle(self, *args, **opts):
+        if opts["cassettes"]:
+            os.environ["LLM_CASSETTE_DIR"] = opts["cassettes"]
+        if opts["latency_ms"] is not None:
+            os.environ["LLM_REPLAY_LATENCY_MS"] = str(opts["latency_ms"])
+        if opts["rate_429"] is not None:
+            os.environ["LLM_REPLAY_429_RATE"] = str(opts["rate_429"])
+        if opts["mode"]:
+            llm_transport.set_mode(opts["mode"])
+        llm_transport.install()
+        llm_transport.stats_reset()
+        structured_output.stats_reset()
+
+        stages = [s.strip() for s in opts["stages"].split(",") if s.strip()]
+        unknown = [s for s in stages if s not in STAGES]
+        if unknown:
+            raise CommandError(f"알 수 없는 단계: {unknown} (가능: {STAGES})")
+
+        plan_text = _SAMPLE_PLAN
+        if opts["plan_file"]:
+            plan_text = Path(opts["plan_file"]).read_text(encoding="utf-8", errors="ignore")
+
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(
+            email=opts["user_email"], defaults={"username": opts["user_email"].split("@")[0]}
+        )
+        project = Project.objects.create(user=user, title="[bench] pipeline", description=plan_text)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        pid = project.project_id
+
+        ctx = {"draft_id": None}
+        results = []
+        self.stdout.write(f"🏁 bench_pipeline mode={llm_transport.mode()} project={pid} stages={stages}")
+        try:
+            for stage in stages:
+                method, url, data, fmt = self._request_for(stage, pid, plan_text, ctx)
+                before = llm_transport.stats_snapshot()
+                t0 = time.perf_counter()
+                resp = getattr(client, method)(url, data, format=fmt)
+                wall = time.perf_counter() - t0
+                calls = _diff(llm_transport.stats_snapshot(), before)
+
+                body = getattr(resp, "data", None)
+                if stage == "g2" and isinstance(body, dict) and body.get("draft_id"):
+                    ctx["draft_id"] = body["draft_id"]
+                elif stage == "g1" and isinstance(body, dict) and body.get("draft_id") and not ctx["draft_id"]:
+                    ctx["draft_id"] = body["draft_id"]
+
+                row = {
+                    "stage": stage,
+                    "status": resp.status_code,
+                    "wall_sec": round(wall, 3),
+                    "calls": int(sum(v.get("calls", 0) for v in calls.values())),
+                    "tokens": int(sum(v.get("tokens", 0) for v in calls.values())),
+                    "injected_429": int(sum(v.get("injected_429", 0) for v in calls.values())),
+                    "by_channel": calls,
+                }
+                if resp.status_code >= 400:
+                    row["error"] = (body.get("error") if isinstance(body, dict) else None) or str(body)[:200]
+                results.append(row)
+                self._print_row(row)
+        finally:
+            if not opts["keep"]:
+                project.delete()
+
+        total = {
+            "wall_sec": round(sum(r["wall_sec"] for r in results), 3),
+            "calls": sum(r["calls"] for r in results),
+            "tokens": sum(r["tokens"] for r in results),
+        }
+        self.stdout.write(f"── 합계: {total['wall_sec']:.2f}s, 호출 {total['calls']}회, 토큰 {total['tokens']}")
+        structured = structured_output.stats_snapshot()
+        if structured:
+            t = structured["_total"]
+            self.stdout.write(
+                f"🩹 구조화 출력: 파싱 {t['calls']}회, 복구 {t['salvaged']}회(재호출 회피 {t['recalls_avoided']}), "
+                f"필드 수정 {t['fields_repaired']}개, 실패 {t['failed']}회"
+            )
+
+        if opts["json_out"]:
+            Path(opts["json_out"]).write_text(
+                json.dumps({"mode": llm_transport.mode(), "stages": results, "total": total,
+                            "structured_output": structured},
+                           ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+            self.stdout.write(f"💾 결과 저장: {opts['json_out']}")
+
+    # ── 단계별 요청 구성 ──
+    def _request_for(self, stage, pid, plan_text, ctx):
+        base = f"/api/project/{pid}"
+        if stage == "g1":
+            return "post", f"{base}/generate-gemini1/", {"plan_text": plan_text}, "json"
+        if stage == "g2":
+            return "post", f"{base}/refine-gemini2/", {}, "json"
+        if stage == "finalize":
+            return "post", f"{base}/finalize/", {"draft_id": ctx["draft_id"]}, "json"
+        if stage == "g3":
+            return "post", f"{base}/similar-projects/", {}, "json"
+        if stage == "gantt":
+            return "post", f"{base}/gantt/", {
+                "start_date": "2025-01-06",
+                "total_weeks": 8,
+                "parts": ["백엔드", "프론트엔드", "인공지능", "서류"],
+                "filename": "bench",
+            }, "json"
+        # final_doc: MultiPart 전용 뷰
+        return "post", f"{base}/final-devdoc/generate/", {"draft_id": ctx["draft_id"] or ""}, "multipart"
+
+    def _print_row(self, row):
+        flag = "✅" if row["status"] < 400 else "❌"
+        self.stdout.write(
+            f"{flag} {row['stage']:<10} status={row['status']:<3} wall={row['wall_sec']:>8.2f}s "
+            f"calls={row['calls']:<4} tokens={row['tokens']:<8} 429={row['injected_429']}"
+            + (f"  err={row['error']}" if row.get("error") else "")
+        )
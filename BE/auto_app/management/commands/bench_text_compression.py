@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+python manage.py bench_text_compression --limit 200
+python manage.py bench_text_compression --train-dict   # 실제 데이터로 사전 학습 → auto_app/text_dicts/
+
+압축 TEXT 컬럼(Project.description / RequirementDraft.content / Requirement.description / GanttChart.source_text)의
+저장 용량 절감과 읽기(해제) 지연을 코덱·사전별로 비교합니다.
+DB에 값이 없으면 합성 한국어 기능 JSON으로 측정합니다.
+"""
+
+import json
+import time
+import zlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auto_app.compressed_text import DICT_DIR, builtin_dictionary, compress_text, decompress_text, train_dictionary
+from auto_app.models import GanttChart, Project, Requirement, RequirementDraft
+
+COLUMNS = [
+    (Project, "description"),
+    (RequirementDraft, "content"),
+    (Requirement, "description"),
+    (GanttChart, "source_text"),
+]
+
+
+def _synthetic(n):
+    out = []
+    for i in range(n):
+        features = [
+            {
+                "기능ID": f"F-{i:03d}-{j:02d}",
+                "기능명": f"일정 관리 기능 {j}",
+                "기능설명": {"목적": "사용자가 프로젝트 일정을 등록하고 조회한다.", "핵심역할": "일정 CRUD 및 알림"},
+                "사용자시나리오": {"상황": "팀장이 주간 회의 전", "행동": "간트 차트를 확인한다.", "기대결과": "지연 업무를 파악"},
+                "입력값": {"필수": ["제목", "시작일", "종료일"], "선택": ["담당자"]},
+                "출력값": {"요약정보": f"{j}번째 기능 요약", "상세정보": "업무별 진행률"},
+                "기능우선순위": ["높음", "중간", "낮음"][j % 3],
+            }
+            for j in range(1 + i % 12)
+        ]
+        out.append(json.dumps(features, ensure_ascii=False, indent=2))
+    return out
+
+
+def _samples(limit):
+    texts = []
+    for model, field in COLUMNS:
+        qs = model.objects.exclude(**{f"{field}__isnull": True}).order_by("-pk").values_list(field, flat=True)
+        texts += [t for t in qs[:limit] if t]
+    return texts
+
+
+def _measure(texts, codec, dictionary):
+    raw = comp = 0
+    t_c = t_d = 0.0
+    for t in texts:
+        t0 = time.perf_counter()
+        blob = compress_text(t, codec=codec, dictionary=dictionary)
+        t1 = time.perf_counter()
+        back = decompress_text(blob)
+        t2 = time.perf_counter()
+        if back != t:
+            raise CommandError(f"왕복 불일치({codec})")
+        raw += len(t.encode("utf-8"))
+        comp += len(blob)
+        t_c += t1 - t0
+        t_d += t2 - t1
+    n = len(texts)
+    return raw, comp, t_c / n * 1e6, t_d / n * 1e6
+
+
+class Command(BaseCommand):
+    help = "압축 TEXT 컬럼 벤치마크(저장 용량 / 압축·해제 지연)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=200, help="컬럼별 최대 샘플 수(기본 200)")
+        parser.add_argument("--train-dict", action="store_true", help="샘플로 사전을 학습해 text_dicts/에 저장")
+        parser.add_argument("--dict-size", type=int, default=16 * 1024, help="학습 사전 크기(기본 16KB)")
+
+    def handle(self, *args, **opts):
+        texts = _samples(max(1, opts["limit"]))
+        source = "DB"
+        if not texts:
+            texts, source = _synthetic(100), "합성 데이터"
+        self.stdout.write(f"📦 샘플 {len(texts)}건({source}), 평균 {sum(len(t.encode('utf-8')) for t in texts) // len(texts)} B")
+
+        dictionaries = [("없음", b""), ("내장", builtin_dictionary())]
+        if opts["train_dict"]:
+            trained = train_dictionary(texts, size=opts["dict_size"])
+            DICT_DIR.mkdir(parents=True, exist_ok=True)
+            path = DICT_DIR / f"{zlib.crc32(trained) & 0xFFFFFFFF:08x}.dict"
+            path.write_bytes(trained)
+            dictionaries.append(("학습", trained))
+            self.stdout.write(f"🧠 사전 저장: {path} ({len(trained)} B) → TEXT_COMPRESSION_DICT={path}")
+
+        codecs = ["zlib"]
+        try:
+            import zstandard  # noqa: F401
+            codecs.append("zstd")
+        except ImportError:
+            self.stdout.write("ℹ️ zstandard 미설치 → zlib만 측정")
+
+        self.stdout.write(f"{'codec':<6}{'dict':<6}{'raw':>12}{'stored':>12}{'ratio':>8}{'comp':>10}{'read':>10}")
+        raw_total, _, _, read_raw = _measure(texts, "none", b"")
+        self.stdout.write(f"{'none':<6}{'-':<6}{raw_total:>12}{raw_total + len(texts):>12}{1:>8.2f}{'-':>10}{read_raw:>8.1f}µs")
+        for codec in codecs:
+            for label, dictionary in dictionaries:
+                raw, comp, us_c, us_d = _measure(texts, codec, dictionary)
+                self.stdout.write(
+                    f"{codec:<6}{label:<6}{raw:>12}{comp:>12}{raw / comp:>8.2f}{us_c:>8.1f}µs{us_d:>8.1f}µs"
+                )
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+python manage.py gc_media [--keep-last N] [--project ID] [--dry-run] [--no-retention]
+
+1) 보존 정책: (프로젝트, 종류)별 최신 N개만 남기고 오래된 산출물 삭제
+   (기본 N = ARTIFACT_KEEP_LAST 또는 종류별 ARTIFACT_KEEP_LAST_<KIND>)
+2) GC: 참조 없는 blob, 고아 blob 파일, 오래된 final/_tmp·plan.json 중간 파일 삭제
+3) 회수한 바이트 수 출력
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auto_app.blob_store import apply_retention, collect_garbage, human_bytes
+from auto_app.models import Project
+
+
+class Command(BaseCommand):
+    help = "산출물 보존 정책 적용 + 참조 없는 blob/중간 파일 GC"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-last", type=int, default=None, help="종류별 보존 개수(기본: 환경변수)")
+        parser.add_argument("--project", type=int, default=None, help="특정 프로젝트만 보존 정책 적용")
+        parser.add_argument("--no-retention", action="store_true", help="보존 정책 생략(GC만)")
+        parser.add_argument("--grace-minutes", type=int, default=10, help="최근 사용 blob 보호 시간(분)")
+        parser.add_argument("--tmp-max-age-hours", type=float, default=24, help="중간 파일 보관 시간(시간)")
+        parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상만 집계")
+
+    def handle(self, *args, **opts):
+        dry = opts["dry_run"]
+        project = None
+        if opts["project"] is not None:
+            project = Project.objects.filter(project_id=opts["project"]).first()
+            if project is None:
+                raise CommandError(f"프로젝트 {opts['project']} 없음")
+
+        kept = {"artifacts": 0, "bytes": 0}
+        if not opts["no_retention"]:
+            kept = apply_retention(keep_last=opts["keep_last"], project=project, dry_run=dry)
+            self.stdout.write(
+                f"🗂️ 보존 정책: 오래된 산출물 {kept['artifacts']}건 정리"
+                f" (간트/문서가 참조 중이라 유지 {kept['referenced']}건)"
+            )
+
+        gc = collect_garbage(
+            dry_run=dry,
+            grace_minutes=opts["grace_minutes"],
+            tmp_max_age_hours=opts["tmp_max_age_hours"],
+        )
+        self.stdout.write(
+            f"🧹 GC: blob {gc['blobs']}개, 고아 파일 {gc['orphan_files']}개, 중간 파일 {gc['tmp_files']}개"
+        )
+
+        total = kept["bytes"] + gc["bytes"]
+        prefix = "🧪 (dry-run) 회수 예정" if dry else "✅ 회수"
+        self.stdout.write(f"{prefix}: {human_bytes(total)} ({total} bytes)")
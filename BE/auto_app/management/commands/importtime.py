@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+python manage.py importtime --budget-ms 1500
+
+새 인터프리터에서 `python -X importtime`으로 django.setup() + URLConf(→ views) import를 실행해
+모듈별 누적 import 시간을 표로 출력하고, 콜드 스타트 예산을 넘으면 실패(CommandError)합니다.
+(Gunicorn 워커 기동 / manage.py check 시간 회귀 감시용 — CI에서 그대로 실행)
+
+- 무거운 SDK(google.generativeai, sklearn, docx, openpyxl, pandas, github, fitz …)가
+  기동 시점에 import되면 예산과 관계없이 실패 → 반드시 함수 안(첫 사용 시점)에서 import할 것
+- --runs N : N회 측정 후 중앙값 사용(디스크 캐시 등 잡음 완화)
+
+환경변수:
+  IMPORT_BUDGET_MS = 기본 예산(ms, 기본 1500)
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 기동 시점에 import되면 안 되는 무거운 패키지(최상위 이름)
+HEAVY_MODULES = (
+    "google.generativeai",
+    "google.ai",
+    "sklearn",
+    "scipy",
+    "numpy",
+    "pandas",
+    "docx",
+    "openpyxl",
+    "github",
+    "fitz",
+    "boto3",
+    "botocore",
+    "pdfplumber",
+    "chardet",
+    "tqdm",
+)
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+import importlib
+importlib.import_module({target!r})
+elapsed = (time.perf_counter() - t0) * 1000
+heavy = sorted(m for m in sys.modules if any(m == h or m.startswith(h + ".") for h in {heavy!r}))
+print("__IMPORTTIME__" + json.dumps({{"elapsed_ms": elapsed, "heavy": heavy}}))
+"""
+
+
+def _parse_importtime(stderr: str):
+    """-X importtime 출력 → [(모듈, self_us, cumulative_us, 깊이)]"""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            depth = (len(m.group(3)) - 1) // 2
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), depth))
+    return rows
+
+
+def _run_probe(target: str):
+    code = _PROBE.format(target=target, heavy=HEAVY_MODULES)
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "auto_project.settings")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(settings.BASE_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    marker = [ln for ln in proc.stdout.splitlines() if ln.startswith("__IMPORTTIME__")]
+    if proc.returncode != 0 or not marker:
+        tail = "\n".join(ln for ln in proc.stderr.splitlines() if not ln.startswith("import time:"))[-2000:]
+        raise CommandError(f"import 측정 실패(exit {proc.returncode}):\n{tail}")
+    info = json.loads(marker[-1][len("__IMPORTTIME__"):])
+    return info, _parse_importtime(proc.stderr)
+
+
+class Command(BaseCommand):
+    help = "django.setup() + URLConf import 시간(-X importtime) 측정 및 콜드 스타트 예산 검사"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--budget-ms", type=float, default=None,
+                            help="허용 import 시간(ms). 기본: IMPORT_BUDGET_MS 또는 1500")
+        parser.add_argument("--target", default=None,
+                            help="측정할 모듈(기본: settings.ROOT_URLCONF → views까지 포함)")
+        parser.add_argument("--runs", type=int, default=3, help="측정 횟수(중앙값 사용, 기본 3)")
+        parser.add_argument("--top", type=int, default=15, help="누적 시간 상위 N개 모듈 출력(기본 15)")
+        parser.add_argument("--json-out", default=None, help="결과 JSON 저장 경로")
+
+    def handle(self, *args, **opts):
+        budget = opts["budget_ms"]
+        if budget is None:
+            budget = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+        target = opts["target"] or settings.ROOT_URLCONF
+        runs = max(1, opts["runs"])
+
+        samples = []
+        for i in range(runs):
+            info, rows = _run_probe(target)
+            samples.append((info["elapsed_ms"], info, rows))
+            self.stdout.write(f"  run {i + 1}/{runs}: {info['elapsed_ms']:.0f}ms")
+        samples.sort(key=lambda s: s[0])
+        _elapsed, info, rows = samples[len(samples) // 2]
+        median = statistics.median(s[0] for s in samples)
+
+        # 최상위(깊이 0) 모듈 기준 누적 시간 상위 N
+        top = sorted((r for r in rows if r[3] == 0), key=lambda r: r[2], reverse=True)[: opts["top"]]
+        self.stdout.write("")
+        self.stdout.write(f"{'module':<48}{'cumulative':>12}{'self':>10}")
+        for name, self_us, cum_us, _depth in top:
+            self.stdout.write(f"{name:<48}{cum_us / 1000:>10.1f}ms{self_us / 1000:>8.1f}ms")
+        app_rows = sorted((r for r in rows if r[0].startswith("auto_app")), key=lambda r: r[2], reverse=True)[:5]
+        if app_rows:
+            self.stdout.write("")
+            self.stdout.write("auto_app 상위:")
+            for name, self_us, cum_us, _depth in app_rows:
+                self.stdout.write(f"  {name:<46}{cum_us / 1000:>10.1f}ms")
+
+        heavy = info.get("heavy") or []
+        self.stdout.write("")
+        self.stdout.write(f"⏱️ import {target}: 중앙값 {median:.0f}ms / 예산 {budget:.0f}ms")
+
+        if opts["json_out"]:
+            with open(opts["json_out"], "w", encoding="utf-8") as f:
+                json.dump({
+                    "target": target,
+                    "median_ms": round(median, 1),
+                    "runs_ms": [round(s[0], 1) for s in samples],
+                    "budget_ms": budget,
+                    "heavy_modules": heavy,
+                    "top": [{"module": n, "cumulative_ms": c / 1000, "self_ms": s / 1000} for n, s, c, _ in top],
+                }, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"💾 결과 저장: {opts['json_out']}")
+
+        problems = []
+        if heavy:
+            problems.append(f"기동 시점에 무거운 모듈 import: {', '.join(heavy[:10])}")
+        if median > budget:
+            problems.append(f"import 시간 {median:.0f}ms > 예산 {budget:.0f}ms")
+        if problems:
+            raise CommandError(" / ".join(problems))
+        self.stdout.write(self.style.SUCCESS("✅ 콜드 스타트 예산 통과"))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_app', '0003_alter_outputdocument_doc_type_ganttchart_gantttask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Artifact',
+            fields=[
+                ('Artifact', models.AutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('g1_json', 'G1 JSON'), ('g1_xlsx', 'G1 XLSX'), ('g2_json', 'G2 JSON'), ('g2_xlsx', 'G2 XLSX'), ('gantt_xlsx', '간트차트 XLSX'), ('report_md', '유사도 보고서 MD'), ('final_docx', '최종 개발문서 DOCX'), ('main_docx', '섹션 본문(main) DOCX'), ('idea_md', '아이디어 기획서 MD'), ('idea_docx', '아이디어 기획서 DOCX')], max_length=20)),
+                ('ts', models.CharField(blank=True, default='', max_length=15)),
+                ('seq', models.PositiveIntegerField(blank=True, null=True)),
+                ('rel_path', models.CharField(max_length=255, unique=True)),
+                ('size', models.BigIntegerField(default=0)),
+                ('sha256', models.CharField(blank=True, default='', max_length=64)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='artifacts', to='auto_app.project')),
+                ('source_draft', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='auto_app.requirementdraft')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-Artifact'],
+                'indexes': [models.Index(fields=['project', 'kind', '-created_at'], name='artifact_proj_kind_created'), models.Index(fields=['project', 'kind', 'ts'], name='artifact_proj_kind_ts'), models.Index(fields=['kind', 'seq'], name='artifact_kind_seq')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_app', '0004_artifact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('Blob', models.AutoField(primary_key=True, serialize=False)),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.BigIntegerField(default=0)),
+                ('path', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_ref_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='artifact',
+            name='kind',
+            field=models.CharField(choices=[('g1_json', 'G1 JSON'), ('g1_xlsx', 'G1 XLSX'), ('g2_json', 'G2 JSON'), ('g2_xlsx', 'G2 XLSX'), ('gantt_xlsx', '간트차트 XLSX'), ('report_md', '유사도 보고서 MD'), ('final_docx', '최종 개발문서 DOCX'), ('main_docx', '섹션 본문(main) DOCX'), ('idea_md', '아이디어 기획서 MD'), ('idea_docx', '아이디어 기획서 DOCX'), ('tools_json', '기술 스택 추천 JSON'), ('tools_md', '기술 스택 추천 MD'), ('code_zip', '코드 스캐폴드 ZIP')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='artifacts', to='auto_app.blob'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_app', '0005_blob_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionState',
+            fields=[
+                ('SessionState', models.AutoField(primary_key=True, serialize=False)),
+                ('key', models.CharField(max_length=50)),
+                ('value', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='auto_app.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'project', 'key'), name='session_state_user_project_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:40
+
+from django.db import migrations, models
+
+
+def _norm_url(url):
+    # similar_store._norm_url과 동일(마이그레이션은 앱 코드를 import하지 않음)
+    return (url or "").strip().rstrip("/")
+
+
+def dedupe_similar_projects(apps, schema_editor):
+    """
+    유니크 제약 추가 전 기존 중복 정리: (프로젝트, 정규화 URL)별 점수→스타→최신 순으로 1행만 남김.
+    남은 행의 repo_url도 정규화해 둔다(이후 업서트가 끝 "/" 없는 URL로 같은 행에 충돌하도록).
+    """
+    SimilarProject = apps.get_model("auto_app", "SimilarProject")
+    seen = set()
+    stale = []
+    renamed = []
+    rows = (
+        SimilarProject.objects
+        .order_by("project_id", "-similarity_score", "-stars", "-SimilarProject")
+        .values_list("SimilarProject", "project_id", "repo_url")
+    )
+    for pk, project_id, url in rows.iterator():
+        norm = _norm_url(url)
+        key = (project_id, norm)
+        if key in seen:
+            stale.append(pk)
+        else:
+            seen.add(key)
+            if norm != url:
+                renamed.append((pk, norm))
+    for i in range(0, len(stale), 500):
+        SimilarProject.objects.filter(SimilarProject__in=stale[i:i + 500]).delete()
+    for pk, norm in renamed:
+        SimilarProject.objects.filter(SimilarProject=pk).update(repo_url=norm)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_app', '0006_sessionstate'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_similar_projects, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='similarproject',
+            constraint=models.UniqueConstraint(fields=('project', 'repo_url'), name='similar_project_project_repo_url'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_app', '0007_similarproject_unique_repo_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ganttchart',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='requirement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='requirementdraft',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='similarproject',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='ganttchart',
+            index=models.Index(fields=['project', 'created_at'], name='gantt_chart_project_created'),
+        ),
+        migrations.AddIndex(
+            model_name='requirement',
+            index=models.Index(fields=['project', 'confirmed_by_user', 'created_at'], name='requirement_proj_conf_created'),
+        ),
+        migrations.AddIndex(
+            model_name='requirementdraft',
+            index=models.Index(fields=['project', 'created_at'], name='draft_project_created'),
+        ),
+    ]
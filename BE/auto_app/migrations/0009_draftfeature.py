@@ -0,0 +1,128 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:52
+
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# 이 시점의 DraftFeature 컬럼 길이(feature_code / feature_name / priority)
+_CODE_MAX, _NAME_MAX, _PRIO_MAX = 50, 255, 20
+_LIST_KEYS = ("정제기획서", "기능목록", "features", "items")
+
+
+# 아래 파싱은 auto_app.draft_store의 같은 이름 함수를 옮겨 둔 것
+# (마이그레이션이 현재 모델/모듈에 의존하지 않도록 그대로 고정)
+def features_from_payload(payload):
+    if isinstance(payload, (str, bytes)):
+        raw = payload.strip() if isinstance(payload, str) else payload
+        if not raw:
+            return None
+        try:
+            payload = json.loads(raw)
+        except Exception:
+            return None
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        for key in _LIST_KEYS:
+            if isinstance(payload.get(key), list):
+                return payload[key]
+    return None
+
+
+def _flatten_strings(x, bag):
+    if isinstance(x, dict):
+        for v in x.values():
+            _flatten_strings(v, bag)
+    elif isinstance(x, list):
+        for v in x:
+            _flatten_strings(v, bag)
+    elif isinstance(x, str):
+        bag.append(x)
+    return bag
+
+
+def _text(v):
+    return v.strip() if isinstance(v, str) else ""
+
+
+def feature_columns(item):
+    if not isinstance(item, dict):
+        text = str(item)
+        return {
+            "feature_code": "", "feature_name": text[:_NAME_MAX] or "기능명 없음", "summary": "",
+            "priority": "", "data": item, "search_text": text,
+        }
+    name = (_text(item.get("기능명")) or _text(item.get("feature_name"))
+            or _text(item.get("name")) or _text(item.get("title")))
+    desc = item.get("기능설명")
+    summary = ""
+    if isinstance(desc, dict):
+        summary = _text(desc.get("목적")) or _text(desc.get("핵심역할"))
+    elif isinstance(desc, str):
+        summary = desc.strip()
+    if not summary:
+        outputs = item.get("출력값")
+        if isinstance(outputs, dict):
+            summary = _text(outputs.get("요약정보"))
+    summary = summary or _text(item.get("summary")) or _text(item.get("description")) or _text(item.get("설명"))
+    return {
+        "feature_code": str(item.get("기능ID") or item.get("feature_id") or "")[:_CODE_MAX],
+        "feature_name": (name or "기능명 없음")[:_NAME_MAX],
+        "summary": summary,
+        "priority": str(item.get("기능우선순위") or item.get("priority") or "").strip()[:_PRIO_MAX],
+        "data": item,
+        "search_text": " ".join(_flatten_strings(item, [])),
+    }
+
+
+def backfill_draft_features(apps, schema_editor):
+    """기존 초안 content를 1회 파싱해 DraftFeature 행 생성(기능 배열이 아닌 초안은 건너뜀)."""
+    RequirementDraft = apps.get_model("auto_app", "RequirementDraft")
+    DraftFeature = apps.get_model("auto_app", "DraftFeature")
+    batch = []
+    drafts = RequirementDraft.objects.order_by("RequirementDraft_id").values_list("RequirementDraft_id", "content")
+    for draft_id, content in drafts.iterator():
+        for i, item in enumerate(features_from_payload(content) or []):
+            batch.append(DraftFeature(draft_id=draft_id, position=i, **feature_columns(item)))
+        if len(batch) >= 500:
+            DraftFeature.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        DraftFeature.objects.bulk_create(batch)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_app', '0008_list_api_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DraftFeature',
+            fields=[
+                ('DraftFeature', models.AutoField(primary_key=True, serialize=False)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('feature_code', models.CharField(blank=True, default='', max_length=50)),
+                ('feature_name', models.CharField(db_index=True, max_length=255)),
+                ('summary', models.TextField(blank=True, default='')),
+                ('priority', models.CharField(blank=True, db_index=True, default='', max_length=20)),
+                ('data', models.JSONField(default=dict)),
+                ('search_text', models.TextField(blank=True, default='')),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='features', to='auto_app.requirementdraft')),
+            ],
+            options={
+                'ordering': ['draft', 'position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='requirement',
+            name='source_feature',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='auto_app.draftfeature'),
+        ),
+        migrations.AddIndex(
+            model_name='draftfeature',
+            index=models.Index(fields=['draft', 'position'], name='draft_feature_draft_pos'),
+        ),
+        migrations.RunPython(backfill_draft_features, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# 큰 TEXT 컬럼 → CompressedTextField(압축 BLOB)
+# DB마다 TEXT→BLOB 변환 규칙이 달라(ALTER ... USING 등) 새 컬럼 추가 → 복사(압축) → 기존 컬럼 삭제 → 이름 변경 순으로 진행
+
+from django.db import migrations, models
+
+import auto_app.compressed_text
+
+# (모델, 필드)
+COLUMNS = [
+    ("project", "description"),
+    ("requirementdraft", "content"),
+    ("requirement", "description"),
+    ("ganttchart", "source_text"),
+]
+BATCH = 500
+
+
+def _copy(apps, src_suffix, dst_suffix):
+    for model_name, field in COLUMNS:
+        Model = apps.get_model("auto_app", model_name)
+        src, dst = field + src_suffix, field + dst_suffix
+        pk = Model._meta.pk.attname
+        batch = []
+        for obj in Model.objects.only(pk, src).order_by(pk).iterator(chunk_size=BATCH):
+            setattr(obj, dst, getattr(obj, src))
+            batch.append(obj)
+            if len(batch) >= BATCH:
+                Model.objects.bulk_update(batch, [dst])
+                batch = []
+        if batch:
+            Model.objects.bulk_update(batch, [dst])
+
+
+def compress_forward(apps, schema_editor):
+    _copy(apps, "", "_z")
+
+
+def compress_backward(apps, schema_editor):
+    _copy(apps, "_z", "")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_app', '0009_draftfeature'),
+    ]
+
+    operations = [
+        *[
+            migrations.AddField(
+                model_name=model_name,
+                name=f"{field}_z",
+                field=auto_app.compressed_text.CompressedTextField(blank=True, null=True),
+            )
+            for model_name, field in COLUMNS
+        ],
+        # 되돌릴 때 기존 컬럼을 NULL 허용으로 다시 만들고 복사 후 NOT NULL 복원
+        migrations.AlterField(
+            model_name='project',
+            name='description',
+            field=models.TextField(null=True),
+        ),
+        migrations.RunPython(compress_forward, compress_backward),
+        *[
+            migrations.RemoveField(model_name=model_name, name=field)
+            for model_name, field in COLUMNS
+        ],
+        *[
+            migrations.RenameField(model_name=model_name, old_name=f"{field}_z", new_name=field)
+            for model_name, field in COLUMNS
+        ],
+        migrations.AlterField(
+            model_name='project',
+            name='description',
+            field=auto_app.compressed_text.CompressedTextField(),
+        ),
+    ]
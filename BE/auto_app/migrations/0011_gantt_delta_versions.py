@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_task_keys(apps, schema_editor):
+    """기존 태스크: 연결된 Requirement PK를 task_key로(간트 프롬프트의 기능ID와 동일)."""
+    from django.db.models.functions import Cast
+
+    GanttTask = apps.get_model("auto_app", "GanttTask")
+    GanttTask.objects.filter(requirement__isnull=False, task_key="").update(
+        task_key=Cast("requirement_id", models.CharField(max_length=64))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_app', '0010_compressed_text_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ganttchart',
+            name='is_delta',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='ganttchart',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='auto_app.ganttchart'),
+        ),
+        migrations.AddField(
+            model_name='gantttask',
+            name='deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='gantttask',
+            name='predecessors',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='gantttask',
+            name='task_key',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='gantttask',
+            index=models.Index(fields=['gantt_chart', 'task_key'], name='gantt_task_chart_key'),
+        ),
+        migrations.RunPython(backfill_task_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_app', '0011_gantt_delta_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCall',
+            fields=[
+                ('LLMCall', models.BigAutoField(primary_key=True, serialize=False)),
+                ('stage', models.CharField(blank=True, default='', max_length=80)),
+                ('call_site', models.CharField(blank=True, default='', max_length=120)),
+                ('provider', models.CharField(choices=[('gemini', 'Gemini'), ('oss', 'gpt-oss/Ollama')], max_length=10)),
+                ('model', models.CharField(blank=True, default='', max_length=80)),
+                ('key_alias', models.CharField(blank=True, default='', max_length=80)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('output_tokens', models.PositiveIntegerField(default=0)),
+                ('latency_ms', models.PositiveIntegerField(default=0)),
+                ('retries', models.PositiveSmallIntegerField(default=0)),
+                ('rate_limited', models.PositiveSmallIntegerField(default=0)),
+                ('cache_hit', models.BooleanField(default=False)),
+                ('outcome', models.CharField(choices=[('ok', '성공'), ('rate_limited', '429'), ('exhausted', '키 풀 고갈'), ('error', '오류')], default='ok', max_length=15)),
+                ('error', models.CharField(blank=True, default='', max_length=200)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('project', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='auto_app.project')),
+            ],
+            options={
+                'ordering': ['-created_at', '-LLMCall'],
+                'indexes': [models.Index(fields=['created_at'], name='llm_call_created'), models.Index(fields=['stage', 'created_at'], name='llm_call_stage_created'), models.Index(fields=['project', 'created_at'], name='llm_call_project_created')],
+            },
+        ),
+    ]
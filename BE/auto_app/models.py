@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
+
+from .compressed_text import CompressedTextField
 
 # 사용자 모델을 People로 변경
 class People(AbstractUser):
@@ -27,7 +30,7 @@ class Project(models.Model):
     project_id = models.AutoField(primary_key=True)  # ✅ 추가
     user = models.ForeignKey(People, on_delete=models.CASCADE)
     title = models.CharField(max_length=100)
-    description = models.TextField()
+    description = CompressedTextField()  # 기획서 원문(최대 수만 자) — 압축 저장
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -46,13 +49,19 @@ class RequirementDraft(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
     
-    content = models.TextField(blank=True, null=True)  # Gemini가 생성한 전체 내용 저장
+    content = CompressedTextField(blank=True, null=True)  # Gemini가 생성한 전체 내용 저장(압축)
     generated_by = models.CharField(max_length=20, blank=True, null=True)
 
     feature_name = models.CharField(max_length=100)
     summary = models.TextField()
     score_by_model = models.FloatField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # 목록 ETag(list_api)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "created_at"], name="draft_project_created"),
+        ]
 
     @property
     def id(self):
@@ -64,6 +73,26 @@ class RequirementDraft(models.Model):
         return f"[{src}] {name}"
 
 
+# 초안 기능 1건 (RequirementDraft.content JSON을 생성 시 1회 파싱해 정규화 — draft_store.py)
+class DraftFeature(models.Model):
+    DraftFeature = models.AutoField(primary_key=True)
+    draft = models.ForeignKey(RequirementDraft, on_delete=models.CASCADE, related_name="features")
+    position = models.PositiveIntegerField(default=0)                  # 원본 배열 순서
+    feature_code = models.CharField(max_length=50, blank=True, default="")  # 기능ID (예: F-001)
+    feature_name = models.CharField(max_length=255, db_index=True)
+    summary = models.TextField(blank=True, default="")
+    priority = models.CharField(max_length=20, blank=True, default="", db_index=True)  # 기능우선순위
+    data = models.JSONField(default=dict)                               # 기능 객체 원본(파싱된 상태)
+    search_text = models.TextField(blank=True, default="")             # data의 문자열 값 평탄화(키워드 매칭용)
+
+    class Meta:
+        ordering = ["draft", "position"]
+        indexes = [
+            models.Index(fields=["draft", "position"], name="draft_feature_draft_pos"),
+        ]
+
+    def __str__(self):
+        return self.feature_name
 
 
 # 확정된 기능 명세서
@@ -72,12 +101,19 @@ class Requirement(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     feature_name = models.CharField(max_length=255)
     summary = models.TextField()
-    description = models.TextField(blank=True, null=True)
+    description = CompressedTextField(blank=True, null=True)
     source = models.CharField(max_length=20, blank=True, null=True)
     score_by_model = models.FloatField(blank=True, null=True)
     selected_from_draft = models.ForeignKey(RequirementDraft, on_delete=models.SET_NULL, null=True, blank=True)
+    source_feature = models.ForeignKey(DraftFeature, on_delete=models.SET_NULL, null=True, blank=True)  # finalize 원본 기능
     confirmed_by_user = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # 목록 ETag(list_api)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "confirmed_by_user", "created_at"], name="requirement_proj_conf_created"),
+        ]
 
     def __str__(self):
         return self.feature_name
@@ -93,6 +129,12 @@ class SimilarProject(models.Model):
     stars = models.IntegerField()
     similarity_score = models.FloatField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # 목록 ETag(list_api)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["project", "repo_url"], name="similar_project_project_repo_url"),
+        ]
 
     def __str__(self):
         return self.repo_name
@@ -164,10 +206,19 @@ class GanttChart(models.Model):
     total_weeks = models.PositiveIntegerField()     # 전체 주차 수
     parts = models.JSONField(default=list)          # ["백엔드","프론트엔드", ...]  ※ MySQL JSON 지원 필요
     generated_by = models.CharField(max_length=20, default="gemini_3")
-    source_text = models.TextField(blank=True, null=True)  # LLM 원문 보관(선택)
+    source_text = CompressedTextField(blank=True, null=True)  # LLM 원문 보관(선택, 압축)
     version = models.PositiveIntegerField(default=1)        # 버전관리(버튼 눌러 새로 생성 시 +1)
+    # 부분 재계획(gantt_replan): parent 대비 바뀐 태스크만 저장(is_delta) → 전체 태스크는 gantt_store.materialize_tasks
+    parent = models.ForeignKey("self", on_delete=models.CASCADE, null=True, blank=True, related_name="children")
+    is_delta = models.BooleanField(default=False)
     file_path = models.CharField(max_length=255, blank=True, null=True)  # 생성된 .xlsx 상대경로
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # 목록 ETag(list_api)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "created_at"], name="gantt_chart_project_created"),
+        ]
 
     def __str__(self):
         return f"Gantt v{self.version} - {self.project.title}"
@@ -192,8 +243,132 @@ class GanttTask(models.Model):
     order = models.PositiveIntegerField(default=0)            # 같은 파트 내 정렬
     notes = models.TextField(blank=True, null=True)
 
+    # 버전 간 같은 작업을 잇는 키(LLM 기능ID). 한 작업이 파트 수만큼 행을 가짐
+    task_key = models.CharField(max_length=64, blank=True, default="")
+    predecessors = models.JSONField(default=list, blank=True)  # 선행작업 task_key 목록
+    deleted = models.BooleanField(default=False)               # delta 버전에서 작업 삭제 표시(tombstone)
+
     class Meta:
         ordering = ["part", "order", "GanttTask"]
+        indexes = [
+            models.Index(fields=["gantt_chart", "task_key"], name="gantt_task_chart_key"),
+        ]
 
     def __str__(self):
         return f"[{self.part}] {self.feature_name}"
+
+
+# 내용 주소(SHA-256) 저장소: 동일 내용 산출물은 media/blobs/ 아래 1벌만 보관
+class Blob(models.Model):
+    Blob = models.AutoField(primary_key=True)
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField(default=0)
+    path = models.CharField(max_length=255)                 # MEDIA_ROOT 기준 blobs/ab/<sha256>
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_ref_at = models.DateTimeField(default=timezone.now)  # 마지막 참조 시각(GC 유예 판단)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size}B)"
+
+
+# 생성 산출물 레지스트리 (media/ 하위 파일 색인 — 디렉터리 glob 대신 조회)
+class Artifact(models.Model):
+    Artifact = models.AutoField(primary_key=True)
+
+    KIND_CHOICES = [
+        ('g1_json', 'G1 JSON'),
+        ('g1_xlsx', 'G1 XLSX'),
+        ('g2_json', 'G2 JSON'),
+        ('g2_xlsx', 'G2 XLSX'),
+        ('gantt_xlsx', '간트차트 XLSX'),
+        ('report_md', '유사도 보고서 MD'),
+        ('final_docx', '최종 개발문서 DOCX'),
+        ('main_docx', '섹션 본문(main) DOCX'),
+        ('idea_md', '아이디어 기획서 MD'),
+        ('idea_docx', '아이디어 기획서 DOCX'),
+        ('tools_json', '기술 스택 추천 JSON'),
+        ('tools_md', '기술 스택 추천 MD'),
+        ('code_zip', '코드 스캐폴드 ZIP'),
+    ]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name="artifacts")
+    user = models.ForeignKey(People, on_delete=models.SET_NULL, null=True, blank=True)  # 프로젝트 없는 산출물(아이디어) 소유자
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    ts = models.CharField(max_length=15, blank=True, default="")      # 파일명 타임스탬프 YYYYMMDD_HHMMSS
+    seq = models.PositiveIntegerField(null=True, blank=True)          # 아이디어 파일 번호(idea_plan_3 → 3)
+    rel_path = models.CharField(max_length=255, unique=True)          # MEDIA_ROOT 기준 상대경로
+    size = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default="")
+    blob = models.ForeignKey(Blob, on_delete=models.SET_NULL, null=True, blank=True, related_name="artifacts")
+    source_draft = models.ForeignKey(RequirementDraft, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at", "-Artifact"]
+        indexes = [
+            models.Index(fields=["project", "kind", "-created_at"], name="artifact_proj_kind_created"),
+            models.Index(fields=["project", "kind", "ts"], name="artifact_proj_kind_ts"),
+            models.Index(fields=["kind", "seq"], name="artifact_kind_seq"),
+        ]
+
+    def __str__(self):
+        return f"[{self.kind}] {self.rel_path}"
+
+
+# 사용자·프로젝트별 작은 상태값(최근 draft, 확정 ID 등) — 여러 서버가 공유 (session_state.py)
+class SessionState(models.Model):
+    SessionState = models.AutoField(primary_key=True)
+    user = models.ForeignKey(People, on_delete=models.CASCADE)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True)
+    key = models.CharField(max_length=50)
+    value = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "project", "key"], name="session_state_user_project_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}/{self.project_id}:{self.key}"
+
+
+# LLM 호출 1건 = 1행 (llm_telemetry가 비동기 일괄 저장, 관리자 대시보드에서 지연/토큰/오류율 집계)
+class LLMCall(models.Model):
+    PROVIDER_CHOICES = [("gemini", "Gemini"), ("oss", "gpt-oss/Ollama")]
+    OUTCOME_CHOICES = [
+        ("ok", "성공"),
+        ("rate_limited", "429"),
+        ("exhausted", "키 풀 고갈"),
+        ("error", "오류"),
+    ]
+
+    LLMCall = models.BigAutoField(primary_key=True)
+    # 비동기 저장 중 프로젝트가 지워져도 배치가 실패하지 않게 FK 제약 없이 보관
+    project = models.ForeignKey(Project, on_delete=models.DO_NOTHING, null=True, blank=True,
+                                db_constraint=False, related_name="+")
+    stage = models.CharField(max_length=80, blank=True, default="")       # URL 이름(gantt-generate 등) 또는 명시 단계
+    call_site = models.CharField(max_length=120, blank=True, default="")  # 호출 모듈.함수
+    provider = models.CharField(max_length=10, choices=PROVIDER_CHOICES)
+    model = models.CharField(max_length=80, blank=True, default="")
+    key_alias = models.CharField(max_length=80, blank=True, default="")   # Gemini 키 별칭 / OSS base URL
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    output_tokens = models.PositiveIntegerField(default=0)
+    latency_ms = models.PositiveIntegerField(default=0)
+    retries = models.PositiveSmallIntegerField(default=0)
+    rate_limited = models.PositiveSmallIntegerField(default=0)            # 이 호출 중 받은 429 수
+    cache_hit = models.BooleanField(default=False)                        # 카세트 재생 등 네트워크 없이 응답
+    outcome = models.CharField(max_length=15, choices=OUTCOME_CHOICES, default="ok")
+    error = models.CharField(max_length=200, blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at", "-LLMCall"]
+        indexes = [
+            models.Index(fields=["created_at"], name="llm_call_created"),
+            models.Index(fields=["stage", "created_at"], name="llm_call_stage_created"),
+            models.Index(fields=["project", "created_at"], name="llm_call_project_created"),
+        ]
+
+    def __str__(self):
+        return f"[{self.provider}] {self.stage or self.call_site} {self.latency_ms}ms {self.outcome}"
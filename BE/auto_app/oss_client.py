@@ -0,0 +1,533 @@
+# -*- coding: utf-8 -*-
+"""
+oss_client.py
+- gpt-oss/Ollama 등 OpenAI 호환 /v1/chat/completions 공용 클라이언트
+- keep-alive 세션(requests.Session + 커넥션 풀)으로 매 호출 TCP/TLS 재연결 제거
+- base URL별 헬스 상태 캐시: 죽은 엔드포인트는 쿨다운 동안 즉시 건너뜀
+  (프로세스 간에도 OSS_HEALTH_CACHE 파일로 공유 → CLI 재시작마다 전체 프로브하지 않음)
+- 선택: 헤지 요청(OSS_HEDGE=1) — 1순위가 OSS_HEDGE_DELAY 초 안에 끝나지 않으면 2순위에도 동시 요청, 먼저 온 응답 사용
+- 엔드포인트별 지연(p50/p95/EWMA)·처리량(토큰/초) 지표: snapshot()
+- chat() 1건마다 llm_telemetry에 기록(Django 안에서 쓸 때만; 단독 스크립트는 건너뜀)
+
+환경변수:
+  GPT_OSS_API_BASE, OLLAMA_API_BASE  후보 base URL (없으면 localhost:11434/v1, localhost:8000/v1)
+  GPT_OSS_MODEL, OLLAMA_MODEL        모델명(기본 llama3.1:8b)
+  OSS_POOL_SIZE       base당 keep-alive 커넥션 수(기본 8)
+  OSS_TIMEOUT         요청 타임아웃 초(기본 240)
+  OSS_HEALTH_TTL      정상 판정 캐시 초(기본 60)
+  OSS_DEAD_COOLDOWN   실패 판정 후 건너뛸 초(기본 30)
+  OSS_HEALTH_CACHE    헬스 캐시 파일(기본 <tmp>/autoplan_oss_health.json, "off"면 미사용)
+  OSS_HEDGE / OSS_HEDGE_DELAY  헤지 사용 여부(기본 0) / 지연 초(기본 3)
+
+로컬 가짜 서버로 시험:
+  python oss_client.py fake --port 8001 --latency 0.2
+  python oss_client.py fake --port 8002 --latency 1.5
+  GPT_OSS_API_BASE=http://127.0.0.1:8001/v1 OLLAMA_API_BASE=http://127.0.0.1:8002/v1 \\
+    python oss_client.py bench -n 20 -c 4 --hedge
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+__all__ = [
+    "OSSUnavailable",
+    "OSSClient",
+    "get_client",
+    "reset_client",
+    "candidate_bases",
+    "default_model",
+    "serve_fake",
+]
+
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def candidate_bases() -> List[str]:
+    bases: List[str] = []
+    for k in ("GPT_OSS_API_BASE", "OLLAMA_API_BASE"):
+        v = (os.getenv(k) or "").strip().rstrip("/")
+        if v and v not in bases:
+            bases.append(v)
+    return bases or ["http://localhost:11434/v1", "http://localhost:8000/v1"]
+
+
+def default_model() -> str:
+    return os.getenv("GPT_OSS_MODEL") or os.getenv("OLLAMA_MODEL") or "llama3.1:8b"
+
+
+class OSSUnavailable(RuntimeError):
+    """모든 후보 엔드포인트 실패."""
+
+
+class _HTTPStatusError(RuntimeError):
+    def __init__(self, status: int, text: str):
+        super().__init__(f"HTTP {status}: {text[:200]}")
+        self.status = status
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 엔드포인트 상태/지표
+# ──────────────────────────────────────────────────────────────────────────────
+class _Endpoint:
+    def __init__(self, base: str):
+        self.base = base
+        self.healthy: Optional[bool] = None     # None = 아직 모름
+        self.checked_at = 0.0
+        self.down_until = 0.0
+        self.consecutive_errors = 0
+        self.inflight = 0
+        self.ewma = 0.0
+        self.latencies = deque(maxlen=200)
+        self.calls = 0
+        self.errors = 0
+        self.tokens = 0
+        self.chars = 0
+        self.busy_sec = 0.0
+        self.last_error = ""
+
+    def usable(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def rank(self) -> Tuple[int, float, int]:
+        # 정상 확인된 것 → 미확인 순, 그 안에서 평균 지연·동시 처리 수가 작은 순
+        return (0 if self.healthy else 1, self.ewma or 0.0, self.inflight)
+
+    def ok(self, elapsed: float, tokens: int, chars: int) -> None:
+        self.healthy = True
+        self.checked_at = time.time()
+        self.consecutive_errors = 0
+        self.calls += 1
+        self.tokens += tokens
+        self.chars += chars
+        self.busy_sec += elapsed
+        self.latencies.append(elapsed)
+        self.ewma = elapsed if not self.ewma else 0.7 * self.ewma + 0.3 * elapsed
+
+    def fail(self, err: str, dead: bool, cooldown: float) -> None:
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.last_error = err[:200]
+        if dead:
+            self.healthy = False
+            self.checked_at = time.time()
+            self.down_until = time.time() + cooldown
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        lat = sorted(self.latencies)
+
+        def _q(p: float) -> Optional[float]:
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))], 3) if lat else None
+
+        return {
+            "base": self.base,
+            "healthy": self.healthy,
+            "down_sec": round(max(0.0, self.down_until - now), 1),
+            "inflight": self.inflight,
+            "calls": self.calls,
+            "errors": self.errors,
+            "p50_sec": _q(0.5),
+            "p95_sec": _q(0.95),
+            "ewma_sec": round(self.ewma, 3) if self.ewma else None,
+            "tokens": self.tokens,
+            "tokens_per_sec": round(self.tokens / self.busy_sec, 1) if self.busy_sec else None,
+            "chars_per_sec": round(self.chars / self.busy_sec, 1) if self.busy_sec else None,
+            "last_error": self.last_error or None,
+        }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 클라이언트
+# ──────────────────────────────────────────────────────────────────────────────
+class OSSClient:
+    def __init__(self, bases: Optional[List[str]] = None, model: Optional[str] = None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.bases = [b.rstrip("/") for b in (bases or candidate_bases())]
+        self.model = model or default_model()
+        self.timeout = _env_num("OSS_TIMEOUT", 240)
+        self.health_ttl = _env_num("OSS_HEALTH_TTL", 60)
+        self.dead_cooldown = _env_num("OSS_DEAD_COOLDOWN", 30)
+        self.hedge = os.getenv("OSS_HEDGE", "0").strip().lower() in ("1", "true", "yes", "on")
+        self.hedge_delay = _env_num("OSS_HEDGE_DELAY", 3.0)
+        cache = os.getenv("OSS_HEALTH_CACHE") or os.path.join(tempfile.gettempdir(), "autoplan_oss_health.json")
+        self.health_cache = None if cache.lower() == "off" else cache
+
+        pool = int(_env_num("OSS_POOL_SIZE", 8))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(1, len(self.bases)), pool_maxsize=max(1, pool), max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._eps: Dict[str, _Endpoint] = {b: _Endpoint(b) for b in self.bases}
+        self._executor = ThreadPoolExecutor(max_workers=max(2, pool), thread_name_prefix="oss-hedge")
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+        self._load_health()
+
+    # ---------------- 헬스 캐시 ----------------
+    def _load_health(self) -> None:
+        if not self.health_cache:
+            return
+        try:
+            with open(self.health_cache, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        now = time.time()
+        for base, st in (data or {}).items():
+            ep = self._eps.get(base)
+            if ep is None or now - float(st.get("checked_at", 0)) > self.health_ttl:
+                continue
+            ep.healthy = bool(st.get("healthy"))
+            ep.checked_at = float(st.get("checked_at", 0))
+            ep.down_until = float(st.get("down_until", 0))
+
+    def _save_health(self) -> None:
+        if not self.health_cache:
+            return
+        with self._lock:
+            data = {
+                b: {"healthy": ep.healthy, "checked_at": ep.checked_at, "down_until": ep.down_until}
+                for b, ep in self._eps.items() if ep.healthy is not None
+            }
+        try:
+            tmp = f"{self.health_cache}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.health_cache)
+        except Exception:
+            pass
+
+    def probe(self, base: str, timeout: float = 3.0) -> bool:
+        """GET {base}/models 로 생존 확인하고 캐시에 반영."""
+        ep = self._eps[base]
+        try:
+            r = self.session.get(f"{base}/models", timeout=timeout)
+            alive = r.status_code == 200
+            err = "" if alive else f"HTTP {r.status_code}"
+        except Exception as e:
+            alive, err = False, f"{type(e).__name__}: {e}"
+        with self._lock:
+            ep.healthy = alive
+            ep.checked_at = time.time()
+            ep.down_until = 0.0 if alive else time.time() + self.dead_cooldown
+            if err:
+                ep.last_error = err[:200]
+        self._save_health()
+        return alive
+
+    def health(self, force: bool = False) -> Dict[str, Optional[bool]]:
+        """캐시가 유효하면 그대로, 만료/미확인 엔드포인트만 프로브."""
+        now = time.time()
+        for base, ep in self._eps.items():
+            if force or ep.healthy is None or now - ep.checked_at > self.health_ttl:
+                self.probe(base)
+        return {b: ep.healthy for b, ep in self._eps.items()}
+
+    def _ordered(self) -> List[_Endpoint]:
+        now = time.time()
+        with self._lock:
+            live = [ep for ep in self._eps.values() if ep.usable(now)]
+            if not live:
+                # 전부 쿨다운 중이면 가장 먼저 풀리는 것부터 다시 시도
+                live = sorted(self._eps.values(), key=lambda e: e.down_until)
+            return sorted(live, key=lambda e: e.rank())
+
+    # ---------------- 호출 ----------------
+    def _post(self, ep: _Endpoint, payload: Dict[str, Any], timeout: float,
+              meta: Optional[Dict[str, Any]] = None) -> str:
+        import requests
+
+        with self._lock:
+            ep.inflight += 1
+        t0 = time.monotonic()
+        try:
+            resp = self.session.post(f"{ep.base}/chat/completions", json=payload, timeout=timeout)
+            if resp.status_code != 200:
+                raise _HTTPStatusError(resp.status_code, resp.text)
+            data = resp.json()
+            text = ((data.get("choices") or [{}])[0].get("message") or {}).get("content", "") or ""
+            usage = data.get("usage") or {}
+            tokens = int(usage.get("completion_tokens") or 0)
+            with self._lock:
+                ep.ok(time.monotonic() - t0, tokens, len(text))
+            if meta is not None:
+                meta.update(base=ep.base, prompt_tokens=int(usage.get("prompt_tokens") or 0), output_tokens=tokens)
+            return text
+        except requests.ConnectionError as e:
+            # 연결 자체가 안 됨(ConnectTimeout 포함) → 쿨다운 동안 건너뜀
+            with self._lock:
+                ep.fail(f"{type(e).__name__}: {e}", dead=True, cooldown=self.dead_cooldown)
+            self._save_health()
+            raise
+        except requests.Timeout as e:
+            # 응답이 느린 것(ReadTimeout)은 살아 있는 것으로 보고 상태만 기록
+            with self._lock:
+                ep.fail(f"{type(e).__name__}: {e}", dead=False, cooldown=0)
+            raise
+        except Exception as e:
+            with self._lock:
+                ep.fail(f"{type(e).__name__}: {e}", dead=False, cooldown=0)
+            raise
+        finally:
+            with self._lock:
+                ep.inflight -= 1
+
+    def _call_one(self, ep: _Endpoint, payload: Dict[str, Any], timeout: float,
+                  max_retries: int, base_backoff: float, meta: Optional[Dict[str, Any]] = None) -> str:
+        """한 엔드포인트에 429/5xx만 백오프 재시도. 연결 실패는 즉시 포기(다음 엔드포인트로)."""
+        import requests
+
+        meta = {} if meta is None else meta
+        for attempt in range(1, max_retries + 1):
+            meta["attempts"] = meta.get("attempts", 0) + 1
+            try:
+                return self._post(ep, payload, timeout, meta)
+            except (requests.ConnectionError, requests.Timeout):
+                raise
+            except _HTTPStatusError as e:
+                if e.status == 429:
+                    meta["rate_limited"] = meta.get("rate_limited", 0) + 1
+                if e.status not in _RETRY_STATUS or attempt == max_retries:
+                    raise
+                sleep_s = min(base_backoff * (2 ** (attempt - 1)), 8.0)
+                print(f"[retry][oss] base={ep.base} model={payload.get('model')} attempt={attempt}/{max_retries} http={e.status} sleep={sleep_s}s")
+                time.sleep(sleep_s)
+        raise OSSUnavailable(f"{ep.base}: retries exhausted")
+
+    def chat(self, messages: List[Dict[str, Any]], *, model: Optional[str] = None, temperature: float = 0.1,
+             timeout: Optional[float] = None, hedge: Optional[bool] = None,
+             max_retries: int = 5, base_backoff: float = 1.0) -> str:
+        payload = {"model": model or self.model, "messages": messages, "temperature": temperature}
+        timeout = timeout or self.timeout
+        order = self._ordered()
+        use_hedge = self.hedge if hedge is None else hedge
+        meta: Dict[str, Any] = {}
+        t0 = time.perf_counter()
+        err: Optional[BaseException] = None
+        try:
+            if use_hedge and len(order) >= 2:
+                return self._hedged(order, payload, timeout, max_retries, base_backoff, meta)
+            return self._failover(order, payload, timeout, max_retries, base_backoff, meta=meta)
+        except BaseException as e:
+            err = e
+            raise
+        finally:
+            self._emit(payload["model"], meta, time.perf_counter() - t0, err)
+
+    @staticmethod
+    def _emit(model: str, meta: Dict[str, Any], elapsed: float, err: Optional[BaseException]) -> None:
+        try:
+            from . import llm_telemetry
+        except ImportError:  # 단독 스크립트 실행
+            return
+        if err is None:
+            outcome = "ok"
+        elif meta.get("rate_limited") and meta.get("rate_limited") >= meta.get("attempts", 0):
+            outcome = "rate_limited"
+        else:
+            outcome = "error"
+        llm_telemetry.emit(
+            "oss",
+            model=model,
+            key_alias=meta.get("base", ""),
+            prompt_tokens=meta.get("prompt_tokens", 0),
+            output_tokens=meta.get("output_tokens", 0),
+            latency_sec=elapsed,
+            retries=max(0, meta.get("attempts", 1) - 1),
+            rate_limited=meta.get("rate_limited", 0),
+            outcome=outcome,
+            error="" if err is None else f"{type(err).__name__}: {err}",
+        )
+
+    def _failover(self, order: List[_Endpoint], payload: Dict[str, Any], timeout: float,
+                  max_retries: int, base_backoff: float, last: Optional[BaseException] = None,
+                  meta: Optional[Dict[str, Any]] = None) -> str:
+        for ep in order:
+            try:
+                return self._call_one(ep, payload, timeout, max_retries, base_backoff, meta)
+            except Exception as e:
+                last = e
+                print(f"[oss] base={ep.base} failed: {type(e).__name__}: {str(e)[:160]} → next")
+        raise OSSUnavailable(f"gpt-oss 호출 실패: {last}")
+
+    def _hedged(self, order: List[_Endpoint], payload: Dict[str, Any], timeout: float,
+                max_retries: int, base_backoff: float, meta: Optional[Dict[str, Any]] = None) -> str:
+        # 두 요청이 동시에 돌므로 텔레메트리 meta는 요청별로 따로 두고, 채택된 쪽만 합침
+        # (헤지 요청은 재시도가 아님 → 둘 다 실패하면 1순위 것만 합침, 헤지 횟수는 snapshot의 hedges_fired)
+        meta = {} if meta is None else meta
+        primary, secondary = order[0], order[1]
+        m1: Dict[str, Any] = {}
+        f1 = self._executor.submit(self._call_one, primary, payload, timeout, max_retries, base_backoff, m1)
+        wait([f1], timeout=self.hedge_delay)
+        if f1.done():
+            self._merge_meta(meta, m1)
+            if f1.exception() is None:
+                return f1.result()
+            # 1순위가 바로 실패 → 헤지 없이 나머지로 순차 전환
+            return self._failover(order[1:], payload, timeout, max_retries, base_backoff, f1.exception(), meta)
+
+        # 1순위가 hedge_delay 안에 끝나지 않음 → 2순위에도 동시 요청, 먼저 성공한 쪽 사용
+        m2: Dict[str, Any] = {}
+        f2 = self._executor.submit(self._call_one, secondary, payload, timeout, max_retries, base_backoff, m2)
+        with self._lock:
+            self.hedges_fired += 1
+        owner = {f1: (primary, m1), f2: (secondary, m2)}
+        pending, last = {f1, f2}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    ep, won = owner[f]
+                    if ep is secondary:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    self._merge_meta(meta, won)
+                    return f.result()
+                last = f.exception()
+        self._merge_meta(meta, m1)
+        return self._failover(order[2:], payload, timeout, max_retries, base_backoff, last, meta)
+
+    @staticmethod
+    def _merge_meta(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+        """요청 1건의 meta를 호출 전체 meta에 합침(시도/429는 누적, 나머지는 덮어씀)."""
+        for key, val in src.items():
+            if key in ("attempts", "rate_limited"):
+                dst[key] = dst.get(key, 0) + val
+            else:
+                dst[key] = val
+
+    # ---------------- 지표 ----------------
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            return {
+                "model": self.model,
+                "hedge": self.hedge,
+                "hedges_fired": self.hedges_fired,
+                "hedge_wins": self.hedge_wins,
+                "endpoints": [ep.snapshot(now) for ep in self._eps.values()],
+            }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 싱글턴
+# ──────────────────────────────────────────────────────────────────────────────
+_client: Optional[OSSClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OSSClient:
+    """환경변수(base 후보/모델)가 바뀌면 새로 만든다."""
+    global _client
+    bases, model = candidate_bases(), default_model()
+    with _client_lock:
+        if _client is None or _client.bases != bases or _client.model != model:
+            _client = OSSClient(bases, model)
+        return _client
+
+
+def reset_client() -> None:
+    global _client
+    with _client_lock:
+        _client = None
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 로컬 가짜 OpenAI 호환 서버(시험/벤치용)
+# ──────────────────────────────────────────────────────────────────────────────
+def serve_fake(port: int, latency: float = 0.2, fail_rate: float = 0.0, host: str = "127.0.0.1"):
+    """GET /v1/models, POST /v1/chat/completions 만 흉내내는 서버. (ThreadingHTTPServer 반환, serve_forever는 호출자)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, obj: Dict[str, Any]) -> None:
+            body = json.dumps(obj).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send(200, {"object": "list", "data": [{"id": "fake"}]})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            req = json.loads(self.rfile.read(n) or b"{}")
+            time.sleep(latency)
+            if random.random() < fail_rate:
+                self._send(503, {"error": "injected"})
+                return
+            last = ((req.get("messages") or [{}])[-1].get("content") or "")
+            text = f"echo[{port}]: {last[:80]}"
+            self._send(200, {
+                "id": "fake", "object": "chat.completion", "model": req.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(last) // 4, "completion_tokens": len(text) // 4},
+            })
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def _main() -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="OpenAI 호환 풀 클라이언트 시험 도구")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    f = sub.add_parser("fake", help="가짜 OpenAI 호환 서버 실행")
+    f.add_argument("--port", type=int, default=8001)
+    f.add_argument("--latency", type=float, default=0.2)
+    f.add_argument("--fail-rate", type=float, default=0.0)
+    b = sub.add_parser("bench", help="현재 환경변수의 엔드포인트로 부하 측정")
+    b.add_argument("-n", type=int, default=20)
+    b.add_argument("-c", type=int, default=4)
+    b.add_argument("--hedge", action="store_true")
+    args = ap.parse_args()
+
+    if args.cmd == "fake":
+        srv = serve_fake(args.port, args.latency, args.fail_rate)
+        print(f"🧪 fake OpenAI server http://127.0.0.1:{args.port}/v1 latency={args.latency}s fail_rate={args.fail_rate}")
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    client = get_client()
+    print(f"[status] health={client.health()}")
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.c) as ex:
+        list(ex.map(lambda i: client.chat([{"role": "user", "content": f"ping {i}"}], hedge=args.hedge), range(args.n)))
+    wall = time.monotonic() - t0
+    print(json.dumps(client.snapshot(), ensure_ascii=False, indent=2))
+    print(f"[bench] n={args.n} c={args.c} wall={wall:.2f}s rps={args.n / wall:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+plan_mapreduce.py
+- 긴 기획서를 섹션 단위로 잘라 세그먼트(최대 글자 수 제한)로 묶는다
+- 세그먼트별 추출 결과(기능 목록)를 로컬에서 병합/중복 제거한다
+- G2 정제용: 기능 묶음과 관련도가 높은 세그먼트만 골라 프롬프트 컨텍스트를 만든다
+- LLM 호출은 하지 않는다(gemini_parserv2 / gemini_refiner에서 사용)
+"""
+
+import contextvars
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+__all__ = [
+    "plan_segment_chars",
+    "plan_map_workers",
+    "split_plan_sections",
+    "run_segments_parallel",
+    "feature_key",
+    "fill_missing_fields",
+    "merge_feature_lists",
+    "renumber_features",
+    "select_relevant_segments",
+]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 설정 (.env로 조정)
+# ──────────────────────────────────────────────────────────────────────────────
+def plan_segment_chars() -> int:
+    """세그먼트 1개의 최대 글자 수. 원문이 이보다 길면 맵-리듀스 모드로 전환."""
+    try:
+        return max(2000, int(os.getenv("PLAN_SEGMENT_CHARS", "12000")))
+    except ValueError:
+        return 12000
+
+
+def plan_map_workers() -> int:
+    """세그먼트 병렬 호출 수(스레드)."""
+    try:
+        return max(1, int(os.getenv("PLAN_MAP_WORKERS", "4")))
+    except ValueError:
+        return 4
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 섹션 분할
+# ──────────────────────────────────────────────────────────────────────────────
+# 제목 줄로 볼 패턴: 마크다운 헤더, "1. / 1.2 / 1)", "제1장", 로마숫자, 기호 목록, [제목]
+_HEADING_RE = re.compile(
+    r"^\s*(?:"
+    r"#{1,6}\s+\S"
+    r"|\d+(?:\.\d+)*[.)]\s+\S"
+    r"|제\s*\d+\s*[장절조편부]"
+    r"|[IVX]{1,5}\.\s+\S"
+    r"|[■□◆◇●○▶▣※]\s*\S"
+    r"|\[[^\]\n]{1,40}\]\s*$"
+    r")"
+)
+
+
+def _split_sections(text: str) -> List[str]:
+    """제목 줄 기준으로 섹션 리스트를 만든다(제목 줄은 해당 섹션의 첫 줄)."""
+    sections: List[List[str]] = [[]]
+    for line in text.splitlines():
+        if _HEADING_RE.match(line) and any(s.strip() for s in sections[-1]):
+            sections.append([])
+        sections[-1].append(line)
+    return ["\n".join(s).strip() for s in sections if any(x.strip() for x in s)]
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    """한 섹션이 max_chars보다 크면 문단 → 줄 → 강제 절단 순으로 나눈다.
+    나뉜 조각 앞에는 섹션 제목을 '(이어서)'로 붙여 문맥을 유지한다."""
+    if len(section) <= max_chars:
+        return [section]
+
+    title = section.splitlines()[0].strip()[:80]
+    prefix = f"(이어서) {title}\n"
+    budget = max(500, max_chars - len(prefix))
+
+    units: List[str] = []
+    for para in re.split(r"\n\s*\n", section):
+        if len(para) <= budget:
+            units.append(para)
+            continue
+        for line in para.splitlines():
+            while len(line) > budget:
+                units.append(line[:budget])
+                line = line[budget:]
+            units.append(line)
+
+    pieces: List[str] = []
+    buf = ""
+    for u in units:
+        cand = f"{buf}\n{u}" if buf else u
+        if len(cand) > budget and buf:
+            pieces.append(buf)
+            buf = u
+        else:
+            buf = cand
+    if buf.strip():
+        pieces.append(buf)
+
+    return [pieces[0]] + [prefix + p for p in pieces[1:]]
+
+
+def split_plan_sections(plan_text: str, max_chars: Optional[int] = None) -> List[str]:
+    """
+    기획서 원문을 섹션 경계에 맞춰 max_chars 이하 세그먼트로 묶는다.
+    - 작은 섹션은 순서대로 이어 붙여 호출 수를 줄임
+    - 큰 섹션은 문단/줄 단위로 분할
+    - 원문 손실 없음(잘라내지 않음)
+    """
+    max_chars = max_chars or plan_segment_chars()
+    text = (plan_text or "").strip()
+    if not text:
+        return []
+    if len(text) <= max_chars:
+        return [text]
+
+    segments: List[str] = []
+    buf = ""
+    for sec in _split_sections(text):
+        for piece in _split_oversized(sec, max_chars):
+            cand = f"{buf}\n\n{piece}" if buf else piece
+            if len(cand) > max_chars and buf:
+                segments.append(buf)
+                buf = piece
+            else:
+                buf = cand
+    if buf.strip():
+        segments.append(buf)
+    return segments
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 병렬 실행 (map)
+# ──────────────────────────────────────────────────────────────────────────────
+def run_segments_parallel(
+    fn: Callable[[int, Any], Any],
+    items: List[Any],
+    max_workers: Optional[int] = None,
+) -> Tuple[List[Any], List[Tuple[int, Exception]]]:
+    """
+    items 각각에 fn(index, item)을 스레드풀로 실행(호출 스레드의 contextvars 유지 → LLM 텔레메트리 stage/project).
+    반환: (입력 순서대로 정렬된 결과 리스트(실패는 None), [(index, 예외), ...])
+    """
+    results: List[Any] = [None] * len(items)
+    errors: List[Tuple[int, Exception]] = []
+    workers = max(1, min(max_workers or plan_map_workers(), len(items) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futs = {ex.submit(contextvars.copy_context().run, fn, i, item): i for i, item in enumerate(items)}
+        for fut in as_completed(futs):
+            i = futs[fut]
+            try:
+                results[i] = fut.result()
+            except Exception as e:
+                errors.append((i, e))
+    errors.sort(key=lambda x: x[0])
+    return results, errors
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 병합/중복 제거 (reduce)
+# ──────────────────────────────────────────────────────────────────────────────
+_KEY_STRIP_RE = re.compile(r"[\s\W_]+", re.UNICODE)
+
+
+def feature_key(feature: Dict[str, Any]) -> str:
+    """중복 판정용 키: 기능명을 소문자화하고 공백/기호를 제거."""
+    if not isinstance(feature, dict):
+        return ""
+    name = feature.get("기능명") or feature.get("feature_name") or ""
+    return _KEY_STRIP_RE.sub("", str(name).lower())
+
+
+def _is_empty(v: Any) -> bool:
+    return v is None or v == "" or v == [] or v == {}
+
+
+def fill_missing_fields(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    """dst의 빈 필드를 src 값으로 채운다(1단계 하위 dict까지). 리스트는 합집합."""
+    for k, v in src.items():
+        if k == "기능ID":
+            continue
+        cur = dst.get(k)
+        if _is_empty(cur):
+            dst[k] = v
+        elif isinstance(cur, dict) and isinstance(v, dict):
+            for sk, sv in v.items():
+                if _is_empty(cur.get(sk)):
+                    cur[sk] = sv
+        elif isinstance(cur, list) and isinstance(v, list):
+            for item in v:
+                if item not in cur:
+                    cur.append(item)
+
+
+def merge_feature_lists(groups: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """세그먼트별 기능 목록을 순서대로 합치며 기능명 기준 중복을 병합한다."""
+    merged: List[Dict[str, Any]] = []
+    index: Dict[str, Dict[str, Any]] = {}
+    for group in groups:
+        for feat in group or []:
+            if not isinstance(feat, dict):
+                continue
+            key = feature_key(feat)
+            if key and key in index:
+                fill_missing_fields(index[key], feat)
+                continue
+            item = dict(feat)
+            merged.append(item)
+            if key:
+                index[key] = item
+    return merged
+
+
+def renumber_features(features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """기능ID를 FEAT-001부터 다시 매긴다(세그먼트별 ID 충돌 방지)."""
+    for i, feat in enumerate(features, start=1):
+        feat["기능ID"] = f"FEAT-{i:03d}"
+    return features
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# G2용: 기능 묶음과 관련된 세그먼트 선택
+# ──────────────────────────────────────────────────────────────────────────────
+_TOKEN_RE = re.compile(r"[0-9a-z가-힣]{2,}")
+
+
+def _tokens(text: str) -> set:
+    return set(_TOKEN_RE.findall((text or "").lower()))
+
+
+def _feature_text(feature: Dict[str, Any]) -> str:
+    if not isinstance(feature, dict):
+        return str(feature)
+    desc = feature.get("기능설명") or {}
+    parts = [str(feature.get("기능명") or "")]
+    if isinstance(desc, dict):
+        parts += [str(desc.get("목적") or ""), str(desc.get("핵심역할") or "")]
+    return " ".join(parts)
+
+
+def select_relevant_segments(
+    segments: List[str],
+    features: List[Dict[str, Any]],
+    budget_chars: Optional[int] = None,
+) -> str:
+    """
+    features와 토큰이 많이 겹치는 세그먼트를 budget_chars 안에서 고른 뒤
+    원문 순서대로 이어 붙여 반환한다.
+    """
+    budget_chars = budget_chars or plan_segment_chars()
+    want = set()
+    for f in features:
+        want |= _tokens(_feature_text(f))
+
+    scored = []
+    for i, seg in enumerate(segments):
+        overlap = len(want & _tokens(seg))
+        scored.append((overlap, -i, i))
+    scored.sort(reverse=True)
+
+    picked: List[int] = []
+    used = 0
+    for overlap, _neg, i in scored:
+        seg_len = len(segments[i])
+        if picked and (overlap == 0 or used + seg_len > budget_chars):
+            continue
+        picked.append(i)
+        used += seg_len
+
+    return "\n\n".join(segments[i] for i in sorted(picked))
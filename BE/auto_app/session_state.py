@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+session_state.py
+- (사용자, 프로젝트, 키) 단위의 작은 상태값 저장소 (예: 최근 사용 draft, 확정 Requirement ID 목록)
+- 여러 앱 서버/컨테이너가 같은 값을 보도록 공유 저장소 사용
+
+SESSION_STATE_BACKEND:
+  "db"    (기본) SessionState 테이블
+  "cache" Django 캐시(CACHES["default"]가 Redis/Memcached 등 공유 캐시일 때만 의미 있음)
+SESSION_STATE_TTL: cache 백엔드 만료(초, 기본 30일)
+"""
+
+import os
+from typing import Any, Optional
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import SessionState
+
+__all__ = [
+    "get_state",
+    "set_state",
+]
+
+
+def _backend() -> str:
+    return os.getenv("SESSION_STATE_BACKEND", "db").strip().lower()
+
+
+def _ttl() -> int:
+    try:
+        return int(os.getenv("SESSION_STATE_TTL", str(30 * 24 * 3600)))
+    except ValueError:
+        return 30 * 24 * 3600
+
+
+def _uid(user) -> Optional[int]:
+    return getattr(user, "pk", None)
+
+
+def _pid(project) -> Optional[int]:
+    return getattr(project, "pk", project)
+
+
+def _cache_key(user, project, key: str) -> str:
+    return f"session_state:{_uid(user)}:{_pid(project) or '-'}:{key}"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 조회/저장
+# ──────────────────────────────────────────────────────────────────────────────
+def get_state(user, project, key: str, default: Any = None) -> Any:
+    if _backend() == "cache":
+        val = cache.get(_cache_key(user, project, key))
+        return default if val is None else val
+    row = (
+        SessionState.objects
+        .filter(user_id=_uid(user), project_id=_pid(project), key=key)
+        .values_list("value", flat=True)
+        .first()
+    )
+    return default if row is None else row
+
+
+def set_state(user, project, key: str, value: Any) -> None:
+    if _backend() == "cache":
+        cache.set(_cache_key(user, project, key), value, _ttl())
+        return
+    flt = {"user_id": _uid(user), "project_id": _pid(project), "key": key}
+    if SessionState.objects.filter(**flt).update(value=value, updated_at=timezone.now()):
+        return
+    try:
+        with transaction.atomic():
+            SessionState.objects.create(value=value, **flt)
+    except IntegrityError:
+        # 동시 생성 경합: 다른 워커가 먼저 만든 행을 갱신
+        SessionState.objects.filter(**flt).update(value=value, updated_at=timezone.now())
+
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+similar_store.py
+- SimilarProject 쓰기 단일 경로: (project, repo_url) 유니크 제약 + bulk_create(update_conflicts=True) 업서트
+  → 추천 결과 저장이 INSERT ... ON DUPLICATE KEY UPDATE(MySQL) / ON CONFLICT(PostgreSQL·SQLite) 한 문장
+  → 같은 저장소를 다시 저장해도 행이 늘지 않음(기존: 호출마다 같은 repo가 계속 쌓임)
+- 아이디어 유사맵(build_similar_map 결과)도 여기서 행으로 펼쳐 저장
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import connection, transaction
+
+from .models import SimilarProject
+
+__all__ = [
+    "rows_from_similar_map",
+    "upsert_similar_projects",
+]
+
+_NAME_MAX = SimilarProject._meta.get_field("repo_name").max_length
+_LANG_MAX = SimilarProject._meta.get_field("language").max_length
+_URL_MAX = SimilarProject._meta.get_field("repo_url").max_length
+
+# 업서트 시 갱신할 컬럼(created_at은 최초 저장 시각 유지, updated_at은 목록 ETag용)
+_UPDATE_FIELDS = ["repo_name", "language", "stars", "similarity_score", "updated_at"]
+
+
+def _norm_url(url: str) -> str:
+    return (url or "").strip().rstrip("/")
+
+
+def rows_from_similar_map(similar_map: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    {기능: [{"keyword", "repos": [{name, full_name, url, stars, desc}, ...]}, ...]} → 저장용 행 목록.
+    예전 형식(repos가 "owner/repo" 문자열 목록)도 허용.
+    """
+    rows = []
+    for entries in (similar_map or {}).values():
+        for entry in entries or []:
+            for repo in (entry or {}).get("repos", []) or []:
+                if isinstance(repo, dict):
+                    full = repo.get("full_name") or repo.get("name") or ""
+                    url = repo.get("url") or (f"https://github.com/{full}" if full else "")
+                    stars = repo.get("stars") or 0
+                else:
+                    full = str(repo)
+                    url = f"https://github.com/{full}"
+                    stars = 0
+                if full and url:
+                    rows.append({"repo_name": full, "repo_url": url, "stars": stars})
+    return rows
+
+
+def upsert_similar_projects(
+    project,
+    rows: Iterable[Dict[str, Any]],
+    update_score: bool = True,
+    prune: bool = False,
+) -> int:
+    """
+    rows: [{"repo_name", "repo_url", "language"?, "stars"?, "similarity_score"?}, ...]
+    - 같은 URL이 여러 번 오면 점수(→스타)가 높은 쪽 하나만 저장
+    - update_score=False: 이미 있는 행의 similarity_score는 건드리지 않음
+      (아이디어 유사맵처럼 점수 없이 저장하는 경로가 G3 점수를 0으로 덮어쓰지 않도록)
+    - prune=True: rows에 없는 이 프로젝트의 기존 행 삭제(G3 재추천 = 목록 교체)
+    반환: 업서트한 행 수
+    """
+    best: Dict[str, SimilarProject] = {}
+    for r in rows:
+        url = _norm_url(r.get("repo_url", ""))[:_URL_MAX]
+        if not url:
+            continue
+        obj = SimilarProject(
+            project=project,
+            repo_name=str(r.get("repo_name") or url.rsplit("/", 1)[-1])[:_NAME_MAX],
+            repo_url=url,
+            language=str(r.get("language") or "")[:_LANG_MAX],
+            stars=int(r.get("stars") or 0),
+            similarity_score=float(r.get("similarity_score") or 0.0),
+        )
+        prev = best.get(url)
+        if prev is None or (obj.similarity_score, obj.stars) > (prev.similarity_score, prev.stars):
+            best[url] = obj
+
+    update_fields = list(_UPDATE_FIELDS) if update_score else [f for f in _UPDATE_FIELDS if f != "similarity_score"]
+    kwargs: Dict[str, Optional[List[str]]] = {"update_conflicts": True, "update_fields": update_fields}
+    # MySQL(ON DUPLICATE KEY UPDATE)은 충돌 대상 컬럼을 지정할 수 없음
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["project", "repo_url"]
+
+    with transaction.atomic():
+        if best:
+            SimilarProject.objects.bulk_create(list(best.values()), **kwargs)
+        if prune:
+            SimilarProject.objects.filter(project=project).exclude(repo_url__in=list(best)).delete()
+    return len(best)
@@ -3,17 +3,13 @@
 import os
 import json
 import glob
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
-from dotenv import load_dotenv
+
+from .gemini_pool import gemini_model
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 환경 변수 로드 및 Gemini 설정
+# 환경 변수/Gemini: 키는 gemini_pool이 첫 호출 때 로드(GEMINI_API_KEY_3 우선)
+# sklearn/SDK는 analyze_similarity 실행 시에만 import(서버 기동·autoreload 시간 절약)
 # ─────────────────────────────────────────────────────────────────────────────
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY_3"))
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 유틸: 최신 features_*.json 찾기
@@ -92,7 +88,9 @@ def analyze_similarity_with_gemini(plan_text, repo_readme, repo_name):
 * 
 * 
 """
-    model = genai.GenerativeModel("gemini-2.5-flash")
+    from google.generativeai.types import GenerationConfig
+
+    model = gemini_model("gemini-2.5-flash", prefer="GEMINI_API_KEY_3")
     try:
         response = model.generate_content(
             prompt, generation_config=GenerationConfig(temperature=0.2)
@@ -106,6 +104,9 @@ def analyze_similarity_with_gemini(plan_text, repo_readme, repo_name):
 # ─────────────────────────────────────────────────────────────────────────────
 def analyze_similarity():
     """TF-IDF + 코사인 유사도 기반 Top3 선정 + 심층 분석. 결과는 analysis_report.md 로 항상 저장."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
     plan_text, repos_data = load_data()
     if not plan_text or not repos_data:
         # 그래도 빈 레포트는 남겨 사용자에게 신호를 주자
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+storage_backend.py
+- 생성 산출물 저장소 추상화: 로컬 디스크(MEDIA_ROOT) / S3 호환(AWS S3, MinIO 등)
+- 생산자(G1/G2 엑셀, 간트, 최종 문서, 아이디어, ZIP)는 지금처럼 MEDIA_ROOT에 open()으로 먼저 쓰고
+  register_artifact → publish()에서 원격 저장소로 스트리밍 업로드(멀티파트)
+  → 업로드 시점은 산출물 등록 때 한 번뿐. 생산자가 저장소에 직접 쓰는 경로는 두지 않음
+- 다운로드 URL: 로컬은 MEDIA_URL, S3는 presigned GET URL(앱 서버를 거치지 않음)
+
+환경변수:
+  ARTIFACT_STORAGE        = "local"(기본) | "s3"
+  S3_BUCKET               = 버킷 이름(필수)
+  S3_ENDPOINT_URL         = MinIO 등 S3 호환 엔드포인트 (예: http://minio:9000)
+  S3_PUBLIC_ENDPOINT_URL  = 브라우저가 접근할 엔드포인트(presigned URL 호스트, 없으면 S3_ENDPOINT_URL)
+  S3_ACCESS_KEY / S3_SECRET_KEY / S3_REGION
+  S3_PREFIX               = 객체 키 접두어(예: "autoplan/media/")
+  S3_PRESIGN_EXPIRES      = presigned URL 유효 시간(초, 기본 3600)
+  S3_KEEP_LOCAL           = "1"이면 업로드 후에도 로컬 스테이징 파일 유지(기본 "0")
+"""
+
+import mimetypes
+import os
+import shutil
+import threading
+from typing import Optional
+from urllib.parse import quote
+
+from django.conf import settings
+
+__all__ = [
+    "LocalStorage",
+    "S3Storage",
+    "get_storage",
+    "reset_storage",
+    "media_rel",
+]
+
+
+def _media_root() -> str:
+    return str(getattr(settings, "MEDIA_ROOT",
+                       os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media")))
+
+
+def media_rel(path: str) -> str:
+    """절대경로/상대경로 → MEDIA_ROOT 기준 상대경로(슬래시)."""
+    if os.path.isabs(path):
+        path = os.path.relpath(os.path.abspath(path), os.path.abspath(_media_root()))
+    return path.replace(os.sep, "/").lstrip("/")
+
+
+def _content_disposition(filename: str) -> str:
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 로컬 디스크
+# ──────────────────────────────────────────────────────────────────────────────
+class LocalStorage:
+    is_local = True
+
+    def path(self, rel: str) -> str:
+        return os.path.join(_media_root(), *media_rel(rel).split("/"))
+
+    def publish(self, abspath: str, rel: Optional[str] = None, content_type: Optional[str] = None) -> str:
+        rel = media_rel(rel or abspath)
+        dst = self.path(rel)
+        if os.path.abspath(abspath) != os.path.abspath(dst):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copyfile(abspath, dst)
+        return rel
+
+    def exists(self, rel: str) -> bool:
+        return os.path.isfile(self.path(rel))
+
+    def read_bytes(self, rel: str) -> bytes:
+        with open(self.path(rel), "rb") as f:
+            return f.read()
+
+    def delete(self, rel: str) -> None:
+        try:
+            os.remove(self.path(rel))
+        except OSError:
+            pass
+
+    def url(self, rel: str, filename: Optional[str] = None, expires: Optional[int] = None) -> str:
+        return getattr(settings, "MEDIA_URL", "/media/") + media_rel(rel)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# S3 호환 (AWS S3 / MinIO)
+# ──────────────────────────────────────────────────────────────────────────────
+class S3Storage:
+    is_local = False
+
+    def __init__(self):
+        # boto3는 S3 백엔드를 쓸 때만 필요 + import가 무거움(~70ms) → 여기서만 import
+        try:
+            import boto3
+            from botocore.config import Config as BotoConfig
+            from boto3.s3.transfer import TransferConfig
+        except ImportError:
+            raise RuntimeError("ARTIFACT_STORAGE=s3 사용 시 boto3가 필요합니다. (pip install boto3)")
+        self.bucket = os.getenv("S3_BUCKET", "")
+        if not self.bucket:
+            raise RuntimeError("S3_BUCKET 환경변수가 필요합니다.")
+        self.prefix = os.getenv("S3_PREFIX", "").strip("/")
+        self.expires = int(os.getenv("S3_PRESIGN_EXPIRES", "3600"))
+        self.keep_local = os.getenv("S3_KEEP_LOCAL", "0") == "1"
+
+        common = dict(
+            aws_access_key_id=os.getenv("S3_ACCESS_KEY") or None,
+            aws_secret_access_key=os.getenv("S3_SECRET_KEY") or None,
+            region_name=os.getenv("S3_REGION") or "us-east-1",
+            config=BotoConfig(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+        endpoint = os.getenv("S3_ENDPOINT_URL") or None
+        public = os.getenv("S3_PUBLIC_ENDPOINT_URL") or endpoint
+        self.client = boto3.client("s3", endpoint_url=endpoint, **common)
+        # presigned URL은 서명에 호스트가 포함되므로 브라우저용 엔드포인트로 별도 클라이언트 생성
+        self.sign_client = self.client if public == endpoint else boto3.client("s3", endpoint_url=public, **common)
+        self.transfer = TransferConfig(multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024)
+
+    def key(self, rel: str) -> str:
+        rel = media_rel(rel)
+        return f"{self.prefix}/{rel}" if self.prefix else rel
+
+    def path(self, rel: str) -> str:
+        """로컬 스테이징 경로(생산자가 먼저 쓰는 위치)."""
+        return os.path.join(_media_root(), *media_rel(rel).split("/"))
+
+    def _extra(self, rel: str, content_type: Optional[str]):
+        ctype = content_type or mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        return {"ContentType": ctype}
+
+    def publish(self, abspath: str, rel: Optional[str] = None, content_type: Optional[str] = None) -> str:
+        """로컬 스테이징 파일을 멀티파트 스트리밍으로 업로드(메모리에 전체를 올리지 않음)."""
+        rel = media_rel(rel or abspath)
+        self.client.upload_file(abspath, self.bucket, self.key(rel),
+                                ExtraArgs=self._extra(rel, content_type), Config=self.transfer)
+        if not self.keep_local:
+            try:
+                os.remove(abspath)
+            except OSError:
+                pass
+        return rel
+
+    def exists(self, rel: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(rel))
+            return True
+        except Exception:
+            return False
+
+    def read_bytes(self, rel: str) -> bytes:
+        obj = self.client.get_object(Bucket=self.bucket, Key=self.key(rel))
+        return obj["Body"].read()
+
+    def delete(self, rel: str) -> None:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self.key(rel))
+        except Exception as e:
+            print(f"⚠️ S3 삭제 실패: {rel} → {e}")
+
+    def url(self, rel: str, filename: Optional[str] = None, expires: Optional[int] = None) -> str:
+        params = {"Bucket": self.bucket, "Key": self.key(rel)}
+        if filename:
+            params["ResponseContentDisposition"] = _content_disposition(filename)
+        return self.sign_client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires or self.expires
+        )
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 싱글턴
+# ──────────────────────────────────────────────────────────────────────────────
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                kind = os.getenv("ARTIFACT_STORAGE", "local").strip().lower()
+                _storage = S3Storage() if kind == "s3" else LocalStorage()
+                print(f"🗄️ artifact storage: {kind}")
+    return _storage
+
+
+def reset_storage():
+    """환경변수 변경 후 재생성(테스트/관리 커맨드용)."""
+    global _storage
+    with _storage_lock:
+        _storage = None
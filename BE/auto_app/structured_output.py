@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+"""
+structured_output.py
+- LLM JSON 출력 공용 계층: 스키마 지정 요청 + 관대한 파서 + 필드 단위 복구
+- 요청: response_mime_type="application/json" + response_schema
+        (SDK: gemini_config(), REST: rest_generation_config())
+- 파싱: parse_json()
+    코드펜스/앞뒤 설명 제거 → 문자열·이스케이프를 추적하며 첫 JSON 값을 스캔
+    → 잘린 출력은 마지막 완결 지점에서 괄호를 닫아 살림, 끝 쉼표 제거
+    → parse_structured에서는 잘려서 필수 필드가 빠진 마지막 객체를 버림(빈 기본값으로 채우지 않음)
+- 검증/복구: coerce()
+    스키마와 다른 필드만 고침("2주" → 2, "3.7/5" → 3.7, 누락 필드 기본값, {"items": [...]} 래핑 해제 등)
+    올바른 필드는 그대로 둠
+- 집계: stats_snapshot() — 기존 방식(json.loads 실패 → 재호출/데이터 손실)이었으면 실패했을 응답을
+        살린 횟수(recalls_avoided), 복구한 필드 수 등
+
+Django/SDK 의존 없음(test_client2 단독 실행에서도 import 가능). GenerationConfig는 필요할 때만 import.
+"""
+
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+__all__ = [
+    "StructuredOutputError",
+    "G1_FEATURES_SCHEMA",
+    "GANTT_TASKS_SCHEMA",
+    "SIMILARITY_SCHEMA",
+    "SIMILARITY_BATCH_SCHEMA",
+    "FILEMAP_SCHEMA",
+    "gemini_config",
+    "rest_generation_config",
+    "parse_json",
+    "coerce",
+    "parse_structured",
+    "stats_snapshot",
+    "stats_reset",
+]
+
+
+class StructuredOutputError(ValueError):
+    """응답에서 스키마에 맞는 JSON을 끝내 얻지 못함."""
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 스키마 (OpenAPI 부분집합: type/properties/required/items/enum/nullable/minimum/maximum)
+# ──────────────────────────────────────────────────────────────────────────────
+def _str(**kw) -> Dict[str, Any]:
+    return {"type": "string", **kw}
+
+
+def _str_list() -> Dict[str, Any]:
+    return {"type": "array", "items": {"type": "string"}}
+
+
+def _obj(props: Dict[str, Any], required: Optional[List[str]] = None) -> Dict[str, Any]:
+    out = {"type": "object", "properties": props}
+    if required:
+        out["required"] = required
+    return out
+
+
+G1_FEATURE_SCHEMA = _obj({
+    "기능ID": _str(),
+    "기능명": _str(),
+    "기능설명": _obj({"목적": _str(), "핵심역할": _str()}),
+    "사용자시나리오": _obj({"상황": _str(), "행동": _str()}),
+    "입력값": _obj({"필수": _str_list(), "선택": _str_list(), "형식": _str()}),
+    "출력값": _obj({"요약정보": _str(), "상세정보": _str()}),
+    "처리방식": _obj({"단계": _str_list(), "사용모델": _str()}),
+    "예외조건및처리": _obj({"입력누락": _str(), "오류": _str()}),
+    "의존성또는연동항목": _str_list(),
+    "기능우선순위": _str(enum=["높음", "중간", "낮음"]),
+    "UI요소": _str_list(),
+    "테스트케이스예시": _str_list(),
+}, required=["기능ID", "기능명", "기능설명"])
+
+G1_FEATURES_SCHEMA = {"type": "array", "items": G1_FEATURE_SCHEMA}
+
+GANTT_TASKS_SCHEMA = {
+    "type": "array",
+    "items": _obj({
+        "기획서요약": _str(),
+        "기능ID": _str(),
+        "기능명": _str(),
+        "파트": _str_list(),
+        "기간": {"type": "integer", "minimum": 1},
+        "시작주차": {"type": "integer", "minimum": 1},
+        "선행작업": {"type": "array", "items": {"type": "string"}, "nullable": True},
+    }, required=["기능ID", "기능명", "파트", "기간", "시작주차"]),
+}
+
+SIMILARITY_SCHEMA = _obj({
+    "score": {"type": "number", "minimum": 0, "maximum": 5},
+    "comment": _str(),
+}, required=["score", "comment"])
+
+SIMILARITY_BATCH_SCHEMA = {
+    "type": "array",
+    "items": _obj({
+        "repo": _str(),
+        "score": {"type": "number", "minimum": 0, "maximum": 5},
+        "comment": _str(),
+    }, required=["repo", "score", "comment"]),
+}
+
+FILEMAP_SCHEMA = _obj({
+    "files": {
+        "type": "array",
+        "items": _obj({
+            "path": _str(),
+            "brief": _str(),
+            "depends_on": _str_list(),
+        }, required=["path", "brief"]),
+    },
+}, required=["files"])
+
+# 응답 스키마로 보낼 때 제외할 로컬 전용 키(Gemini Schema가 모르는 필드)
+_LOCAL_ONLY_KEYS = ("minimum", "maximum")
+
+
+def _wire_schema(schema: Dict[str, Any], upper: bool) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for k, v in schema.items():
+        if k in _LOCAL_ONLY_KEYS:
+            continue
+        if k == "type":
+            out[k] = v.upper() if upper else v
+        elif k == "properties":
+            out[k] = {pk: _wire_schema(pv, upper) for pk, pv in v.items()}
+        elif k == "items":
+            out[k] = _wire_schema(v, upper)
+        else:
+            out[k] = v
+    return out
+
+
+def gemini_config(schema: Optional[Dict[str, Any]] = None, temperature: float = 0.1, **extra):
+    """google.generativeai GenerationConfig(JSON + 스키마). 구버전 SDK면 스키마 없이 JSON만."""
+    from google.generativeai.types import GenerationConfig
+
+    kwargs = dict(temperature=temperature, response_mime_type="application/json", **extra)
+    if schema is not None:
+        try:
+            return GenerationConfig(response_schema=_wire_schema(schema, upper=False), **kwargs)
+        except TypeError:
+            pass
+    return GenerationConfig(**kwargs)
+
+
+def rest_generation_config(schema: Optional[Dict[str, Any]] = None, temperature: float = 0.1, **extra) -> Dict[str, Any]:
+    """REST generateContent 의 generationConfig 본문."""
+    cfg: Dict[str, Any] = {"temperature": temperature, "responseMimeType": "application/json", **extra}
+    if schema is not None:
+        cfg["responseSchema"] = _wire_schema(schema, upper=True)
+    return cfg
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 집계
+# ──────────────────────────────────────────────────────────────────────────────
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _count(name: str, **inc: int) -> None:
+    with _stats_lock:
+        row = _stats.setdefault(name, {"calls": 0, "clean": 0, "salvaged": 0, "fields_repaired": 0,
+                                       "recalls_avoided": 0, "failed": 0})
+        row["calls"] += 1
+        for k, v in inc.items():
+            row[k] = row.get(k, 0) + v
+
+
+def stats_snapshot() -> Dict[str, Dict[str, int]]:
+    with _stats_lock:
+        snap = {k: dict(v) for k, v in _stats.items()}
+    total: Dict[str, int] = {}
+    for row in snap.values():
+        for k, v in row.items():
+            total[k] = total.get(k, 0) + v
+    if snap:
+        snap["_total"] = total
+    return snap
+
+
+def stats_reset() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 관대한 JSON 파서
+# ──────────────────────────────────────────────────────────────────────────────
+_FENCE = re.compile(r"```[a-zA-Z0-9_-]*\s*\n?([\s\S]*?)(?:```|$)")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_CLOSER = {"{": "}", "[": "]"}
+
+
+def _strip_fence(text: str) -> str:
+    t = (text or "").strip().lstrip("﻿")
+    m = _FENCE.search(t)
+    if m and m.group(1).strip():
+        return m.group(1).strip()
+    return t
+
+
+def _scan(text: str, start: int) -> Tuple[int, List[Tuple[int, str]], bool]:
+    """
+    start의 '{' 또는 '['부터 문자열/이스케이프를 추적하며 스캔.
+    반환: (끝 인덱스(완결 시 닫는 괄호 다음), 잘릴 수 있는 지점 목록[(idx, 그 시점 닫기 문자열)], 완결 여부)
+    """
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []
+    in_str = esc = False
+    i = start
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append(_CLOSER[ch])
+        elif ch in "}]":
+            if not stack:
+                return i, cuts, False
+            stack.pop()
+            if not stack:
+                return i + 1, cuts, True
+            # 닫힌 직후: 여기까지 포함해서 자를 수 있음
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch == ",":
+            # 쉼표 직전: 앞 원소까지는 완결
+            cuts.append((i, "".join(reversed(stack))))
+        i += 1
+    return n, cuts, False
+
+
+def _loads(s: str) -> Any:
+    try:
+        return json.loads(s)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", s))
+
+
+def parse_json(text: str, expect: Optional[str] = None) -> Tuple[Any, bool]:
+    """
+    text에서 JSON 값 하나를 최대한 살려 반환. (value, salvaged)
+    expect: "array" | "object" → 해당 괄호로 시작하는 값을 우선 탐색
+    실패 시 StructuredOutputError.
+    """
+    value, salvaged, _ = _parse_json(text, expect)
+    return value, salvaged
+
+
+def _parse_json(text: str, expect: Optional[str] = None) -> Tuple[Any, bool, bool]:
+    """parse_json 본체. 반환: (value, salvaged, 잘린 출력을 닫아서 살렸는지)."""
+    raw = (text or "").strip()
+    try:
+        return json.loads(raw), False, False
+    except Exception:
+        pass
+
+    body = _strip_fence(raw)
+    try:
+        return _loads(body), True, False
+    except Exception:
+        pass
+
+    first = {"array": "[", "object": "{"}.get(expect or "")
+    starts = [i for i, ch in enumerate(body) if ch in "{["]
+    if first:
+        starts.sort(key=lambda i: (body[i] != first, i))
+    for start in starts[:20]:
+        end, cuts, complete = _scan(body, start)
+        if complete:
+            try:
+                return _loads(body[start:end]), True, False
+            except Exception:
+                continue
+        # 잘린 출력: 뒤쪽 완결 지점부터 괄호를 닫아 가며 시도
+        for idx, closers in reversed(cuts[-400:]):
+            try:
+                return _loads(body[start:idx] + closers), True, True
+            except Exception:
+                continue
+        # 완결 원소가 하나도 없으면 빈 컨테이너
+        if body[start] == "[" and not cuts:
+            return [], True, True
+    raise StructuredOutputError("응답에서 JSON 값을 찾지 못했습니다.")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 스키마 기반 필드 복구
+# ──────────────────────────────────────────────────────────────────────────────
+_NUM = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _default(schema: Dict[str, Any]) -> Any:
+    t = schema.get("type")
+    if schema.get("nullable"):
+        return None
+    if t == "object":
+        return {k: _default(v) for k, v in (schema.get("properties") or {}).items()
+                if k in (schema.get("required") or [])}
+    return {"array": [], "string": "", "integer": 0, "number": 0.0, "boolean": False}.get(t)
+
+
+def _clamp(v, schema):
+    if "minimum" in schema and v < schema["minimum"]:
+        return type(v)(schema["minimum"])
+    if "maximum" in schema and v > schema["maximum"]:
+        return type(v)(schema["maximum"])
+    return v
+
+
+def coerce(value: Any, schema: Dict[str, Any], fixes: Optional[List[str]] = None, path: str = "$") -> Any:
+    """스키마에 맞지 않는 부분만 고쳐 반환. 고친 위치는 fixes에 기록."""
+    fixes = fixes if fixes is not None else []
+    t = schema.get("type")
+
+    if value is None:
+        if schema.get("nullable"):
+            return None
+        fixes.append(f"{path}: null→default")
+        return _default(schema)
+
+    if t == "object":
+        if not isinstance(value, dict):
+            fixes.append(f"{path}: {type(value).__name__}→object")
+            return _default(schema)
+        out = dict(value)
+        props = schema.get("properties") or {}
+        for k, sub in props.items():
+            if k in out:
+                out[k] = coerce(out[k], sub, fixes, f"{path}.{k}")
+            elif k in (schema.get("required") or []):
+                fixes.append(f"{path}.{k}: missing")
+                out[k] = _default(sub)
+        return out
+
+    if t == "array":
+        if isinstance(value, dict):
+            # {"items": [...]} / {"tasks": [...]} 같은 래핑 해제
+            inner = next((v for v in value.values() if isinstance(v, list)), None)
+            if inner is None:
+                fixes.append(f"{path}: object→[object]")
+                value = [value]
+            else:
+                fixes.append(f"{path}: unwrapped")
+                value = inner
+        elif isinstance(value, str) and (schema.get("items") or {}).get("type") == "string":
+            fixes.append(f"{path}: string→array")
+            value = [s.strip() for s in re.split(r"[,\n]", value) if s.strip()]
+        elif not isinstance(value, list):
+            fixes.append(f"{path}: {type(value).__name__}→array")
+            value = [value]
+        item_schema = schema.get("items")
+        if not item_schema:
+            return value
+        out = []
+        for i, it in enumerate(value):
+            # 객체 배열에 섞인 비객체 원소는 버림(복구 불가)
+            if item_schema.get("type") == "object" and not isinstance(it, dict):
+                fixes.append(f"{path}[{i}]: dropped {type(it).__name__}")
+                continue
+            out.append(coerce(it, item_schema, fixes, f"{path}[{i}]"))
+        return out
+
+    if t == "string":
+        if isinstance(value, str):
+            out = value
+        elif isinstance(value, (dict, list)):
+            fixes.append(f"{path}: {type(value).__name__}→string")
+            out = json.dumps(value, ensure_ascii=False)
+        else:
+            fixes.append(f"{path}: {type(value).__name__}→string")
+            out = str(value)
+        enum = schema.get("enum")
+        if enum and out not in enum:
+            match = next((e for e in enum if e in out), None)
+            if match is not None:
+                fixes.append(f"{path}: enum '{out[:20]}'→'{match}'")
+                out = match
+        return out
+
+    if t in ("integer", "number"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            m = _NUM.search(str(value))
+            if not m:
+                fixes.append(f"{path}: '{str(value)[:20]}'→default")
+                return _default(schema)
+            fixes.append(f"{path}: '{str(value)[:20]}'→number")
+            value = float(m.group(0))
+        if t == "integer" and not isinstance(value, int):
+            if value != int(value):
+                fixes.append(f"{path}: {value}→int")
+            value = int(round(value))
+        clamped = _clamp(value, schema)
+        if clamped != value:
+            fixes.append(f"{path}: {value}→{clamped}")
+        return clamped
+
+    if t == "boolean" and not isinstance(value, bool):
+        fixes.append(f"{path}: {type(value).__name__}→bool")
+        return str(value).strip().lower() in ("1", "true", "yes", "y", "예")
+
+    return value
+
+
+def _drop_partial_tail(value: Any, schema: Dict[str, Any], fixes: List[str], path: str = "$") -> None:
+    """
+    잘린 출력을 닫아서 살린 값에서, 잘림 지점(각 단계의 마지막 원소)에 걸린 객체가
+    필수 필드를 다 갖추지 못했으면 버림. coerce가 빈 기본값으로 채워 가짜 항목이 되는 것을 막는다.
+    """
+    t = schema.get("type")
+    if t == "array" and isinstance(value, list) and value:
+        item_schema = schema.get("items") or {}
+        last = value[-1]
+        required = item_schema.get("required") or []
+        if item_schema.get("type") == "object" and isinstance(last, dict) and any(k not in last for k in required):
+            fixes.append(f"{path}[{len(value) - 1}]: dropped partial")
+            value.pop()
+            return
+        _drop_partial_tail(last, item_schema, fixes, f"{path}[{len(value) - 1}]")
+    elif t == "object" and isinstance(value, dict) and value:
+        key = next(reversed(value))
+        sub = (schema.get("properties") or {}).get(key)
+        if sub:
+            _drop_partial_tail(value[key], sub, fixes, f"{path}.{key}")
+
+
+def parse_structured(text: str, schema: Dict[str, Any], name: str = "llm",
+                     fixes: Optional[List[str]] = None) -> Any:
+    """
+    parse_json + coerce. 기존 json.loads 경로였다면 실패했을 응답(잘림/코드펜스/앞뒤 설명)을
+    살린 경우 recalls_avoided로 집계한다. fixes를 넘기면 복구한 필드 목록을 채워 준다.
+    """
+    try:
+        value, salvaged, truncated = _parse_json(text, expect=schema.get("type"))
+    except StructuredOutputError:
+        _count(name, failed=1)
+        raise
+    fixes = fixes if fixes is not None else []
+    if truncated:
+        _drop_partial_tail(value, schema, fixes)
+    value = coerce(value, schema, fixes)
+    if not salvaged and not fixes:
+        _count(name, clean=1)
+    else:
+        _count(name, salvaged=int(salvaged), fields_repaired=len(fixes), recalls_avoided=int(salvaged))
+        print(f"🩹 structured[{name}]: salvaged={salvaged} fixes={len(fixes)} {fixes[:3]}")
+    return value
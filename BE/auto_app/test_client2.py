@@ -4,8 +4,12 @@ import sys
 import json
 import time
 import hashlib
+import heapq
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, List
 
 
 try:
@@ -19,6 +23,27 @@ try:
     import chardet  # type: ignore
 except Exception:
     chardet = None
+
+# gpt-oss/Ollama 풀 클라이언트(keep-alive 세션, 엔드포인트 헬스 캐시, 헤지)
+try:
+    from . import oss_client  # type: ignore
+except ImportError:
+    import oss_client  # type: ignore
+
+# 스키마 지정 JSON 응답 + 관대한 파서(코드펜스/잘림/필드 타입 복구)
+try:
+    from . import structured_output  # type: ignore
+except ImportError:
+    import structured_output  # type: ignore
+
+# 녹화/재생 전송 계층(LLM_TRANSPORT_MODE=record|replay)
+try:
+    from . import llm_transport  # type: ignore
+except ImportError:
+    try:
+        import llm_transport  # type: ignore
+    except ImportError:
+        llm_transport = None
 ALLOWED = {
     'frontend': ['React.js', 'React.tsx', 'Next.js', 'Vue', 'Angular'],
     'backend':  ['Django', 'FastAPI', 'Express', 'NestJS', 'Spring Boot'],
@@ -141,12 +166,15 @@ def main():
     parser.add_argument('--spec-file', default=None, help='기술명세서 파일 경로 (txt/md/pdf/docx 등)')
     parser.add_argument('--spec-text', default=None, help='기술명세서 텍스트 직접 입력')
     parser.add_argument('--meta-note', default=None, help='metadata.json에 메모로 기록할 문자열')
+    parser.add_argument('--incremental', action='store_true', help='입력 해시가 바뀐 파일만 재생성(CODEGEN_INCREMENTAL=1과 동일)')
     args = parser.parse_args()
 
     # .env 로드
     env_path = Path(__file__).parent / '.env'
     if load_dotenv and env_path.exists():
         load_dotenv(env_path)
+    if llm_transport and llm_transport.mode() != 'live':
+        llm_transport.install()
 
     backend_base = args.backend_base or os.environ.get('BACKEND_BASE') or None
 
@@ -255,12 +283,13 @@ def main():
             # 실행에 사용될 모델/엔드포인트 요약 로그
             oss_bases, oss_model = get_oss_candidates_and_model()
             print(f"[generate] using model={oss_model} bases={', '.join(oss_bases)}")
+            incremental = args.incremental or os.environ.get('CODEGEN_INCREMENTAL') == '1'
             if args.generate_sql:
-                run_local_generation(plan_text, kind='sql', out_dir=(artifacts_root / 'SQL'), suggestions=suggestions)
+                run_local_generation(plan_text, kind='sql', out_dir=(artifacts_root / 'SQL'), suggestions=suggestions, incremental=incremental)
             if args.generate_backend:
-                run_local_generation(plan_text, kind='backend', out_dir=(artifacts_root / 'Back'), suggestions=suggestions)
+                run_local_generation(plan_text, kind='backend', out_dir=(artifacts_root / 'Back'), suggestions=suggestions, incremental=incremental)
             if args.generate_frontend:
-                run_local_generation(plan_text, kind='frontend', out_dir=(artifacts_root / 'Front'), suggestions=suggestions)
+                run_local_generation(plan_text, kind='frontend', out_dir=(artifacts_root / 'Front'), suggestions=suggestions, incremental=incremental)
 
         # 입력 원본 및 메타 저장
         save_documents(
@@ -473,21 +502,292 @@ def local_propose(spec_md: str, plan_md: str) -> Dict[str, Any]:
     return parsed
 
 
-def run_local_generation(plan_text: str, kind: str, out_dir: Path, suggestions: Optional[Dict[str, Any]] = None):
+def run_local_generation(plan_text: str, kind: str, out_dir: Path, suggestions: Optional[Dict[str, Any]] = None,
+                         incremental: bool = False):
     out_dir.mkdir(parents=True, exist_ok=True)
-    fmap = get_filemap(plan_text, kind, suggestions)
-    # 파일맵 보관 (요구사항 저장)
+    prev = load_manifest(out_dir)
+    saved_s = 0.0
+    fmap_key = filemap_input_key(plan_text, kind, suggestions)
+    fmap = None
+    fmap_seconds = float(prev.get('filemap_seconds') or 0.0)
+    if incremental and prev.get('filemap_key') == fmap_key:
+        try:
+            fmap = json.loads((out_dir / '_filemap.json').read_text(encoding='utf-8'))
+            saved_s += fmap_seconds
+            print(f"[incr] plan/suggestions unchanged -> reuse {out_dir / '_filemap.json'}")
+        except Exception as e:
+            print(f"[warn][incr] filemap reuse failed: {e}")
+            fmap = None
+    if fmap is None:
+        t0 = time.monotonic()
+        fmap = get_filemap(plan_text, kind, suggestions)
+        fmap_seconds = time.monotonic() - t0
+        # 파일맵 보관 (요구사항 저장)
+        try:
+            (out_dir / '_filemap.json').write_text(json.dumps(fmap, ensure_ascii=False, indent=2), encoding='utf-8')
+            print(f"[plan] saved filemap -> {out_dir / '_filemap.json'}")
+        except Exception as e:
+            print(f"[warn] failed to save filemap: {e}")
+    files = [f for f in (fmap.get('files') or []) if isinstance(f, dict) and f.get('path')]
+
+    # 파일별 입력 해시 → 바뀐 파일만 생성 대상
+    keys = {f['path']: file_input_key(f, plan_text, suggestions) for f in files}
+    prev_files = prev.get('files') or {}
+    todo = files
+    reused: List[str] = []
+    if incremental:
+        todo = []
+        for f in files:
+            old = prev_files.get(f['path']) or {}
+            if old.get('key') == keys[f['path']] and (out_dir / f['path']).is_file():
+                reused.append(f['path'])
+                saved_s += float(old.get('seconds') or 0.0)
+            else:
+                todo.append(f)
+        print_incremental_diff(prev_files, files, keys, reused)
+
+    workers = codegen_workers(len(todo))
+    print(f"[gen] {kind} files={len(todo)}/{len(files)} workers={workers}")
+    started = time.monotonic()
+    progress = {'done': 0}
+    progress_lock = threading.Lock()
+
+    def _one(f: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.monotonic()
+        res = {'path': f['path'], 'ok': False, 'seconds': 0.0, 'bytes': 0}
+        try:
+            code = generate_file(f['path'], f.get('brief', ''), plan_text, suggestions)
+            abs_path = out_dir / f['path']
+            abs_path.parent.mkdir(parents=True, exist_ok=True)
+            abs_path.write_text(code, encoding='utf-8')
+            res.update(ok=True, bytes=len(code.encode('utf-8', errors='ignore')))
+        except Exception as e:
+            res['error'] = f"{type(e).__name__}: {e}"
+        res['seconds'] = time.monotonic() - t0
+        status = 'ok' if res['ok'] else f"FAIL {res.get('error')}"
+        with progress_lock:  # 여러 워커의 로그 줄이 섞이지 않도록
+            progress['done'] += 1
+            print(f"[gen] ({progress['done']}/{len(todo)}) {status} path={f['path']} {res['seconds']:.1f}s bytes={res['bytes']}")
+        return res
+
+    results = schedule_generation(todo, _one, workers)
+    wall = time.monotonic() - started
+    serial = sum(r['seconds'] for r in results)
+    failed = [r for r in results if not r['ok']]
+    print(f"[local] {kind} files: {len(results) - len(failed)}/{len(results)} -> {out_dir}")
+    print(f"[gen] wall={wall:.1f}s sum(per-file)={serial:.1f}s speedup=x{(serial / wall) if wall > 0 else 1:.1f}")
+    for r in failed:
+        print(f"[warn][gen] failed path={r['path']} {r.get('error')}")
+    if incremental:
+        print(f"[incr] reused {len(reused)} files, saved ~{saved_s:.1f}s (previous generation time)")
+
+    # 매니페스트 갱신: 재사용 항목은 유지, 새로 만든 항목은 교체, 실패/삭제 항목은 제거(다음 실행에서 재시도)
+    from datetime import datetime, timezone
+    now = datetime.now(timezone.utc).isoformat()
+    entries = {p: prev_files[p] for p in reused if p in prev_files}
+    for r in results:
+        if r['ok']:
+            entries[r['path']] = {'key': keys[r['path']], 'bytes': r['bytes'], 'seconds': round(r['seconds'], 2), 'generated_at': now}
+    save_manifest(out_dir, {
+        'version': 1,
+        'kind': kind,
+        'filemap_key': fmap_key,
+        'filemap_seconds': round(fmap_seconds, 2),
+        'model': codegen_model_id(),
+        'files': entries,
+    })
+    return results
+
+# ---------------- 증분 재생성(입력 해시 매니페스트) ----------------
+
+MANIFEST_NAME = '_manifest.json'
+
+
+def codegen_provider() -> str:
+    return os.environ.get('CODEGEN_PROVIDER', 'oss').lower().strip()
+
+
+def codegen_model_id() -> str:
+    if codegen_provider() == 'gemini':
+        return f"gemini:{os.environ.get('GEMINI_MODEL_CODE', 'gemini-2.5-pro')}"
+    return f"oss:{get_oss_candidates_and_model()[1]}"
+
+
+def _slice_tokens(text: str) -> set:
+    return set(re.findall(r'[0-9a-z가-힣]{2,}', (text or '').lower()))
+
+
+def plan_slice_for(plan_text: str, provider: str, path_: str = '', brief: str = '') -> str:
+    """
+    파일 생성 프롬프트에 들어가는 계획 구간(해시 키와 프롬프트가 같은 값을 쓰도록 공용화).
+    계획이 예산보다 길면 경로/brief와 겹치는 단어가 있는 문단만 점수순으로 골라 원래 순서대로 담는다
+    → 다른 요구사항이 바뀌어도 이 파일의 구간은 그대로 유지됨
+    """
+    plan_text = plan_text or ''
+    budget = 1500 if provider == 'gemini' else 4000
+    if len(plan_text) <= budget:
+        return plan_text
+    want = _slice_tokens(f"{path_} {brief}")
+    if not want:
+        return plan_text[:budget]
+    paras = [p for p in re.split(r'\n\s*\n|\n(?=#)', plan_text) if p.strip()]
+    score = [len(_slice_tokens(p) & want) for p in paras]
+    picked, used = set(), 0
+    for i in sorted(range(len(paras)), key=lambda i: (-score[i], i)):
+        if score[i] == 0:
+            break
+        if used + len(paras[i]) > budget:
+            continue
+        picked.add(i)
+        used += len(paras[i]) + 2
+    if not picked:
+        return plan_text[:budget]
+    return '\n\n'.join(paras[i] for i in sorted(picked))
+
+
+def suggestions_slice_for(suggestions: Optional[Dict[str, Any]], provider: str) -> str:
+    if not suggestions:
+        return ''
+    return safe_json_text(suggestions)[:1200 if provider == 'gemini' else 1500]
+
+
+def file_input_key(f: Dict[str, Any], plan_text: str, suggestions: Optional[Dict[str, Any]]) -> str:
+    """(경로, brief, 계획 구간, 제안 구간, 모델) 해시. 같으면 이전 산출물 재사용"""
+    provider = codegen_provider()
+    return sha256_of(json.dumps([
+        f.get('path'), f.get('brief', ''),
+        plan_slice_for(plan_text, provider, f.get('path', ''), f.get('brief', '')),
+        suggestions_slice_for(suggestions, provider),
+        codegen_model_id(),
+    ], ensure_ascii=False))
+
+
+def filemap_input_key(plan_text: str, kind: str, suggestions: Optional[Dict[str, Any]]) -> str:
+    model = os.environ.get('GEMINI_MODEL_FILEMAP') or 'gemini-2.5-pro'
+    return sha256_of(json.dumps([kind, plan_text or '', safe_json_text(suggestions) if suggestions else '', model], ensure_ascii=False))
+
+
+def load_manifest(out_dir: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads((out_dir / MANIFEST_NAME).read_text(encoding='utf-8'))
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def save_manifest(out_dir: Path, manifest: Dict[str, Any]) -> None:
     try:
-        (out_dir / '_filemap.json').write_text(json.dumps(fmap, ensure_ascii=False, indent=2), encoding='utf-8')
-        print(f"[plan] saved filemap -> {out_dir / '_filemap.json'}")
+        (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
     except Exception as e:
-        print(f"[warn] failed to save filemap: {e}")
-    for f in fmap.get('files', []):
-        code = generate_file(f['path'], f['brief'], plan_text, suggestions)
-        abs_path = out_dir / f['path']
-        abs_path.parent.mkdir(parents=True, exist_ok=True)
-        abs_path.write_text(code, encoding='utf-8')
-    print(f"[local] {kind} files: {len(fmap.get('files', []))} -> {out_dir}")
+        print(f"[warn] failed to save manifest: {e}")
+
+
+def print_incremental_diff(prev_files: Dict[str, Any], files: List[Dict[str, Any]], keys: Dict[str, str], reused: List[str]) -> None:
+    reused_set = set(reused)
+    added = [f['path'] for f in files if f['path'] not in prev_files]
+    changed = [f['path'] for f in files if f['path'] in prev_files and f['path'] not in reused_set]
+    removed = [p for p in prev_files if p not in keys]
+    print(f"[incr] diff: +{len(added)} added, ~{len(changed)} changed, ={len(reused_set)} unchanged, -{len(removed)} removed")
+    for p in added:
+        print(f"[incr]   + {p}")
+    for p in changed:
+        print(f"[incr]   ~ {p}")
+    for p in removed:
+        print(f"[incr]   - {p} (파일맵에서 빠짐, 기존 파일은 유지)")
+
+
+# ---------------- 병렬 생성 스케줄러(워커 풀/의존 순서) ----------------
+
+def codegen_workers(n_files: int) -> int:
+    """CODEGEN_WORKERS(기본 4) 범위에서 파일 수만큼만 워커 사용"""
+    try:
+        n = int(os.environ.get('CODEGEN_WORKERS', '4'))
+    except ValueError:
+        n = 4
+    return max(1, min(n, n_files or 1))
+
+
+# 경로 토큰 → 생성 우선순위(작을수록 먼저). 파일맵에 priority가 있으면 그 값을 우선 사용
+_ORDER_HINTS = [
+    (0, {'sql', 'schema', 'schemas', 'ddl', 'migration', 'migrations', 'settings', 'config', 'requirements', 'package', 'env'}),
+    (1, {'models', 'model', 'entity', 'entities', 'types', 'dto', 'dtos', 'interfaces'}),
+    (2, {'serializers', 'serializer', 'repository', 'repositories', 'services', 'service', 'utils', 'lib', 'store', 'hooks'}),
+    (3, {'views', 'view', 'controllers', 'controller', 'routes', 'router', 'handlers', 'pages', 'components'}),
+    (4, {'urls', 'app', 'main', 'index', 'server', 'tests', 'test'}),
+]
+
+
+def order_hint(f: Dict[str, Any]) -> int:
+    pr = f.get('priority')
+    if isinstance(pr, (int, float)):
+        return int(pr)
+    tokens = set(t for t in re.split(r'[/\\._\-]+', str(f.get('path', '')).lower()) if t)
+    for rank, names in _ORDER_HINTS:
+        if tokens & names:
+            return rank
+    return 2
+
+
+def schedule_generation(files: List[Dict[str, Any]], worker, workers: int) -> List[Dict[str, Any]]:
+    """
+    files를 워커 풀에서 병렬 실행.
+    - depends_on(경로 목록)에 적힌 파일이 끝난 뒤에 시작
+    - 시작 가능한 파일이 여럿이면 order_hint → 파일맵 순서대로 먼저 배정
+    - 순환 의존이면 가장 앞 순서 파일의 의존을 무시하고 진행
+    결과는 files 순서대로 반환
+    """
+    index = {}
+    for i, f in enumerate(files):
+        index.setdefault(f['path'], i)
+    rank = [(order_hint(f), i) for i, f in enumerate(files)]
+
+    pending: Dict[int, set] = {}
+    dependents: Dict[int, List[int]] = {}
+    ready: List[Tuple[int, int]] = []
+    for i, f in enumerate(files):
+        deps = {index[d] for d in (f.get('depends_on') or []) if isinstance(d, str) and d in index and index[d] != i}
+        if deps:
+            pending[i] = deps
+            for d in deps:
+                dependents.setdefault(d, []).append(i)
+        else:
+            heapq.heappush(ready, rank[i])
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+
+    def _release(i: int) -> None:
+        for j in dependents.get(i, []):
+            deps = pending.get(j)
+            if deps is None:
+                continue
+            deps.discard(i)
+            if not deps:
+                del pending[j]
+                heapq.heappush(ready, rank[j])
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='codegen') as ex:
+        running = {}
+        while ready or running or pending:
+            while ready and len(running) < workers:
+                _, i = heapq.heappop(ready)
+                running[ex.submit(worker, files[i])] = i
+            if not running:
+                i = min(pending, key=lambda k: rank[k])
+                print(f"[warn][gen] circular depends_on -> start {files[i]['path']} anyway")
+                del pending[i]
+                heapq.heappush(ready, rank[i])
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                i = running.pop(fut)
+                try:
+                    results[i] = fut.result()
+                except Exception as e:
+                    results[i] = {'path': files[i]['path'], 'ok': False, 'seconds': 0.0, 'bytes': 0,
+                                  'error': f"{type(e).__name__}: {e}"}
+                _release(i)
+    return [r for r in results if r is not None]
+
 
 def get_filemap(plan_text: str, kind_label: str, suggestions: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     # 1) Gemini(2.5 Pro 기본)로 파일맵 설계
@@ -495,18 +795,19 @@ def get_filemap(plan_text: str, kind_label: str, suggestions: Optional[Dict[str,
     prompt = (
         f"역할: 당신은 {kind_label} 코드 구조를 설계하는 아키텍트입니다.\n"
         "다음 계획을 바탕으로 생성할 파일들의 구조와 간단 요구사항을 JSON으로만 출력하세요.\n\n"
-        "출력 형식(JSON): {\n  \"files\": [ { \"path\": string, \"brief\": string } ]\n}\n\n"
+        "출력 형식(JSON): {\n  \"files\": [ { \"path\": string, \"brief\": string, \"depends_on\": [string] } ]\n}\n"
+        "depends_on(선택): 이 파일이 참조하는 다른 파일 path 목록(예: views → models).\n\n"
         f"계획:\n{plan_text[:8000]}\n\n"
         + ("참고 툴 제안(JSON):\n" + safe_json_text(suggestions)[:4000] + "\n\n" if suggestions else "")
         + "중요: 오직 JSON만. 주석/설명/코드블록 금지."
     )
     print(f"[gemini][filemap] request model={model_for_filemap}")
     try:
-        text = call_gemini(prompt, model=model_for_filemap)
+        text = call_gemini(prompt, model=model_for_filemap, response_schema=structured_output.FILEMAP_SCHEMA)
         # rate-limit 보호 약간의 슬립
         time.sleep(0.5)
-        parsed = parse_flexible_json(text)
-        if isinstance(parsed, dict) and isinstance(parsed.get('files'), list):
+        parsed = structured_output.parse_structured(text, structured_output.FILEMAP_SCHEMA, 'filemap')
+        if parsed.get('files'):
             return parsed
     except Exception as e:
         print(f"[warn][gemini][filemap] {type(e).__name__}: {e}")
@@ -514,7 +815,8 @@ def get_filemap(plan_text: str, kind_label: str, suggestions: Optional[Dict[str,
     # 2) 폴백: OSS로 시도
     sys_prompt = f"당신은 {kind_label} 코드 구조를 파일 단위로 설계합니다. JSON만 출력하세요."
     usr = (
-        "다음 계획을 파일맵(JSON: {\n  \"files\": [ { \"path\": string, \"brief\": string } ]\n})으로 변환:\n\n"
+        "다음 계획을 파일맵(JSON: {\n  \"files\": [ { \"path\": string, \"brief\": string, \"depends_on\": [string] } ]\n})으로 변환."
+        " depends_on(선택)은 이 파일이 참조하는 다른 파일 path 목록:\n\n"
         + plan_text
     )
     if suggestions:
@@ -524,11 +826,14 @@ def get_filemap(plan_text: str, kind_label: str, suggestions: Optional[Dict[str,
         {'role': 'system', 'content': sys_prompt},
         {'role': 'user', 'content': usr},
     ])
-    return parse_json_tail(text)
+    try:
+        return structured_output.parse_structured(text, structured_output.FILEMAP_SCHEMA, 'filemap')
+    except ValueError:
+        return parse_json_tail(text)
 
 
 def generate_file(path_: str, brief: str, plan_text: str, suggestions: Optional[Dict[str, Any]] = None) -> str:
-    provider = os.environ.get('CODEGEN_PROVIDER', 'oss').lower().strip()
+    provider = codegen_provider()
     if provider == 'gemini':
         print(f"[gemini][gen] start path={path_} model={os.environ.get('GEMINI_MODEL_CODE','gemini-2.5-pro')}")
         code = generate_file_with_gemini(path_, brief, plan_text, suggestions)
@@ -536,9 +841,9 @@ def generate_file(path_: str, brief: str, plan_text: str, suggestions: Optional[
         return code
     # default: OSS/Ollama
     sys_prompt = '오직 코드만 출력합니다. 설명 금지.'
-    usr = f"파일 경로: {path_}\n요구사항: {brief}\n참고 계획: {plan_text[:4000]}\n"
+    usr = f"파일 경로: {path_}\n요구사항: {brief}\n참고 계획: {plan_slice_for(plan_text, 'oss', path_, brief)}\n"
     if suggestions:
-        usr += "참고 툴 제안(JSON 개요):\n" + safe_json_text(suggestions)[:1500] + "\n"
+        usr += "참고 툴 제안(JSON 개요):\n" + suggestions_slice_for(suggestions, 'oss') + "\n"
     usr += "완성된 파일 전체를 출력하세요."
     print(f"[oss][gen] start path={path_} model={get_oss_candidates_and_model()[1]}")
     code = call_gpt_oss([
@@ -551,21 +856,55 @@ def generate_file(path_: str, brief: str, plan_text: str, suggestions: Optional[
 
 # ---------------- Gemini 코드 생성(레이트리밋/분할 생성) ----------------
 
-_gemini_rl_state = { 'last_called': 0.0 }
+class RateLimiter:
+    """프로바이더별 최소 호출 간격(rpm) 보장. 여러 워커 스레드가 하나의 인스턴스를 공유"""
+
+    def __init__(self, name: str, rpm: float):
+        self.name = name
+        self.rpm = rpm
+        self.min_interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        if self.min_interval <= 0:
+            return
+        # 잠금 안에서는 슬롯만 예약하고, 대기는 잠금 밖에서 (다른 스레드가 다음 슬롯을 예약 가능)
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at)
+            self._next_at = at + self.min_interval
+        sleep_s = at - now
+        if sleep_s > 0:
+            print(f"[{self.name}][rate] sleep {sleep_s:.2f}s (rpm={self.rpm:g})")
+            time.sleep(sleep_s)
+
+
+# provider → (rpm 환경변수, 기본값). 0 이하 = 제한 없음
+_RATE_ENV = {
+    'gemini': ('GEMINI_RPM', '5'),
+    'oss': ('OSS_RPM', '0'),
+}
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    with _rate_limiters_lock:
+        rl = _rate_limiters.get(provider)
+        if rl is None:
+            env_key, default = _RATE_ENV.get(provider, (f'{provider.upper()}_RPM', '0'))
+            try:
+                rpm = float(os.environ.get(env_key, default))
+            except ValueError:
+                rpm = float(default)
+            rl = _rate_limiters[provider] = RateLimiter(provider, rpm)
+        return rl
+
 
 def call_gemini_rate_limited(text: str, *, model: Optional[str] = None, max_output_tokens: Optional[int] = None) -> str:
-    rpm = float(os.environ.get('GEMINI_RPM', '5'))  # 분당 요청수 제한 (기본 5)
-    min_interval = 60.0 / max(rpm, 0.1)
-    now = time.time()
-    delta = now - _gemini_rl_state['last_called']
-    if delta < min_interval:
-        sleep_s = min_interval - delta
-        print(f"[gemini][rate] sleep {sleep_s:.2f}s (rpm={rpm})")
-        time.sleep(sleep_s)
-    # 호출
-    out = call_gemini_with_config(text, model=model, max_output_tokens=max_output_tokens)
-    _gemini_rl_state['last_called'] = time.time()
-    return out
+    get_rate_limiter('gemini').wait()  # 분당 요청수 제한 (GEMINI_RPM, 기본 5)
+    return call_gemini_with_config(text, model=model, max_output_tokens=max_output_tokens)
 
 def call_gemini_with_config(user_text: str, *, model: Optional[str] = None, max_output_tokens: Optional[int] = None) -> str:
     import requests
@@ -607,8 +946,8 @@ def generate_file_with_gemini(path_: str, brief: str, plan_text: str, suggestion
     # 1) 1차 시도: 한 번에 전체 생성 (max tokens 넉넉히)
     header = (
         "오직 코드만 출력합니다. 설명/주석/코드블록 금지.\n"
-        f"파일 경로: {path_}\n요구사항: {brief}\n참고 계획(요약): {plan_text[:1500]}\n"
-        + ("참고 툴 제안(JSON 개요):\n" + safe_json_text(suggestions)[:1200] + "\n" if suggestions else "")
+        f"파일 경로: {path_}\n요구사항: {brief}\n참고 계획(요약): {plan_slice_for(plan_text, 'gemini', path_, brief)}\n"
+        + ("참고 툴 제안(JSON 개요):\n" + suggestions_slice_for(suggestions, 'gemini') + "\n" if suggestions else "")
         + "출력 끝에는 <EOF/> 마커를 반드시 붙이세요."
     )
     txt = call_gemini_rate_limited(header, model=os.environ.get('GEMINI_MODEL_CODE','gemini-2.5-pro'), max_output_tokens=int(os.environ.get('GEMINI_CODE_MAX_TOKENS','3500')))
@@ -633,16 +972,18 @@ def generate_file_with_gemini(path_: str, brief: str, plan_text: str, suggestion
 
 # -------------------------- LLM 호출부 --------------------------
 
-def call_gemini(user_text: str, model: Optional[str] = None) -> str:
+def call_gemini(user_text: str, model: Optional[str] = None, response_schema: Optional[Dict[str, Any]] = None) -> str:
     import requests
     api_key = os.environ.get('GOOGLE_API_KEY') or os.environ.get('GEMINI_API_KEY')
     if not api_key:
         raise RuntimeError('GEMINI_API_KEY 미설정')
     model = model or os.environ.get('GEMINI_MODEL', 'gemini-2.5-flash')
     url = f'https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent'
+    # response_schema가 있으면 JSON + 스키마로 응답 강제(파싱 실패 재호출 방지)
+    gen_cfg = structured_output.rest_generation_config(response_schema, temperature=0.2) if response_schema else {'temperature': 0.2}
     payload = {
         'contents': [{'role': 'user', 'parts': [{'text': user_text}]}],
-        'generationConfig': {'temperature': 0.2}
+        'generationConfig': gen_cfg
     }
     # 간단 재시도
     last = None
@@ -671,51 +1012,30 @@ def call_gemini(user_text: str, model: Optional[str] = None) -> str:
 
 def call_gpt_oss(messages: list[dict], *, max_retries: int = 5, base_backoff: float = 1.0) -> str:
     """
-	gpt-oss/Ollama(OpenAI 호환) 호출 + 지수 백오프 재시도.
+	gpt-oss/Ollama(OpenAI 호환) 호출. oss_client 풀 클라이언트 사용:
+	  - keep-alive 세션, 죽은 엔드포인트 즉시 건너뜀, 429/5xx만 지수 백오프 재시도
+	  - OSS_HEDGE=1 이면 느린 1순위 대신 2순위 응답을 먼저 받을 수 있음
 	환경변수:
 	  - GPT_OSS_API_BASE, OLLAMA_API_BASE (기본 http://localhost:11434/v1 → 실패 시 http://localhost:8000/v1)
 	  - GPT_OSS_MODEL, OLLAMA_MODEL (기본 llama3.1:8b)
     """
-    import requests
-    candidates, model = get_oss_candidates_and_model()
-    # model already resolved above
-    last_err = None
-
-    for api_base in candidates:
-        url = f"{api_base}/chat/completions"
-        payload = {'model': model, 'messages': messages, 'temperature': 0.1}
-        for attempt in range(1, max_retries + 1):
-            try:
-                resp = requests.post(url, json=payload, timeout=240)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    return ((data.get('choices') or [{}])[0].get('message') or {}).get('content', '')
-                # 429/5xx 재시도
-                if resp.status_code in (429, 500, 502, 503, 504):
-                    last_err = f"HTTP {resp.status_code} @ {api_base}: {resp.text[:200]}"
-                    sleep_s = min(base_backoff * (2 ** (attempt - 1)), 8.0)
-                    print(f"[retry][oss] base={api_base} model={model} attempt={attempt}/{max_retries} http={resp.status_code} sleep={sleep_s}s")
-                else:
-                    resp.raise_for_status()
-            except Exception as e:
-                last_err = f"{api_base}: {e}"
-                # ReadTimeout 또는 연결류 에러면 즉시 네이티브 Ollama 스트리밍 폴백 1회 시도
-                if 'Read timed out' in str(e) or 'Connection' in str(e):
-                    try:
-                        print(f"[fallback][ollama-native] streaming via {api_base}")
-                        return call_ollama_native_chat(messages, model)
-                    except Exception as ee:
-                        last_err = f"ollama-native: {ee}"
-                sleep_s = min(base_backoff * (2 ** (attempt - 1)), 8.0)
-                print(f"[retry][oss] base={api_base} model={model} attempt={attempt}/{max_retries} error={type(e).__name__}: {e} sleep={sleep_s}s")
-                time.sleep(sleep_s)
-
+    _candidates, model = get_oss_candidates_and_model()
+    get_rate_limiter('oss').wait()  # OSS_RPM (기본 제한 없음)
+    try:
+        return oss_client.get_client().chat(messages, model=model, max_retries=max_retries, base_backoff=base_backoff)
+    except Exception as e:
+        last_err = f"{type(e).__name__}: {e}"
+    # 모든 OpenAI 호환 엔드포인트 실패(연결 불가/응답 지연) → 네이티브 Ollama 스트리밍 1회 시도
+    try:
+        print(f"[fallback][ollama-native] streaming ({last_err[:120]})")
+        return call_ollama_native_chat(messages, model)
+    except Exception as ee:
+        last_err = f"{last_err} / ollama-native: {ee}"
     raise RuntimeError(f"gpt-oss 호출 실패 (retries={max_retries}): {last_err}")
 
 
 def call_ollama_native_chat(messages: list[dict], model: Optional[str] = None, *, stream_log: bool = True) -> str:
     """Ollama 네이티브 /api/chat 스트리밍 호출. 진행 상황 로그를 단계적으로 출력."""
-    import requests
     # 기본은 OLLAMA_API_BASE(예: http://localhost:11434/v1). 네이티브는 /v1 제거.
     api_base = os.environ.get('OLLAMA_API_BASE', 'http://localhost:11434/v1')
     base_native = api_base[:-3] if api_base.endswith('/v1') else api_base
@@ -724,7 +1044,7 @@ def call_ollama_native_chat(messages: list[dict], model: Optional[str] = None, *
     payload = { 'model': model_name, 'messages': messages, 'stream': True }
     acc = []
     total = 0
-    with requests.post(url, json=payload, stream=True, timeout=None) as resp:
+    with oss_client.get_client().session.post(url, json=payload, stream=True, timeout=None) as resp:
         resp.raise_for_status()
         for raw in resp.iter_lines():
             if not raw:
@@ -752,40 +1072,17 @@ def log_backend_status() -> None:
     gemini_key_set = bool(os.environ.get('GEMINI_API_KEY') or os.environ.get('GOOGLE_API_KEY'))
     print(f"[status] gemini model={gemini_model} key={'set' if gemini_key_set else 'missing'}")
 
-    # OSS/Ollama API 후보
-    oss_base = os.environ.get('GPT_OSS_API_BASE')
-    ollama_base = os.environ.get('OLLAMA_API_BASE')
-    model = os.environ.get('GPT_OSS_MODEL') or os.environ.get('OLLAMA_MODEL') or 'llama3.1:8b'
-    candidates, model_pref = get_oss_candidates_and_model()
-
-    # 간단 연결 확인
-    import requests
-    for base in candidates:
-        try:
-            r = requests.get(f"{base}/models", timeout=3)
-            ok = (r.status_code == 200)
-            print(f"[status] oss base={base} ok={ok} model_pref={model_pref}")
-        except Exception as e:
-            print(f"[status] oss base={base} error={type(e).__name__}: {e}")
+    # OSS/Ollama API 후보: 헬스 캐시(OSS_HEALTH_TTL)가 유효하면 프로브 생략
+    _candidates, model_pref = get_oss_candidates_and_model()
+    client = oss_client.get_client()
+    for base, ok in client.health().items():
+        ep = next(e for e in client.snapshot()['endpoints'] if e['base'] == base)
+        err = f" error={ep['last_error']}" if not ok and ep['last_error'] else ''
+        print(f"[status] oss base={base} ok={ok} model_pref={model_pref}{err}")
 
 
 def get_oss_candidates_and_model() -> Tuple[list, str]:
-    env_bases = []
-    for k in ['GPT_OSS_API_BASE', 'OLLAMA_API_BASE']:
-        v = os.environ.get(k)
-        if v:
-            env_bases.append(v.rstrip('/'))
-    if env_bases:
-        seen = set()
-        candidates = []
-        for base in env_bases:
-            if base not in seen:
-                candidates.append(base)
-                seen.add(base)
-    else:
-        candidates = ['http://localhost:11434/v1', 'http://localhost:8000/v1']
-    model = os.environ.get('GPT_OSS_MODEL') or os.environ.get('OLLAMA_MODEL') or 'llama3.1:8b'
-    return candidates, model
+    return oss_client.candidate_bases(), oss_client.default_model()
 
 
 # -------------------------- 파싱/저장 --------------------------
@@ -801,35 +1098,13 @@ def parse_json_tail(text: str) -> Dict[str, Any]:
 
 def parse_flexible_json(text: str) -> Any:
     """
-    코드블록(```json ... ```) 또는 앞뒤 설명이 섞인 출력에서 JSON 부분만 최대한 파싱.
+    코드블록(```json ... ```), 앞뒤 설명, 잘린 출력이 섞여도 JSON 부분을 최대한 파싱(structured_output.parse_json).
     실패 시 원문 반환.
     """
-    import re
-    # 1) ```json ... ``` 블록 우선 추출
-    m = re.search(r"```json\s*([\s\S]*?)```", text, flags=re.IGNORECASE)
-    if m:
-        body = m.group(1)
-        try:
-            return json.loads(body)
-        except Exception:
-            pass
-    # 2) 마지막 중괄호 블록 시도
-    m2 = re.search(r"\{[\s\S]*\}$", text)
-    if m2:
-        s = m2.group(0)
-        try:
-            return json.loads(s)
-        except Exception:
-            pass
-    # 3) 대괄호 단독 루트 시도
-    m3 = re.search(r"\[[\s\S]*\]$", text)
-    if m3:
-        s = m3.group(0)
-        try:
-            return json.loads(s)
-        except Exception:
-            pass
-    return {'raw': text}
+    try:
+        return structured_output.parse_json(text)[0]
+    except ValueError:
+        return {'raw': text}
 
 
 def parse_freeform_recommendation(text: str) -> Optional[Dict[str, Dict[str, Optional[str]]]]:
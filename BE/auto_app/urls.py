@@ -20,6 +20,7 @@ from .views import (
 
     # Gantt Chart / Outputs
     GanttChartGenerateView, GanttChartDownloadView, GanttChartListView, GanttChartDownloadByNameView,
+    GanttReplanView, GanttRenderView,
     OutputDocumentListView,
 
     # Team Members & Assignment
@@ -80,11 +81,14 @@ urlpatterns = [
     # Gantt / Outputs
     # ───────────────────────────────
     path("project/<int:project_id>/gantt/",         GanttChartGenerateView.as_view(), name="gantt-generate"), # POST: 간트차트 생성
+    path("project/<int:project_id>/gantt/replan/",  GanttReplanView.as_view(),        name="gantt-replan"),   # POST: 간트차트 부분 재계획(delta)
     path("gantt/download/<int:gantt_id>/",          GanttChartDownloadView.as_view(), name="gantt-download"), # GET: 간트차트 파일 다운로드
     path("project/<int:project_id>/gantt/list/",    GanttChartListView.as_view(),     name="gantt-list"),     # GET: 프로젝트별 간트 목록
     path("project/<int:project_id>/outputs/",       OutputDocumentListView.as_view(), name="output-list"),    # GET: 프로젝트 출력물 목록
     path("gantt/file/<path:filename>/",             GanttChartDownloadByNameView.as_view(), name="gantt-download-by-name"), # GET: 파일명으로 간트 다운로드
     path("project/<int:project_id>/gantt/latest/tasks/", LatestGanttTasksView.as_view(), name="gantt-latest-tasks"), # GET: 최신 간트 태스크
+    path("project/<int:project_id>/gantt/latest/render/", GanttRenderView.as_view(), name="gantt-latest-render"), # GET: 최신 간트 이미지(SVG/PNG)
+    path("gantt/<int:gantt_id>/render/",            GanttRenderView.as_view(),        name="gantt-render"),   # GET: 간트 이미지(SVG/PNG)
 
     # ───────────────────────────────
     # Team & Auto Assignment
@@ -66,8 +66,8 @@ class UserInfoView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = User.objects.get(user_id=request.user.user_id)  # 🔥 핵심 수정
-        serializer = UserSerializer(user)
+        # request.user는 CachedJWTAuthentication이 만든 People(스냅샷) → 재조회 불필요
+        serializer = UserSerializer(request.user)
         return Response(serializer.data)
 
 from rest_framework.views import APIView
@@ -76,6 +76,11 @@ from rest_framework import status, permissions
 from .models import Project, RequirementDraft, Requirement, SimilarProject, TeamMember, ProjectTimeline, OutputDocument
 from .serializers import ProjectSerializer
 from .gemini_parserv2 import generate_feature_list
+from .artifact_registry import (
+    register_artifact, list_artifacts, latest_artifact, find_artifact,
+    artifact_abspath, artifact_url, ts_to_iso, next_idea_seq,
+    file_url, stored_exists, read_stored_bytes, detach_for_write,
+)
 
 class ProjectCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -266,7 +271,10 @@ import json, os, io
 import time # ✅ time 모듈 import
 
 from .models import Project, RequirementDraft
-from .gemini_parserv2 import generate_feature_list, export_tabular_files
+from .draft_store import create_draft, draft_feature_rows, draft_features, flatten_strings
+from .gemini_parserv2 import generate_feature_list, generate_feature_list_mapreduce, export_tabular_files
+from .gemini_pool import get_pool
+from .plan_mapreduce import plan_segment_chars
 
 class Gemini1GenerateView(APIView):
     """
@@ -330,9 +338,7 @@ class Gemini1GenerateView(APIView):
                     plan_text = (project.description or "").strip()
             if not plan_text:
                 return Response({"error": "입력 텍스트가 비어 있습니다."}, status=status.HTTP_400_BAD_REQUEST)
-            MAX_CHARS = 20000
-            if len(plan_text) > MAX_CHARS:
-                plan_text = plan_text[:MAX_CHARS]
+            # ✅ 자르지 않음: 세그먼트 크기보다 길면 아래에서 맵-리듀스 모드로 처리
         except ValueError as ve:
             return Response({"error": str(ve)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -353,6 +359,22 @@ class Gemini1GenerateView(APIView):
         final_features = []
         # ✅ 기본 반복 횟수를 3으로 조정 (환경 변수로 덮어쓰기 가능)
         MAX_PASSES = int(os.getenv("AUTO_PASSES", "3"))
+        mapreduce_stats = None
+        # 키 구성: settings에 별도 키가 있으면 풀에 등록하고 그 별칭을 모든 호출(맵-리듀스 포함)에 우선 사용
+        api_key = getattr(settings, "GEMINI_API_KEY_1", None)
+        key_alias = get_pool().ensure_key(api_key, alias="GEMINI_API_KEY_1") if api_key else "GEMINI_API_KEY_1"
+
+        # ✅ 긴 원문: 섹션 분할 → 세그먼트 병렬 추출 → 로컬 병합 (반복 패스 대신)
+        if len(plan_text) > plan_segment_chars():
+            try:
+                final_features, mapreduce_stats = generate_feature_list_mapreduce(plan_text, prefer=key_alias)
+                print(f"   (맵-리듀스: {mapreduce_stats})")
+            except Exception as e:
+                return Response({
+                    "error": "Gemini1 맵-리듀스 추출 중 오류가 발생했습니다.",
+                    "detail": str(e)
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            MAX_PASSES = 0
 
         for pass_count in range(1, MAX_PASSES + 1):
             # ✅ 두 번째 호출부터는 1초 지연 시간을 두어 API 과부하 방지
@@ -361,7 +383,7 @@ class Gemini1GenerateView(APIView):
 
             print(f"-> Django View: 기능 추출 패스 #{pass_count} 진행")
             try:
-                new_features = generate_feature_list(plan_text, existing_features=final_features)
+                new_features = generate_feature_list(plan_text, existing_features=final_features, prefer=key_alias)
                 if new_features:
                     final_features.extend(new_features)
                     print(f"   (패스 #{pass_count}: {len(new_features)}개 기능 추가)")
@@ -388,10 +410,10 @@ class Gemini1GenerateView(APIView):
                 outputs = first.get("출력값") or {}
                 if isinstance(outputs, dict):
                     summary = (outputs.get("요약정보") or "").strip()
-            draft = RequirementDraft.objects.create(
-                project=project,
+            draft = create_draft(
+                project,
+                final_features,  # content(JSON) + 기능별 DraftFeature 행
                 source="gemini_1",
-                content=json.dumps(final_features, ensure_ascii=False),
                 generated_by="gemini_1",
                 feature_name=feature_name,
                 summary=summary or "설명 없음",
@@ -405,7 +427,6 @@ class Gemini1GenerateView(APIView):
         warnings = []
         try:
             media_root = getattr(settings, "MEDIA_ROOT", os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media"))
-            media_url  = getattr(settings, "MEDIA_URL", "/media/")
             out_dir = os.path.join(media_root, "drafts")
             os.makedirs(out_dir, exist_ok=True)
             ts = timezone.now().strftime("%Y%m%d_%H%M%S")
@@ -413,17 +434,26 @@ class Gemini1GenerateView(APIView):
             base_path = os.path.join(out_dir, base_name)
             plan_lines = (project.description or "").splitlines()
             json_path = f"{base_path}.json"
+            # 같은 초에 재생성되면 기존(blob 하드링크) 파일을 덮어쓰게 되므로 링크부터 끊음
+            detach_for_write(json_path)
+            detach_for_write(f"{base_path}.xlsx")
             with open(json_path, "w", encoding="utf-8") as f:
                 json.dump({"기획서원문": plan_lines, "기능목록": final_features}, f, ensure_ascii=False, indent=2)
-            json_url = f"{media_url}drafts/{os.path.basename(json_path)}"
+            json_url = file_url(json_path)
             xlsx_url = None
             try:
                 export_tabular_files(plan_lines, final_features, base_path)
-                xlsx_url = f"{media_url}drafts/{os.path.basename(base_path)}.xlsx"
+                xlsx_url = file_url(f"{base_path}.xlsx")
             except (ModuleNotFoundError, ImportError):
                 warnings.append("pandas/openpyxl이 없어 G1 XLSX 생성을 건너뜁니다.")
             except Exception as e:
                 warnings.append(f"G1 엑셀 생성 실패: {e}")
+
+            # 산출물 레지스트리 등록(목록/최신 조회용)
+            register_artifact(json_path, "g1_json", project=project, user=request.user, source_draft=draft, ts=ts)
+            if xlsx_url:
+                register_artifact(f"{base_path}.xlsx", "g1_xlsx", project=project, user=request.user,
+                                  source_draft=draft, ts=ts)
         except Exception as e:
             return Response({"error": f"G1 파일 저장 실패: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -437,6 +467,7 @@ class Gemini1GenerateView(APIView):
                 "score_by_model": 0.0,
                 "used_source": used_source,
                 "files": {"json": json_url, "xlsx": xlsx_url},
+                "mapreduce": mapreduce_stats,
                 "warnings": warnings or None,
             },
             status=status.HTTP_201_CREATED,
@@ -455,11 +486,10 @@ from rest_framework import status, permissions
 import os, json, re
 from django.utils import timezone
 
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
-
 from .models import Project, RequirementDraft
-from .gemini_refiner import make_refine_prompt, export_excel_from_features
+from .gemini_refiner import make_refine_prompt, refine_features_mapreduce, export_excel_from_features
+from .gemini_pool import get_pool, gemini_model
+from .structured_output import StructuredOutputError, gemini_config, parse_json
 
 class Gemini2RefineView(APIView):
     """
@@ -469,6 +499,7 @@ class Gemini2RefineView(APIView):
     동작:
       1) gemini_1 초안(JSON 배열) 로드 (파일 입력은 받지 않음)
       2) make_refine_prompt(plan_text, features)로 프롬프트 생성
+         (원문이 PLAN_SEGMENT_CHARS보다 길면 기능 묶음별 맵-리듀스 정제)
       3) gemini-2.5-flash로 정제 JSON 생성
       4) JSON 파일 + (가능하면) 엑셀 동기화 파일을 MEDIA_ROOT에 저장
       5) gemini_2 초안으로 RequirementDraft 저장
@@ -476,14 +507,6 @@ class Gemini2RefineView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
 
-    def _strip_code_fence(self, s: str) -> str:
-        s = (s or "").strip()
-        # ```json ... ``` 제거
-        if s.startswith("```"):
-            s = re.sub(r"^```(?:json)?", "", s, flags=re.I).strip()
-            s = re.sub(r"```$", "", s).strip()
-        return s
-
     def post(self, request, project_id):
         # ❌ 파일 입력 금지: G2는 검증/정제 전용
         if request.FILES:
@@ -514,48 +537,40 @@ class Gemini2RefineView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-        # 2) 초안 content(JSON 문자열) → list
-        try:
-            features = json.loads(src_draft.content or "[]")
-            if not isinstance(features, list) or not features:
-                return Response(
-                    {"error": "초안 content는 비어있지 않은 JSON 배열이어야 합니다."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        except Exception as e:
+        # 2) 초안 기능 목록(생성 시 정규화된 DraftFeature 행 — content 재파싱 없음)
+        features = draft_features(src_draft)
+        if not features:
             return Response(
-                {"error": f"초안 JSON 파싱 실패: {e}"},
+                {"error": "초안 content는 비어있지 않은 JSON 배열이어야 합니다."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 원문 텍스트 (너무 길면 잘라서 프롬프트 보호)
+        # 원문 텍스트 (자르지 않음: 길면 맵-리듀스 정제로 전환)
         plan_text = (project.description or "").strip()
-        if len(plan_text) > 20000:
-            plan_text = plan_text[:20000]
+        mapreduce_stats = None
 
         # 3) Refiner 프롬프트 생성 및 LLM 호출
         try:
-            # 안전한 구성: settings 또는 환경변수에서 키가 있으면 설정
-            api_key = getattr(settings, "GEMINI_API_KEY_2", None) or os.getenv("GEMINI_API_KEY_2")
-            if api_key:
-                genai.configure(api_key=api_key)
-
-            prompt = make_refine_prompt(plan_text, features)
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            resp = model.generate_content(
-                prompt,
-                generation_config=GenerationConfig(
-                    temperature=0.2,
-                    response_mime_type="application/json"  # ✅ JSON 강제
+            # 키 구성: settings에 별도 키가 있으면 풀에 등록(전역 genai.configure 사용 안 함)
+            api_key = getattr(settings, "GEMINI_API_KEY_2", None)
+            key_alias = get_pool().ensure_key(api_key, alias="GEMINI_API_KEY_2") if api_key else "GEMINI_API_KEY_2"
+
+            if len(plan_text) > plan_segment_chars():
+                refined, mapreduce_stats = refine_features_mapreduce(plan_text, features, prefer=key_alias)
+            else:
+                prompt = make_refine_prompt(plan_text, features)
+                model = gemini_model("gemini-2.5-flash", prefer=key_alias)
+                resp = model.generate_content(
+                    prompt,
+                    generation_config=gemini_config(temperature=0.2),  # ✅ JSON 강제
                 )
-            )
-            text = self._strip_code_fence(getattr(resp, "text", "") or "")
+                text = getattr(resp, "text", "") or ""
 
-            try:
-                refined = json.loads(text)
-            except json.JSONDecodeError:
-                # 파싱 실패 시 원문 텍스트 그대로 보존
-                refined = text
+                try:
+                    refined = parse_json(text, expect="array")[0]  # 코드펜스/잘린 배열 복구
+                except StructuredOutputError:
+                    # 파싱 실패 시 원문 텍스트 그대로 보존
+                    refined = text.strip()
 
         except Exception as e:
             msg = str(e)
@@ -579,8 +594,9 @@ class Gemini2RefineView(APIView):
 
         # 4) 파일 저장(MEDIA_ROOT/refine/) - XLSX는 의존성 없으면 건너뜀
         warnings = []
+        if mapreduce_stats and mapreduce_stats.get("failed_batches"):
+            warnings.append(f"일부 기능 묶음 정제 실패 → 원본 유지: {mapreduce_stats['failed_batches']}")
         media_root = getattr(settings, "MEDIA_ROOT", os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media"))
-        media_url  = getattr(settings, "MEDIA_URL", "/media/")
         out_dir = os.path.join(media_root, "refine")
         os.makedirs(out_dir, exist_ok=True)
 
@@ -588,12 +604,14 @@ class Gemini2RefineView(APIView):
         base = f"project{project.project_id}_{ts}_g2"  # ✅ g2 접미사
         json_path = os.path.join(out_dir, f"{base}_fix.json")
         xlsx_path = os.path.join(out_dir, f"{base}_fix.xlsx")
+        detach_for_write(json_path)
+        detach_for_write(xlsx_path)
 
         # JSON 저장 ({"정제기획서": refined} 래핑) — 항상 생성
         try:
             with open(json_path, "w", encoding="utf-8") as f:
                 json.dump({"정제기획서": refined}, f, ensure_ascii=False, indent=2)
-            json_url = f"{media_url}refine/{os.path.basename(json_path)}"
+            json_url = file_url(json_path)
         except Exception as e:
             return Response({"error": f"JSON 파일 저장 실패: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -604,7 +622,7 @@ class Gemini2RefineView(APIView):
             plan_lines = (project.description or "").splitlines()
             refined_features_for_file = refined if isinstance(refined, list) else features
             export_excel_from_features(plan_lines, refined_features_for_file, xlsx_path)
-            xlsx_url = f"{media_url}refine/{os.path.basename(xlsx_path)}"
+            xlsx_url = file_url(xlsx_path)
         except (ModuleNotFoundError, ImportError):
             warnings.append("pandas/openpyxl이 없어 XLSX 생성을 건너뜁니다. 'pip install pandas openpyxl' 후 재시도하세요.")
         except Exception as e:
@@ -616,10 +634,11 @@ class Gemini2RefineView(APIView):
                 json.dumps(refined, ensure_ascii=False, indent=2)
                 if not isinstance(refined, str) else refined
             )
-            new_draft = RequirementDraft.objects.create(
-                project=project,
-                source="gemini_2",
+            new_draft = create_draft(
+                project,
+                refined,
                 content=refined_text_for_db,
+                source="gemini_2",
                 generated_by="gemini_2",
                 feature_name="Refined Draft by Gemini 2",
                 summary="Gemini 2가 정제한 결과(JSON/Excel 동기화).",
@@ -631,6 +650,12 @@ class Gemini2RefineView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+        # 5-1) 산출물 레지스트리 등록
+        register_artifact(json_path, "g2_json", project=project, user=request.user, source_draft=new_draft, ts=ts)
+        if xlsx_url:
+            register_artifact(xlsx_path, "g2_xlsx", project=project, user=request.user,
+                              source_draft=new_draft, ts=ts)
+
         # 6) 응답
         return Response({
             "message": "Gemini 2 정제 완료 (JSON/Excel 동기화)",
@@ -640,6 +665,7 @@ class Gemini2RefineView(APIView):
                 "json": json_url,
                 "xlsx": xlsx_url  # 의존성 없으면 None
             },
+            "mapreduce": mapreduce_stats,
             "warnings": warnings or None
         }, status=status.HTTP_201_CREATED)
     
@@ -647,39 +673,21 @@ class Gemini2RefineView(APIView):
 class ProjectG2FilesView(APIView):
     """
     GET /api/project/<project_id>/files/g2/
-    refine/ 밑에 저장된 G2(JSON/XLSX) 파일 목록을 최신순으로 반환
+    refine/ 밑에 저장된 G2(JSON/XLSX) 파일 목록을 최신순으로 반환 (Artifact 레지스트리 조회)
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, project_id):
         project = get_object_or_404(Project, project_id=project_id, user=request.user)
 
-        media_root = getattr(settings, "MEDIA_ROOT",
-                             os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media"))
-        media_url  = getattr(settings, "MEDIA_URL", "/media/")
-        pid = project.project_id
-
-        refine_dir = os.path.join(media_root, "refine")
-        json_paths = sorted(glob(os.path.join(refine_dir, f"project{pid}_*_g2_fix.json")), reverse=True)
-        xlsx_set   = set(glob(os.path.join(refine_dir, f"project{pid}_*_g2_fix.xlsx")))
-
-        def _ts_to_iso(fname_base: str):
-            # project{pid}_YYYYMMDD_HHMMSS_g2_fix
-            name = os.path.basename(fname_base)
-            ts = name.split(f"project{pid}_")[1].split("_g2", 1)[0]
-            try:
-                return datetime.strptime(ts, "%Y%m%d_%H%M%S").isoformat()
-            except Exception:
-                return None
-
+        xlsx_by_ts = {a.ts: a for a in list_artifacts(project, "g2_xlsx")}
         items = []
-        for jp in json_paths:
-            base = jp[:-5]  # .json 제거
-            xp = f"{base}.xlsx"
+        for a in list_artifacts(project, "g2_json"):
             items.append({
-                "json": f"{media_url}refine/{os.path.basename(jp)}",
-                "xlsx": f"{media_url}refine/{os.path.basename(xp)}" if xp in xlsx_set else None,
-                "created_at": _ts_to_iso(base),
+                "json": artifact_url(a),
+                "xlsx": artifact_url(xlsx_by_ts.get(a.ts)),
+                "created_at": ts_to_iso(a.ts),
+                "draft_id": a.source_draft_id,
             })
 
         return Response({
@@ -690,6 +698,19 @@ class ProjectG2FilesView(APIView):
 
 # 리액트에 초안들 보여주는 기능
 # views.py (마지막에 추가)
+from .list_api import ListError, build_list, col, computed, list_etag, list_response, not_modified, validate_params, with_etag
+
+DRAFT_LIST_FIELDS = {
+    "draft_id": col("RequirementDraft_id"),
+    "type": computed(("generated_by",), lambda r: "Gemini1" if r["generated_by"] == "gemini_1" else "Gemini2"),
+    "feature_name": col("feature_name"),
+    "summary": col("summary"),
+    "score_by_model": col("score_by_model"),
+    "content": col("content"),  # JSON 문자열(큰 TEXT) — 필요 없으면 ?fields=로 제외
+    "created_at": col("created_at"),
+}
+
+
 class RequirementDraftListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -701,22 +722,13 @@ class RequirementDraftListView(APIView):
             return Response({"error": "해당 프로젝트가 존재하지 않거나 권한이 없습니다."},
                             status=status.HTTP_404_NOT_FOUND)
 
-        drafts = RequirementDraft.objects.filter(project=project)
-
-        # React에서 사용하는 형식에 맞춰 변환
-        result = []
-        for d in drafts:
-            result.append({
-                "draft_id": d.RequirementDraft_id,
-                "type": "Gemini1" if d.generated_by == "gemini_1" else "Gemini2",
-                "feature_name": d.feature_name,
-                "summary": d.summary,
-                "score_by_model": d.score_by_model,
-                "content": d.content,  # JSON 문자열
-                "created_at": d.created_at,
-            })
-
-        return Response(result, status=status.HTTP_200_OK)
+        # React에서 사용하는 형식(오래된 순). ?fields= / ?limit=&cursor= / ETag(304)는 list_api
+        return list_response(
+            request,
+            RequirementDraft.objects.filter(project=project),
+            DRAFT_LIST_FIELDS,
+            descending=False,
+        )
 
 
 
@@ -737,7 +749,10 @@ from .github_crawler import (
     get_readme_content,
     matched_keywords_list,
 )
-from .github_num import make_similarity_prompt, gemini_similarity_eval
+from .gemini_pool import is_auth_error, is_rate_limit_error
+from .github_num import gemini_similarity_batch
+from .keyword_extractor import extract_keywords
+from .similar_store import rows_from_similar_map, upsert_similar_projects
 from .similarity_analyzer import analyze_similarity as run_similarity_report
 
 
@@ -748,13 +763,14 @@ class Gemini3RecommendView(APIView):
       {
         "override_keywords": ["custom","keyword","list"],
         "top_k": 3,          # 응답/DB 저장 개수(기본 3)
-        "eval_limit": 8,     # 🔸 평가 전 컷오프: Gemini 호출 개수 상한
+        "eval_limit": 8,     # 🔸 평가 전 컷오프: Gemini로 평가할 후보 수 상한
+        "batch_size": 8,     # 🔸 한 번의 Gemini 호출로 평가할 후보 수(기본 G3_BATCH_SIZE, 1=후보별 단건)
         "sleep": 0.4         # 🔸 Gemini 호출 사이 간격(초)
       }
     동작:
       1) 확정된 Requirement 수집 → 키워드 구성
       2) GitHub 검색/README 수집 (github_crawler.*)
-      3) 🔸 (수정) 평가 전 컷오프 후 Gemini 재랭킹 (github_num.*)
+      3) 🔸 (수정) 평가 전 컷오프 후 Gemini 배치 재랭킹 (github_num.gemini_similarity_batch)
       4) SimilarProject DB 저장
       5) github_repositories.json 저장(컷오프 이후 후보들)
       6) features_*.json 생성(최신 gemini_2 정제본 우선, 없으면 폴백 생성)
@@ -768,24 +784,13 @@ class Gemini3RecommendView(APIView):
         return re.sub(r"\s+", " ", s or "").strip()
 
     def _extract_basic_keywords(self, requirements, topk: int = 10):
-        """feature_name/summary에서 간단 키워드 추출(영문/숫자/하이픈, 3자 이상, 중복제거)"""
-        bag = []
-        for r in requirements:
-            bag.append(self._one_line(getattr(r, "feature_name", "") or ""))
-            bag.append(self._one_line(getattr(r, "summary", "") or ""))
-        text = " ".join(bag).lower()
-        words = re.findall(r"[a-z0-9][a-z0-9\-]{2,}", text)
-        stop = {"and","the","for","with","from","that","this","into","your","you",
-                "are","can","have","has","how","use","using","based"}
-        uniq, seen = [], set()
-        for w in words:
-            if w in stop:
-                continue
-            if w not in seen:
-                seen.add(w)
-                uniq.append(w)
-            if len(uniq) >= topk:
-                break
+        """feature_name/summary에서 검색 키워드 추출(keyword_extractor: 한글 토큰화 + 용어집 영문 변환 + TF-IDF)"""
+        docs = [
+            self._one_line(f"{getattr(r, 'feature_name', '') or ''} {getattr(r, 'summary', '') or ''}")
+            for r in requirements
+        ]
+        docs = [d for d in docs if d]
+        uniq = extract_keywords("\n".join(docs), top_k=topk, corpus=docs)
         return uniq if uniq else ["ai", "automation"]
 
     # ── main ──────────────────────────────────────────────────────────────────
@@ -842,48 +847,53 @@ class Gemini3RecommendView(APIView):
         candidates = candidates[:eval_limit]
 
         # 4) Gemini 점수화 + 코멘트 (github_num.*)
+        #    요구사항 텍스트는 배치당 한 번만 전송, 검증 실패 항목만 단건 평가로 폴백
         merged = "\n".join(f"- {r.feature_name} — {r.summary or ''}" for r in reqs)[:8000]
         sleep_sec = float(request.data.get("sleep", 0.4))
-        for c in candidates:
-            desc = c.get("description", "") or ""
-            readme_trunc = (c.get("readme", "") or "")[:3500]
-            prompt = make_similarity_prompt(merged, desc, readme_trunc)
-            try:
-                score, comment = gemini_similarity_eval(prompt)  # (float|None, str)
-            except Exception as e:
-                msg = str(e).lower()
-                # 친절한 힌트(429/401) + 휴리스틱 폴백
-                if "429" in msg or "rate" in msg or "quota" in msg or "exceeded" in msg:
-                    time.sleep(3)
-                    try:
-                        score, comment = gemini_similarity_eval(prompt)
-                    except Exception:
-                        score = 0.5 * c["matched_count"] + (c["stars"] / 1000.0)
-                        comment = "429 지속 → 휴리스틱 점수 사용"
-                elif "401" in msg or "unauthorized" in msg or "invalid" in msg or "permission" in msg:
-                    score, comment = 0.0, "Gemini 401(키 인증 실패). GEMINI_API_KEY_3 확인."
-                else:
-                    score, comment = 0.0, f"Gemini 평가 실패: {e}"
+        batch_size = request.data.get("batch_size")
+        try:
+            scored = gemini_similarity_batch(
+                merged, candidates,
+                batch_size=int(batch_size) if batch_size is not None else None,
+                sleep=sleep_sec,
+            )
+        except Exception as e:
+            # 친절한 힌트(429/401) + 휴리스틱 폴백 (github_num은 두 경우 재시도·폴백 없이 바로 올림)
+            if is_rate_limit_error(e):
+                scored = [(0.5 * c["matched_count"] + (c["stars"] / 1000.0), "429 지속 → 휴리스틱 점수 사용")
+                          for c in candidates]
+            elif is_auth_error(e):
+                scored = [(0.0, "Gemini 401(키 인증 실패). GEMINI_API_KEY_3 확인.")] * len(candidates)
+            else:
+                scored = [(0.0, f"Gemini 평가 실패: {e}")] * len(candidates)
+        for c, (score, comment) in zip(candidates, scored):
             c["gemini_score"] = float(score if score is not None else 0.0)
             c["gemini_comment"] = comment
-            time.sleep(sleep_sec)  # 쿼터 보호
 
         # 5) 정렬 & 저장
         top_k = int(request.data.get("top_k", 3))
         candidates.sort(key=lambda x: (-x.get("gemini_score", 0.0), -x.get("stars", 0)))
         topN = candidates[:top_k]
 
-        SimilarProject.objects.filter(project=project).delete()
+        # 업서트 1문장 + 이번 추천에 없는 기존 행 정리(목록 교체)
+        upsert_similar_projects(project, [
+            {
+                "repo_name": item["name"],
+                "repo_url": item["url"],
+                "language": item.get("language", ""),
+                "stars": item.get("stars", 0),
+                "similarity_score": item.get("gemini_score", 0.0),
+            } for item in topN
+        ], prune=True)
+        saved = {
+            sp.repo_url: sp
+            for sp in SimilarProject.objects.filter(project=project, repo_url__in=[i["url"].rstrip("/") for i in topN])
+        }
         items = []
         for rank, item in enumerate(topN, start=1):
-            sp = SimilarProject.objects.create(
-                project=project,
-                repo_name=item["name"],
-                repo_url=item["url"],
-                language=item.get("language", "")[:50],
-                stars=item.get("stars", 0),
-                similarity_score=item.get("gemini_score", 0.0),
-            )
+            sp = saved.get(item["url"].rstrip("/"))
+            if sp is None:
+                continue
             items.append({
                 "id": sp.pk,
                 "repo_name": sp.repo_name,
@@ -907,10 +917,9 @@ class Gemini3RecommendView(APIView):
                 .first()
             )
             if refined:
-                try:
-                    refined_json = json.loads(refined.content)
-                except Exception:
-                    refined_json = refined.content  # 문자열이면 그대로
+                refined_json = draft_features(refined)
+                if refined_json is None:
+                    refined_json = refined.content  # 기능 배열이 아니면 문자열 그대로
                 payload = {"정제기획서": refined_json}
             else:
                 feats = []
@@ -955,15 +964,16 @@ class Gemini3RecommendView(APIView):
             try:
                 media_root = getattr(settings, "MEDIA_ROOT",
                                      os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media"))
-                media_url = getattr(settings, "MEDIA_URL", "/media/")
                 out_dir = os.path.join(media_root, "reports")
                 os.makedirs(out_dir, exist_ok=True)
 
                 base = f"project{project.project_id}_analysis_report.md"
                 dst = os.path.join(out_dir, base)
+                detach_for_write(dst)  # 고정 파일명 → 이전 보고서가 blob과 공유하는 inode를 덮지 않게
                 with open(report_fs_path, "rb") as src, open(dst, "wb") as dstf:
                     dstf.write(src.read())
-                report_url = f"{media_url}reports/{base}"
+                report_url = file_url(dst)
+                register_artifact(dst, "report_md", project=project, user=request.user)
             except Exception:
                 report_url = None
 
@@ -1099,6 +1109,7 @@ class TeamMemberUpdateView(APIView):
 
 from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
 from django.db import transaction
+from django.db.models import F
 
 class AutoAssignTasksView(APIView):
     permission_classes = [IsAuthenticated]
@@ -1112,7 +1123,9 @@ class AutoAssignTasksView(APIView):
         members = list(TeamMember.objects.filter(project=project))
         # 확정된 요건만 배정 대상으로 사용
         requirements = list(
-            Requirement.objects.filter(project=project, confirmed_by_user=True).order_by("Requirement")
+            Requirement.objects.filter(project=project, confirmed_by_user=True)
+            .annotate(feature_text=F("source_feature__search_text"))
+            .order_by("Requirement")
         )
 
         if not members:
@@ -1128,40 +1141,7 @@ class AutoAssignTasksView(APIView):
         # ──────────────────────────────────────────────
         # 정규화 / 토큰화 유틸
         # ──────────────────────────────────────────────
-        SYNONYM_MAP = {
-            # 언어/런타임
-            r"\bc\+\+\b": "cpp", r"\bc sharp\b|\bc#\b": "csharp", r"\bpy(thon)?\b": "python",
-            r"\bjs\b|\bjavascript\b": "javascript", r"\bts\b|\btypescript\b": "typescript",
-            r"\bnode\.?js\b|\bnodejs\b|\bnode\b": "node", r"\bjava\b": "java",
-            r"\bgo(lang)?\b": "golang", r"\brust\b": "rust", r"\bphp\b": "php",
-            r"\bkotlin\b": "kotlin", r"\bswift\b": "swift",
-            # 프레임워크 / FE
-            r"\bdjango\b": "django", r"\bfastapi\b": "fastapi", r"\bspring\b|\bspringboot\b": "spring",
-            r"\breact ?native\b": "reactnative", r"\breact\b": "react", r"\bvue(js)?\b": "vue",
-            r"\bangular\b": "angular", r"\bnext\.?js\b": "nextjs", r"\btailwind\b": "tailwind",
-            # 데이터/DB
-            r"\bmysql\b": "mysql", r"\bpostgres(ql)?\b": "postgres", r"\bmaria(db)?\b": "mariadb",
-            r"\bredis\b": "redis", r"\bkafka\b": "kafka", r"\bsql\b": "sql", r"\brdbms\b": "db",
-            r"\bmongo(db)?\b": "mongodb",
-            # 인프라/클라우드/DevOps
-            r"\baws\b": "aws", r"\bgcp\b": "gcp", r"\bazure\b": "azure",
-            r"\bk8s\b|\bkubernetes\b": "kubernetes", r"\bdocker\b": "docker",
-            r"\bterraform\b": "terraform", r"\bci/?cd\b|\bpipeline\b": "cicd",
-            # AI/데이터
-            r"\bai\b|\bml\b|\bmachine learning\b": "ml",
-            r"\bpytorch\b": "pytorch", r"\btensorflow\b|\btf\b": "tensorflow",
-            r"\bnlp\b": "nlp", r"\bcv\b|\bcomputer vision\b": "cv",
-            r"\bllm\b": "llm", r"\binference\b": "inference", r"\bembedding(s)?\b": "embedding",
-            # 기타 도메인/역할
-            r"\bbackend\b|백엔드": "backend", r"\bfrontend\b|프론트(엔드)?": "frontend",
-            r"\bfull[- ]?stack\b": "fullstack",
-            r"\bdevops\b|인프라": "devops", r"\bqa\b|\btest(ing)?\b|테스트": "qa",
-            r"\bpm\b|\bproduct manager\b|기획|문서|문서화|스펙|요구사항": "docs",
-            r"\bmobile\b|안드로이드|iOS": "mobile",
-            r"\bui\b|\bux\b|디자인": "design",
-            r"\bapi\b|rest|grpc|msa|microservice": "api",
-            r"데이터|분석|통계|bi|warehouse|etl|spark|airflow": "data"
-        }
+        from .keyword_extractor import SYNONYM_MAP
 
         CATEGORY_WORDS = {
             "backend": {"backend", "api", "server", "db", "sql", "django", "spring", "node", "fastapi", "redis", "kafka"},
@@ -1198,22 +1178,17 @@ class AutoAssignTasksView(APIView):
                 "id": getattr(m, "TeamMember", getattr(m, "pk", None))
             }
 
-        def _flatten_strings(x, bag):
-            if isinstance(x, dict):
-                for v in x.values(): _flatten_strings(v, bag)
-            elif isinstance(x, list):
-                for v in x: _flatten_strings(v, bag)
-            elif isinstance(x, str):
-                bag.append(x)
-
         def _req_tokens_and_category(req: Requirement):
             pieces = [req.feature_name or "", req.summary or ""]
-            # description에 원본 JSON이 들어있으면 펼쳐서 문자열만 수집
-            try:
-                raw = json.loads(req.description or "{}")
-                _flatten_strings(raw, pieces)
-            except Exception:
-                pass
+            if req.feature_text:
+                # finalize 원본 기능(DraftFeature)의 평탄화 문자열 — JSON 파싱 없음
+                pieces.append(req.feature_text)
+            elif req.description:
+                # description에 원본 JSON이 들어있으면 펼쳐서 문자열만 수집
+                try:
+                    flatten_strings(json.loads(req.description), pieces)
+                except Exception:
+                    pass
             toks = _to_tokens(" ".join(pieces))
 
             # 카테고리 추정
@@ -1407,7 +1382,7 @@ from rest_framework import permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from .models import Project, Requirement, GanttChart, GanttTask, OutputDocument
+from .models import Project, Requirement, GanttChart, OutputDocument
 from .gemini_gantt import make_prompt, call_gemini, parse_llm_array, build_gantt_xlsx
 
 
@@ -1426,7 +1401,7 @@ def _unique_name(outdir: str, prefix: str = "간트차트", ext: str = ".xlsx")
     """동일 파일명 있으면 _1, _2…로 뒤에 번호를 붙여 유니크한 이름 생성."""
     name = f"{prefix}{ext}"
     i = 1
-    while os.path.exists(os.path.join(outdir, name)):
+    while stored_exists(os.path.join(outdir, name)):
         name = f"{prefix}_{i}{ext}"
         i += 1
     return name
@@ -1475,7 +1450,7 @@ from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Project, Requirement, GanttChart, GanttTask
+from .models import Project, Requirement, GanttChart
 
 # gemini_gantt.py 유틸 사용
 from .gemini_gantt import (
@@ -1486,6 +1461,7 @@ from .gemini_gantt import (
     build_gantt_xlsx,
     unique_filename,
 )
+from .gantt_store import normalize_items, save_chart_tasks
 
 # =========================
 # helpers
@@ -1514,6 +1490,37 @@ def _unique_name(outdir: str, base: str, ext: str) -> str:
     """중복 시 _1, _2… 붙여 유니크 파일명 생성 (gemini_gantt.unique_filename 사용)"""
     return unique_filename(outdir, base=base, ext=ext)
 
+def _save_gantt_xlsx(request, project, gantt, items, parts, filename_prefix):
+    """작업 항목으로 .xlsx 생성 → gantt.file_path 저장 + 산출물 등록. 반환: 파일명(실패 시 예외)"""
+    outdir = _media_subdir("gantt")
+    base_prefix = f"project{project.project_id}_{filename_prefix}"  # 파일명에 projectID 자동 포함
+    fname = _unique_name(outdir, base_prefix, ".xlsx")
+    abspath = os.path.join(outdir, fname)
+    build_gantt_xlsx(items, gantt.total_weeks, parts, abspath)
+
+    # 파일 경로 저장(상대 경로)
+    gantt.file_path = os.path.join("gantt", fname)
+    gantt.save(update_fields=["file_path", "updated_at"])
+    register_artifact(abspath, "gantt_xlsx", project=project, user=request.user)
+    return fname
+
+def _gantt_file_response(gantt, fname, message, **extra):
+    """생성/재계획 공통 응답 (G1 스타일: 생성 안내 문구 + files.xlsx)"""
+    xlsx_url = file_url(gantt.file_path)
+    return Response({
+        "message": message,
+        "doc_id": gantt.GanttChart,              # 레거시 호환
+        "gantt_id": gantt.GanttChart,            # 권장 필드
+        "filename": fname,                        # 예) project6_오토플랜_1차간트.xlsx
+        "relative_path": gantt.file_path,         # 예) gantt/project6_...
+        "files": {"xlsx": xlsx_url},              # ✅ G1과 유사 구조
+        "download_url": f"/api/gantt/download/{gantt.GanttChart}/",
+        "download_by_name_url": f"/api/gantt/file/{fname}",
+        "public_media_url": xlsx_url,
+        **extra,
+        "warnings": None
+    }, status=201)
+
 # =========================
 # Gantt 생성 뷰 (OutputDocument 미사용) - PATCHED
 # =========================
@@ -1532,7 +1539,6 @@ class GanttChartGenerateView(APIView):
     parser_classes = [JSONParser, FormParser, MultiPartParser]
 
     def post(self, request, project_id):
-        import re  # <-- 내부 임포트(외부 수정 불필요)
         project = get_object_or_404(Project, project_id=project_id, user=request.user)
 
         # 1) 입력값
@@ -1578,19 +1584,6 @@ class GanttChartGenerateView(APIView):
         except Exception as e:
             return Response({"error": f"Gemini 처리 실패: {e}"}, status=500)
 
-        # === 추가: requirement_id 정규화 유틸 ===
-        def _to_int_pk(value):
-            """문자/라벨('F-001','REQ-12') → 끝자리 숫자 추출해서 int로. 못 찾으면 None."""
-            if value is None:
-                return None
-            if isinstance(value, int):
-                return value
-            s = str(value).strip()
-            if s.isdigit():  # "17"
-                return int(s)
-            m = re.search(r"(\d+)$", s)  # "F-001" → "001"
-            return int(m.group(1)) if m else None
-
         # === 추가: Requirement dict 캐시(루프마다 쿼리 금지) ===
         req_map = {getattr(r, "Requirement", r.pk): r for r in reqs.only("Requirement")}
 
@@ -1606,105 +1599,126 @@ class GanttChartGenerateView(APIView):
             version=version,
         )
 
-        # 7) 태스크 벌크 저장 (PATCH: requirement 안전 매핑 + parts 안전 처리)
-        order_counter, tasks_to_create = {}, []
-        for item in parsed:
-            # 기능명/작업명 잡기(여러 키 지원)
-            feature = (
-                item.get("기능명")
-                or item.get("feature_name")
-                or item.get("작업명")
-                or item.get("task")
-                or str(item.get("기능ID") or "작업")
-            )
+        # 7) 태스크 벌크 저장 (gantt_store: 항목 정규화 + requirement 안전 매핑 + task_key/선행작업 보관)
+        save_chart_tasks(gantt, normalize_items(parsed, total_weeks), req_map)
 
-            # 파트가 문자열로 올 수도 있음 → 리스트로 정규화
-            parts_in_item = item.get("파트") or item.get("part") or item.get("parts") or ["기타"]
-            if isinstance(parts_in_item, str):
-                parts_in_item = [p.strip() for p in parts_in_item.split(",") if p.strip()]
-            if not isinstance(parts_in_item, list) or not parts_in_item:
-                parts_in_item = ["기타"]
-            parts_in_item = [str(p).strip() for p in parts_in_item if str(p).strip()]
+        # 8) 엑셀(.xlsx) 생성  ← 파일명에 projectID 자동 포함
+        try:
+            fname = _save_gantt_xlsx(request, project, gantt, parsed, parts, filename_prefix)
+        except Exception as e:
+            return Response({"error": f"엑셀 생성 실패: {e}"}, status=500)
 
-            # 주차/기간 정수화 + 범위 보정
-            try:
-                start_w = int(item.get("시작주차") or item.get("start_week") or 1)
-            except Exception:
-                start_w = 1
+        # ✅ 응답 (G1 스타일: 생성 안내 문구 + files.xlsx)
+        return _gantt_file_response(gantt, fname, f"간트차트 엑셀 파일이 생성되었습니다: {fname}")
+
+
+# =========================
+# Gantt 부분 재계획 뷰 (바뀐 작업만 LLM 전송 → delta 버전)
+# =========================
+from .gantt_replan import ReplanError, call_replan, plan_replan, save_replan, splice
+
+
+class GanttReplanView(APIView):
+    """
+    POST /api/project/<int:project_id>/gantt/replan/
+    Body(JSON): (모두 선택)
+    {
+      "gantt_id": 12,                 # 기준 버전(없으면 최신)
+      "requirement_ids": [3, 7],      # 바뀐 확정 기능(없으면 기준 버전 이후 수정/추가/확정해제된 기능 자동 감지)
+      "task_keys": ["F-003"],         # 직접 지정할 작업(기능ID)
+      "feedback": "로그인 일정을 1주 앞당겨 주세요",
+      "filename": "오토플랜_재계획"
+    }
+    - 바뀐 작업 + 선후관계 이웃만 LLM에 보내고, 결과를 기준 버전에 덮어써 새 버전 생성
+    - 새 버전은 기준 버전 대비 바뀐 태스크만 저장(is_delta) → GET .../gantt/latest/tasks/ 는 합쳐서 반환
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+
+    def post(self, request, project_id):
+        project = get_object_or_404(Project, project_id=project_id, user=request.user)
+
+        gantt_id = request.data.get("gantt_id")
+        if gantt_id:
             try:
-                dur_w = int(item.get("기간") or item.get("duration") or item.get("duration_weeks") or 1)
-            except Exception:
-                dur_w = 1
-            if start_w < 1: start_w = 1
-            if dur_w < 1: dur_w = 1
-            if start_w > total_weeks: start_w = total_weeks
-            if start_w + dur_w - 1 > total_weeks:
-                dur_w = max(1, total_weeks - start_w + 1)
-
-            # requirement FK 안전 매핑 (핵심 수정)
-            rid_raw = item.get("requirement_id") or item.get("기능ID")
-            rid_int = _to_int_pk(rid_raw)
-            req_obj = req_map.get(rid_int) if rid_int is not None else None
-
-            for p in parts_in_item:
-                key = str(p) or "기타"
-                order_counter[key] = order_counter.get(key, 0) + 1
-                tasks_to_create.append(GanttTask(
-                    gantt_chart=gantt,
-                    requirement=req_obj,          # None 허용
-                    part=key,
-                    feature_name=str(feature),
-                    start_week=start_w,
-                    duration_weeks=dur_w,
-                    order=order_counter[key],
-                ))
-
-        if tasks_to_create:
-            GanttTask.objects.bulk_create(tasks_to_create)
+                gantt_id = int(gantt_id)
+            except (TypeError, ValueError):
+                return Response({"error": "gantt_id는 정수여야 합니다."}, status=400)
+
+        requirement_ids = request.data.get("requirement_ids")
+        task_keys = request.data.get("task_keys")
+        try:
+            if requirement_ids is not None:
+                if isinstance(requirement_ids, (str, int)):
+                    requirement_ids = [v for v in str(requirement_ids).split(",") if v.strip()]
+                requirement_ids = [int(v) for v in requirement_ids]
+        except (TypeError, ValueError):
+            return Response({"error": "requirement_ids는 정수 배열이어야 합니다."}, status=400)
+        if isinstance(task_keys, str):
+            task_keys = task_keys.split(",")
+        if task_keys is not None:
+            if not isinstance(task_keys, (list, tuple)) or not all(isinstance(k, (str, int)) for k in task_keys):
+                return Response({"error": "task_keys는 기능ID 문자열 배열이어야 합니다."}, status=400)
+            task_keys = [str(k).strip() for k in task_keys if str(k).strip()]
+
+        charts = GanttChart.objects.filter(project=project)
+        if gantt_id:
+            base = get_object_or_404(charts, GanttChart=gantt_id)
+        else:
+            base = charts.order_by("-created_at", "-GanttChart").first()
+            if base is None:
+                return Response({"error": "간트차트가 없습니다. 먼저 간트차트를 생성하세요."}, status=404)
+        feedback = (request.data.get("feedback") or "").strip()
+        filename_prefix = _sanitize_filename(request.data.get("filename") or "간트차트_재계획")
+
+        try:
+            plan = plan_replan(project, base, requirement_ids, task_keys, feedback)
+        except ReplanError as e:
+            return Response({"error": str(e)}, status=400)
 
-        # 8) 엑셀(.xlsx) 생성  ← 파일명에 projectID 자동 포함
-        outdir = _media_subdir("gantt")
-        base_prefix = f"project{project.project_id}_{filename_prefix}"
-        fname = _unique_name(outdir, base_prefix, ".xlsx")
-        abspath = os.path.join(outdir, fname)
         try:
-            build_gantt_xlsx(parsed, total_weeks, parts, abspath)
+            llm_text, returned = call_replan(plan)
         except Exception as e:
-            return Response({"error": f"엑셀 생성 실패: {e}"}, status=500)
+            return Response({"error": f"Gemini 처리 실패: {e}"}, status=500)
 
-        # 파일 경로 저장(상대 경로)
-        gantt.file_path = os.path.join("gantt", fname)
-        gantt.save(update_fields=["file_path"])
+        delta, removed, all_tasks = splice(plan, returned)
+        gantt = save_replan(project, plan, llm_text, delta, removed, all_tasks)
 
-        # ✅ 응답 (G1 스타일: 생성 안내 문구 + files.xlsx)
-        media_url = getattr(settings, "MEDIA_URL", "/media/")
-        xlsx_url = f"{media_url}{gantt.file_path}"
-        return Response({
-            "message": f"간트차트 엑셀 파일이 생성되었습니다: {fname}",
-            "doc_id": gantt.GanttChart,              # 레거시 호환
-            "gantt_id": gantt.GanttChart,            # 권장 필드
-            "filename": fname,                        # 예) project6_오토플랜_1차간트.xlsx
-            "relative_path": gantt.file_path,         # 예) gantt/project6_...
-            "files": {"xlsx": xlsx_url},              # ✅ G1과 유사 구조
-            "download_url": f"/api/gantt/download/{gantt.GanttChart}/",
-            "download_by_name_url": f"/api/gantt/file/{fname}",
-            "public_media_url": xlsx_url,
-            "warnings": None
-        }, status=201)
+        # 엑셀은 새 버전 전체로 생성
+        items = [
+            {"기능ID": t["key"], "기능명": t["feature_name"], "파트": t["parts"],
+             "기간": t["duration_weeks"], "시작주차": t["start_week"]}
+            for t in all_tasks
+        ]
+        try:
+            fname = _save_gantt_xlsx(request, project, gantt, items, list(gantt.parts or []), filename_prefix)
+        except Exception as e:
+            return Response({"error": f"엑셀 생성 실패: {e}"}, status=500)
+
+        return _gantt_file_response(
+            gantt, fname, f"간트차트가 부분 재계획되었습니다: {fname}",
+            parent_id=base.GanttChart,
+            version=gantt.version,
+            is_delta=gantt.is_delta,
+            replanned=[t["key"] for t in delta],   # 바뀐 작업(기능ID)
+            removed=removed,
+            sent_tasks=len(plan.editable) + len(plan.new_keys),
+            total_tasks=len(all_tasks),
+            prompt_chars=len(plan.prompt or ""),
+        )
 
 
 # ====== 간트차트 다운로드 뷰들 (GanttChart 기반) ======
 import os
-from urllib.parse import quote
 
 from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.http import FileResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
 
 from .models import GanttChart
+from .artifact_serving import serve_artifact
 
 XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
@@ -1732,19 +1746,11 @@ class GanttChartDownloadView(APIView):
             return Response({"error": "파일 경로가 비어 있습니다."}, status=404)
 
         abs_path = os.path.join(_media_root(), rel_path)
-        if not os.path.isfile(abs_path):
+        if not stored_exists(abs_path):
             return Response({"error": "파일이 존재하지 않습니다."}, status=404)
 
-        filename = os.path.basename(abs_path)
-        resp = FileResponse(
-            open(abs_path, "rb"),
-            as_attachment=True,
-            filename=filename,
-            content_type=XLSX_MIME,
-        )
-        # 한글 파일명 호환
-        resp.headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
-        return resp
+        # ETag/304/Range/프록시 위임 + 한글 파일명 호환
+        return serve_artifact(request, abs_path, os.path.basename(abs_path), XLSX_MIME)
 
 
 # 2) 파일명 기반 다운로드: 생성 응답의 download_by_name_url 과 매칭
@@ -1764,17 +1770,10 @@ class GanttChartDownloadByNameView(APIView):
             return Response({"error": "파일을 찾을 수 없거나 권한이 없습니다."}, status=404)
 
         abs_path = os.path.join(_media_root(), rel_path)
-        if not os.path.isfile(abs_path):
+        if not stored_exists(abs_path):
             return Response({"error": "파일이 존재하지 않습니다."}, status=404)
 
-        resp = FileResponse(
-            open(abs_path, "rb"),
-            as_attachment=True,
-            filename=safe_name,
-            content_type=XLSX_MIME,
-        )
-        resp.headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(safe_name)}"
-        return resp
+        return serve_artifact(request, abs_path, safe_name, XLSX_MIME)
 
 
 
@@ -1899,51 +1898,63 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from .models import Requirement, SimilarProject, Project
 
+CONFIRMED_LIST_FIELDS = {
+    name: col(name) for name in ("Requirement", "feature_name", "summary", "description", "created_at")
+}
+
+
 class ConfirmedRequirementListView(APIView):
     """
     GET /api/project/<project_id>/requirements/confirmed/
-    확정된 기능 명세서 목록만 반환
+    확정된 기능 명세서 목록만 반환 (최신순)
+    ?fields=feature_name,summary  ?limit=50&cursor=...  If-None-Match → 304
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, project_id):
         project = get_object_or_404(Project, pk=project_id, user=request.user)
-        items = list(
-            Requirement.objects
-            .filter(project=project, confirmed_by_user=True)
-            .order_by("-created_at")
-            .values("Requirement", "feature_name", "summary", "description", "created_at")
+        return list_response(
+            request,
+            Requirement.objects.filter(project=project, confirmed_by_user=True),
+            CONFIRMED_LIST_FIELDS,
         )
-        return Response(items, status=200)
 
 
 class ConfirmedAndSimilarView(APIView):
     """
     GET /api/project/<project_id>/requirements/confirmed-and-similar/
     확정된 기능 명세서와 저장된 유사 프로젝트를 한 번에 반환
+    ?fields= / ?limit=&cursor= 는 confirmed 목록에 적용(페이지면 confirmed_next_cursor 포함), ETag는 두 목록 합산
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, project_id):
         project = get_object_or_404(Project, pk=project_id, user=request.user)
+        confirmed_qs = Requirement.objects.filter(project=project, confirmed_by_user=True)
+        similar_qs = SimilarProject.objects.filter(project=project)
 
-        confirmed = list(
-            Requirement.objects
-            .filter(project=project, confirmed_by_user=True)
-            .order_by("-created_at")
-            .values("Requirement", "feature_name", "summary", "description", "created_at")
-        )
+        try:
+            validate_params(request, CONFIRMED_LIST_FIELDS)
+        except ListError as e:
+            return Response({"error": str(e)}, status=400)
+        etag = list_etag(request, confirmed_qs, similar_qs)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        confirmed = build_list(request, confirmed_qs, CONFIRMED_LIST_FIELDS)
         similar = list(
-            SimilarProject.objects
-            .filter(project=project)
+            similar_qs
             .order_by("-similarity_score", "-stars")
             .values("SimilarProject", "repo_name", "repo_url", "language", "stars", "similarity_score", "created_at")
         )
 
-        return Response({
-            "confirmed": confirmed,
+        body = {
+            "confirmed": confirmed.items,
             "similar": similar
-        }, status=200)
+        }
+        if confirmed.paginated:
+            body["confirmed_next_cursor"] = confirmed.next_cursor
+        return with_etag(Response(body, status=200), etag)
     
 # 제미나이 아이디어
 # views.py
@@ -1957,11 +1968,10 @@ import json
 from datetime import datetime
 
 # ⬇ gemini_idea.py의 함수 재사용
-from .idea_to_plan_generator import build_similar_map, generate_markdown, generate_word  # :contentReference[oaicite:1]{index=1}
+from .idea_to_plan_generator import generate_markdown, generate_word  # :contentReference[oaicite:1]{index=1}
 
-# ⬇ 정제/확장 로직은 원래 gemini_idea.py에서 IdeaRefiner/IdeaExpander가 담당
-from .idea_refiner import IdeaRefiner
-from .idea_expander import IdeaExpander
+# ⬇ 정제/확장/유사맵: 프로세스 공용 IdeaRefiner/IdeaExpander + 병렬 실행기(idea_pipeline)
+from .idea_pipeline import run_idea_pipeline
 
 # (옵션) 모델을 써서 확정 Requirement에서 core_features를 구성하는 뷰
 from .models import Project, Requirement
@@ -1977,17 +1987,12 @@ class IdeaProcessView(APIView):
         if not idea:
             return Response({"error": "idea(아이디어) 가 비었습니다."}, status=400)
 
-        # 1) 정제
-        refiner = IdeaRefiner()
-        refined = refiner.refine(idea)
-
-        # 2) 확장
-        expander = IdeaExpander()
-        suggestions = expander.expand(refined)
-
-        # 3) 유사맵
+        # 1) 정제 → 2) 확장 / 3) 유사맵 (2, 3은 정제 결과만 필요 → 동시 실행)
+        result, timings = run_idea_pipeline(idea=idea)
+        refined = result["refined"]
+        suggestions = result["suggestions"]
+        similar_map = result["similar_map"]
         core_features = refined.get("core_features") or []
-        similar_map = build_similar_map(core_features)
 
         # 4) === DB 저장 ===
         project_id = request.data.get("project_id")
@@ -1995,35 +2000,29 @@ class IdeaProcessView(APIView):
         if project_id:
             project = get_object_or_404(Project, pk=project_id, user=request.user)
 
-            # RequirementDraft 저장
-            for feature in core_features:
-                RequirementDraft.objects.create(
+            # RequirementDraft 저장(한 번에)
+            refined_json = json.dumps(refined, ensure_ascii=False)
+            RequirementDraft.objects.bulk_create([
+                RequirementDraft(
                     project=project,
                     source="gemini_1",
                     feature_name=feature,
                     summary="",  # 필요 시 refined에서 채움
                     score_by_model=0.0,  # 필요 시 모델 점수
-                    content=json.dumps(refined, ensure_ascii=False),
+                    content=refined_json,
                     generated_by="IdeaProcessView"
                 )
+                for feature in core_features
+            ])
 
-            # SimilarProject 저장
-            for feature, repo_list in similar_map.items():
-                for repo_info in repo_list:
-                    for repo in repo_info.get("repos", []):
-                        SimilarProject.objects.create(
-                            project=project,
-                            repo_name=repo,
-                            repo_url=f"https://github.com/{repo}",
-                            language="",  # 필요 시 추가
-                            stars=0,  # 필요 시 추가
-                            similarity_score=0.0
-                        )
+            # SimilarProject 저장(업서트: 같은 저장소는 1행, 기존 G3 점수 유지)
+            upsert_similar_projects(project, rows_from_similar_map(similar_map), update_score=False)
 
         out = {
             "refined": refined,
             "suggestions": suggestions,
             "similar_map": similar_map,
+            "timings": timings,
         }
 
         if request.data.get("also_return_markdown") is True:
@@ -2068,31 +2067,28 @@ class IdeaExportView(APIView):
 
         # 파일명 프리픽스
         prefix = (request.data.get("filename_prefix") or "idea_plan").strip()
-        # 자동 인덱스
-        existing = [f for f in os.listdir(outdir) if f.startswith(prefix + "_")]
-        nums = []
-        for f in existing:
-            try:
-                stem = os.path.splitext(f)[0]
-                n = stem.split("_")[-1]
-                if n.isdigit():
-                    nums.append(int(n))
-            except Exception:
-                pass
-        next_idx = max(nums) + 1 if nums else 1
+        # 자동 인덱스(레지스트리 조회, 미등록 파일과 겹치면 건너뜀)
+        next_idx = next_idea_seq(prefix)
+        while stored_exists(os.path.join(outdir, f"{prefix}_{next_idx}.md")):
+            next_idx += 1
         md_name = f"{prefix}_{next_idx}.md"
         docx_name = f"{prefix}_{next_idx}.docx"
 
         # 1) MD 내용 생성 후 저장
         md_text = generate_markdown(refined, suggestions, similar_map)  # :contentReference[oaicite:4]{index=4}
         md_path = os.path.join(outdir, md_name)
+        docx_path = os.path.join(outdir, docx_name)
+        detach_for_write(md_path)
+        detach_for_write(docx_path)
         with open(md_path, "w", encoding="utf-8") as f:
             f.write(md_text)
 
         # 2) DOCX 생성 후 저장
-        docx_path = os.path.join(outdir, docx_name)
         generate_word(refined, suggestions, similar_map, docx_path)     # :contentReference[oaicite:5]{index=5}
 
+        register_artifact(md_path, "idea_md", user=request.user, seq=next_idx)
+        register_artifact(docx_path, "idea_docx", user=request.user, seq=next_idx)
+
         return Response({
             "markdown_file": md_name,
             "docx_file": docx_name,
@@ -2117,26 +2113,18 @@ class IdeaFromConfirmedRequirementsView(APIView):
             "core_features": core_features,
         }
         suggestions = []
-        similar_map = build_similar_map(core_features)
+        result, timings = run_idea_pipeline(refined=refined, stages=("similar_map",))
+        similar_map = result["similar_map"]
 
         # === DB 저장 ===
-        # SimilarProject 저장
-        for feature, repo_list in similar_map.items():
-            for repo_info in repo_list:
-                for repo in repo_info.get("repos", []):
-                    SimilarProject.objects.create(
-                        project=project,
-                        repo_name=repo,
-                        repo_url=f"https://github.com/{repo}",
-                        language="",
-                        stars=0,
-                        similarity_score=0.0
-                    )
+        # SimilarProject 저장(업서트: 같은 저장소는 1행, 기존 G3 점수 유지)
+        upsert_similar_projects(project, rows_from_similar_map(similar_map), update_score=False)
 
         payload = {
             "refined": refined,
             "suggestions": suggestions,
-            "similar_map": similar_map
+            "similar_map": similar_map,
+            "timings": timings,
         }
 
         # (옵션) export
@@ -2146,24 +2134,22 @@ class IdeaFromConfirmedRequirementsView(APIView):
             os.makedirs(outdir, exist_ok=True)
             prefix = (request.data.get("filename_prefix") or "idea_plan").strip()
 
-            existing = [f for f in os.listdir(outdir) if f.startswith(prefix + "_")]
-            nums = []
-            for f in existing:
-                try:
-                    stem = os.path.splitext(f)[0]
-                    n = stem.split("_")[-1]
-                    if n.isdigit():
-                        nums.append(int(n))
-                except Exception:
-                    pass
-            next_idx = max(nums) + 1 if nums else 1
+            next_idx = next_idea_seq(prefix)
+            while stored_exists(os.path.join(outdir, f"{prefix}_{next_idx}.md")):
+                next_idx += 1
             md_name = f"{prefix}_{next_idx}.md"
             docx_name = f"{prefix}_{next_idx}.docx"
 
             md_text = generate_markdown(refined, suggestions, similar_map)
+            detach_for_write(os.path.join(outdir, md_name))
+            detach_for_write(os.path.join(outdir, docx_name))
             with open(os.path.join(outdir, md_name), "w", encoding="utf-8") as f:
                 f.write(md_text)
             generate_word(refined, suggestions, similar_map, os.path.join(outdir, docx_name))
+            register_artifact(os.path.join(outdir, md_name), "idea_md", project=project,
+                              user=request.user, seq=next_idx)
+            register_artifact(os.path.join(outdir, docx_name), "idea_docx", project=project,
+                              user=request.user, seq=next_idx)
 
             payload["export"] = {
                 "markdown_file": md_name,
@@ -2413,23 +2399,46 @@ class TeamMemberDetailView(APIView):
             "project_id": getattr(project, "project_id", None)
         }, status=200)
 
+GANTT_LIST_FIELDS = {
+    "GanttChart": col("GanttChart"),
+    "version": col("version"),
+    "file_path": col("file_path"),
+    "start_date": col("start_date"),
+    "total_weeks": col("total_weeks"),
+    "download_url": computed(
+        ("file_path", "_doc_id"),
+        lambda r: f"/api/gantt/download/{r['_doc_id']}/" if r.get("_doc_id") else None,
+    ),
+}
+
+
 class GanttChartListView(APIView):
-    """GET /api/project/<project_id>/gantt/list/"""
+    """
+    GET /api/project/<project_id>/gantt/list/  (최신순)
+    ?fields= / ?limit=&cursor= / If-None-Match → 304 (list_api)
+    """
     permission_classes = [IsAuthenticated]
     def get(self, request, project_id):
         project = get_object_or_404(Project, project_id=project_id, user=request.user)
-        items = []
-        for g in GanttChart.objects.filter(project=project).order_by("-created_at", "-GanttChart"):
-            doc_id = _gantt_doc_id_by_path(project, g.file_path)
-            items.append({
-                "GanttChart": g.GanttChart,
-                "version": g.version,
-                "file_path": g.file_path,
-                "start_date": g.start_date,
-                "total_weeks": g.total_weeks,
-                "download_url": f"/api/gantt/download/{doc_id}/" if doc_id else None
-            })
-        return Response(items, status=200)
+        docs = OutputDocument.objects.filter(project=project)
+
+        def attach_doc_ids(rows):
+            # 행마다 OutputDocument 조회하던 것을 페이지당 1회로
+            paths = {r["file_path"] for r in rows if r.get("file_path")}
+            by_path = {}
+            if paths:
+                for pk, path in docs.filter(file_path__in=paths).order_by("OutputDocument").values_list("OutputDocument", "file_path"):
+                    by_path[path] = pk  # 같은 경로면 최신(pk 큰 것)이 남음
+            for r in rows:
+                r["_doc_id"] = by_path.get(r.get("file_path"))
+
+        return list_response(
+            request,
+            GanttChart.objects.filter(project=project),
+            GANTT_LIST_FIELDS,
+            prepare=attach_doc_ids,
+            etag_querysets=(docs,),
+        )
 
 class OutputDocumentListView(APIView):
     """GET /api/project/<project_id>/outputs/"""
@@ -2447,31 +2456,21 @@ class OutputDocumentListView(APIView):
 # views.py (기존 G1/G2 다운로드 뷰 교체)
 
 from django.conf import settings
-from django.http import FileResponse, Http404
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework import permissions
-import os, glob
+import os
 
 from .models import Project
+from .artifact_serving import serve_artifact
 
 EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
-def _send_xlsx(abspath: str) -> FileResponse:
-    if not os.path.exists(abspath):
-        raise Http404("엑셀 파일이 존재하지 않습니다.")
-    fname = os.path.basename(abspath)
-    size = os.path.getsize(abspath)
-    f = open(abspath, "rb")
-    resp = FileResponse(f, as_attachment=True, filename=fname, content_type=EXCEL_MIME)
-    resp["Content-Type"] = EXCEL_MIME
-    resp["Content-Disposition"] = f"attachment; filename*=UTF-8''{fname}"
-    resp["X-Content-Type-Options"] = "nosniff"
-    resp["Cache-Control"] = "no-transform, no-store"
-    resp["Content-Transfer-Encoding"] = "binary"
-    resp["Accept-Ranges"] = "none"
-    resp["Content-Length"] = str(size)
-    return resp
+def _send_xlsx(request, abspath: str):
+    # ETag/304/Range/프록시 위임은 artifact_serving에서 처리
+    return serve_artifact(request, abspath, content_type=EXCEL_MIME,
+                          not_found="엑셀 파일이 존재하지 않습니다.")
 
 def _normalize_ts(ts: str) -> str:
     # 14자리 숫자면 가운데 언더바 삽입
@@ -2479,9 +2478,11 @@ def _normalize_ts(ts: str) -> str:
         return ts[:8] + "_" + ts[8:]
     return ts
 
-def _latest_file(path_pattern: str) -> str | None:
-    files = sorted(glob.glob(path_pattern), reverse=True)
-    return files[0] if files else None
+def _registry_xlsx(project, kind: str, ts: str) -> str | None:
+    # ts 일치 → 없으면 최신(사용자 편의). 디렉터리 스캔 없이 인덱스 조회
+    a = None if ts == "latest" else find_artifact(project, kind, ts)
+    a = a or latest_artifact(project, kind)
+    return artifact_abspath(a) if a else None
 
 class ProjectG1XlsxDownloadView(APIView):
     """
@@ -2492,24 +2493,10 @@ class ProjectG1XlsxDownloadView(APIView):
 
     def get(self, request, project_id, ts):
         project = get_object_or_404(Project, project_id=project_id, user=request.user)
-        media_root = getattr(settings, "MEDIA_ROOT", os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media"))
-        drafts_dir = os.path.join(media_root, "drafts")
-
-        if ts == "latest":
-            cand = _latest_file(os.path.join(drafts_dir, f"project{project.project_id}_*_g1.xlsx"))
-            if not cand:
-                raise Http404("G1 엑셀 파일이 없습니다.")
-            return _send_xlsx(cand)
-
-        ts = _normalize_ts(ts)
-        xlsx_path = os.path.join(drafts_dir, f"project{project.project_id}_{ts}_g1.xlsx")
-        if not os.path.exists(xlsx_path):
-            # 폴더에서 가장 최신 파일로 한번 더 시도(사용자 편의)
-            cand = _latest_file(os.path.join(drafts_dir, f"project{project.project_id}_*_g1.xlsx"))
-            if not cand:
-                raise Http404("해당 ts의 G1 엑셀 파일이 없습니다.")
-            xlsx_path = cand
-        return _send_xlsx(xlsx_path)
+        xlsx_path = _registry_xlsx(project, "g1_xlsx", _normalize_ts(ts))
+        if not xlsx_path:
+            raise Http404("G1 엑셀 파일이 없습니다.")
+        return _send_xlsx(request, xlsx_path)
 
 class ProjectG2XlsxDownloadView(APIView):
     """
@@ -2520,32 +2507,20 @@ class ProjectG2XlsxDownloadView(APIView):
 
     def get(self, request, project_id, ts):
         project = get_object_or_404(Project, project_id=project_id, user=request.user)
-        media_root = getattr(settings, "MEDIA_ROOT", os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media"))
-        refine_dir = os.path.join(media_root, "refine")
-
-        if ts == "latest":
-            cand = _latest_file(os.path.join(refine_dir, f"project{project.project_id}_*_g2_fix.xlsx"))
-            if not cand:
-                raise Http404("G2 엑셀 파일이 없습니다.")
-            return _send_xlsx(cand)
-
-        ts = _normalize_ts(ts)
-        xlsx_path = os.path.join(refine_dir, f"project{project.project_id}_{ts}_g2_fix.xlsx")
-        if not os.path.exists(xlsx_path):
-            cand = _latest_file(os.path.join(refine_dir, f"project{project.project_id}_*_g2_fix.xlsx"))
-            if not cand:
-                raise Http404("해당 ts의 G2 엑셀 파일이 없습니다.")
-            xlsx_path = cand
-        return _send_xlsx(xlsx_path)
+        xlsx_path = _registry_xlsx(project, "g2_xlsx", _normalize_ts(ts))
+        if not xlsx_path:
+            raise Http404("G2 엑셀 파일이 없습니다.")
+        return _send_xlsx(request, xlsx_path)
 
 # --- MD 원문 그대로 반환(미리보기 RAW) ---
 import os
-from django.http import Http404, HttpResponse
+from django.http import Http404
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from .models import Project
+from .artifact_serving import serve_artifact
 
 def _reports_dir():
     media_root = getattr(settings, "MEDIA_ROOT",
@@ -2566,15 +2541,13 @@ class ProjectReportRawView(APIView):
         reports_dir = _reports_dir()
         # 최신 파일 선택 (고정 파일명 사용 중이면 그대로 참조)
         path = os.path.join(reports_dir, f"project{project.project_id}_analysis_report.md")
-        if not os.path.isfile(path):
+        if not stored_exists(path):
             raise Http404("보고서가 없습니다. 먼저 유사도 분석을 실행하세요.")
-        with open(path, "rb") as f:
-            data = f.read()
-        resp = HttpResponse(data, content_type="text/markdown; charset=utf-8")
         # 첨부로 다운받지 않고 브라우저/프론트에서 바로 렌더링하도록 Content-Disposition 생략
+        # 재조회는 ETag → 304로 처리(본문을 메모리에 읽지 않음)
         # CORS가 필요하면 settings의 CORS_ALLOW_HEADERS/ORIGINS 설정을 확인
-        resp["Cache-Control"] = "no-store"
-        return resp
+        return serve_artifact(request, path, content_type="text/markdown; charset=utf-8",
+                              as_attachment=None)
 
 class ProjectReportRawByNameView(APIView):
     """
@@ -2590,37 +2563,34 @@ class ProjectReportRawByNameView(APIView):
         if not filename.startswith(f"project{project.project_id}_") or not filename.endswith(".md"):
             raise Http404("파일 접근 권한이 없거나 잘못된 이름입니다.")
         path = os.path.join(reports_dir, filename)
-        if not os.path.isfile(path):
+        if not stored_exists(path):
             raise Http404("파일을 찾을 수 없습니다.")
-        with open(path, "rb") as f:
-            data = f.read()
-        resp = HttpResponse(data, content_type="text/markdown; charset=utf-8")
-        resp["Cache-Control"] = "no-store"
-        return resp
+        return serve_artifact(request, path, content_type="text/markdown; charset=utf-8",
+                              as_attachment=None)
 
 
 # === 확정 기획서/명세서 기반 파일 생성 뷰 ===
 # 기준: Project.description(기획서) + Requirement.confirmed_by_user(True)(명세서) + 최신 G2 초안(있으면)
 # 출력: 제안(JSON/MD) 또는 코드 ZIP, 최종 합본 MD
 
-import os, io, json, zipfile
+import os, json
 from datetime import datetime
 from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
 from .models import Project, Requirement, RequirementDraft  # 모델 스키마 근거: confirmed_by_user, RequirementDraft_id 등
+from .artifact_serving import content_disposition
+from .zip_stream import stream_zip, write_zip
 
 # ---------- 공통 유틸 ----------
 def _media_root():
     return getattr(settings, "MEDIA_ROOT",
                    os.path.join(getattr(settings, "BASE_DIR", os.getcwd()), "media"))
 
-def _media_url():
-    return getattr(settings, "MEDIA_URL", "/media/")
-
 def _ensure_dir(path: str):
     os.makedirs(path, exist_ok=True); return path
 
@@ -2630,25 +2600,36 @@ def _nowtag():
 def _save_text(rel_dir: str, filename: str, text: str):
     abs_dir = os.path.join(_media_root(), rel_dir); _ensure_dir(abs_dir)
     abs_path = os.path.join(abs_dir, filename)
+    detach_for_write(abs_path)
     with open(abs_path, "w", encoding="utf-8") as f:
         f.write(text or "")
-    url = _media_url().rstrip("/") + "/" + os.path.join(rel_dir, filename).replace("\\", "/")
-    return abs_path, url
+    return abs_path, file_url(abs_path)
 
-def _save_bytes(rel_dir: str, filename: str, data: bytes):
-    abs_dir = os.path.join(_media_root(), rel_dir); _ensure_dir(abs_dir)
-    abs_path = os.path.join(abs_dir, filename)
-    with open(abs_path, "wb") as f:
-        f.write(data or b"")
-    url = _media_url().rstrip("/") + "/" + os.path.join(rel_dir, filename).replace("\\", "/")
-    return abs_path, url
-
-def _zip_bytes(files):
-    bio = io.BytesIO()
-    with zipfile.ZipFile(bio, "w", zipfile.ZIP_DEFLATED) as zf:
-        for arc_path, content in files:
-            zf.writestr(arc_path, content or "")
-    bio.seek(0); return bio.read()
+def _emit_code_zip(request, project, label: str, files):
+    """
+    files((arc_path, content) 반복자)를 media/artifacts/project{pid}/project{pid}_{label}_{ts}.zip 으로 기록.
+    - 기본: 디스크에 바로 써서(메모리 일정) 레지스트리 등록 후 {"zip_url"} 201
+    - ?stream=1: 생성되는 대로 ZIP 조각을 chunked 응답으로 전송 + 동시에 디스크 기록, 완료 시 등록
+    """
+    rel = f"artifacts/project{project.project_id}"
+    ts = _nowtag()
+    filename = f"project{project.project_id}_{label}_{ts}.zip"
+    zip_abs = os.path.join(_ensure_dir(os.path.join(_media_root(), rel)), filename)
+
+    def _register(path):
+        register_artifact(path, "code_zip", project=project, user=request.user, ts=ts)
+
+    if str(request.query_params.get("stream", "")).lower() in ("1", "true", "yes"):
+        resp = StreamingHttpResponse(stream_zip(files, spool_path=zip_abs, on_complete=_register),
+                                     content_type="application/zip")
+        resp["Content-Disposition"] = content_disposition(filename)
+        resp["Cache-Control"] = "no-store"
+        resp["X-Accel-Buffering"] = "no"  # nginx 버퍼링 해제 → 조각 단위로 바로 전달
+        return resp
+
+    write_zip(zip_abs, files)
+    _register(zip_abs)
+    return Response({"zip_url": file_url(zip_abs)}, status=201)
 
 # ---------- 확정본 수집 ----------
 def _get_confirmed_plan_spec(project: Project):
@@ -2718,14 +2699,16 @@ class ProjectToolsProposeFromConfirmedView(APIView):
 
         rel = f"artifacts/project{project.project_id}"
         ts = _nowtag()
-        _, json_url = _save_text(rel, f"tools_recommendation_{ts}.json",
-                                 json.dumps(summary_json, ensure_ascii=False, indent=2))
-        _, md_url   = _save_text(rel, f"tools_summary_{ts}.md", md)
+        json_abs, json_url = _save_text(rel, f"tools_recommendation_{ts}.json",
+                                        json.dumps(summary_json, ensure_ascii=False, indent=2))
+        md_abs, md_url     = _save_text(rel, f"tools_summary_{ts}.md", md)
+        register_artifact(json_abs, "tools_json", project=project, user=request.user, ts=ts)
+        register_artifact(md_abs, "tools_md", project=project, user=request.user, ts=ts)
         return Response({"json_url": json_url, "summary_md_url": md_url}, status=201)
 
 # ---------- 2) 코드/산출물 생성(확정본 기반) ----------
 class ProjectGenerateSQLFromConfirmedView(APIView):
-    """POST /api/project/<project_id>/generate/sql/ → SQL 스캐폴드 ZIP"""
+    """POST /api/project/<project_id>/generate/sql/[?stream=1] → SQL 스캐폴드 ZIP"""
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, project_id):
@@ -2741,14 +2724,10 @@ class ProjectGenerateSQLFromConfirmedView(APIView):
             ("SQL/schema.sql", "-- TODO: 확정 명세서 기반 DDL\n"),
             ("SQL/seed.sql",   "-- TODO: 샘플 시드 데이터\n"),
         ]
-        data = _zip_bytes(files)
-        rel = f"artifacts/project{project.project_id}"
-        ts = _nowtag()
-        _, url = _save_bytes(rel, f"project{project.project_id}_sql_{ts}.zip", data)
-        return Response({"zip_url": url}, status=201)
+        return _emit_code_zip(request, project, "sql", files)
 
 class ProjectGenerateBackendFromConfirmedView(APIView):
-    """POST /api/project/<project_id>/generate/backend/ → 백엔드 스캐폴드 ZIP"""
+    """POST /api/project/<project_id>/generate/backend/[?stream=1] → 백엔드 스캐폴드 ZIP"""
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, project_id):
@@ -2765,14 +2744,10 @@ class ProjectGenerateBackendFromConfirmedView(APIView):
             ("Back/app/urls.py", "from django.urls import path\nfrom .views import ping\nurlpatterns = [ path('ping/', ping) ]\n"),
             ("Back/manage.py", "# placeholder\n"),
         ]
-        data = _zip_bytes(files)
-        rel = f"artifacts/project{project.project_id}"
-        ts = _nowtag()
-        _, url = _save_bytes(rel, f"project{project.project_id}_backend_{ts}.zip", data)
-        return Response({"zip_url": url}, status=201)
+        return _emit_code_zip(request, project, "backend", files)
 
 class ProjectGenerateFrontendFromConfirmedView(APIView):
-    """POST /api/project/<project_id>/generate/frontend/ → 프론트 스캐폴드 ZIP"""
+    """POST /api/project/<project_id>/generate/frontend/[?stream=1] → 프론트 스캐폴드 ZIP"""
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, project_id):
@@ -2788,11 +2763,7 @@ class ProjectGenerateFrontendFromConfirmedView(APIView):
             ("Front/src/main.jsx", "import App from './App.jsx'\nconsole.log('boot')\n"),
             ("Front/package.json", '{"name":"front","private":true}'),
         ]
-        data = _zip_bytes(files)
-        rel = f"artifacts/project{project.project_id}"
-        ts = _nowtag()
-        _, url = _save_bytes(rel, f"project{project.project_id}_frontend_{ts}.zip", data)
-        return Response({"zip_url": url}, status=201)
+        return _emit_code_zip(request, project, "frontend", files)
 
 # ==== FinalizeRequirementView & FinalDevDocGenerateView (fixed + main.py 통합) ====
 from rest_framework.views import APIView
@@ -2808,23 +2779,29 @@ from django.core.exceptions import FieldError
 from pathlib import Path
 import os, json, re, tempfile, types
 
-from docx import Document as DocxDocument
-
-from .models import Project, Requirement, RequirementDraft
+from .models import Project, Requirement, RequirementDraft, GanttChart
+from .session_state import get_state, set_state
+from .gantt_render import add_gantt_to_docx
 from .auto_document import (
     load_docx_and_plaintext,
     detect_placeholders_in_text,
     docx_replace_placeholders,
 )
 
-# ✅ main.py 파이프라인 병행 사용
-try:
-    # 프로젝트 루트에 main.py가 있고, 내부에서 src.* 의존성이 충족되어야 합니다.
-    from . import main as rd_main  # run_pipeline(args) 제공
-    _HAS_MAIN = True
-except Exception:
-    rd_main = None
-    _HAS_MAIN = False
+# ✅ main.py 파이프라인 병행 사용 (src.* 의존성이 무거워 첫 사용 때 import)
+_RD_MAIN = None
+
+
+def _rd_main():
+    """main 모듈(run_pipeline(args) 제공). 프로젝트 루트에 main.py와 src.* 의존성이 있어야 함. 없으면 None."""
+    global _RD_MAIN
+    if _RD_MAIN is None:
+        try:
+            from . import main as rd_main
+            _RD_MAIN = rd_main
+        except Exception:
+            _RD_MAIN = False
+    return _RD_MAIN or None
 
 # ---------------------------
 # 공통 유틸 / 메모리
@@ -2838,62 +2815,63 @@ def _media_paths():
     media_url  = getattr(settings, "MEDIA_URL", "/media/")
     final_dir  = os.path.join(media_root, "final")
     os.makedirs(final_dir, exist_ok=True)
-    mem_dir = os.path.join(final_dir, "_mem")
-    os.makedirs(mem_dir, exist_ok=True)
+    mem_dir = os.path.join(final_dir, "_mem")    # (레거시) 이전 파일 기반 메모리 — 읽기 전용 이관용
     main_dir = os.path.join(final_dir, "_main")  # main.py 산출물 보관
     os.makedirs(main_dir, exist_ok=True)
     tmp_dir = os.path.join(final_dir, "_tmp")    # 입력 중간물 보관
     os.makedirs(tmp_dir, exist_ok=True)
     return media_root, media_url, final_dir, mem_dir, main_dir, tmp_dir
 
-def _mem_paths(project: Project, user):
+# 최근 draft / 확정 ID 기억: session_state(공유 DB/캐시) 사용 — 다중 서버에서도 동일 값
+def _legacy_mem(project: Project, user, suffix: str):
+    """이전 media/final/_mem/*.json 값이 있으면 한 번 읽어 session_state로 옮기고 파일 삭제."""
     _, _, _, mem_dir, _, _ = _media_paths()
     uid = getattr(user, "id", None) or getattr(user, "pk", None) or "u"
-    pid = project.project_id
-    last_draft_path = Path(mem_dir) / f"proj{pid}_user{uid}_last_draft.json"
-    final_ids_path  = Path(mem_dir) / f"proj{pid}_user{uid}_finalized_ids.json"
-    return last_draft_path, final_ids_path
+    path = Path(mem_dir) / f"proj{project.project_id}_user{uid}_{suffix}.json"
+    if not path.exists():
+        return None
+    try:
+        obj = json.loads(path.read_text(encoding="utf-8"))
+        path.unlink()
+        return obj
+    except Exception:
+        return None
 
 def _remember_last_draft(project: Project, user, draft_id: int):
-    last_draft_path, _ = _mem_paths(project, user)
-    last_draft_path.write_text(json.dumps({
-        "project_id": project.project_id,
-        "user_id": getattr(user, "id", None),
+    set_state(user, project, "last_draft", {
         "draft_id": int(draft_id),
         "ts": timezone.now().isoformat()
-    }, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"🧠 remembered last draft -> {last_draft_path.as_posix()}")
+    })
 
 def _load_last_draft(project: Project, user) -> int | None:
-    last_draft_path, _ = _mem_paths(project, user)
-    if last_draft_path.exists():
-        try:
-            obj = json.loads(last_draft_path.read_text(encoding="utf-8"))
-            return int(obj.get("draft_id"))
-        except Exception:
-            return None
-    return None
+    obj = get_state(user, project, "last_draft")
+    if obj is None:
+        obj = _legacy_mem(project, user, "last_draft")
+        if obj and obj.get("draft_id") is not None:
+            set_state(user, project, "last_draft", {"draft_id": int(obj["draft_id"]), "ts": obj.get("ts")})
+    try:
+        return int(obj.get("draft_id")) if obj else None
+    except Exception:
+        return None
 
 def _remember_finalized_ids(project: Project, user, req_ids: list[int]):
-    _, final_ids_path = _mem_paths(project, user)
-    final_ids_path.write_text(json.dumps({
-        "project_id": project.project_id,
-        "user_id": getattr(user, "id", None),
+    set_state(user, project, "finalized_ids", {
         "requirement_ids": list(map(int, req_ids)),
         "ts": timezone.now().isoformat()
-    }, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"🧠 remembered finalized ids -> {final_ids_path.as_posix()}")
+    })
 
 def _load_finalized_ids(project: Project, user) -> list[int] | None:
-    _, final_ids_path = _mem_paths(project, user)
-    if final_ids_path.exists():
-        try:
-            obj = json.loads(final_ids_path.read_text(encoding="utf-8"))
-            ids = obj.get("requirement_ids") or []
-            return list(map(int, ids)) if ids else None
-        except Exception:
-            return None
-    return None
+    obj = get_state(user, project, "finalized_ids")
+    if obj is None:
+        obj = _legacy_mem(project, user, "finalized_ids")
+        if obj and obj.get("requirement_ids"):
+            set_state(user, project, "finalized_ids",
+                      {"requirement_ids": list(map(int, obj["requirement_ids"])), "ts": obj.get("ts")})
+    try:
+        ids = (obj or {}).get("requirement_ids") or []
+        return list(map(int, ids)) if ids else None
+    except Exception:
+        return None
 
 def _write_text(path: Path, text: str):
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -2903,6 +2881,8 @@ def _write_text(path: Path, text: str):
 # 템플릿
 # ---------------------------
 def _auto_make_minimal_template(dst: Path) -> Path:
+    from docx import Document as DocxDocument
+
     dst.parent.mkdir(parents=True, exist_ok=True)
     doc = DocxDocument()
     doc.add_heading("연구개발계획서 (자동 생성)", level=0)
@@ -2943,23 +2923,11 @@ def _default_template_path() -> Path:
 # ---------------------------
 # finalize: 초안 → Requirement 생성/확정
 # ---------------------------
-def _extract_features_from_draft_content(draft: RequirementDraft):
-    raw = (draft.content or "").strip()
-    try:
-        obj = json.loads(raw)
-    except Exception:
-        return None
-    if isinstance(obj, list):
-        return obj
-    if isinstance(obj, dict):
-        for key in ["정제기획서", "기능목록", "features", "items"]:
-            if key in obj and isinstance(obj[key], list):
-                return obj[key]
-    return None
-
-def _create_requirements_for_features(project: Project, draft: RequirementDraft, features_list):
+def _create_requirements_for_features(project: Project, draft: RequirementDraft, feature_rows):
+    """feature_rows: draft의 DraftFeature 목록(draft_feature_rows). Requirement.source_feature로 연결."""
     created_ids = []
-    for item in features_list:
+    for row in feature_rows:
+        item = row.data
         if isinstance(item, dict):
             fname = item.get("feature_name") or item.get("name") or item.get("기능명") or item.get("title")
             summ  = item.get("summary")      or item.get("desc") or item.get("description") or item.get("설명")
@@ -2969,7 +2937,7 @@ def _create_requirements_for_features(project: Project, draft: RequirementDraft,
         feature_name = _one_line(fname) if fname else _one_line(str(item)[:120])
         summary      = _one_line(summ) if summ else _one_line(str(item))
 
-        req = Requirement(project=project)
+        req = Requirement(project=project, source_feature=row)
         if hasattr(req, "feature_name"): setattr(req, "feature_name", feature_name)
         if hasattr(req, "summary"):      setattr(req, "summary", summary)
         for flag in ["confirmed_by_user", "is_confirmed", "finalized"]:
@@ -3005,7 +2973,7 @@ class FinalizeRequirementView(APIView):
             return Response({"error": "draft_id는 필수입니다.(정수)"}, status=400)
 
         draft = get_object_or_404(RequirementDraft, pk=draft_id, project=project)
-        features = _extract_features_from_draft_content(draft)
+        features = draft_feature_rows(draft)
         if not features:
             return Response({"error": "초안에서 기능 목록을 파싱하지 못했습니다."}, status=400)
 
@@ -3063,12 +3031,12 @@ def _collect_3_sources_strict(project: Project, draft: RequirementDraft, user):
     2) 그 Draft로 생성된 Requirement 집합 (링크 컬럼 → 실패 시 finalize 메모리 PK 폴백)
     3) Gemini3 리포트 MD (필수)
     """
-    # 1) Draft 본문/요약
-    draft_raw = (draft.content or "").strip()
-    try:
-        draft_snippet = json.dumps(json.loads(draft_raw), ensure_ascii=False, indent=2)[:4000]
-    except Exception:
-        draft_snippet = draft_raw[:4000]
+    # 1) Draft 본문/요약 (기능 배열이면 정규화된 행에서, 아니면 content 원문)
+    features = draft_features(draft)
+    if features is not None:
+        draft_snippet = json.dumps(features, ensure_ascii=False, indent=2)[:4000]
+    else:
+        draft_snippet = (draft.content or "").strip()[:4000]
     draft_summary = _one_line(getattr(draft, "summary", "") or "") or "(요약 없음)"
 
     # 2) Requirement 수집 (링크 컬럼)
@@ -3090,10 +3058,10 @@ def _collect_3_sources_strict(project: Project, draft: RequirementDraft, user):
     # 3) Gemini3 리포트
     media_root, _, _, _, _, _ = _media_paths()
     report_fs = os.path.join(media_root, "reports", f"project{project.project_id}_analysis_report.md")
-    if not os.path.exists(report_fs):
+    if not stored_exists(report_fs):
         return None, {"error": f"Gemini3 보고서를 찾지 못했습니다: {report_fs}"}
     try:
-        gem3_md = Path(report_fs).read_text(encoding="utf-8", errors="ignore")
+        gem3_md = read_stored_bytes(report_fs).decode("utf-8", errors="ignore")
     except Exception:
         return None, {"error": "Gemini3 보고서 읽기 실패"}
 
@@ -3147,7 +3115,8 @@ def _build_main_inputs(project: Project, mapping: dict, tmp_dir: str) -> list[Pa
     return [p_plan, p_spec, p_report, p_draft]
 
 def _run_main_pipeline(project: Project, out_docx_path: Path, inputs: list[Path]) -> tuple[Path | None, str | None]:
-    if not _HAS_MAIN:
+    rd_main = _rd_main()
+    if rd_main is None:
         return None, "main.py 모듈을 찾지 못했습니다. (의존 모듈 src.* 확인 필요)"
     # API 키: GOOGLE_API_KEY 또는 GEMINI_API_KEY
     api_key = os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY") or os.environ.get("GEMINI_API_KEY_3")
@@ -3218,6 +3187,8 @@ class FinalDevDocGenerateView(APIView):
         ts = timezone.now().strftime("%Y%m%d_%H%M%S")
         final_dst = Path(final_dir) / f"project{project.project_id}_{ts}_final.docx"
         main_dst  = Path(main_dir)  / f"project{project.project_id}_{ts}_main.docx"
+        detach_for_write(final_dst.as_posix())
+        detach_for_write(main_dst.as_posix())
 
         # ========== 1) main.py 파이프라인 실행 (섹션 산출) ==========
         main_text = ""
@@ -3231,7 +3202,7 @@ class FinalDevDocGenerateView(APIView):
                 # main.docx → 텍스트 추출 (템플릿 치환용)
                 _, main_text = load_docx_and_plaintext(outp)
                 # URL
-                main_file_url = f"{media_url}final/_main/{main_dst.name}"
+                main_file_url = file_url(main_dst.as_posix())
                 # 템플릿에 키가 있다면 매핑에 추가
                 mapping.setdefault("원문_Main", (main_text or "")[:50000])
         except Exception as e:
@@ -3242,6 +3213,8 @@ class FinalDevDocGenerateView(APIView):
             tpl_doc, tpl_text = load_docx_and_plaintext(tpl_path)
             has_main_placeholder = "{{원문_Main}}" in tpl_text
 
+            from docx import Document as DocxDocument
+
             doc = DocxDocument(tpl_path.as_posix())
             docx_replace_placeholders(doc, mapping, unsure_to_red=False)
 
@@ -3252,18 +3225,34 @@ class FinalDevDocGenerateView(APIView):
                 for line in (main_text or "").splitlines():
                     doc.add_paragraph(line)
 
+            # 최신 간트차트가 있으면 '부록'으로 삽입(그림, PNG 불가 시 주차 표)
+            latest_gantt = (GanttChart.objects.filter(project=project)
+                            .order_by("-created_at", "-GanttChart").first())
+            if latest_gantt:
+                try:
+                    doc.add_page_break()
+                    doc.add_heading("부록. 간트차트", level=1)
+                    add_gantt_to_docx(doc, latest_gantt, heading=None)
+                except Exception as e:
+                    print(f"[경고] 간트차트 삽입 생략: {e}")
+
             doc.save(final_dst.as_posix())
         except Exception as e:
             return Response({"error": f"DOCX 생성 실패: {e}"}, status=500)
 
-        file_url = f"{media_url}final/{final_dst.name}"
+        final_url = file_url(final_dst.as_posix())
+        register_artifact(final_dst.as_posix(), "final_docx", project=project, user=request.user,
+                          source_draft=draft, ts=ts)
+        if main_file_url:
+            register_artifact(main_dst.as_posix(), "main_docx", project=project, user=request.user,
+                              source_draft=draft, ts=ts)
         print(f"📄 최종 개발문서 저장: {final_dst.as_posix()}")
         if main_file_url:
             print(f"📄 섹션 본문(main) 저장: {main_dst.as_posix()}")
 
         return Response({
             "ok": True,
-            "file_url": file_url,
+            "file_url": final_url,
             "main_file_url": main_file_url,  # 없을 수도 있음
             "draft_id_used": draft_id
         }, status=201)
@@ -3272,9 +3261,6 @@ class FinalDevDocGenerateView(APIView):
 
 
 
-# 파일 상단에 추가
-import glob
-
 class FinalDevDocFilesView(APIView):
     """
     GET /api/project/<project_id>/final-devdoc/files/
@@ -3286,23 +3272,13 @@ class FinalDevDocFilesView(APIView):
     def get(self, request, project_id):
         project = get_object_or_404(Project, pk=project_id, user=request.user)
 
-        # ✅ _media_paths가 6개를 반환하므로 이렇게 받아야 함
-        _, media_url, final_dir, *_ = _media_paths()
-
-        # 최종(final) 문서
-        pattern = os.path.join(final_dir, f"project{project.project_id}_*_final.docx")
-        files = sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True)
-
+        # 최종(final) 문서 — Artifact 레지스트리 조회(최신순)
         items = []
-        for fp in files:
-            name = os.path.basename(fp)
-            # 타임스탬프 추출: project{pid}_YYYYMMDD_HHMMSS_final.docx
-            m = re.search(rf"project{project.project_id}_(\d{{8}}_\d{{6}})_final\.docx$", name)
-            ts = m.group(1) if m else ""
+        for a in list_artifacts(project, "final_docx"):
             items.append({
-                "file_url": f"{media_url}final/{name}",
-                "filename": name,
-                "created_at": ts
+                "file_url": artifact_url(a),
+                "filename": os.path.basename(a.rel_path),
+                "created_at": a.ts
             })
 
         resp = {"items": items, "latest": (items[0] if items else None)}
@@ -3310,19 +3286,12 @@ class FinalDevDocFilesView(APIView):
         # (옵션) main.py 결과도 함께
         include_main = str(request.query_params.get("include_main", "")).lower() in ("1", "true", "yes")
         if include_main:
-            main_dir = os.path.join(final_dir, "_main")
-            main_pattern = os.path.join(main_dir, f"project{project.project_id}_*_main.docx")
-            main_files = sorted(glob.glob(main_pattern), key=os.path.getmtime, reverse=True)
-
             main_items = []
-            for fp in main_files:
-                name = os.path.basename(fp)
-                m = re.search(rf"project{project.project_id}_(\d{{8}}_\d{{6}})_main\.docx$", name)
-                ts = m.group(1) if m else ""
+            for a in list_artifacts(project, "main_docx"):
                 main_items.append({
-                    "file_url": f"{media_url}final/_main/{name}",
-                    "filename": name,
-                    "created_at": ts
+                    "file_url": artifact_url(a),
+                    "filename": os.path.basename(a.rel_path),
+                    "created_at": a.ts
                 })
 
             resp["main_items"] = main_items
@@ -3348,9 +3317,7 @@ try:
 except Exception as e:
     chatmod = None
 
-# 2) chat.py가 없거나 일부 함수가 없을 때를 대비한 안전 폴백들
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
+# 2) chat.py가 없거나 일부 함수가 없을 때를 대비한 안전 폴백들 (SDK는 호출 시 import)
 
 def _get_api_key():
     # chat.py가 제공하면 우선 사용
@@ -3366,10 +3333,11 @@ def _get_api_key():
     )
 
 def _configure_gemini():
+    """챗봇 키를 풀에 등록하고 별칭 반환(전역 genai.configure 사용 안 함)."""
     api_key = _get_api_key()
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY가 설정되어 있지 않습니다.")
-    genai.configure(api_key=api_key)
+    return get_pool().ensure_key(api_key, alias="GEMINI_API_KEY_4")
 
 def _get_system_instruction():
     # chat.py가 시스템 지침 제공 시 사용
@@ -3390,10 +3358,10 @@ def _build_model():
         return chatmod.get_model()
     if chatmod and hasattr(chatmod, "init_model"):
         return chatmod.init_model()
-    # 기본 Gemini 모델 생성
-    _configure_gemini()
-    return genai.GenerativeModel(
-        model_name=getattr(chatmod, "MODEL_NAME", "gemini-1.5-flash"),
+    # 기본 Gemini 모델 생성(키 풀 경유)
+    return gemini_model(
+        getattr(chatmod, "MODEL_NAME", "gemini-1.5-flash"),
+        prefer=_configure_gemini(),
         system_instruction=_get_system_instruction(),
     )
 
@@ -3475,13 +3443,15 @@ class ChatbotView(APIView):
                     pass
 
             # 표준 경로: 모델 생성 → 히스토리 세팅 → 메시지 전송
+            from google.generativeai.types import GenerationConfig
+
             model = _build_model()
 
             # 모델 이름 오버라이드가 필요하면 교체(옵션)
             if preferred_model:
-                _configure_gemini()
-                model = genai.GenerativeModel(
-                    model_name=preferred_model,
+                model = gemini_model(
+                    preferred_model,
+                    prefer=_configure_gemini(),
                     system_instruction=_get_system_instruction(),
                 )
 
@@ -3533,7 +3503,10 @@ from rest_framework.response import Response
 from rest_framework import permissions, status
 
 # 모델 import (이미 위에서 import 했다면 중복 제거)
-from .models import Project, GanttChart, GanttTask
+from .models import Project, GanttChart
+from .gantt_store import materialize_tasks
+from .gantt_render import PngUnavailable, rendered_path, snap_scale
+from .artifact_serving import serve_artifact
 
 
 class LatestGanttTasksView(APIView):
@@ -3559,12 +3532,10 @@ class LatestGanttTasksView(APIView):
         if not latest:
             return Response({"error": "간트차트가 없습니다."}, status=status.HTTP_404_NOT_FOUND)
 
-        # 3) 태스크 조회 (파트/시작주차/순서 기준 정렬)
-        tasks_qs = (
-            GanttTask.objects
-            .filter(gantt_chart=latest)
-            .select_related("requirement")
-            .order_by("part", "start_week", "order", "GanttTask")  # ← 'id' 대신 'GanttTask'
+        # 3) 태스크 조회 (부분 재계획 버전은 기준 버전과 합성, 파트/시작주차/순서 기준 정렬)
+        tasks_qs = sorted(
+            materialize_tasks(latest, select_related=True),
+            key=lambda t: (t.part, t.start_week, t.order, t.GanttTask),
         )
 
         tasks = []
@@ -3590,8 +3561,51 @@ class LatestGanttTasksView(APIView):
             "total_weeks": latest.total_weeks,   # e.g. 12
             "parts": latest.parts,               # e.g. ["백엔드","프론트엔드","AI","서류"]
             "tasks": tasks,                      # 위에서 구성한 태스크 배열
+            "image": {                           # 서버 렌더 이미지(모바일/문서 삽입용)
+                "svg": f"/api/gantt/{latest.GanttChart}/render/?type=svg",
+                "png": f"/api/gantt/{latest.GanttChart}/render/?type=png",
+            },
         }, status=status.HTTP_200_OK)
 
+
+class GanttRenderView(APIView):
+    """
+    GET /api/gantt/<int:gantt_id>/render/?type=svg|png&scale=2   (scale: 1/2/3/4 중 가까운 값)
+    GET /api/project/<int:project_id>/gantt/latest/render/?type=...
+    - 서버 렌더 간트 이미지(gantt_render). (gantt id, version)별 파일 캐시 + 강한 ETag → 304
+    - PNG는 cairosvg 설치 시에만(없으면 501, SVG 사용)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, gantt_id: int = None, project_id: int = None):
+        if gantt_id is not None:
+            chart = get_object_or_404(GanttChart.objects.select_related("project"),
+                                      GanttChart=gantt_id, project__user=request.user)
+        else:
+            project = get_object_or_404(Project, project_id=project_id, user=request.user)
+            chart = (GanttChart.objects.filter(project=project)
+                     .order_by("-created_at", "-GanttChart").first())
+            if not chart:
+                return Response({"error": "간트차트가 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+        fmt = (request.query_params.get("type") or "svg").lower()
+        if fmt not in ("svg", "png"):
+            return Response({"error": "type은 svg 또는 png 입니다."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # 캐시 파일이 클라이언트 입력만큼 늘지 않도록 고정 배율로 맞춤
+            scale = snap_scale(float(request.query_params.get("scale") or 1))
+        except ValueError:
+            return Response({"error": "scale은 숫자여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            path = rendered_path(chart, fmt, scale)
+        except PngUnavailable as e:
+            return Response({"error": str(e), "svg": f"/api/gantt/{chart.GanttChart}/render/?type=svg"},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+        filename = f"gantt{chart.GanttChart}_v{chart.version}.{fmt}"
+        content_type = "image/svg+xml" if fmt == "svg" else "image/png"
+        return serve_artifact(request, path, filename=filename, content_type=content_type, as_attachment=False)
+
 # views.py (필요 부분만)
 import os
 from django.conf import settings
@@ -3599,16 +3613,16 @@ from django.http import Http404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
-from .idea_refiner import IdeaRefiner
-from .idea_expander import IdeaExpander
+from .idea_pipeline import run_idea_pipeline
 
 
 
 class IdeaPreviewView(APIView):
     """
-    GET /api/idea/preview/?idea=...&title=...&also_return_markdown=true
+    GET /api/idea/preview/?idea=...&title=...&also_return_markdown=true&similar_map=false
     GET /api/idea/preview/?filename=idea_plan_1.md
     - 저장 없이 정제/확장(MD 포함) OR 기존 md 파일을 읽어 반환
+    - similar_map=true면 유사맵도 확장과 동시에 생성
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -3638,20 +3652,22 @@ class IdeaPreviewView(APIView):
         # 1) 파일명으로 미리보기 (이미 export된 md 읽기)
         if filename:
             base = getattr(settings, "MEDIA_ROOT", os.path.join(settings.BASE_DIR, "media"))
-            md_path = os.path.join(base, "ideas", filename)
-            if not (os.path.isfile(md_path) and md_path.endswith(".md")):
+            md_path = os.path.join(base, "ideas", os.path.basename(filename))
+            if not (md_path.endswith(".md") and stored_exists(md_path)):
                 raise Http404("markdown file not found")
-            with open(md_path, "r", encoding="utf-8") as f:
-                md_text = f.read()
+            md_text = read_stored_bytes(md_path).decode("utf-8")
             return Response({"md": md_text, "from_file": True}, status=200)
 
         # 2) 아이디어로 즉시 정제/확장 (저장 없음)
         if not idea:
             return Response({"error": "idea or filename is required"}, status=400)
 
-        refined = IdeaRefiner().refine(idea)
-        suggestions = IdeaExpander().expand(refined)
-        similar_map = {}  # 필요 시 채워 넣기
+        with_similar = str(request.query_params.get("similar_map", "false")).lower() in ("1", "true", "yes")
+        stages = ("expand", "similar_map") if with_similar else ("expand",)
+        result, timings = run_idea_pipeline(idea=idea, stages=stages)
+        refined = result["refined"]
+        suggestions = result["suggestions"]
+        similar_map = result["similar_map"]
 
         md_text = None
         if want_md:
@@ -3664,6 +3680,7 @@ class IdeaPreviewView(APIView):
             "refined": refined,
             "suggestions": suggestions,
             "similar_map": similar_map,
+            "timings": timings,
         }
         if want_md:
             payload["md"] = md_text
@@ -3674,10 +3691,12 @@ class IdeaPreviewView(APIView):
 # views.py
 import os, mimetypes
 from django.conf import settings
-from django.http import FileResponse, Http404
+from django.http import Http404
 from rest_framework.views import APIView
 from rest_framework import permissions
 
+from .artifact_serving import serve_artifact
+
 class IdeaFileDownloadView(APIView):
     """
     생성된 아이디어 기획서(MD/DOCX) 파일 다운로드
@@ -3691,12 +3710,11 @@ class IdeaFileDownloadView(APIView):
         filepath = os.path.abspath(os.path.join(ideas_dir, filename))
 
         # 경로 탈출 방지 + 존재 확인
-        if not filepath.startswith(ideas_dir) or not os.path.exists(filepath):
+        if not filepath.startswith(ideas_dir) or not stored_exists(filepath):
             raise Http404("File not found")
 
         content_type, _ = mimetypes.guess_type(filepath)
-        resp = FileResponse(open(filepath, "rb"), as_attachment=True, filename=filename)
-        if content_type:
-            resp["Content-Type"] = content_type
-        return resp
+        return serve_artifact(request, filepath, os.path.basename(filepath),
+                              content_type or "application/octet-stream",
+                              not_found="File not found")
 
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+zip_stream.py
+- 코드 생성 ZIP을 메모리에 통째로 만들지 않고, 파일이 만들어지는 대로 하나씩 추가
+- write_zip  : 디스크(.part)에 바로 기록 후 원자적 rename → 메모리 사용량 일정
+- stream_zip : 같은 ZIP을 디스크에 기록하면서 동시에 바이트 조각을 yield
+               (StreamingHttpResponse로 생성 도중에 클라이언트에 chunked 전송)
+
+entries: (arc_path, content) 반복자. content는 str | bytes | 파일 경로(pathlib.Path) | 읽기 가능한 파일 객체
+         제너레이터를 넘기면 LLM이 파일을 하나 만들 때마다 ZIP에 바로 반영된다.
+"""
+
+import os
+import uuid
+import zipfile
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator, Optional, Tuple, Union
+
+__all__ = [
+    "write_zip",
+    "stream_zip",
+]
+
+Content = Union[str, bytes, Path, IO[bytes], None]
+
+_CHUNK = 256 * 1024
+
+
+def _part_path(abspath: str) -> str:
+    return f"{abspath}.{uuid.uuid4().hex[:8]}.part"
+
+
+def _iter_add(zf: zipfile.ZipFile, arc_path: str, content: Content) -> Iterator[None]:
+    """항목 하나를 청크 단위로 추가. 청크를 쓸 때마다 한 번씩 yield(스트리밍 시 그때그때 내보내기)."""
+    info = zipfile.ZipInfo(arc_path.replace(os.sep, "/").lstrip("/"))
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    with zf.open(info, "w", force_zip64=True) as dst:
+        if content is None:
+            pass
+        elif isinstance(content, str):
+            dst.write(content.encode("utf-8"))
+        elif isinstance(content, (bytes, bytearray, memoryview)):
+            dst.write(content)
+        else:
+            src = open(content, "rb") if isinstance(content, (Path, os.PathLike)) else content
+            try:
+                for chunk in iter(lambda: src.read(_CHUNK), b""):
+                    dst.write(chunk)
+                    yield
+            finally:
+                if src is not content:
+                    src.close()
+    yield
+
+
+def write_zip(abspath: str, entries: Iterable[Tuple[str, Content]]) -> str:
+    """entries를 abspath ZIP으로 기록(임시 .part → 완료 시 교체). abspath 반환."""
+    os.makedirs(os.path.dirname(abspath), exist_ok=True)
+    part = _part_path(abspath)
+    try:
+        with zipfile.ZipFile(part, "w", zipfile.ZIP_DEFLATED) as zf:
+            for arc_path, content in entries:
+                for _ in _iter_add(zf, arc_path, content):
+                    pass
+        os.replace(part, abspath)
+    except BaseException:
+        try:
+            os.remove(part)
+        except OSError:
+            pass
+        raise
+    return abspath
+
+
+class _TeeSink:
+    """zipfile 출력 대상: 스풀 파일에 쓰고, 아직 내보내지 않은 조각을 모아둔다.
+    tell/seek가 없으므로 zipfile은 data descriptor 방식(비탐색 스트림)으로 기록한다."""
+
+    def __init__(self, spool):
+        self._spool = spool
+        self._pending = []
+
+    def write(self, b) -> int:
+        b = bytes(b)
+        if self._spool is not None:
+            self._spool.write(b)
+        self._pending.append(b)
+        return len(b)
+
+    def flush(self) -> None:
+        if self._spool is not None:
+            self._spool.flush()
+
+    def drain(self) -> bytes:
+        out = b"".join(self._pending)
+        self._pending.clear()
+        return out
+
+
+def stream_zip(
+    entries: Iterable[Tuple[str, Content]],
+    spool_path: Optional[str] = None,
+    on_complete: Optional[Callable[[str], None]] = None,
+) -> Iterator[bytes]:
+    """
+    ZIP 바이트 조각을 항목 단위로 yield.
+    spool_path가 있으면 같은 내용을 디스크에도 기록하고, 끝까지 성공했을 때만
+    spool_path로 교체한 뒤 on_complete(spool_path) 호출(레지스트리 등록 등).
+    클라이언트가 중간에 끊으면(GeneratorExit) 스풀 파일은 버린다.
+    """
+    part = None
+    spool = None
+    if spool_path:
+        os.makedirs(os.path.dirname(spool_path), exist_ok=True)
+        part = _part_path(spool_path)
+        spool = open(part, "wb")
+    ok = False
+    try:
+        sink = _TeeSink(spool)
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+            for arc_path, content in entries:
+                for _ in _iter_add(zf, arc_path, content):
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+        tail = sink.drain()  # central directory
+        if tail:
+            yield tail
+        ok = True
+    finally:
+        if spool is not None:
+            spool.close()
+            if ok:
+                os.replace(part, spool_path)
+            else:
+                try:
+                    os.remove(part)
+                except OSError:
+                    pass
+    if ok and spool_path and on_complete:
+        on_complete(spool_path)
@@ -43,6 +43,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'auto_app.llm_telemetry.TelemetryContextMiddleware',  # LLM 호출 텔레메트리에 stage/project 부착
 ]
 
 # 🔹 URL 및 WSGI 설정
@@ -107,6 +108,11 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# ✅ 추가: 산출물 다운로드 프록시 위임(auto_app/artifact_serving.py)
+#   ""(앱에서 직접 전송) | "nginx"(X-Accel-Redirect) | "apache"(X-Sendfile)
+ARTIFACT_OFFLOAD = os.getenv('ARTIFACT_OFFLOAD', '')
+ARTIFACT_ACCEL_PREFIX = os.getenv('ARTIFACT_ACCEL_PREFIX', '/protected-media/')
+
 # ✅ 추가: xlsx MIME 보정 (로컬/윈도우 등 환경에서 필요할 수 있음)
 mimetypes.add_type(
     'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
@@ -119,13 +125,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # 🔹 CORS 허용
 CORS_ALLOW_ALL_ORIGINS = True
 # ✅ 추가: 파일 다운로드 시 파일명 헤더 노출(프론트 fetch에서 읽기 위함)
-CORS_EXPOSE_HEADERS = ['Content-Disposition','Content-Disposition', 'Content-Type']
+CORS_EXPOSE_HEADERS = ['Content-Disposition','Content-Disposition', 'Content-Type',
+                       'ETag', 'Last-Modified', 'Content-Range', 'Accept-Ranges', 'Content-Length']
 SECURE_CONTENT_TYPE_NOSNIFF = True    
 
 # 🔹 REST Framework 설정 (JWT 포함)
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication + 사용자 스냅샷 캐시(요청당 People SELECT 제거, JWT_USER_CACHE_TTL 초)
+        'auto_app.auth_cache.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -1,7 +1,7 @@
 from typing import List, Dict, Any
 import time
 
-import google.generativeai as genai
+from auto_app.gemini_pool import get_pool
 
 
 SYS_PROMPT = (
@@ -11,7 +11,8 @@ SYS_PROMPT = (
 
 class SectionWriter:
 	def __init__(self, api_key: str, model_name: str, temperature: float = 0.2, max_retry: int = 3):
-		genai.configure(api_key=api_key)
+		# 전역 genai.configure 대신 키 풀에 등록(동시 요청 간 키 섞임 방지)
+		self.key_alias = get_pool().ensure_key(api_key) if api_key else None
 		self.model_name = model_name
 		self.temperature = temperature
 		self.max_retry = max_retry
@@ -19,7 +20,7 @@ class SectionWriter:
 	def _call_model(self, messages: List[Dict[str, str]]) -> str:
 		for attempt in range(1, self.max_retry + 1):
 			try:
-				model = genai.GenerativeModel(self.model_name)
+				model = get_pool().model(self.model_name, prefer=self.key_alias)
 				resp = model.generate_content(
 					messages,
 					generation_config={"temperature": self.temperature},